@@ -30,6 +30,7 @@ class ExecutorModule:
         cls.__defaults["WorkDirectory"] = os.path.join(rootPath, "work", *exeName.split("/"))
         cls.__defaults["ReconnectRetries"] = 10
         cls.__defaults["ReconnectSleep"] = 5
+        cls.__defaults["FuseChain"] = False
         cls.__defaults["shifterProxy"] = ""
         cls.__defaults["shifterProxyLocation"] = os.path.join(cls.__defaults["WorkDirectory"], ".shifterCred")
         cls.__properties["shifterProxy"] = ""
@@ -122,15 +123,42 @@ class ExecutorModule:
         return result
 
     def _ex_processTask(self, taskId, taskStub):
-        self.__properties["shifterProxy"] = self.ex_getOption("shifterProxy")
-        self.__freezeTime = 0
-        self.__fastTrackEnabled = True
         self.log.verbose(f"Task {str(taskId)}: Received")
+        result = self._ex_deserializeTask(taskId, taskStub)
+        if not result["OK"]:
+            return result
+        result = self._ex_processTaskObject(taskId, result["Value"])
+        if not result["OK"]:
+            return result
+        taskObj, freezeTime, fastTrackType = result["Value"]
+        # Serialize again
+        result = self._ex_serializeTask(taskId, taskObj)
+        if not result["OK"]:
+            return result
+        # EOP
+        return S_OK((result["Value"], freezeTime, fastTrackType))
+
+    def _ex_deserializeTask(self, taskId, taskStub):
         result = self.__deserialize(taskId, taskStub)
         if not result["OK"]:
             self.log.error("Can not deserialize task", f"Task {str(taskId)}: {result['Message']}")
-            return result
-        taskObj = result["Value"]
+        return result
+
+    def _ex_serializeTask(self, taskId, taskObj):
+        result = self.__serialize(taskId, taskObj)
+        if not result["OK"]:
+            self.log.verbose(f"Task {str(taskId)}: Cannot serialize: {result['Message']}")
+        return result
+
+    def _ex_processTaskObject(self, taskId, taskObj):
+        """Process an already deserialized task. Used directly when several executors of the same process
+        run one after the other on a task, to avoid serializing it between them.
+
+        :return: S_OK((taskObj, freezeTime, fastTrackType))/S_ERROR
+        """
+        self.__properties["shifterProxy"] = self.ex_getOption("shifterProxy")
+        self.__freezeTime = 0
+        self.__fastTrackEnabled = True
         # Shifter proxy?
         result = self.__installShifterProxy()
         if not result["OK"]:
@@ -141,15 +169,9 @@ class ExecutorModule:
             raise Exception("processTask does not return a return structure")
         if not result["OK"]:
             return result
-        # If there's a result, serialize it again!
+        # If there's a result, it replaces the task
         if result["Value"]:
             taskObj = result["Value"]
-        # Serialize again
-        result = self.__serialize(taskId, taskObj)
-        if not result["OK"]:
-            self.log.verbose(f"Task {str(taskId)}: Cannot serialize: {result['Message']}")
-            return result
-        taskStub = result["Value"]
         # Try fast track
         fastTrackType = False
         if not self.__freezeTime and self.__fastTrackEnabled:
@@ -159,8 +181,7 @@ class ExecutorModule:
             else:
                 fastTrackType = result["Value"]
 
-        # EOP
-        return S_OK((taskStub, self.__freezeTime, fastTrackType))
+        return S_OK((taskObj, self.__freezeTime, fastTrackType))
 
     ####
     # Callable functions
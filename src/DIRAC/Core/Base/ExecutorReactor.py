@@ -64,6 +64,10 @@ class ExecutorReactor:
             self.__instances = {}
             self.__instanceLock = threading.Lock()
             self.__aliveLock = aliveLock
+            self.__fuseChain = False
+            self.__reportPeriod = 300
+            self.__stats = {"start": time.time(), "tasks": 0, "steps": 0}
+            self.__statsLock = threading.Lock()
 
         def updateMaxTasks(self, mt):
             self.__maxTasks = max(self.__maxTasks, mt)
@@ -74,6 +78,8 @@ class ExecutorReactor:
             self.__reconnectSleep = max(self.__reconnectSleep, exeClass.ex_getOption("ReconnectSleep", 0))
             self.__reconnectRetries = max(self.__reconnectRetries, exeClass.ex_getOption("ReconnectRetries", 0))
             self.__extraArgs[name] = exeClass.ex_getExtraArguments()
+            self.__fuseChain = self.__fuseChain or exeClass.ex_getOption("FuseChain")
+            self.__reportPeriod = exeClass.ex_getOption("ThroughputReportPeriod", self.__reportPeriod)
 
         def connect(self):
             self.__msgClient = MessageClient(self.__mindName)
@@ -166,7 +172,25 @@ class ExecutorReactor:
                 msgObj.freezeTime = extra
             return self.__msgClient.sendMessage(msgObj)
 
+        def __updateStats(self, steps):
+            """Count the tasks processed and report the throughput periodically"""
+            with self.__statsLock:
+                self.__stats["tasks"] += 1
+                self.__stats["steps"] += steps
+                elapsed = time.time() - self.__stats["start"]
+                if elapsed < self.__reportPeriod:
+                    return
+                gLogger.info(
+                    f"Throughput for {self.__mindName}",
+                    "%d tasks (%d executor steps) in %.1f s: %.2f tasks/s"
+                    % (self.__stats["tasks"], self.__stats["steps"], elapsed, self.__stats["tasks"] / elapsed),
+                )
+                self.__stats = {"start": time.time(), "tasks": 0, "steps": 0}
+
         def __moduleProcess(self, eType, taskId, taskStub, fastTrackLevel=0):
+            if self.__fuseChain:
+                return self.__fusedModuleProcess(eType, taskId, taskStub)
+
             result = self.__getInstance(eType)
             if not result["OK"]:
                 return result
@@ -191,8 +215,63 @@ class ExecutorReactor:
                 else:
                     gLogger.notice(f"Stopping {taskId} fast track. Sending back to the mind")
 
+            self.__updateStats(fastTrackLevel + 1)
             return S_OK(("TaskDone", taskStub, True))
 
+        def __fusedModuleProcess(self, eType, taskId, taskStub):
+            """Run on a task all the executors of its chain hosted by this process, one after the other.
+            The deserialized task is passed from one executor to the next, and it is serialized once,
+            when it goes back to the mind.
+            """
+            taskObj = None
+            prevInstance = None
+            for step in range(11):
+                result = self.__getInstance(eType)
+                if not result["OK"]:
+                    return result
+                modInstance = result["Value"]
+                # The task object can only be shared by executors using the same deserialization
+                if taskObj is not None and type(modInstance).deserializeTask is not type(prevInstance).deserializeTask:
+                    result = prevInstance._ex_serializeTask(taskId, taskObj)
+                    if not result["OK"]:
+                        return result
+                    taskStub = result["Value"]
+                    taskObj = None
+                try:
+                    if taskObj is None:
+                        result = modInstance._ex_deserializeTask(taskId, taskStub)
+                        if not result["OK"]:
+                            self.__storeInstance(eType, modInstance)
+                            return S_OK(("TaskError", taskStub, f"Error: {result['Message']}"))
+                        taskObj = result["Value"]
+                    result = modInstance._ex_processTaskObject(taskId, taskObj)
+                except Exception as excp:
+                    gLogger.exception(f"Error while processing task {taskId}", lException=excp)
+                    return S_ERROR(f"Error processing task {taskId}: {excp}")
+
+                self.__storeInstance(eType, modInstance)
+
+                if not result["OK"]:
+                    # The task object holds the partial changes of the failing executor, so the last serialized
+                    # stub is sent back instead, like the stub from before the step without fusion. The changes
+                    # of the executors run since that stub are dropped, the mind fails the task anyway
+                    return S_OK(("TaskError", taskStub, f"Error: {result['Message']}"))
+                taskObj, freezeTime, fastTrackType = result["Value"]
+                prevInstance = modInstance
+
+                if freezeTime or not fastTrackType or fastTrackType not in self.__modules or step == 10:
+                    break
+                gLogger.verbose(f"Fast tracking task {taskId} to {fastTrackType} in the same process")
+                eType = fastTrackType
+
+            self.__updateStats(step + 1)
+            result = modInstance._ex_serializeTask(taskId, taskObj)
+            if not result["OK"]:
+                return S_OK(("TaskError", taskStub, f"Error: {result['Message']}"))
+            if freezeTime:
+                return S_OK(("TaskFreeze", result["Value"], freezeTime))
+            return S_OK(("TaskDone", result["Value"], True))
+
     #####
     # Start of ExecutorReactor
     #####
@@ -0,0 +1,84 @@
+""" pytest(s) for the ExecutorReactor
+"""
+# pylint: disable=protected-access, missing-docstring
+import pytest
+
+from DIRAC import S_OK, S_ERROR
+from DIRAC.Core.Base.ExecutorModule import ExecutorModule
+from DIRAC.Core.Base.ExecutorReactor import ExecutorReactor
+
+
+class Task:
+    def __init__(self, steps):
+        self.steps = steps
+
+
+class BaseExecutor(ExecutorModule):
+    serialized = 0
+
+    @classmethod
+    def initialize(cls):
+        return S_OK()
+
+    def serializeTask(self, taskObj):
+        BaseExecutor.serialized += 1
+        return S_OK(",".join(taskObj.steps))
+
+    def deserializeTask(self, taskStub):
+        return S_OK(Task([step for step in taskStub.split(",") if step]))
+
+
+class StepOne(BaseExecutor):
+    def processTask(self, taskId, taskObj):
+        taskObj.steps.append("One")
+        return S_OK()
+
+    def fastTrackDispatch(self, taskId, taskObj):
+        return S_OK("Test/StepTwo")
+
+
+class StepTwo(BaseExecutor):
+    def processTask(self, taskId, taskObj):
+        taskObj.steps.append("Two")
+        if taskId == "bad":
+            return S_ERROR("Bad task")
+        return S_OK()
+
+
+@pytest.fixture(params=[False, True], ids=["fastTrack", "fused"])
+def mindCluster(request, mocker):
+    mocker.patch(
+        "DIRAC.Core.Base.ExecutorModule.PathFinder.getExecutorSection", side_effect=lambda name: f"/Executors/{name}"
+    )
+    for name, exeClass in (("Test/StepOne", StepOne), ("Test/StepTwo", StepTwo)):
+        assert exeClass._ex_initialize(name, name)["OK"]
+        exeClass.ex_setOption("FuseChain", request.param)
+    mc = ExecutorReactor.MindCluster("Test/Mind", ExecutorReactor.AliveLock())
+    mc.addModule("Test/StepOne", StepOne)
+    mc.addModule("Test/StepTwo", StepTwo)
+    BaseExecutor.serialized = 0
+    return mc, request.param
+
+
+def test_moduleProcess(mindCluster):
+    mc, fused = mindCluster
+
+    result = mc._MindCluster__moduleProcess("Test/StepOne", "task", "Zero")
+
+    assert result["OK"]
+    assert result["Value"] == ("TaskDone", "Zero,One,Two", True)
+    # The task is only serialized when going back to the mind in the fused mode
+    assert BaseExecutor.serialized == (1 if fused else 2)
+
+
+def test_moduleProcess_error(mindCluster):
+    mc, fused = mindCluster
+
+    result = mc._MindCluster__moduleProcess("Test/StepOne", "bad", "Zero")
+
+    assert result["OK"]
+    msgName, taskStub, errorMsg = result["Value"]
+    assert msgName == "TaskError"
+    # The partial changes of the failing executor are never sent back, the last serialized stub is
+    assert taskStub == ("Zero" if fused else "Zero,One")
+    assert errorMsg == "Error: Bad task"
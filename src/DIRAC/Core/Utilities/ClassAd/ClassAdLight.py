@@ -1,93 +1,97 @@
 """ ClassAd Class - a light purely Python representation of the
     Condor ClassAd library.
+
+    The same JDLs are parsed many times (e.g. by each optimizer, the JobAgent and the JobWrapper), so
+    the parsed attributes are kept in a LRU cache keyed by the JDL digest.
 """
+import hashlib
+import re
+import threading
 
+import cachetools
 
-class ClassAd:
-    def __init__(self, jdl):
-        """ClassAd constructor from a JDL string"""
-        self.contents = {}
-        result = self.__analyse_jdl(jdl)
-        if result:
-            self.contents = result
-
-    def __analyse_jdl(self, jdl, index=0):
-        """Analyse one [] jdl enclosure"""
-
-        jdl = jdl.strip()
-
-        # Strip all the blanks first
-        # temp = jdl.replace(' ','').replace('\n','')
-        temp = jdl
-
-        result = {}
-
-        if temp[0] != "[" or temp[-1] != "]":
-            print("Invalid JDL: it should start with [ and end with ]")
-            return result
-
-        # Parse the jdl string now
-        body = temp[1:-1]
-        index = 0
-        namemode = 1
-        valuemode = 0
-        while index < len(body):
-            if namemode:
-                ind = body.find("=", index)
-                if ind != -1:
-                    name = body[index:ind]
-                    index = ind + 1
-                    valuemode = 1
-                    namemode = 0
-                else:
-                    break
-            elif valuemode:
-                ind1 = body.find("[", index)
-                ind2 = body.find(";", index)
-                if ind1 != -1 and ind1 < ind2:
-                    value, newind = self.__find_subjdl(body, ind1)
-                elif ind1 == -1 and ind2 == -1:
-                    value = body[index:]
-                    newind = len(body)
-                else:
-                    if index == ind2:
-                        return {}
-                    else:
-                        value = body[index:ind2]
-                        newind = ind2 + 1
+# The delimiters of the [] enclosures and of the attributes, and the string literals in which they are ignored
+_JDL_DELIMITERS = re.compile(r'"[^"]*"?|[\[\];]')
+
+
+def jdlDigest(jdl):
+    """Digest of a JDL string, used as key of the parse caches"""
+    return hashlib.sha256(jdl.encode(errors="surrogateescape")).digest()
+
+
+def _findOutsideLiterals(body, char, start, end):
+    """Find a character in body[start:end] which is not inside a string literal"""
+    index = body.find(char, start, end)
+    while index != -1 and body.count('"', start, index) % 2:
+        index = body.find(char, index + 1, end)
+    return index
 
-                result[name.strip()] = value.strip().replace("\n", "")
-                index = newind
-                valuemode = 0
-                namemode = 1
 
+def _findValueEnd(body, index):
+    """Find the ; ending a value containing [] enclosures, starting inside the first enclosure
+
+    :return: tuple (position of the ;, position of the next attribute)
+    """
+    depth = 1
+    for match in _JDL_DELIMITERS.finditer(body, index):
+        char = match.group()
+        if char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        elif char == ";" and not depth:
+            return match.start(), match.end()
+    return len(body), len(body)
+
+
+@cachetools.cached(cachetools.LRUCache(maxsize=1000), key=jdlDigest, lock=threading.Lock())
+def _parseJDL(jdl):
+    """Analyse one [] jdl enclosure
+
+    The returned dictionary is shared through the cache, it must not be modified.
+
+    :param str jdl: JDL string
+    :return: dict {attribute name: expression string}, empty if the JDL is invalid
+    """
+    jdl = jdl.strip()
+    result = {}
+
+    if jdl[:1] != "[" or jdl[-1:] != "]":
+        print("Invalid JDL: it should start with [ and end with ]")
         return result
 
-    def __find_subjdl(self, body, index):
-        """Find a full [] enclosure starting from index"""
-        result = ""
-        if body[index] != "[":
-            return (result, 0)
-
-        depth = 0
-        ind = index
-        while depth < 10:
-            ind1 = body.find("]", ind + 1)
-            ind2 = body.find("[", ind + 1)
-            if ind2 != -1 and ind2 < ind1:
-                depth += 1
-                ind = ind2
-            else:
-                if depth > 0:
-                    depth -= 1
-                    ind = ind1
-                else:
-                    result = body[index : ind1 + 1]
-                    if body[ind1 + 1] == ";":
-                        return (result, ind1 + 2)
-                    return result, 0
+    # The name goes up to the first "=", the value up to the next ";". The string literals are only looked at
+    # when a ; or a [ may be inside one
+    body = jdl[1:-1]
+    index = 0
+    while True:
+        nameEnd = body.find("=", index)
+        if nameEnd == -1:
+            break
+        name = body[index:nameEnd]
+        valueStart = nameEnd + 1
+        valueEnd = body.find(";", valueStart)
+        if valueEnd != -1 and body.count('"', valueStart, valueEnd) % 2:
+            valueEnd = _findOutsideLiterals(body, ";", valueStart, len(body))
+        if valueEnd == -1:
+            valueEnd = len(body)
+        index = valueEnd + 1
+        subStart = body.find("[", valueStart, valueEnd)
+        if subStart != -1:
+            subStart = _findOutsideLiterals(body, "[", valueStart, valueEnd)
+        if subStart != -1:
+            valueEnd, index = _findValueEnd(body, subStart + 1)
+        elif valueEnd == valueStart:
+            return {}
+        result[name.strip()] = body[valueStart:valueEnd].strip().replace("\n", "")
+
+    return result
+
 
-        return result, 0
+class ClassAd:
+    def __init__(self, jdl):
+        """ClassAd constructor from a JDL string"""
+        self.contents = dict(_parseJDL(jdl))
 
     def insertAttributeInt(self, name, attribute):
         """Insert a named integer attribute"""
@@ -268,6 +268,51 @@ class ElasticSearchDB:
         except RequestError as re:
             return S_ERROR(re)
 
+    @ifConnected
+    def getDocs(self, index: str, docIDs: list) -> dict:
+        """Retrieves several documents of an index with a single multi-get request.
+
+        :param index: name of the index
+        :param docIDs: document IDs
+        :return: S_OK(dict) {docID: document} of the documents found
+        """
+        sLog.debug(f"Retrieving {len(docIDs)} documents in index {index}")
+        try:
+            result = self.client.mget(body={"ids": [str(docID) for docID in docIDs]}, index=index)
+        except NotFoundError:
+            sLog.warn("Could not find the index", index)
+            return S_OK({})
+        except RequestError as re:
+            return S_ERROR(re)
+        return S_OK({doc["_id"]: doc["_source"] for doc in result["docs"] if doc.get("found")})
+
+    @ifConnected
+    def upsertDocs(self, docs: list) -> dict:
+        """Updates several documents with partial documents, creating the missing ones,
+        with a single bulk request.
+
+        :param docs: list of tuples (index name, document ID, partial document)
+        :return: S_OK(number of documents updated or created)/S_ERROR
+        """
+        sLog.debug(f"Updating {len(docs)} documents")
+        actions = (
+            {
+                "_op_type": "update",
+                "_index": index,
+                "_id": str(docID),
+                "doc": doc,
+                "doc_as_upsert": True,
+                "retry_on_conflict": 3,
+            }
+            for index, docID, doc in docs
+        )
+        try:
+            res = bulk(client=self.client, actions=actions)
+        except (BulkIndexError, RequestError, TransportError) as e:
+            sLog.exception()
+            return S_ERROR(e)
+        return S_OK(res[0])
+
     @ifConnected
     def updateDoc(self, index: str, docID: str, body) -> dict:
         """Update an existing document with a script or partial document
@@ -1,5 +1,8 @@
 """ Used by the executors for dispatching events (IIUC)
 """
+import collections
+import heapq
+import itertools
 import threading
 import time
 
@@ -99,7 +102,8 @@ class ExecutorState:
         maxFreeSlots = 0
         try:
             for eId in self.__typeToId[eType]:
-                freeSlots = self.freeSlots(eId)
+                # Inlined freeSlots, this is called for each task sent
+                freeSlots = self.__maxTasks.get(eId, 0) - len(self.__execTasks.get(eId, ()))
                 if freeSlots > maxFreeSlots:
                     maxFreeSlots = freeSlots
                     idleId = eId
@@ -141,6 +145,13 @@ class ExecutorState:
 
 
 class ExecutorQueues:
+    """Waiting queues of the tasks, one per executor type.
+
+    The queues are deques of (taskId, token) tuples. A task removed from the middle of a queue is only
+    forgotten in the index dicts, and its stale entry is skipped when it reaches the head of the queue,
+    so that all the operations are O(1).
+    """
+
     def __init__(self, log=False):
         if log:
             self.__log = log
@@ -148,12 +159,15 @@ class ExecutorQueues:
             self.__log = gLogger
         self.__lock = threading.Lock()
         self.__queues = {}
+        self.__queueLength = {}
         self.__lastUse = {}
         self.__taskInQueue = {}
+        self.__taskToken = {}
+        self.__tokens = itertools.count()
 
     def _internals(self):
         return {
-            "queues": dict(self.__queues),
+            "queues": self.getState(),
             "lastUse": dict(self.__lastUse),
             "taskInQueue": dict(self.__taskInQueue),
             "locked": self.__lock.locked(),  # pylint: disable=no-member
@@ -174,16 +188,20 @@ class ExecutorQueues:
                     )
                     self.__log.fatal(errMsg)
                     return 0
-                return len(self.__queues[eType])
+                return self.__queueLength[eType]
             if eType not in self.__queues:
-                self.__queues[eType] = []
+                self.__queues[eType] = collections.deque()
+                self.__queueLength[eType] = 0
             self.__lastUse[eType] = time.time()
+            token = next(self.__tokens)
             if ahead:
-                self.__queues[eType].insert(0, taskId)
+                self.__queues[eType].appendleft((taskId, token))
             else:
-                self.__queues[eType].append(taskId)
+                self.__queues[eType].append((taskId, token))
             self.__taskInQueue[taskId] = eType
-            return len(self.__queues[eType])
+            self.__taskToken[taskId] = token
+            self.__queueLength[eType] += 1
+            return self.__queueLength[eType]
         finally:
             self.__lock.release()
 
@@ -191,29 +209,31 @@ class ExecutorQueues:
         if not isinstance(eTypes, (list, tuple)):
             eTypes = [eTypes]
         self.__lock.acquire()
-        for eType in eTypes:
-            try:
-                taskId = self.__queues[eType].pop(0)
-                del self.__taskInQueue[taskId]
-                # Found! release and return!
-                self.__lock.release()
-                self.__lastUse[eType] = time.time()
-                self.__log.verbose(f"Popped task {taskId} from executor {eType} waiting queue")
-                return (taskId, eType)
-            except IndexError:
-                continue
-            except KeyError:
-                continue
-        self.__lock.release()
-        # Not found. release and return None
+        try:
+            for eType in eTypes:
+                queue = self.__queues.get(eType)
+                while queue:
+                    taskId, token = queue.popleft()
+                    # Skip the entries of the deleted tasks
+                    if self.__taskToken.get(taskId) != token:
+                        continue
+                    del self.__taskInQueue[taskId]
+                    del self.__taskToken[taskId]
+                    self.__queueLength[eType] -= 1
+                    self.__lastUse[eType] = time.time()
+                    self.__log.verbose(f"Popped task {taskId} from executor {eType} waiting queue")
+                    return (taskId, eType)
+        finally:
+            self.__lock.release()
+        # Not found
         return None
 
     def getState(self):
         self.__lock.acquire()
         try:
             qInfo = {}
-            for qName in self.__queues:
-                qInfo[qName] = list(self.__queues[qName])
+            for qName, queue in self.__queues.items():
+                qInfo[qName] = [taskId for taskId, token in queue if self.__taskToken.get(taskId) == token]
         finally:
             self.__lock.release()
         return qInfo
@@ -223,16 +243,19 @@ class ExecutorQueues:
         self.__lock.acquire()
         try:
             try:
-                eType = self.__taskInQueue[taskId]
-                del self.__taskInQueue[taskId]
-                self.__lastUse[eType] = time.time()
+                eType = self.__taskInQueue.pop(taskId)
             except KeyError:
                 return False
-            try:
-                iPos = self.__queues[eType].index(taskId)
-            except ValueError:
-                return False
-            del self.__queues[eType][iPos]
+            # The entry in the queue is skipped when popped
+            del self.__taskToken[taskId]
+            self.__queueLength[eType] -= 1
+            self.__lastUse[eType] = time.time()
+            queue = self.__queues[eType]
+            # Do not keep too many stale entries
+            if len(queue) > 2 * self.__queueLength[eType] + 1000:
+                self.__queues[eType] = collections.deque(
+                    entry for entry in queue if self.__taskToken.get(entry[0]) == entry[1]
+                )
             return True
         finally:
             self.__lock.release()
@@ -240,10 +263,7 @@ class ExecutorQueues:
     def waitingTasks(self, eType):
         self.__lock.acquire()
         try:
-            try:
-                return len(self.__queues[eType])
-            except KeyError:
-                return 0
+            return self.__queueLength.get(eType, 0)
         finally:
             self.__lock.release()
 
@@ -304,7 +324,11 @@ class ExecutorDispatcher:
         self.__freezerLock = threading.Lock()
         self.__tasks = {}
         self.__log = gLogger.getSubLogger(self.__class__.__name__)
-        self.__taskFreezer = []
+        # {taskId: token} of the frozen tasks
+        self.__taskFreezer = {}
+        # {eType: heap of (unfreeze time, token, taskId)}, the entries of the tasks unfrozen early are skipped
+        self.__freezerHeaps = {}
+        self.__freezerTokens = itertools.count()
         self.__queues = ExecutorQueues(self.__log)
         self.__states = ExecutorState(self.__log)
         self.__cbHolder = ExecutorDispatcherCallbacks()
@@ -422,7 +446,11 @@ class ExecutorDispatcher:
             eTask.eType = eType
             isFrozen = False
             if eTask.frozenCount < 10:
-                self.__taskFreezer.append(taskId)
+                token = next(self.__freezerTokens)
+                self.__taskFreezer[taskId] = token
+                heapq.heappush(
+                    self.__freezerHeaps.setdefault(eType, []), (eTask.frozenSince + freezeTime, token, taskId)
+                )
                 isFrozen = True
         finally:
             self.__freezerLock.release()
@@ -439,11 +467,8 @@ class ExecutorDispatcher:
     def __removeFromFreezer(self, taskId):
         self.__freezerLock.acquire()
         try:
-            try:
-                iP = self.__taskFreezer.index(taskId)
-            except ValueError:
+            if self.__taskFreezer.pop(taskId, None) is None:
                 return False
-            self.__taskFreezer.pop(iP)
             try:
                 eTask = self.__tasks[taskId]
             except KeyError:
@@ -454,34 +479,31 @@ class ExecutorDispatcher:
         return True
 
     def __unfreezeTasks(self, eType=False):
-        iP = 0
-        while iP < len(self.__taskFreezer):
-            self.__freezerLock.acquire()
-            try:
-                try:
-                    taskId = self.__taskFreezer[iP]
-                except IndexError:
-                    return
-                try:
-                    eTask = self.__tasks[taskId]
-                except KeyError:
-                    self.__log.notice(f"Removing task {taskId} from the freezer. Somebody has removed the task")
-                    self.__taskFreezer.pop(iP)
-                    continue
-                # Current taskId/eTask is the one to defrost
-                if eType and eType != eTask.eType:
-                    iP += 1
-                    continue
-                if time.time() - eTask.frozenSince < eTask.freezeTime:
-                    iP += 1
-                    continue
-                self.__taskFreezer.pop(iP)
-            finally:
-                self.__freezerLock.release()
-            # Out of the lock zone to minimize zone of exclusion
+        now = time.time()
+        toDispatch = []
+        self.__freezerLock.acquire()
+        try:
+            for heapType in [eType] if eType else list(self.__freezerHeaps):
+                heap = self.__freezerHeaps.get(heapType, [])
+                while heap and heap[0][0] <= now:
+                    _unfreezeTime, token, taskId = heapq.heappop(heap)
+                    # Skip the entries of the tasks already out of the freezer
+                    if self.__taskFreezer.get(taskId) != token:
+                        continue
+                    del self.__taskFreezer[taskId]
+                    try:
+                        toDispatch.append(self.__tasks[taskId])
+                    except KeyError:
+                        self.__log.notice(f"Removing task {taskId} from the freezer. Somebody has removed the task")
+                if not heap:
+                    self.__freezerHeaps.pop(heapType, None)
+        finally:
+            self.__freezerLock.release()
+        # Out of the lock zone to minimize zone of exclusion
+        for eTask in toDispatch:
             eTask.frozenTime += time.time() - eTask.frozenSince
-            self.__log.verbose(f"Unfreezed task {taskId}")
-            self.__dispatchTask(taskId, defrozeIfNeeded=False)
+            self.__log.verbose(f"Unfreezed task {eTask.taskId}")
+            self.__dispatchTask(eTask.taskId, defrozeIfNeeded=False)
 
     def __addTaskIfNew(self, taskId, taskObj):
         self.__tasksLock.acquire()
@@ -615,12 +637,7 @@ class ExecutorDispatcher:
         self.__states.removeTask(taskId)
         self.__freezerLock.acquire()
         try:
-            try:
-                self.__taskFreezer.pop(self.__taskFreezer.index(taskId))
-            except KeyError:
-                pass
-            except ValueError:
-                pass
+            self.__taskFreezer.pop(taskId, None)
         finally:
             self.__freezerLock.release()
         if eId:
@@ -1,11 +1,14 @@
 """Transformation classes around the JDL format."""
+import re
+import threading
 
+import cachetools
 from diraccfg import CFG
 from pydantic import ValidationError
 
 from DIRAC import S_OK, S_ERROR
 from DIRAC.Core.Utilities import List
-from DIRAC.Core.Utilities.ClassAd.ClassAdLight import ClassAd
+from DIRAC.Core.Utilities.ClassAd.ClassAdLight import ClassAd, jdlDigest
 from DIRAC.WorkloadManagementSystem.Utilities.JobModel import BaseJobDescriptionModel
 
 ARGUMENTS = "Arguments"
@@ -43,127 +46,134 @@ VO = "VirtualOrganization"
 CREDENTIALS_FIELDS = {OWNER, OWNER_GROUP, VO}
 
 
-def loadJDLAsCFG(jdl):
-    """
-    Load a JDL as CFG
-    """
-
-    def cleanValue(value):
-        value = value.strip()
-        if value[0] == '"':
-            entries = []
-            iPos = 1
-            current = ""
-            state = "in"
-            while iPos < len(value):
-                if value[iPos] == '"':
-                    if state == "in":
-                        entries.append(current)
-                        current = ""
-                        state = "out"
-                    elif state == "out":
-                        current = current.strip()
-                        if current not in (",",):
-                            return S_ERROR("value seems a list but is not separated in commas")
-                        current = ""
-                        state = "in"
-                else:
-                    current += value[iPos]
-                iPos += 1
-            if state == "in":
-                return S_ERROR('value is opened with " but is not closed')
-            return S_OK(", ".join(entries))
-        else:
-            return S_OK(value.replace('"', ""))
-
-    def assignValue(key, value, cfg):
-        key = key.strip()
-        if len(key) == 0:
-            return S_ERROR("Invalid key name")
-        value = value.strip()
-        if not value:
-            return S_ERROR(f"No value for key {key}")
-        if value[0] == "{":
-            if value[-1] != "}":
-                return S_ERROR("Value '%s' seems a list but does not end in '}'" % (value))
-            valList = List.fromChar(value[1:-1])
-            for i in range(len(valList)):
-                result = cleanValue(valList[i])
-                if not result["OK"]:
-                    return S_ERROR(f"Var {key} : {result['Message']}")
-                valList[i] = result["Value"]
-                if valList[i] is None:
-                    return S_ERROR(f"List value '{value}' seems invalid for item {i}")
-            value = ", ".join(valList)
-        else:
-            result = cleanValue(value)
+# The characters delimiting the keys, values and sections of a JDL
+_JDL_DELIMITERS = re.compile(r'[;\[\]="]')
+
+# {JDL digest: (cfg, position)} of the JDLs already loaded, the cfgs are cloned before being returned
+_jdlCFGCache = cachetools.LRUCache(maxsize=1000)
+_jdlCFGCacheLock = threading.Lock()
+
+
+def _cleanValue(value):
+    """Remove the quotes of a JDL value, a list of quoted strings becomes a comma separated string"""
+    value = value.strip()
+    if value[0] != '"':
+        return S_OK(value.replace('"', ""))
+    # The even parts are the quoted strings, the odd parts what separates them
+    parts = value[1:].split('"')
+    for separator in parts[1:-1:2]:
+        if separator.strip() != ",":
+            return S_ERROR("value seems a list but is not separated in commas")
+    if len(parts) % 2:
+        return S_ERROR('value is opened with " but is not closed')
+    return S_OK(", ".join(parts[0:-1:2]))
+
+
+def _assignValue(key, value, cfg):
+    """Set a JDL key/value pair as an option of the cfg"""
+    key = key.strip()
+    if len(key) == 0:
+        return S_ERROR("Invalid key name")
+    value = value.strip()
+    if not value:
+        return S_ERROR(f"No value for key {key}")
+    if value[0] == "{":
+        if value[-1] != "}":
+            return S_ERROR("Value '%s' seems a list but does not end in '}'" % (value))
+        valList = List.fromChar(value[1:-1])
+        for i in range(len(valList)):
+            result = _cleanValue(valList[i])
             if not result["OK"]:
                 return S_ERROR(f"Var {key} : {result['Message']}")
-            nV = result["Value"]
-            if nV is None:
-                return S_ERROR(f"Value '{value} seems invalid")
-            value = nV
-        cfg.setOption(key, value)
-        return S_OK()
-
-    if jdl[0] == "[":
-        iPos = 1
+            valList[i] = result["Value"]
+            if valList[i] is None:
+                return S_ERROR(f"List value '{value}' seems invalid for item {i}")
+        value = ", ".join(valList)
     else:
-        iPos = 0
-    key = ""
-    value = ""
-    action = "key"
-    insideLiteral = False
+        result = _cleanValue(value)
+        if not result["OK"]:
+            return S_ERROR(f"Var {key} : {result['Message']}")
+        nV = result["Value"]
+        if nV is None:
+            return S_ERROR(f"Value '{value} seems invalid")
+        value = nV
+    cfg.setOption(key, value)
+    return S_OK()
+
+
+def _loadJDLSection(jdl, iPos):
+    """Load the JDL section starting at iPos, up to the closing ] or to the end of the JDL
+
+    :return: S_OK((cfg, position of the closing ]))
+    """
     cfg = CFG()
-    while iPos < len(jdl):
+    # Start of the current key, and of its value once the = is found
+    keyStart = iPos
+    key = None
+    valueStart = None
+    while True:
+        match = _JDL_DELIMITERS.search(jdl, iPos)
+        if not match:
+            return S_OK((cfg, len(jdl)))
+        iPos = match.start()
         char = jdl[iPos]
-        if char == ";" and not insideLiteral:
-            if key.strip():
-                result = assignValue(key, value, cfg)
+        if char == '"':
+            # The delimiters are ignored inside the string literals of the values
+            if valueStart is not None:
+                iPos = jdl.find('"', iPos + 1)
+                if iPos == -1:
+                    return S_OK((cfg, len(jdl)))
+        elif char == "=":
+            if valueStart is None:
+                key = jdl[keyStart:iPos]
+                valueStart = iPos + 1
+        else:
+            if valueStart is None:
+                key = jdl[keyStart:iPos]
+                value = ""
+            else:
+                value = jdl[valueStart:iPos]
+            if char == "[":
+                key = key.strip()
+                if not key:
+                    return S_ERROR("Invalid key in JDL")
+                if value.strip():
+                    return S_ERROR(f"Key {key} seems to have a value and open a sub JDL at the same time")
+                result = _loadJDLSection(jdl, iPos + 1)
                 if not result["OK"]:
                     return result
-            key = ""
-            value = ""
-            action = "key"
-        elif char == "[" and not insideLiteral:
-            key = key.strip()
-            if not key:
-                return S_ERROR("Invalid key in JDL")
-            if value.strip():
-                return S_ERROR(f"Key {key} seems to have a value and open a sub JDL at the same time")
-            result = loadJDLAsCFG(jdl[iPos:])
-            if not result["OK"]:
-                return result
-            subCfg, subPos = result["Value"]
-            cfg.createNewSection(key, contents=subCfg)
-            key = ""
-            value = ""
-            action = "key"
-            insideLiteral = False
-            iPos += subPos
-        elif char == "=" and not insideLiteral:
-            if action == "key":
-                action = "value"
-                insideLiteral = False
-            else:
-                value += char
-        elif char == "]" and not insideLiteral:
-            key = key.strip()
-            if len(key) > 0:
-                result = assignValue(key, value, cfg)
+                subCfg, iPos = result["Value"]
+                cfg.createNewSection(key, contents=subCfg)
+            elif key.strip():
+                result = _assignValue(key, value, cfg)
                 if not result["OK"]:
                     return result
-            return S_OK((cfg, iPos))
-        else:
-            if action == "key":
-                key += char
-            else:
-                value += char
-                if char == '"':
-                    insideLiteral = not insideLiteral
+            if char == "]":
+                return S_OK((cfg, iPos))
+            keyStart = iPos + 1
+            valueStart = None
         iPos += 1
 
-    return S_OK((cfg, iPos))
+
+def loadJDLAsCFG(jdl):
+    """
+    Load a JDL as CFG
+
+    :param str jdl: JDL string
+    :return: S_OK((cfg, position of the closing ]))
+    """
+    key = jdlDigest(jdl)
+    with _jdlCFGCacheLock:
+        cached = _jdlCFGCache.get(key)
+    if cached is None:
+        result = _loadJDLSection(jdl, 1 if jdl[0] == "[" else 0)
+        if not result["OK"]:
+            return result
+        cached = result["Value"]
+        with _jdlCFGCacheLock:
+            _jdlCFGCache[key] = cached
+    cfg, iPos = cached
+    return S_OK((cfg.clone(), iPos))
 
 
 def dumpCFGAsJDL(cfg, level=1, tab="  "):
@@ -54,6 +54,17 @@
     Create a new Table in the DB
 
 
+    _partitionTableByTime( tableName, column, periodDays )
+
+    Partition a table by RANGE of a DATETIME column, one partition per period,
+    or add the partitions of the next periods to an already partitioned table.
+
+
+    _dropTimePartitions( tableName, olderThan )
+
+    Drop the time partitions of a table only holding records older than a date.
+
+
     _getConnection()
 
     Gets a connection from the Queue (or open a new one if none is available)
@@ -147,6 +158,7 @@
 
 """
 import collections
+import datetime
 import functools
 import json
 import os
@@ -1028,6 +1040,97 @@ class MySQL:
 
         return S_OK()
 
+    def _getTimePartitions(self, tableName):
+        """Get the partitions of a table partitioned with _partitionTableByTime
+
+        :param str tableName: table name
+        :returns: S_OK(list) of (partition name, upper bound as a 'YYYY-MM-DD' string) of the time partitions,
+                  sorted by date, without the partition of the MAXVALUE bound. None if the table is not partitioned.
+        """
+        result = self._query(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM INFORMATION_SCHEMA.PARTITIONS "
+            "WHERE TABLE_SCHEMA = '%s' AND TABLE_NAME = '%s' ORDER BY PARTITION_ORDINAL_POSITION"
+            % (self.__dbName, tableName)
+        )
+        if not result["OK"]:
+            return result
+        if not result["Value"] or result["Value"][0][0] is None:
+            return S_OK(None)
+        partitions = []
+        for name, description in result["Value"]:
+            if description and description != "MAXVALUE":
+                partitions.append((name, description.strip("'")[:10]))
+        return S_OK(partitions)
+
+    def _partitionTableByTime(self, tableName, column, periodDays, aheadPeriods=4):
+        """Partition a table by RANGE of a DATETIME column, with one partition per period of periodDays days,
+        and make sure the partitions of the next aheadPeriods periods exist.
+        The existing records of a table that is not partitioned yet are put in the partition of the dates
+        before the current day. The partitions are named after their upper bound, e.g. p20240131, the records
+        beyond the last one are kept in the pMax partition.
+
+        MySQL requires that the column is part of all the unique keys of the table, and that the table has no
+        foreign key: this has to be ensured before.
+
+        :param str tableName: table name
+        :param str column: DATETIME column
+        :param int periodDays: number of days covered by each partition
+        :param int aheadPeriods: number of periods to create partitions for, after the current day
+        :returns: S_OK(number of partitions added)/S_ERROR
+        """
+        result = self._getTimePartitions(tableName)
+        if not result["OK"]:
+            return result
+        partitions = result["Value"]
+
+        today = datetime.datetime.utcnow().date()
+        lastBound = today + datetime.timedelta(days=periodDays * aheadPeriods)
+        if partitions:
+            bound = datetime.date.fromisoformat(partitions[-1][1]) + datetime.timedelta(days=periodDays)
+        else:
+            bound = today
+        newBounds = []
+        while bound <= lastBound:
+            newBounds.append(bound)
+            bound += datetime.timedelta(days=periodDays)
+        if not newBounds:
+            return S_OK(0)
+
+        newPartitions = [f"PARTITION p{bound:%Y%m%d} VALUES LESS THAN ('{bound:%Y-%m-%d}')" for bound in newBounds]
+        newPartitions.append("PARTITION pMax VALUES LESS THAN (MAXVALUE)")
+        if partitions is None:
+            cmd = f"ALTER TABLE `{tableName}` PARTITION BY RANGE COLUMNS(`{column}`) ({', '.join(newPartitions)})"
+        else:
+            cmd = f"ALTER TABLE `{tableName}` REORGANIZE PARTITION pMax INTO ({', '.join(newPartitions)})"
+        self.log.info("Adding time partitions", f"to {tableName}: {len(newBounds)}")
+        result = self._update(cmd)
+        if not result["OK"]:
+            return result
+        return S_OK(len(newBounds))
+
+    def _dropTimePartitions(self, tableName, olderThan):
+        """Drop the partitions of a table partitioned with _partitionTableByTime that only hold
+        records older than a given date. This is much cheaper than deleting the records.
+
+        :param str tableName: table name
+        :param olderThan: datetime or 'YYYY-MM-DD' string
+        :returns: S_OK(list of dropped partitions)/S_ERROR
+        """
+        result = self._getTimePartitions(tableName)
+        if not result["OK"]:
+            return result
+        if result["Value"] is None:
+            return S_ERROR(DErrno.EMYSQL, f"Table {tableName} is not partitioned")
+        olderThan = str(olderThan)[:10]
+        toDrop = [name for name, bound in result["Value"] if bound <= olderThan]
+        if not toDrop:
+            return S_OK([])
+        self.log.info("Dropping time partitions", f"of {tableName}: {', '.join(toDrop)}")
+        result = self._update(f"ALTER TABLE `{tableName}` DROP PARTITION {', '.join(toDrop)}")
+        if not result["OK"]:
+            return result
+        return S_OK(toDrop)
+
     def _to_value(self, param):
         """
         Convert to string
@@ -3,11 +3,45 @@ Profiling class for updated information on process status
 """
 import datetime
 import errno
+import os
+import threading
+
 import psutil
+from cachetools import TTLCache
 
 from DIRAC import gLogger, S_OK, S_ERROR
 from DIRAC.Core.Utilities.DErrno import EEZOMBIE, EENOPID, EEEXCEPTION
 
+# Process tree samples are shared by all the profilers of a process for this number of seconds
+TREE_SAMPLE_LIFETIME = 1
+_treeSamples = TTLCache(maxsize=64, ttl=TREE_SAMPLE_LIFETIME)
+_treeSamplesLock = threading.Lock()
+
+
+def _getCgroupCPUUsage(pid, treePIDs):
+    """Returns the (user, system) CPU times in seconds of the cgroup v2 of a process,
+    if that cgroup only contains the processes of its tree (e.g. a container per job), else None.
+    Unlike the processes scan, the cgroup accounting includes all the terminated processes.
+    """
+    try:
+        with open(f"/proc/{pid}/cgroup") as fd:
+            cgroups = fd.read().splitlines()
+        if len(cgroups) != 1 or not cgroups[0].startswith("0::"):
+            # Not a pure cgroup v2 hierarchy
+            return None
+        cgroupDir = os.path.join("/sys/fs/cgroup", cgroups[0][3:].lstrip("/"))
+        with open(os.path.join(cgroupDir, "cgroup.procs")) as fd:
+            if not {int(cgroupPID) for cgroupPID in fd.read().split()} <= treePIDs:
+                return None
+        if any(entry.is_dir() for entry in os.scandir(cgroupDir)):
+            # The processes of the child cgroups are not listed in cgroup.procs
+            return None
+        with open(os.path.join(cgroupDir, "cpu.stat")) as fd:
+            cpuStat = dict(line.split() for line in fd if line.strip())
+        return int(cpuStat["user_usec"]) / 1e6, int(cpuStat["system_usec"]) / 1e6
+    except (OSError, KeyError, ValueError):
+        return None
+
 
 def checkInvocation(func):
     """Decorator for invoking psutil methods"""
@@ -162,6 +196,51 @@ class Profiler:
             gLogger.debug("CPU user", f"{cpuUsageSystem:.1f}s")
         return S_OK(cpuUsageSystem + childrenSystem + oldChildrenSystem)
 
+    @checkInvocation
+    def treeUsage(self, withTerminatedChildren=True):
+        """
+        Returns the CPU times (in seconds) and the memory usage (in MB) of the process and all its children,
+        as cpuUsageUser, cpuUsageSystem, memoryUsage and vSizeUsage with withChildren=True, but from a single
+        scan of the process tree, which is shared for TREE_SAMPLE_LIFETIME seconds by all the profilers.
+        """
+        key = (self.process.pid, withTerminatedChildren)
+        with _treeSamplesLock:
+            usage = _treeSamples.get(key)
+            if usage is None:
+                usage = _treeSamples[key] = self.__sampleTree(withTerminatedChildren)
+        return S_OK(dict(usage))
+
+    def __sampleTree(self, withTerminatedChildren):
+        """Sums the usage of the processes of the tree, reading each of them only once"""
+        children = self.process.children(recursive=True)
+        usage = {"cpuUsageUser": 0.0, "cpuUsageSystem": 0.0, "memoryUsage": 0.0, "vSizeUsage": 0.0}
+        for proc in [self.process] + children:
+            try:
+                with proc.oneshot():
+                    cpuTimes = proc.cpu_times()
+                    memoryInfo = proc.memory_info()
+            except psutil.NoSuchProcess:
+                if proc is self.process:
+                    raise
+                # A child terminated during the scan
+                continue
+            usage["cpuUsageUser"] += cpuTimes.user
+            usage["cpuUsageSystem"] += cpuTimes.system
+            if withTerminatedChildren and proc is not self.process:
+                usage["cpuUsageUser"] += cpuTimes.children_user
+                usage["cpuUsageSystem"] += cpuTimes.children_system
+            usage["memoryUsage"] += memoryInfo.rss
+            usage["vSizeUsage"] += memoryInfo.vms
+        # converted to MB
+        usage["memoryUsage"] /= float(2**20)
+        usage["vSizeUsage"] /= float(2**20)
+
+        if withTerminatedChildren:
+            cgroupUsage = _getCgroupCPUUsage(self.process.pid, {self.process.pid} | {child.pid for child in children})
+            if cgroupUsage:
+                usage["cpuUsageUser"], usage["cpuUsageSystem"] = cgroupUsage
+        return usage
+
     def getAllProcessData(self, withChildren=False, withTerminatedChildren=False):
         """
         Returns data available about a process
@@ -94,3 +94,17 @@ def test_execQueues():
     assert res_internals["taskInQueue"] == {}
 
     assert not eQ.deleteTask("t00")
+
+
+def test_execQueues_deleteAndPushAgain():
+    """A task deleted from the middle of a queue and pushed again is only popped once"""
+    queues = ExecutorQueues()
+    for i in range(3):
+        queues.pushTask("type0", f"t{i}")
+    assert queues.deleteTask("t1")
+    assert queues.waitingTasks("type0") == 2
+    assert queues.pushTask("type0", "t1") == 3
+    assert queues.getState() == {"type0": ["t0", "t2", "t1"]}
+    assert [queues.popTask("type0")[0] for _ in range(3)] == ["t0", "t2", "t1"]
+    assert queues.popTask("type0") is None
+    assert queues.waitingTasks("type0") == 0
@@ -9,7 +9,7 @@ import pytest
 
 from DIRAC import S_OK
 from DIRAC.Core.Utilities.ClassAd.ClassAdLight import ClassAd
-from DIRAC.Core.Utilities.JDL import jdlToBaseJobDescriptionModel
+from DIRAC.Core.Utilities.JDL import jdlToBaseJobDescriptionModel, loadJDLAsCFG
 from DIRAC.Interfaces.API.Job import Job
 from DIRAC.WorkloadManagementSystem.Utilities.JobModel import JobDescriptionModel
 
@@ -99,3 +99,45 @@ def test_jdlToBaseJobDescriptionModel_invalid(jdl):
 
     # Assert
     assert not res["OK"], res["Value"]
+
+
+NESTED_JDL = """[
+    Executable = "dirac-jobexec";
+    Arguments = "jobDescription.xml -o LogLevel=INFO;Option=[1]";
+    InputData = {"/vo/file1", "/vo/file2"};
+    Parameters = [ A = "1"; B = [ C = 2; ]; ];
+    Priority = 1;
+]"""
+
+
+def test_ClassAd_parse():
+    """This test checks the attributes parsed from a JDL, and that the cached parse results are not shared"""
+    classAd = ClassAd(NESTED_JDL)
+
+    assert classAd.getAttributes() == ["Executable", "Arguments", "InputData", "Parameters", "Priority"]
+    assert classAd.getAttributeString("Arguments") == "jobDescription.xml -o LogLevel=INFO;Option=[1]"
+    assert classAd.getListFromExpression("InputData") == ["/vo/file1", "/vo/file2"]
+    assert classAd.get_expression("Parameters") == '[ A = "1"; B = [ C = 2; ]; ]'
+    assert classAd.getAttributeInt("Priority") == 1
+
+    classAd.deleteAttribute("Priority")
+    assert ClassAd(NESTED_JDL).getAttributeInt("Priority") == 1
+    assert not ClassAd("""[Executable =;]""").isOK()
+
+
+def test_loadJDLAsCFG():
+    """This test checks the cfg loaded from a JDL, and that the cached cfgs are not shared"""
+    res = loadJDLAsCFG(NESTED_JDL)
+    assert res["OK"], res["Message"]
+    cfg = res["Value"][0]
+
+    assert cfg["Arguments"] == "jobDescription.xml -o LogLevel=INFO;Option=[1]"
+    assert cfg["InputData"] == "/vo/file1, /vo/file2"
+    assert cfg["Parameters"]["A"] == "1"
+    assert cfg["Parameters"]["B"]["C"] == "2"
+    assert res["Value"][1] == len(NESTED_JDL) - 1
+
+    cfg.setOption("Priority", "2")
+    assert loadJDLAsCFG(NESTED_JDL)["Value"][0]["Priority"] == "1"
+
+    assert not loadJDLAsCFG("""[InputData = {"/vo/file1" "/vo/file2"};]""")["OK"]
@@ -1,5 +1,6 @@
 """ Test for Profiler.py
 """
+import errno
 import time
 from os.path import dirname, join
 from subprocess import Popen
@@ -153,3 +154,35 @@ def test_cpuUsage():
     res = p.cpuUsageUser()
     assert res["OK"] is False
     assert res["Errno"] == 3
+
+
+def test_treeUsage():
+    mainProcess = Popen(
+        [
+            "python",
+            join(dirname(DIRAC.__file__), "tests/Utilities/ProcessesCreator_withChildren.py"),
+        ]
+    )
+    time.sleep(1)
+    p = Profiler(mainProcess.pid)
+    res = p.treeUsage()
+    assert res["OK"] is True
+    usage = res["Value"]
+    assert usage["memoryUsage"] > 0
+    assert usage["vSizeUsage"] >= usage["memoryUsage"]
+    assert usage["cpuUsageUser"] >= 0
+    assert usage["cpuUsageSystem"] >= 0
+
+    # The sample is shared until it expires
+    assert p.treeUsage()["Value"] == usage
+    assert Profiler(mainProcess.pid).treeUsage()["Value"] == usage
+    time.sleep(1.5)
+    res = p.treeUsage()
+    assert res["OK"] is True
+    assert res["Value"]["cpuUsageUser"] >= usage["cpuUsageUser"]
+
+    mainProcess.wait()
+    time.sleep(1.5)
+    res = p.treeUsage()
+    assert res["OK"] is False
+    assert res["Errno"] == errno.ESRCH
@@ -27,6 +27,7 @@ from DIRAC.Core.Security.ProxyInfo import getProxyInfo
 from DIRAC.ConfigurationSystem.Client.Helpers.Operations import Operations
 from DIRAC.MonitoringSystem.Client.DataOperationSender import DataOperationSender
 from DIRAC.DataManagementSystem.Utilities.DMSHelpers import DMSHelpers
+from DIRAC.DataManagementSystem.Utilities.ReplicaCache import getReplicaCache
 from DIRAC.Resources.Catalog.FileCatalog import FileCatalog
 from DIRAC.Resources.Storage.StorageElement import StorageElement
 from DIRAC.ResourceStatusSystem.Client.ResourceStatus import ResourceStatus
@@ -91,6 +92,8 @@ class DataManager:
 
         if catalogs is None:
             catalogs = []
+        if isinstance(catalogs, str):
+            catalogs = [catalogs]
         catalogsToUse = FileCatalog(vo=self.voName).getMasterCatalogNames()["Value"] if masterCatalogOnly else catalogs
 
         self.fileCatalog = FileCatalog(catalogs=catalogsToUse, vo=self.voName)
@@ -98,6 +101,14 @@ class DataManager:
         self.resourceStatus = ResourceStatus()
         self.ignoreMissingInFC = Operations(vo=self.voName).getValue("DataManagement/IgnoreMissingInFC", False)
         self.useCatalogPFN = Operations(vo=self.voName).getValue("DataManagement/UseCatalogPFN", True)
+        # Optional client side cache of the catalog replicas, disabled if the lifetime is 0
+        self.replicaCache = None
+        replicaCacheLifetime = Operations(vo=self.voName).getValue("DataManagement/ReplicaCacheLifetime", 0)
+        if replicaCacheLifetime > 0:
+            replicaCacheSize = Operations(vo=self.voName).getValue("DataManagement/ReplicaCacheSize", 100000)
+            self.replicaCache = getReplicaCache(
+                (self.voName, tuple(sorted(catalogsToUse))), replicaCacheSize, replicaCacheLifetime
+            )
         self.dmsHelper = DMSHelpers(vo=vo)
         self.registrationProtocol = self.dmsHelper.getRegistrationProtocols()
         self.thirdPartyProtocols = self.dmsHelper.getThirdPartyProtocols()
@@ -421,7 +432,9 @@ class DataManager:
 
         return sortedSEs
 
-    def putAndRegister(self, lfn, fileName, diracSE, guid=None, path=None, checksum=None, overwrite=False):
+    def putAndRegister(
+        self, lfn, fileName, diracSE, guid=None, path=None, checksum=None, overwrite=False, register=True
+    ):
         """Put a local file to a Storage Element and register in the File Catalogues
 
         'lfn' is the file LFN
@@ -430,6 +443,8 @@ class DataManager:
         'guid' is the guid with which the file is to be registered (if not provided will be generated)
         'path' is the path on the storage where the file will be put (if not provided the LFN will be used)
         'overwrite' removes file from the file catalogue and SE before attempting upload
+        'register' if False, the file is not registered and the tuple to give to registerFile
+        is returned in the 'fileTuple' key of the successful entry, for a later bulk registration
         """
 
         res = self.__hasAccess("addFile", lfn)
@@ -566,6 +581,14 @@ class DataManager:
             "GUID": guid,
             "Addler": checksum,
         }
+        if not register:
+            successful[lfn]["fileTuple"] = fileTuple
+            res = self.dataOpSender.sendData(accountingDict, commitFlag=True)
+            if not res["OK"]:
+                log.error("Couldn't commit data operation", res["Message"])
+                return res
+            return S_OK({"Successful": successful, "Failed": failed})
+
         startTime = time.time()
         res = self.registerFile(fileTuple)
         registerTime = time.time() - startTime
@@ -1025,6 +1048,7 @@ class DataManager:
             fileCatalog = self.fileCatalog
 
         res = fileCatalog.addFile(fileDict)
+        self.__invalidateReplicaCache(fileDict)
         if not res["OK"]:
             errStr = "Completely failed to register files."
             self.log.getSubLogger("__registerFile").debug(errStr, res["Message"])
@@ -1092,6 +1116,7 @@ class DataManager:
             res = fileCatalog.addReplica(replicaDict)
         else:
             res = self.fileCatalog.addReplica(replicaDict)
+        self.__invalidateReplicaCache(replicaDict)
         if not res["OK"]:
             errStr = "Completely failed to register replicas."
             log.debug(errStr, res["Message"])
@@ -1204,6 +1229,7 @@ class DataManager:
         completelyRemovedFiles = set(lfnDict) - set(failed)
         if completelyRemovedFiles:
             res = self.fileCatalog.removeFile(list(completelyRemovedFiles))
+            self.__invalidateReplicaCache(completelyRemovedFiles)
             if not res["OK"]:
                 failed.update(
                     dict.fromkeys(completelyRemovedFiles, f"Failed to remove file from the catalog: {res['Message']}")
@@ -1397,6 +1423,7 @@ class DataManager:
         for lfn, pfn, se in replicaTuples:
             replicaDict[lfn] = {"SE": se, "PFN": pfn}
         res = self.fileCatalog.removeReplica(replicaDict)
+        self.__invalidateReplicaCache(replicaDict)
         endTime = datetime.utcnow()
         accountingDict = _initialiseAccountingDict("removeCatalogReplica", "", len(replicaTuples))
         accountingDict["RegistrationTime"] = time.time() - registrationStartTime
@@ -1663,9 +1690,17 @@ class DataManager:
         """
         catalogReplicas = {}
         failed = {}
+        if self.replicaCache:
+            if isinstance(lfns, str):
+                lfns = [lfns]
+            elif isinstance(lfns, (dict, set)):
+                lfns = list(lfns)
+            catalogReplicas, lfns = self.replicaCache.get(lfns, allStatus)
         for lfnChunk in breakListIntoChunks(lfns, 1000):
             res = self.fileCatalog.getReplicas(lfnChunk, allStatus=allStatus)
             if res["OK"]:
+                if self.replicaCache:
+                    self.replicaCache.add(res["Value"]["Successful"], allStatus)
                 catalogReplicas.update(res["Value"]["Successful"])
                 failed.update(res["Value"]["Failed"])
             else:
@@ -1696,6 +1731,33 @@ class DataManager:
             self.__filterTapeReplicas(result, diskOnly=diskOnly)
         return S_OK(result)
 
+    def prefetchReplicas(self, lfns, allStatus=True):
+        """Bulk load the replicas of a list of LFNs in the replica cache, such that the following
+        getReplicas calls for these LFNs do not need to query the catalog
+
+        :param list lfns: LFNs to prefetch
+        :param bool allStatus: allStatus flag of the later getReplicas calls
+
+        :return: S_OK({"Successful": [lfns in the cache], "Failed": {lfn: error}})
+        """
+        if not self.replicaCache:
+            return S_ERROR("The replica cache is not enabled")
+        res = self.getReplicas(lfns, allStatus=allStatus, getUrl=False)
+        if not res["OK"]:
+            return res
+        return S_OK({"Successful": list(res["Value"]["Successful"]), "Failed": res["Value"]["Failed"]})
+
+    def getReplicaCacheStats(self):
+        """Get the statistics (hits, misses, hit rate, size) of the replica cache"""
+        if not self.replicaCache:
+            return S_ERROR("The replica cache is not enabled")
+        return self.replicaCache.getStats()
+
+    def __invalidateReplicaCache(self, lfns):
+        """Remove from the replica cache LFNs whose replicas were modified"""
+        if self.replicaCache:
+            self.replicaCache.invalidate(lfns)
+
     def getReplicasForJobs(self, lfns, allStatus=False, getUrl=True, diskOnly=False):
         """get replicas useful for jobs"""
         # Call getReplicas with no filter and enforce filters in this method
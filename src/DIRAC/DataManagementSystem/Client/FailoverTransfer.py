@@ -2,13 +2,16 @@
 
     The failover transfer client exposes the following methods:
     - transferAndRegisterFile()
+    - transferAndRegisterFiles()
     - transferAndRegisterFileFailover()
 
     Initially these methods were developed inside workflow modules but
     have evolved to a generic 'transfer file with failover' client.
 
     The transferAndRegisterFile() method will correctly set registration
-    requests in case of failure.
+    requests in case of failure. The transferAndRegisterFiles() method does
+    the same for a list of files, uploading them concurrently and registering
+    them with a single bulk call.
 
     The transferAndRegisterFileFailover() method will attempt to upload
     a file to a list of alternative SEs and set appropriate replication
@@ -16,10 +19,13 @@
     temporary replica.
 
 """
+import concurrent.futures
 import time
 
 from DIRAC import S_OK, S_ERROR, gLogger
 
+from DIRAC.Core.Utilities.Adler import fileAdler
+from DIRAC.Core.Utilities.File import makeGuid
 from DIRAC.Core.Utilities.ReturnValues import returnSingleResult
 from DIRAC.Core.Utilities.DErrno import cmpError, EFCERR
 from DIRAC.DataManagementSystem.Client.DataManager import DataManager
@@ -80,40 +86,16 @@ class FailoverTransfer:
 
         """
         errorList = []
-        fileGUID = fileMetaDict.get("GUID", None)
-        fileChecksum = fileMetaDict.get("Checksum", None)
-
         for se in destinationSEList:
-            # We put here some retry in case the problem comes from the FileCatalog
-            # being unavailable. If it is, then the `hasAccess` call would fail,
-            # and we would not make any failover request. So the only way is to wait a bit
-            # This keeps the WN busy for a while, but at least we do not lose all the processing
-            # time we just spent
-            # This same retry path is taken if we only have one possible stage out SE
-            # and retryUpload is True
-            for sleeptime in (10, 60, 300, 600):
-                self.log.info(
-                    "Attempting dm.putAndRegister",
-                    "('%s','%s','%s',guid='%s',catalog='%s', checksum = '%s')"
-                    % (lfn, localPath, se, fileGUID, fileCatalog, fileChecksum),
-                )
-
-                result = DataManager(catalogs=fileCatalog, masterCatalogOnly=masterCatalogOnly).putAndRegister(
-                    lfn, localPath, se, guid=fileGUID, checksum=fileChecksum
-                )
-                # retry on any failure
-                if result["OK"]:
-                    self.log.verbose(result)
-                    break
-                elif cmpError(result, EFCERR):
-                    self.log.debug("transferAndRegisterFile: FC unavailable, retry")
-                elif retryUpload and len(destinationSEList) == 1:
-                    self.log.debug("transferAndRegisterFile: Failed uploading to the only SE, retry")
-                else:
-                    self.log.debug("dm.putAndRegister failed, but move to the next")
-                    break
-                time.sleep(sleeptime)
-
+            result = self._putAndRegister(
+                lfn,
+                localPath,
+                se,
+                fileMetaDict,
+                fileCatalog,
+                masterCatalogOnly,
+                retry=retryUpload and len(destinationSEList) == 1,
+            )
             if not result["OK"]:
                 self.log.error("dm.putAndRegister failed with message", result["Message"])
                 errorList.append(result["Message"])
@@ -157,6 +139,149 @@ class FailoverTransfer:
         self.log.error("Failed to upload output data file", f"Encountered {len(errorList)} errors")
         return S_ERROR("Failed to upload output data file")
 
+    #############################################################################
+    def transferAndRegisterFiles(
+        self, fileList, fileCatalog=None, masterCatalogOnly=False, retryUpload=False, maxThreads=4
+    ):
+        """Performs the transfer of several files concurrently and their registration in bulk.
+
+        The files are uploaded by a pool of at most maxThreads threads, each of them computing the
+        checksum of its file right before the upload, so that checksums and transfers overlap.
+        The uploaded files are then registered with a single call to the catalogs, and registration
+        requests are set for those which could not be registered.
+
+        :param list fileList: list of dictionaries with the fileName, localPath, lfn, destinationSEList
+          and fileMetaDict keys, as the arguments of transferAndRegisterFile.
+          The Checksum and GUID are added to the fileMetaDict when not provided.
+        :param fileCatalog: list of catalogs to use (see :py:class:`DIRAC.DataManagementSystem.Client.DataManager`)
+        :param masterCatalogOnly: use only master catalog (see :py:class:`DIRAC.DataManagementSystem.Client.DataManager`)
+        :param retryUpload: if set to True, and there is only one output SE in destinationSEList, retry several times.
+        :param int maxThreads: maximum number of concurrent uploads
+
+        :return: S_OK with the "Successful" dictionary of uploaded SE per LFN, and the "Failed" one of
+          error per LFN, for which the failover is left to the caller
+        """
+        successful = {}
+        failed = {}
+        uploaded = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(maxThreads, len(fileList)))) as pool:
+            futures = [
+                pool.submit(self._transferFile, fileDict, fileCatalog, masterCatalogOnly, retryUpload)
+                for fileDict in fileList
+            ]
+            for fileDict, future in zip(fileList, futures):
+                result = future.result()
+                if not result["OK"]:
+                    failed[fileDict["lfn"]] = result["Message"]
+                else:
+                    uploaded.append((fileDict, result["Value"]))
+        if not uploaded:
+            return S_OK({"Successful": successful, "Failed": failed})
+
+        self.log.info("Registering the uploaded files in bulk", f"({len(uploaded)} files)")
+        result = DataManager(catalogs=fileCatalog, masterCatalogOnly=masterCatalogOnly).registerFile(
+            [fileTuple for _fileDict, (_se, fileTuple) in uploaded]
+        )
+        if not result["OK"]:
+            self.log.error("Failed to register the uploaded files", result["Message"])
+            notRegistered = {fileDict["lfn"] for fileDict, _ in uploaded}
+        else:
+            notRegistered = set(result["Value"]["Failed"])
+
+        if notRegistered:
+            # The uploads succeeded, so set registration requests as transferAndRegisterFile does
+            if masterCatalogOnly:
+                fileCatalog = FileCatalog().getMasterCatalogNames()["Value"]
+            elif not fileCatalog:
+                fileCatalog = ""
+
+        for fileDict, (se, _fileTuple) in uploaded:
+            lfn = fileDict["lfn"]
+            if lfn in notRegistered:
+                fileMetaDict = fileDict["fileMetaDict"]
+                result = self._setRegistrationRequest(lfn, se, fileMetaDict, fileCatalog)
+                if not result["OK"]:
+                    self.log.error("Failed to set registration request", f"SE {se} and metadata: \n{fileMetaDict}")
+                    failed[lfn] = f"Failed to set registration request for: SE {se} and metadata: \n{fileMetaDict}"
+                    continue
+                self.log.info("Successfully set registration request", f"for: SE {se} and metadata: \n{fileMetaDict}")
+            successful[lfn] = se
+
+        return S_OK({"Successful": successful, "Failed": failed})
+
+    def _transferFile(self, fileDict, fileCatalog, masterCatalogOnly, retryUpload):
+        """Uploads a file of transferAndRegisterFiles to the first possible destination, without registering it.
+
+        :return: S_OK with the SE the file was uploaded to and the tuple to give to DataManager.registerFile
+        """
+        lfn = fileDict["lfn"]
+        localPath = fileDict["localPath"]
+        destinationSEList = fileDict["destinationSEList"]
+        fileMetaDict = fileDict["fileMetaDict"]
+        if not fileMetaDict.get("Checksum"):
+            fileMetaDict["Checksum"] = fileAdler(localPath)
+            fileMetaDict.setdefault("ChecksumType", self.defaultChecksumType)
+        if not fileMetaDict.get("GUID"):
+            fileMetaDict["GUID"] = makeGuid(localPath)
+
+        for se in destinationSEList:
+            result = self._putAndRegister(
+                lfn,
+                localPath,
+                se,
+                fileMetaDict,
+                fileCatalog,
+                masterCatalogOnly,
+                retry=retryUpload and len(destinationSEList) == 1,
+                register=False,
+            )
+            if not result["OK"]:
+                self.log.error("dm.putAndRegister failed with message", result["Message"])
+                continue
+            if lfn in result["Value"]["Failed"]:
+                self.log.error("dm.putAndRegister failed with unknown error", str(result["Value"]["Failed"][lfn]))
+                continue
+            self.log.info("dm.putAndRegister successfully uploaded", f"{fileDict['fileName']} to {se}")
+            return S_OK((se, result["Value"]["Successful"][lfn]["fileTuple"]))
+
+        self.log.error("Failed to upload output data file", lfn)
+        return S_ERROR("Failed to upload output data file")
+
+    def _putAndRegister(self, lfn, localPath, se, fileMetaDict, fileCatalog, masterCatalogOnly, retry, register=True):
+        """Calls dm.putAndRegister for one SE, retrying when the catalog is unavailable or if retry is set"""
+        fileGUID = fileMetaDict.get("GUID", None)
+        fileChecksum = fileMetaDict.get("Checksum", None)
+        # We put here some retry in case the problem comes from the FileCatalog
+        # being unavailable. If it is, then the `hasAccess` call would fail,
+        # and we would not make any failover request. So the only way is to wait a bit
+        # This keeps the WN busy for a while, but at least we do not lose all the processing
+        # time we just spent
+        # This same retry path is taken if we only have one possible stage out SE
+        # and retryUpload is True
+        for sleeptime in (10, 60, 300, 600):
+            self.log.info(
+                "Attempting dm.putAndRegister",
+                "('%s','%s','%s',guid='%s',catalog='%s', checksum = '%s')"
+                % (lfn, localPath, se, fileGUID, fileCatalog, fileChecksum),
+            )
+
+            result = DataManager(catalogs=fileCatalog, masterCatalogOnly=masterCatalogOnly).putAndRegister(
+                lfn, localPath, se, guid=fileGUID, checksum=fileChecksum, register=register
+            )
+            # retry on any failure
+            if result["OK"]:
+                self.log.verbose(result)
+                break
+            elif cmpError(result, EFCERR):
+                self.log.debug("transferAndRegisterFile: FC unavailable, retry")
+            elif retry:
+                self.log.debug("transferAndRegisterFile: Failed uploading to the only SE, retry")
+            else:
+                self.log.debug("dm.putAndRegister failed, but move to the next")
+                break
+            time.sleep(sleeptime)
+        return result
+
     #############################################################################
     def transferAndRegisterFileFailover(
         self,
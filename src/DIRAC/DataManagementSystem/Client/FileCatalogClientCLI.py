@@ -2203,11 +2203,15 @@ class FileCatalogClientCLI(CLI):
         """Get the catalog statistics
 
         Usage:
-          stats
+          stats [-f]
+
+        Options:
+          -f  count the catalog tables instead of using the summary counters,
+              and show the consistency counters as well (slow on large catalogs)
         """
 
         try:
-            result = self.fc.getCatalogCounters()
+            result = self.fc.getCatalogCounters(full="-f" in args.split())
         except AttributeError as x:
             print("Error: no statistics available for this type of catalog:", str(x))
             return
@@ -2221,14 +2225,35 @@ class FileCatalogClientCLI(CLI):
             records.append((key, str(value)))
         printTable(fields, records)
 
-    def do_rebuild(self, _args):
-        """Rebuild auxiliary tables keeping the directory usage data
+    def do_rebuild(self, args):
+        """Rebuild auxiliary tables keeping the directory usage data,
+        the file ancestry relations or the catalog counters
 
         Usage:
-           rebuild
+           rebuild [ancestors|counters]
         """
 
         start = time.time()
+        if args.split() == ["counters"]:
+            result = self.fc.rebuildCatalogCounters(timeout=3600)
+            if not result["OK"]:
+                print("Error:", result["Message"])
+                return
+
+            total = time.time() - start
+            print("Catalog counters rebuilt in %.2f sec" % total)
+            return
+
+        if args.split() == ["ancestors"]:
+            result = self.fc.rebuildFileAncestors(timeout=3600)
+            if not result["OK"]:
+                print("Error:", result["Message"])
+                return
+
+            total = time.time() - start
+            print("%d file ancestor relations added in %.2f sec" % (result["Value"], total))
+            return
+
         result = self.fc.rebuildDirectoryUsage(timeout=300)
         if not result["OK"]:
             print("Error:", result["Message"])
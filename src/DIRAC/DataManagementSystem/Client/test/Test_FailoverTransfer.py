@@ -0,0 +1,74 @@
+""" Unit tests for the FailoverTransfer client
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from DIRAC import S_OK, S_ERROR
+from DIRAC.DataManagementSystem.Client import FailoverTransfer as moduleTested
+
+
+def putAndRegister(lfn, localPath, se, guid=None, checksum=None, register=True):
+    if "noUpload" in lfn:
+        return S_ERROR("Failed to put file to Storage Element.")
+    fileTuple = (lfn, f"srm://{se}{lfn}", 1, se, guid, checksum)
+    return S_OK({"Successful": {lfn: {"put": 0.1, "fileTuple": fileTuple}}, "Failed": {}})
+
+
+def registerFile(fileTuples):
+    return S_OK(
+        {
+            "Successful": {fileTuple[0]: True for fileTuple in fileTuples if "noRegister" not in fileTuple[0]},
+            "Failed": {fileTuple[0]: "Error" for fileTuple in fileTuples if "noRegister" in fileTuple[0]},
+        }
+    )
+
+
+@pytest.fixture
+def failoverTransfer(mocker):
+    dmMock = MagicMock()
+    dmMock.return_value.putAndRegister.side_effect = putAndRegister
+    dmMock.return_value.registerFile.side_effect = registerFile
+    mocker.patch.object(moduleTested, "DataManager", dmMock)
+    mocker.patch.object(moduleTested, "DMSHelpers", MagicMock())
+    mocker.patch.object(moduleTested, "fileAdler", return_value="01234567")
+    seMock = MagicMock()
+    seMock.return_value.getURL.side_effect = lambda lfn, _protocols: S_OK(
+        {"Successful": {lfn: "srm://url"}, "Failed": {}}
+    )
+    mocker.patch.object(moduleTested, "StorageElement", seMock)
+    ft = moduleTested.FailoverTransfer()
+    ft.dmMock = dmMock
+    return ft
+
+
+@pytest.mark.parametrize("maxThreads", [1, 4])
+def test_transferAndRegisterFiles(failoverTransfer, maxThreads, tmp_path):
+    lfns = ["/vo/file1", "/vo/noUpload", "/vo/noRegister", "/vo/file2"]
+    for lfn in lfns:
+        (tmp_path / lfn.split("/")[-1]).write_text(lfn)
+    fileList = [
+        {
+            "fileName": lfn.split("/")[-1],
+            "localPath": str(tmp_path / lfn.split("/")[-1]),
+            "lfn": lfn,
+            "destinationSEList": ["SE1", "SE2"],
+            "fileMetaDict": {"Size": 1, "LFN": lfn, "GUID": None},
+        }
+        for lfn in lfns
+    ]
+    res = failoverTransfer.transferAndRegisterFiles(fileList, maxThreads=maxThreads)
+    assert res["OK"], res
+    assert res["Value"]["Successful"] == {"/vo/file1": "SE1", "/vo/noRegister": "SE1", "/vo/file2": "SE1"}
+    assert list(res["Value"]["Failed"]) == ["/vo/noUpload"]
+
+    # The checksums and GUIDs are set, and the registration is done in a single call
+    assert all(fileDict["fileMetaDict"]["Checksum"] == "01234567" for fileDict in fileList)
+    assert all(fileDict["fileMetaDict"]["GUID"] for fileDict in fileList)
+    assert failoverTransfer.dmMock.return_value.registerFile.call_count == 1
+    assert len(failoverTransfer.dmMock.return_value.registerFile.call_args[0][0]) == 3
+
+    # A registration request is set for the file which could not be registered
+    operations = list(failoverTransfer.getRequest())
+    assert [op.Type for op in operations] == ["RegisterFile"]
+    assert [opFile.LFN for opFile in operations[0]] == ["/vo/noRegister"]
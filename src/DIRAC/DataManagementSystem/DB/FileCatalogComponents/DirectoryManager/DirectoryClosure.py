@@ -97,6 +97,10 @@ class DirectoryClosure(DirectoryTreeBase):
         result["DirID"] = dirId
         return result
 
+    def getDirectoryListTable(self):
+        """Get the name of the table holding one row per existing directory"""
+        return self.directoryTable
+
     def existsDir(self, path):
         """Check the existence of a directory at the specified path
 
@@ -72,7 +72,7 @@ class DirectoryLevelTree(DirectoryTreeBase):
 
         dirID = result["Value"]
         req = "DELETE FROM FC_DirectoryLevelTree WHERE DirID=%d" % dirID
-        result = self.db._update(req)
+        result = self._updateWithDirectoryCounter(req, -1)
         result["DirID"] = dirID
         return result
 
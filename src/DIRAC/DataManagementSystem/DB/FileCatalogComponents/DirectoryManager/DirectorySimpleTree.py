@@ -37,8 +37,7 @@ class DirectorySimpleTree(DirectoryTreeBase):
 
         dirID = result["Value"]
         req = "DELETE FROM FC_DirectoryTree WHERE DirID=%d" % dirID
-        result = self.db._update(req)
-        return result
+        return self._updateWithDirectoryCounter(req, -1)
 
     def makeDir(self, path):
         result = self.findDir(path)
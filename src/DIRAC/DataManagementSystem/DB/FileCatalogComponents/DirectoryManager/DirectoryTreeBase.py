@@ -105,7 +105,7 @@ class DirectoryTreeBase:
                 self.db.umask,
                 status,
             )
-            result = self.db._update(req)
+            result = self._updateWithDirectoryCounter(req, 1)
             if result["OK"]:
                 resGet = self.getDirectoryParameters(dirID)
                 if resGet["OK"]:
@@ -118,6 +118,31 @@ class DirectoryTreeBase:
             return S_ERROR(f"Failed to create directory {path}")
         return S_OK(dirID)
 
+    def _updateWithDirectoryCounter(self, req, change):
+        """Execute the statement creating or removing a directory together with the
+        update of the Directories catalog counter, in a single transaction. The counter
+        is only changed if the statement affected rows, e.g. not for the second of two
+        concurrent removals of the same directory
+
+        :param str req: SQL statement
+        :param int change: change of the number of directories
+
+        :return: S_OK(number of rows affected by the statement)/S_ERROR
+        """
+        # ROW_COUNT() is evaluated before this statement inserts anything, hence it refers to req
+        counterReq = "INSERT INTO FC_CatalogCounters (CounterName,SEID,CounterValue,LastUpdate) "
+        counterReq += "SELECT 'Directories',0,%d,UTC_TIMESTAMP() FROM DUAL WHERE ROW_COUNT() > 0" % change
+        counterReq += " ON DUPLICATE KEY UPDATE CounterValue=CounterValue+VALUES(CounterValue),"
+        counterReq += " LastUpdate=UTC_TIMESTAMP()"
+        result = self.db._transaction(["START TRANSACTION", req, counterReq])
+        if not result["OK"]:
+            return result
+        return S_OK(result["Value"][1][1])
+
+    def getDirectoryListTable(self):
+        """Get the name of the table holding one row per existing directory"""
+        return self.getTreeTable()
+
     #####################################################################
     def makeDirectories(self, path, credDict):
         """Make all the directories recursively in the path. The return value
@@ -247,7 +247,8 @@ class FileManager(FileManagerBase):
         if res["OK"]:
             statusID = res["Value"]
 
-        directorySESizeDict = {}
+        # Owners are resolved once for all the files sharing them
+        ownerIDs = {}
         for lfn in lfns.keys():
             dirID = lfns[lfn]["DirID"]
             fileName = os.path.basename(lfn)
@@ -256,33 +257,38 @@ class FileManager(FileManagerBase):
             s_uid = uid
             s_gid = gid
             if ownerDict:
-                result = self.db.ugManager.getUserAndGroupID(ownerDict)
-                if result["OK"]:
-                    s_uid, s_gid = result["Value"]
+                ownerKey = tuple(sorted(ownerDict.items()))
+                if ownerKey not in ownerIDs:
+                    result = self.db.ugManager.getUserAndGroupID(ownerDict)
+                    ownerIDs[ownerKey] = result["Value"] if result["OK"] else (uid, gid)
+                s_uid, s_gid = ownerIDs[ownerKey]
             insertTuples.append("(%d,%d,%d,%d,%d,'%s')" % (dirID, size, s_uid, s_gid, statusID, fileName))
-            directorySESizeDict.setdefault(dirID, {})
-            directorySESizeDict[dirID].setdefault(0, {"Files": 0, "Size": 0})
-            directorySESizeDict[dirID][0]["Size"] += lfns[lfn]["Size"]
-            directorySESizeDict[dirID][0]["Files"] += 1
 
-        req = f"INSERT INTO FC_Files (DirID,Size,UID,GID,Status,FileName) VALUES {','.join(insertTuples)}"
-        res = self.db._update(req, conn=connection)
+        # All the chunks are inserted in one transaction, so that a failure does not leave orphan files
+        reqs = [
+            f"INSERT INTO FC_Files (DirID,Size,UID,GID,Status,FileName) VALUES {','.join(tuples)}"
+            for tuples in breakListIntoChunks(insertTuples, self.db.insertChunkSize)
+        ]
+        res = self.db._transaction(["START TRANSACTION"] + reqs, conn=connection)
         if not res["OK"]:
             return res
         # Get the fileIDs for the inserted files
-        res = self._findFiles(list(lfns), ["FileID"], connection=connection)
+        res = self._getInsertedFileIDs(lfns, connection=connection)
         if not res["OK"]:
             for lfn in list(lfns):
                 failed[lfn] = "Failed post insert check"
                 lfns.pop(lfn)
         else:
-            failed.update(res["Value"]["Failed"])
-            for lfn in res["Value"]["Failed"]:
-                lfns.pop(lfn)
-            for lfn, fileDict in res["Value"]["Successful"].items():
-                lfns[lfn]["FileID"] = fileDict["FileID"]
+            fileIDs = res["Value"]
+            for lfn in list(lfns):
+                if lfn in fileIDs:
+                    lfns[lfn]["FileID"] = fileIDs[lfn]
+                else:
+                    failed[lfn] = "No such file or directory"
+                    lfns.pop(lfn)
         insertTuples = []
         toDelete = []
+        directorySESizeDict = {}
         for lfn in lfns:
             fileInfo = lfns[lfn]
             fileID = fileInfo["FileID"]
@@ -295,23 +301,52 @@ class FileManager(FileManagerBase):
             insertTuples.append(
                 "(%d,'%s','%s','%s',UTC_TIMESTAMP(),UTC_TIMESTAMP(),%d)" % (fileID, guid, checksum, checksumtype, mode)
             )
+            directorySESizeDict.setdefault(dirID, {})
+            directorySESizeDict[dirID].setdefault(0, {"Files": 0, "Size": 0})
+            directorySESizeDict[dirID][0]["Size"] += fileInfo["Size"]
+            directorySESizeDict[dirID][0]["Files"] += 1
         if insertTuples:
             fields = "FileID,GUID,Checksum,ChecksumType,CreationDate,ModificationDate,Mode"
-            req = f"INSERT INTO FC_FileInfo ({fields}) VALUES {','.join(insertTuples)}"
-            res = self.db._update(req)
+            reqs = [
+                f"INSERT INTO FC_FileInfo ({fields}) VALUES {','.join(tuples)}"
+                for tuples in breakListIntoChunks(insertTuples, self.db.insertChunkSize)
+            ]
+            # The directory usage is updated in the same transaction
+            res = self._updateWithDirectoryUsage(reqs, directorySESizeDict, "+", connection=connection)
             if not res["OK"]:
                 self._deleteFiles(toDelete, connection=connection)
                 for lfn in list(lfns):
                     failed[lfn] = res["Message"]
                     lfns.pop(lfn)
-            else:
-                # Update the directory usage
-                result = self._updateDirectoryUsage(directorySESizeDict, "+", connection=connection)
-                if not result["OK"]:
-                    gLogger.warn("Failed to insert FC_DirectoryUsage", result["Message"])
 
         return S_OK({"Successful": lfns, "Failed": failed})
 
+    def _getInsertedFileIDs(self, lfns, connection=False):
+        """Get the FileIDs of freshly inserted files in one pass, using the DirID
+        already resolved for each of them
+
+        :param dict lfns: { lfn: { "DirID": dirID, ... } }
+
+        :return: S_OK( { lfn: fileID } )
+        """
+        connection = self._getConnection(connection)
+        lfnDict = {}
+        for lfn, lfnInfo in lfns.items():
+            lfnDict[(lfnInfo["DirID"], os.path.basename(lfn))] = lfn
+
+        fileIDs = {}
+        for keys in breakListIntoChunks(list(lfnDict), self.db.insertChunkSize):
+            queryTuples = ",".join("(%d,'%s')" % (dirID, fileName) for dirID, fileName in keys)
+            req = f"SELECT DirID,FileName,FileID FROM FC_Files WHERE (DirID,FileName) IN ({queryTuples})"
+            res = self.db._query(req, conn=connection)
+            if not res["OK"]:
+                return res
+            for dirID, fileName, fileID in res["Value"]:
+                lfn = lfnDict.get((dirID, fileName))
+                if lfn:
+                    fileIDs[lfn] = fileID
+        return S_OK(fileIDs)
+
     def _getFileIDFromGUID(self, guid, connection=False):
         connection = self._getConnection(connection)
         if not guid:
@@ -380,6 +415,30 @@ class FileManager(FileManagerBase):
             return filePurge
         return S_OK()
 
+    def _deleteFilesWithUsage(self, fileIDs, directorySEDict, connection=False):
+        """Remove the given files with their replicas and decrease the directory usage
+        in a single transaction
+        """
+        connection = self._getConnection(connection)
+        if not fileIDs:
+            return S_OK()
+        res = self.__getFileIDReplicas(fileIDs, connection=connection)
+        if not res["OK"]:
+            return res
+        reqs = []
+        if res["Value"]:
+            repIDString = intListToString(list(res["Value"]))
+            reqs += [
+                f"DELETE FROM {table} WHERE RepID in ({repIDString})" for table in ["FC_Replicas", "FC_ReplicaInfo"]
+            ]
+        fileIDString = intListToString(fileIDs)
+        reqs += [f"DELETE FROM {table} WHERE FileID in ({fileIDString})" for table in ["FC_Files", "FC_FileInfo"]]
+        res = self._updateWithDirectoryUsage(reqs, directorySEDict, "-", connection=connection)
+        if not res["OK"]:
+            gLogger.error("Failed to remove files", res["Message"])
+            return S_ERROR(f"Failed to remove files: {res['Message']}")
+        return S_OK()
+
     def __deleteFileReplicas(self, fileIDs, connection=False):
         connection = self._getConnection(connection)
         res = self.__getFileIDReplicas(fileIDs, connection=connection)
@@ -421,6 +480,8 @@ class FileManager(FileManagerBase):
         statusID = 0
         if res["OK"]:
             statusID = res["Value"]
+        # SEs are resolved once for all the replicas sharing them
+        seIDs = {}
         for lfn in list(lfns):
             fileID = lfns[lfn]["FileID"]
             fileIDLFNs[fileID] = lfn
@@ -432,31 +493,36 @@ class FileManager(FileManagerBase):
             else:
                 return S_ERROR(f"Illegal type of SE list: {str(type(seName))}")
             for seName in seList:
-                res = self.db.seManager.findSE(seName)
+                if seName not in seIDs:
+                    seIDs[seName] = self.db.seManager.findSE(seName)
+                res = seIDs[seName]
                 if not res["OK"]:
                     failed[lfn] = res["Message"]
                     lfns.pop(lfn)
-                    continue
+                    break
                 seID = res["Value"]
                 insertTuples.append((fileID, seID))
         if not master:
             res = self._getRepIDsForReplica(insertTuples, connection=connection)
             if not res["OK"]:
                 return res
+            existingTuples = set()
             for fileID, repDict in res["Value"].items():
                 for seID, repID in repDict.items():
                     successful[fileIDLFNs[fileID]] = True
-                    insertTuples.remove((fileID, seID))
+                    existingTuples.add((fileID, seID))
+            insertTuples = [tuple_ for tuple_ in insertTuples if tuple_ not in existingTuples]
 
         if not insertTuples:
             return S_OK({"Successful": successful, "Failed": failed})
 
-        req = "INSERT INTO FC_Replicas (FileID,SEID,Status) VALUES %s" % (
-            ",".join(["(%d,%d,%d)" % (tuple_[0], tuple_[1], statusID) for tuple_ in insertTuples])
-        )
-        res = self.db._update(req, conn=connection)
-        if not res["OK"]:
-            return res
+        for tuples in breakListIntoChunks(insertTuples, self.db.insertChunkSize):
+            req = "INSERT INTO FC_Replicas (FileID,SEID,Status) VALUES %s" % (
+                ",".join(["(%d,%d,%d)" % (tuple_[0], tuple_[1], statusID) for tuple_ in tuples])
+            )
+            res = self.db._update(req, conn=connection)
+            if not res["OK"]:
+                return res
         res = self._getRepIDsForReplica(insertTuples, connection=connection)
         if not res["OK"]:
             return res
@@ -485,34 +551,36 @@ class FileManager(FileManagerBase):
                 toDelete.append(repID)
                 insertReplicas.append("(%d,'%s',UTC_TIMESTAMP(),UTC_TIMESTAMP(),'%s')" % (repID, replicaType, pfn))
         if insertReplicas:
-            req = "INSERT INTO FC_ReplicaInfo (RepID,RepType,CreationDate,ModificationDate,PFN) VALUES %s" % (
-                ",".join(insertReplicas)
-            )
-            res = self.db._update(req, conn=connection)
+            reqs = [
+                "INSERT INTO FC_ReplicaInfo (RepID,RepType,CreationDate,ModificationDate,PFN) VALUES %s"
+                % ",".join(replicas)
+                for replicas in breakListIntoChunks(insertReplicas, self.db.insertChunkSize)
+            ]
+            # The directory usage is updated in the same transaction
+            res = self._updateWithDirectoryUsage(reqs, directorySESizeDict, "+", connection=connection)
             if not res["OK"]:
                 for lfn in lfns.keys():
                     failed[lfn] = res["Message"]
                 self.__deleteReplicas(toDelete, connection=connection)
             else:
-                # Update the directory usage
-                self._updateDirectoryUsage(directorySESizeDict, "+", connection=connection)
                 for lfn in lfns.keys():
                     successful[lfn] = True
         return S_OK({"Successful": successful, "Failed": failed})
 
     def _getRepIDsForReplica(self, replicaTuples, connection=False):
         connection = self._getConnection(connection)
-        queryTuples = []
-        for fileID, seID in replicaTuples:
-            queryTuples.append("(%d,%d)" % (fileID, seID))
-        req = f"SELECT RepID,FileID,SEID FROM FC_Replicas WHERE (FileID,SEID) IN ({intListToString(queryTuples)})"
-        res = self.db._query(req, conn=connection)
-        if not res["OK"]:
-            return res
         replicaDict = {}
-        for repID, fileID, seID in res["Value"]:
-            replicaDict.setdefault(fileID, {})
-            replicaDict[fileID][seID] = repID
+        for tuples in breakListIntoChunks(replicaTuples, self.db.insertChunkSize):
+            queryTuples = []
+            for fileID, seID in tuples:
+                queryTuples.append("(%d,%d)" % (fileID, seID))
+            req = f"SELECT RepID,FileID,SEID FROM FC_Replicas WHERE (FileID,SEID) IN ({intListToString(queryTuples)})"
+            res = self.db._query(req, conn=connection)
+            if not res["OK"]:
+                return res
+            for repID, fileID, seID in res["Value"]:
+                replicaDict.setdefault(fileID, {})
+                replicaDict[fileID][seID] = repID
 
         return S_OK(replicaDict)
 
@@ -561,24 +629,34 @@ class FileManager(FileManagerBase):
             for fileID, seDict in res["Value"].items():
                 for seID, repID in seDict.items():
                     repIDs.append(repID)
-            res = self.__deleteReplicas(repIDs, connection=connection)
+            res = self.__deleteReplicas(repIDs, directorySEDict=directorySESizeDict, connection=connection)
             if not res["OK"]:
                 for lfn in lfnFileIDDict.keys():
                     failed[lfn] = res["Message"]
             else:
-                # Update the directory usage
-                self._updateDirectoryUsage(directorySESizeDict, "-", connection=connection)
                 for lfn in lfnFileIDDict.keys():
                     successful[lfn] = True
         return S_OK({"Successful": successful, "Failed": failed})
 
-    def __deleteReplicas(self, repIDs, connection=False):
+    def __deleteReplicas(self, repIDs, directorySEDict=None, connection=False):
+        """Remove the given replicas. If directorySEDict is given, the directory usage
+        is decreased accordingly in the same transaction
+        """
         connection = self._getConnection(connection)
         if not isinstance(repIDs, (list, tuple)):
             repIDs = [repIDs]
         if not repIDs:
             return S_OK()
         repIDString = intListToString(repIDs)
+        if directorySEDict is not None:
+            reqs = [
+                f"DELETE FROM {table} WHERE RepID in ({repIDString})" for table in ["FC_Replicas", "FC_ReplicaInfo"]
+            ]
+            res = self._updateWithDirectoryUsage(reqs, directorySEDict, "-", connection=connection)
+            if not res["OK"]:
+                gLogger.error("Failed to remove replicas", res["Message"])
+                return S_ERROR(f"Failed to remove replicas: {res['Message']}")
+            return S_OK()
         failed = []
         for table in ["FC_Replicas", "FC_ReplicaInfo"]:
             req = f"DELETE FROM {table} WHERE RepID in ({repIDString})"
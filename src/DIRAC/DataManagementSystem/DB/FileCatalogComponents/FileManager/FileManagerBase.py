@@ -6,16 +6,30 @@ import os
 import stat
 
 from DIRAC import S_OK, S_ERROR, gLogger
-from DIRAC.Core.Utilities.List import intListToString
+from DIRAC.Core.Utilities.List import intListToString, breakListIntoChunks
 from DIRAC.Core.Utilities.Pfn import pfnunparse
+from DIRAC.DataManagementSystem.DB.FileCatalogComponents.Utilities import getCountersUpdateString
 
 
 class FileManagerBase:
     """Base class for all the specific File Managers"""
 
+    _tables = dict()
+    _tables["FC_CatalogCounters"] = {
+        "Fields": {
+            "CounterName": "VARCHAR(32) NOT NULL",
+            "SEID": "INTEGER NOT NULL DEFAULT 0",
+            "CounterValue": "BIGINT NOT NULL DEFAULT 0",
+            "LastUpdate": "DATETIME NOT NULL",
+        },
+        "PrimaryKey": ["CounterName", "SEID"],
+    }
+
     def __init__(self, database=None):
         self.db = database
         self.statusDict = {}
+        if database is not None:
+            self._checkTables()
 
     def _getConnection(self, connection):
         if connection:
@@ -29,6 +43,30 @@ class FileManagerBase:
     def setDatabase(self, database):
         self.db = database
 
+    def _checkTables(self):
+        """Create the tables missing in catalogs created by an earlier version of the schema.
+        The catalog counters are computed once when their table is created, as they are then
+        only updated incrementally
+        """
+        result = self.db._query("SHOW TABLES")
+        if not result["OK"]:
+            return result
+        tableList = [x[0] for x in result["Value"]]
+        tablesToCreate = {table: self._tables[table] for table in self._tables if table not in tableList}
+        if not tablesToCreate:
+            return S_OK()
+
+        result = self.db._createTables(tablesToCreate)
+        if not result["OK"]:
+            gLogger.error("Failed to create tables", str(list(tablesToCreate)))
+            return result
+        gLogger.info(f"Tables created: {','.join(tablesToCreate)}")
+        if "FC_CatalogCounters" in tablesToCreate:
+            result = self.rebuildCatalogCounters()
+            if not result["OK"]:
+                gLogger.error("Failed to initialize the catalog counters", result["Message"])
+        return result
+
     def getFileCounters(self, connection=False):
         """Get a number of counters to verify the sanity of the Files in the catalog"""
         connection = self._getConnection(connection)
@@ -85,6 +123,45 @@ class FileManagerBase:
             return res
         return S_OK({"Replicas": res["Value"][0][0]})
 
+    def getSummaryCounters(self, connection=False):
+        """Get the catalog counters maintained incrementally in the FC_CatalogCounters table
+
+        :return: S_OK(dict), without the Files counter if the table was never initialized
+        """
+        connection = self._getConnection(connection)
+        req = "SELECT CounterName,SEID,CounterValue FROM FC_CatalogCounters"
+        res = self.db._query(req, conn=connection)
+        if not res["OK"]:
+            return res
+        resultDict = {}
+        for counterName, seID, value in res["Value"]:
+            if counterName == "Replicas":
+                result = self.db.seManager.getSEName(seID)
+                seName = result["Value"] if result["OK"] else str(seID)
+                resultDict[f"Replicas at {seName}"] = value
+                resultDict["Replicas"] = resultDict.get("Replicas", 0) + value
+            else:
+                resultDict[counterName] = value
+        return S_OK(resultDict)
+
+    def rebuildCatalogCounters(self, connection=False):
+        """Recompute the FC_CatalogCounters table from the catalog tables, e.g. after
+        its creation in an existing catalog. This is as costly as the full table counts
+        """
+        connection = self._getConnection(connection)
+        insert = "INSERT INTO FC_CatalogCounters (CounterName,SEID,CounterValue,LastUpdate)"
+        reqs = [
+            "START TRANSACTION",
+            "DELETE FROM FC_CatalogCounters",
+            f"{insert} SELECT 'Files',0,COUNT(*),UTC_TIMESTAMP() FROM FC_Files",
+            f"{insert} SELECT 'Directories',0,COUNT(*),UTC_TIMESTAMP() FROM {self.db.dtree.getDirectoryListTable()}",
+            f"{insert} SELECT 'Replicas',SEID,COUNT(*),UTC_TIMESTAMP() FROM FC_Replicas GROUP BY SEID",
+        ]
+        res = self.db._transaction(reqs, conn=connection)
+        if not res["OK"]:
+            return res
+        return self.getSummaryCounters(connection=connection)
+
     ######################################################
     #
     # File write methods
@@ -365,66 +442,129 @@ class FileManagerBase:
 
         return S_OK({"Successful": successful, "Failed": failed})
 
-    def _updateDirectoryUsage(self, directorySEDict, change, connection=False):
-        connection = self._getConnection(connection)
-        for directoryID in directorySEDict.keys():
+    def _getDirectoryUsageUpdates(self, directorySEDict, change):
+        """Build the statements applying a storage usage change to the given directories
+        and to all their parents, so that FC_DirectoryUsage always holds the subtree totals.
+        Changes of directories sharing the same parents are coalesced per (DirID, SEID).
+        The catalog wide Files and Replicas counters are updated by the same statements
+
+        :param dict directorySEDict: { dirID: { seID: { "Files": nFiles, "Size": size } } }
+        :param str change: "+" or "-"
+
+        :return: S_OK( list of SQL statements )
+        """
+        sign = -1 if change == "-" else 1
+        usageDict = {}
+        counterDict = {}
+        for directoryID, dirDict in directorySEDict.items():
+            for seID, seDict in dirDict.items():
+                # SEID 0 holds the logical usage, i.e. the files themselves
+                counter = ("Replicas", seID) if seID else ("Files", 0)
+                counterDict[counter] = counterDict.get(counter, 0) + sign * seDict["Files"]
             result = self.db.dtree.getPathIDsByID(directoryID)
             if not result["OK"]:
                 return result
-            parentIDs = result["Value"]
-            dirDict = directorySEDict[directoryID]
-            for seID in dirDict.keys():
-                seDict = dirDict[seID]
-                files = seDict["Files"]
-                size = seDict["Size"]
-                insertTuples = []
-                for dirID in parentIDs:
-                    insertTuples.append("(%d,%d,%d,%d,UTC_TIMESTAMP())" % (dirID, seID, size, files))
-
-                req = "INSERT INTO FC_DirectoryUsage (DirID,SEID,SESize,SEFiles,LastUpdate) "
-                req += f"VALUES {','.join(insertTuples)}"
-                req += (
-                    " ON DUPLICATE KEY UPDATE SESize=SESize%s%d, SEFiles=SEFiles%s%d, LastUpdate=UTC_TIMESTAMP() "
-                    % (change, size, change, files)
-                )
-                res = self.db._update(req)
-                if not res["OK"]:
-                    gLogger.warn("Failed to update FC_DirectoryUsage", res["Message"])
+            for dirID in result["Value"]:
+                for seID, seDict in dirDict.items():
+                    usage = usageDict.setdefault((dirID, seID), [0, 0])
+                    usage[0] += seDict["Size"]
+                    usage[1] += seDict["Files"]
+
+        insertTuples = [
+            "(%d,%d,%d,%d,UTC_TIMESTAMP())" % (dirID, seID, sign * size, sign * files)
+            for (dirID, seID), (size, files) in usageDict.items()
+            if size or files
+        ]
+        reqs = []
+        for tuples in breakListIntoChunks(insertTuples, 1000):
+            req = "INSERT INTO FC_DirectoryUsage (DirID,SEID,SESize,SEFiles,LastUpdate) "
+            req += f"VALUES {','.join(tuples)}"
+            req += " ON DUPLICATE KEY UPDATE SESize=SESize+VALUES(SESize), SEFiles=SEFiles+VALUES(SEFiles),"
+            req += " LastUpdate=UTC_TIMESTAMP()"
+            reqs.append(req)
+        req = getCountersUpdateString(counterDict)
+        if req:
+            reqs.append(req)
+        return S_OK(reqs)
+
+    def _updateDirectoryUsage(self, directorySEDict, change, connection=False):
+        connection = self._getConnection(connection)
+        result = self._getDirectoryUsageUpdates(directorySEDict, change)
+        if not result["OK"]:
+            return result
+        for req in result["Value"]:
+            res = self.db._update(req, conn=connection)
+            if not res["OK"]:
+                gLogger.warn("Failed to update FC_DirectoryUsage", res["Message"])
+                return res
         return S_OK()
 
+    def _updateWithDirectoryUsage(self, reqs, directorySEDict, change, connection=False):
+        """Execute the given statements together with the corresponding FC_DirectoryUsage
+        update in a single transaction, so that the usage never drifts from the file and
+        replica tables
+
+        :param list reqs: SQL statements modifying the file or replica tables
+        :param dict directorySEDict: { dirID: { seID: { "Files": nFiles, "Size": size } } }
+        :param str change: "+" or "-"
+        """
+        connection = self._getConnection(connection)
+        result = self._getDirectoryUsageUpdates(directorySEDict, change)
+        if not result["OK"]:
+            return result
+        return self.db._transaction(["START TRANSACTION"] + reqs + result["Value"], conn=connection)
+
     def _populateFileAncestors(self, lfns, connection=False):
+        """Register the ancestors of the given files. The ancestors of the ancestors are
+        registered as well, and the new ancestors are propagated to the already registered
+        descendents of the files, so that FC_FileAncestors always holds the full transitive
+        closure of the ancestry relation and any lookup is a single indexed query
+        """
         connection = self._getConnection(connection)
         successful = {}
         failed = {}
+        lfnAncestors = {}
         for lfn, lfnDict in lfns.items():
-            originalFileID = lfnDict["FileID"]
-            originalDepth = lfnDict.get("AncestorDepth", 1)
             ancestors = lfnDict.get("Ancestors", [])
             if isinstance(ancestors, str):
                 ancestors = [ancestors]
-            if lfn in ancestors:
-                ancestors.remove(lfn)
+            ancestors = [ancestor for ancestor in ancestors if ancestor != lfn]
             if not ancestors:
                 successful[lfn] = True
                 continue
-            res = self._findFiles(ancestors, connection=connection)
-            if res["Value"]["Failed"]:
+            lfnAncestors[lfn] = ancestors
+        if not lfnAncestors:
+            return S_OK({"Successful": successful, "Failed": failed})
+
+        # Resolve the ancestors of all the files and their own ancestors at once
+        allAncestors = {ancestor for ancestors in lfnAncestors.values() for ancestor in ancestors}
+        res = self._findFiles(list(allAncestors), connection=connection)
+        if not res["OK"]:
+            return res
+        ancestorIDs = {ancestor: fileDict["FileID"] for ancestor, fileDict in res["Value"]["Successful"].items()}
+        fileIDAncestorDict = {}
+        if ancestorIDs:
+            res = self._getFileAncestors(list(set(ancestorIDs.values())), connection=connection)
+            if not res["OK"]:
+                for lfn in lfnAncestors:
+                    failed[lfn] = "Failed to obtain all ancestors"
+                return S_OK({"Successful": successful, "Failed": failed})
+            fileIDAncestorDict = res["Value"]
+
+        insertedIDs = []
+        for lfn, ancestors in lfnAncestors.items():
+            if any(ancestor not in ancestorIDs for ancestor in ancestors):
                 failed[lfn] = "Failed to resolve ancestor files"
                 continue
-            ancestorIDs = res["Value"]["Successful"]
-            fileIDLFNs = {}
+            originalFileID = lfns[lfn]["FileID"]
+            originalDepth = lfns[lfn].get("AncestorDepth", 1)
             toInsert = {}
-            for ancestor in ancestorIDs.keys():
-                fileIDLFNs[ancestorIDs[ancestor]["FileID"]] = ancestor
-                toInsert[ancestorIDs[ancestor]["FileID"]] = originalDepth
-            res = self._getFileAncestors(list(fileIDLFNs))
-            if not res["OK"]:
-                failed[lfn] = "Failed to obtain all ancestors"
-                continue
-            fileIDAncestorDict = res["Value"]
-            for fileIDDict in fileIDAncestorDict.values():
-                for ancestorID, relativeDepth in fileIDDict.items():
-                    toInsert[ancestorID] = relativeDepth + originalDepth
+            for ancestor in ancestors:
+                toInsert[ancestorIDs[ancestor]] = originalDepth
+            for ancestor in ancestors:
+                for ancestorID, relativeDepth in fileIDAncestorDict.get(ancestorIDs[ancestor], {}).items():
+                    depth = relativeDepth + originalDepth
+                    toInsert[ancestorID] = min(toInsert.get(ancestorID, depth), depth)
             res = self._insertFileAncestors(originalFileID, toInsert, connection=connection)
             if not res["OK"]:
                 if "Duplicate" in res["Message"]:
@@ -433,8 +573,65 @@ class FileManagerBase:
                     failed[lfn] = "Failed to insert ancestor files"
             else:
                 successful[lfn] = True
+                insertedIDs.append(originalFileID)
+
+        if insertedIDs:
+            res = self._propagateFileAncestors(insertedIDs, connection=connection)
+            if not res["OK"]:
+                gLogger.error("Failed to propagate ancestors to the descendents", res["Message"])
         return S_OK({"Successful": successful, "Failed": failed})
 
+    def _propagateFileAncestors(self, fileIDs, connection=False):
+        """Give the ancestors of the given files to all their registered descendents
+
+        :param list fileIDs: IDs of the files whose ancestors were just added
+        """
+        connection = self._getConnection(connection)
+        req = "INSERT IGNORE INTO FC_FileAncestors (FileID, AncestorID, AncestorDepth) "
+        req += "SELECT d.FileID, a.AncestorID, MIN(d.AncestorDepth + a.AncestorDepth) "
+        req += "FROM FC_FileAncestors AS d JOIN FC_FileAncestors AS a ON a.FileID = d.AncestorID "
+        req += f"WHERE d.AncestorID IN ({intListToString(fileIDs)}) AND d.FileID <> a.AncestorID "
+        req += "GROUP BY d.FileID, a.AncestorID"
+        return self.db._update(req, conn=connection)
+
+    def rebuildFileAncestors(self, chunkSize=10000, connection=False):
+        """Complete FC_FileAncestors with the missing transitive relations, e.g. for catalogs where
+        ancestors were registered before the closure was maintained, or after their descendents.
+        The closure is extended by ranges of FileIDs until a full pass does not add any relation
+
+        :param int chunkSize: number of FileIDs treated by a single statement
+
+        :return: S_OK( number of inserted relations )
+        """
+        connection = self._getConnection(connection)
+        res = self.db._query("SELECT MIN(FileID), MAX(FileID) FROM FC_FileAncestors", conn=connection)
+        if not res["OK"]:
+            return res
+        minID, maxID = res["Value"][0]
+        if minID is None:
+            return S_OK(0)
+
+        total = 0
+        inserted = True
+        while inserted:
+            inserted = 0
+            for firstID in range(minID, maxID + 1, chunkSize):
+                req = "INSERT IGNORE INTO FC_FileAncestors (FileID, AncestorID, AncestorDepth) "
+                req += "SELECT d.FileID, a.AncestorID, MIN(d.AncestorDepth + a.AncestorDepth) "
+                req += "FROM FC_FileAncestors AS d JOIN FC_FileAncestors AS a ON a.FileID = d.AncestorID "
+                req += "WHERE d.FileID BETWEEN %d AND %d AND d.FileID <> a.AncestorID " % (
+                    firstID,
+                    firstID + chunkSize - 1,
+                )
+                req += "GROUP BY d.FileID, a.AncestorID"
+                res = self.db._update(req, conn=connection)
+                if not res["OK"]:
+                    return res
+                inserted += res["Value"]
+            gLogger.verbose("Added %d file ancestor relations" % inserted)
+            total += inserted
+        return S_OK(total)
+
     def _insertFileAncestors(self, fileID, ancestorDict, connection=False):
         connection = self._getConnection(connection)
         ancestorTuples = []
@@ -537,20 +734,30 @@ class FileManagerBase:
         failed = {}
         successful = {}
         relDict = result["Value"]
+        # Resolve the LFNs of all the relatives at once
+        relativeIDs = {aID for aIDs in relDict.values() for aID in aIDs}
+        relativeLFNs = {}
+        relativeFailed = {}
+        if relativeIDs:
+            result = self._getFileLFNs(list(relativeIDs))
+            if not result["OK"]:
+                for id_ in relDict:
+                    failed[inputIDDict[id_]] = f"Failed to find {relation}"
+                relDict = {}
+            else:
+                relativeLFNs = result["Value"]["Successful"]
+                relativeFailed = result["Value"]["Failed"]
         for id_ in inputIDs:
             if id_ in relDict:
-                result = self._getFileLFNs(list(relDict[id_]))
-                if not result["OK"]:
-                    failed[inputIDDict[id]] = f"Failed to find {relation}"
-                else:
-                    if result["Value"]["Successful"]:
-                        resDict = {}
-                        for aID in result["Value"]["Successful"]:
-                            resDict[result["Value"]["Successful"][aID]] = relDict[id_][aID]
-                        successful[inputIDDict[id_]] = resDict
-                    for aID in result["Value"]["Failed"]:
+                resDict = {}
+                for aID, depth in relDict[id_].items():
+                    if aID in relativeLFNs:
+                        resDict[relativeLFNs[aID]] = depth
+                    elif aID in relativeFailed:
                         failed[inputIDDict[id_]] = "Failed to get the ancestor LFN"
-            else:
+                if resDict:
+                    successful[inputIDDict[id_]] = resDict
+            elif inputIDDict[id_] not in failed:
                 successful[inputIDDict[id_]] = {}
 
         return S_OK({"Successful": successful, "Failed": failed})
@@ -646,34 +853,46 @@ class FileManagerBase:
             return res
         directorySESizeDict = res["Value"]
 
-        # Now do removal
-        res = self._deleteFiles(list(fileIDLfns), connection=connection)
+        # Now do removal together with the directory usage update
+        res = self._deleteFilesWithUsage(list(fileIDLfns), directorySESizeDict, connection=connection)
         if not res["OK"]:
             for lfn in fileIDLfns.values():
                 failed[lfn] = res["Message"]
         else:
-            # Update the directory usage
-            self._updateDirectoryUsage(directorySESizeDict, "-", connection=connection)
             for lfn in fileIDLfns.values():
                 successful[lfn] = True
         return S_OK({"Successful": successful, "Failed": failed})
 
+    def _deleteFilesWithUsage(self, fileIDs, directorySEDict, connection=False):
+        """Remove the given files and decrease the directory usage accordingly.
+        Derived classes may override it to do both in a single transaction
+        """
+        res = self._deleteFiles(fileIDs, connection=connection)
+        if not res["OK"]:
+            return res
+        res = self._updateDirectoryUsage(directorySEDict, "-", connection=connection)
+        if not res["OK"]:
+            gLogger.warn("Failed to update FC_DirectoryUsage", res["Message"])
+        return S_OK()
+
     def _computeStorageUsageOnRemoveFile(self, lfns, connection=False):
         # Resolve the replicas to calculate reduction in storage usage
         fileIDLfns = {}
         for lfn, lfnDict in lfns.items():
             fileIDLfns[lfnDict["FileID"]] = lfn
-        res = self._getFileReplicas(list(fileIDLfns), connection=connection)
+        # All the replicas are removed with the files, whatever their status
+        res = self._getFileReplicas(list(fileIDLfns), allStatus=True, connection=connection)
         if not res["OK"]:
             return res
         directorySESizeDict = {}
-        for fileID, seDict in res["Value"].items():
-            dirID = lfns[fileIDLfns[fileID]]["DirID"]
-            size = lfns[fileIDLfns[fileID]]["Size"]
+        for lfnDict in lfns.values():
+            dirID = lfnDict["DirID"]
             directorySESizeDict.setdefault(dirID, {})
             directorySESizeDict[dirID].setdefault(0, {"Files": 0, "Size": 0})
-            directorySESizeDict[dirID][0]["Size"] += size
+            directorySESizeDict[dirID][0]["Size"] += lfnDict["Size"]
             directorySESizeDict[dirID][0]["Files"] += 1
+        for fileID, seDict in res["Value"].items():
+            dirID = lfns[fileIDLfns[fileID]]["DirID"]
             for seName in seDict.keys():
                 res = self.db.seManager.findSE(seName)
                 if not res["OK"]:
@@ -12,6 +12,9 @@ from DIRAC.Core.Utilities.List import stringListToString, intListToString, break
 
 
 class FileManagerPs(FileManagerBase):
+    # The catalog counters are maintained by triggers, created together with their table in FileCatalogWithFkAndPsDB.sql
+    _tables = dict()
+
     def __init__(self, database=None):
         super().__init__(database)
 
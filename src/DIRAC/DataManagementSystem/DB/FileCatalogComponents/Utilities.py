@@ -19,3 +19,20 @@ def getIDSelectString(ids):
         return S_ERROR("Illegal fileID")
 
     return S_OK(idString)
+
+
+def getCountersUpdateString(counterDict):
+    """Build the statement applying incremental changes to the FC_CatalogCounters summary table
+
+    :param dict counterDict: { (counterName, seID): change }, seID is 0 for the counters not related to an SE
+    :return: SQL statement, empty string if there is no change to apply
+    """
+    tuples = [
+        "('%s',%d,%d,UTC_TIMESTAMP())" % (name, seID, change) for (name, seID), change in counterDict.items() if change
+    ]
+    if not tuples:
+        return ""
+    req = "INSERT INTO FC_CatalogCounters (CounterName,SEID,CounterValue,LastUpdate) "
+    req += f"VALUES {','.join(tuples)}"
+    req += " ON DUPLICATE KEY UPDATE CounterValue=CounterValue+VALUES(CounterValue), LastUpdate=UTC_TIMESTAMP()"
+    return req
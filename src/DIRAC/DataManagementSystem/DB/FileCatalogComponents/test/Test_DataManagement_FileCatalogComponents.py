@@ -13,6 +13,7 @@ from DIRAC.DataManagementSystem.DB.FileCatalogComponents.DirectoryManager.Direct
 # from DIRAC.DataManagementSystem.DB.FileCatalogComponents.DirectoryNodeTree import DirectoryNodeTree
 
 from DIRAC.DataManagementSystem.DB.FileCatalogComponents.FileManager.FileManagerBase import FileManagerBase
+from DIRAC.DataManagementSystem.DB.FileCatalogComponents.FileManager.FileManager import FileManager
 
 dbMock = MagicMock()
 ugManagerMock = MagicMock()
@@ -44,6 +45,33 @@ def test_Level_makeDirectory():
     assert res["OK"] is True  # this will need to be implemented on a derived class
 
 
+def test_Level_removeDirTwice():
+    # Two concurrent removals of the same directory: both find it, only the first DELETE affects a row
+    levelDbMock = MagicMock()
+    levelDbMock._transaction.side_effect = [
+        {"OK": True, "Value": [("START TRANSACTION", 0), ("DELETE", 1), ("INSERT", 1)]},
+        {"OK": True, "Value": [("START TRANSACTION", 0), ("DELETE", 0), ("INSERT", 0)]},
+    ]
+    tree = DirectoryLevelTree()
+    tree.db = levelDbMock
+    tree.findDir = MagicMock(return_value={"OK": True, "Value": 5})
+
+    res = tree.removeDir("/a")
+    assert res["OK"] is True
+    assert res["Value"] == 1
+    res = tree.removeDir("/a")
+    assert res["OK"] is True
+    assert res["Value"] == 0
+
+    # The counter is only changed in the transaction whose DELETE removed the directory
+    for call in levelDbMock._transaction.call_args_list:
+        _start, req, counterReq = call.args[0]
+        assert req == "DELETE FROM FC_DirectoryLevelTree WHERE DirID=5"
+        assert "FC_CatalogCounters" in counterReq
+        assert "'Directories',0,-1," in counterReq
+        assert "WHERE ROW_COUNT() > 0" in counterReq
+
+
 ####################################################################################
 # SimpleTree
 # FIXME: this fails... is it a genuine failure?
@@ -99,3 +127,91 @@ def test_Base_addFile():
     res = fmb.addFile({"aa": "aaa/bbb"}, {})
     assert res["OK"] is True  # this will need to be implemented on a derived class, but it anyway returns S_OK()
     assert "aa" in res["Value"]["Failed"]
+
+
+def test_Base_getDirectoryUsageUpdates():
+    # /a (1) -> /a/b (2) and /a/c (3)
+    parents = {2: [1, 2], 3: [1, 3]}
+    dtreeMock = MagicMock()
+    dtreeMock.getPathIDsByID.side_effect = lambda dirID: {"OK": True, "Value": parents[dirID]}
+    fmb.db.dtree = dtreeMock
+
+    directorySEDict = {2: {0: {"Files": 2, "Size": 20}, 5: {"Files": 1, "Size": 10}}, 3: {0: {"Files": 1, "Size": 5}}}
+    res = fmb._getDirectoryUsageUpdates(directorySEDict, "-")
+    assert res["OK"] is True
+    # Everything is coalesced in a single statement, plus the catalog counters update
+    assert len(res["Value"]) == 2
+    req, counterReq = res["Value"]
+    # The parent directory gets the sum of its children
+    assert "(1,0,-25,-3,UTC_TIMESTAMP())" in req
+    assert "(1,5,-10,-1,UTC_TIMESTAMP())" in req
+    assert "(2,0,-20,-2,UTC_TIMESTAMP())" in req
+    assert "(3,0,-5,-1,UTC_TIMESTAMP())" in req
+    assert req.count("UTC_TIMESTAMP())") == 5
+    # The counters are only changed once per file or replica, not for each parent
+    assert "FC_CatalogCounters" in counterReq
+    assert "('Files',0,-3,UTC_TIMESTAMP())" in counterReq
+    assert "('Replicas',5,-1,UTC_TIMESTAMP())" in counterReq
+    assert counterReq.count("UTC_TIMESTAMP())") == 2
+
+
+####################################################################################
+# FileManager
+
+
+def test_FileManager_getInsertedFileIDs():
+    fmDbMock = MagicMock()
+    fmDbMock.insertChunkSize = 2
+    fm = FileManager(fmDbMock)
+    fmDbMock._query.reset_mock()
+    fmDbMock._query.side_effect = [
+        {"OK": True, "Value": ((1, "f1", 11), (1, "f2", 12))},
+        {"OK": True, "Value": ((2, "f1", 21),)},
+    ]
+
+    lfns = {"/a/f1": {"DirID": 1}, "/a/f2": {"DirID": 1}, "/b/f1": {"DirID": 2}}
+    res = fm._getInsertedFileIDs(lfns)
+    assert res["OK"] is True
+    assert res["Value"] == {"/a/f1": 11, "/a/f2": 12, "/b/f1": 21}
+    # One query per chunk of files, whatever the number of directories
+    assert fmDbMock._query.call_count == 2
+
+
+def test_Base_checkTables():
+    # Catalog created before the catalog counters: the table is created and computed once
+    fmDbMock = MagicMock()
+    fmDbMock._query.side_effect = [
+        {"OK": True, "Value": (("FC_Files",), ("FC_Replicas",))},
+        {"OK": True, "Value": (("Files", 0, 10), ("Directories", 0, 2))},
+    ]
+    fmDbMock._createTables.return_value = {"OK": True, "Value": None}
+    fmDbMock._transaction.return_value = {"OK": True, "Value": []}
+    FileManager(fmDbMock)
+    assert list(fmDbMock._createTables.call_args[0][0]) == ["FC_CatalogCounters"]
+    reqs = fmDbMock._transaction.call_args[0][0]
+    assert "DELETE FROM FC_CatalogCounters" in reqs
+
+    # Up to date catalog: nothing is created
+    fmDbMock = MagicMock()
+    fmDbMock._query.return_value = {"OK": True, "Value": (("FC_Files",), ("FC_CatalogCounters",))}
+    FileManager(fmDbMock)
+    fmDbMock._createTables.assert_not_called()
+    fmDbMock._transaction.assert_not_called()
+
+
+def test_Base_populateFileAncestors():
+    fm = FileManagerBase(MagicMock())
+    # /c has /b as ancestor, which already has /a as ancestor
+    fm._findFiles = MagicMock(return_value={"OK": True, "Value": {"Successful": {"/b": {"FileID": 2}}, "Failed": {}}})
+    fm._getFileAncestors = MagicMock(return_value={"OK": True, "Value": {2: {1: 1}}})
+    fm._insertFileAncestors = MagicMock(return_value={"OK": True, "Value": 2})
+    fm._propagateFileAncestors = MagicMock(return_value={"OK": True, "Value": 0})
+
+    res = fm._populateFileAncestors({"/c": {"FileID": 3, "Ancestors": ["/b"]}, "/d": {"FileID": 4}})
+    assert res["OK"] is True
+    assert res["Value"]["Successful"] == {"/c": True, "/d": True}
+    # The ancestors of the ancestor are registered as well
+    fm._insertFileAncestors.assert_called_once_with(3, {2: 1, 1: 2}, connection=fm._getConnection(False))
+    # and the new ancestors are given to the existing descendents
+    fm._propagateFileAncestors.assert_called_once()
+    assert fm._propagateFileAncestors.call_args[0][0] == [3]
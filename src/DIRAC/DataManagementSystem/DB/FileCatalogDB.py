@@ -50,6 +50,8 @@ class FileCatalogDB(DB):
         self.validReplicaStatus = databaseConfig["ValidReplicaStatus"]
         self.visibleFileStatus = databaseConfig["VisibleFileStatus"]
         self.visibleReplicaStatus = databaseConfig["VisibleReplicaStatus"]
+        # Maximum number of rows written or looked up by a single bulk statement
+        self.insertChunkSize = int(databaseConfig.get("InsertChunkSize", 1000))
 
         # Load the configured components
         for compAttribute, componentType in [
@@ -1046,6 +1048,28 @@ class FileCatalogDB(DB):
         result = self.dtree._rebuildDirectoryUsage()
         return result
 
+    def rebuildFileAncestors(self, credDict={}):
+        """Complete the FileAncestors table with the missing transitive relations"""
+
+        result = self._checkAdminPermission(credDict)
+        if not result["OK"]:
+            return result
+        if not result["Value"]:
+            return S_ERROR(errno.EACCES, "Not authorized to rebuild the file ancestors")
+
+        return self.fileManager.rebuildFileAncestors()
+
+    def rebuildCatalogCounters(self, credDict={}):
+        """Recompute the catalog counters summary table from scratch"""
+
+        result = self._checkAdminPermission(credDict)
+        if not result["OK"]:
+            return result
+        if not result["Value"]:
+            return S_ERROR(errno.EACCES, "Not authorized to rebuild the catalog counters")
+
+        return self.fileManager.rebuildCatalogCounters()
+
     def repairCatalog(self, credDict={}):
         """Repair catalog inconsistencies"""
 
@@ -1141,13 +1165,22 @@ class FileCatalogDB(DB):
     #  Catalog admin methods
     #
 
-    def getCatalogCounters(self, credDict):
+    def getCatalogCounters(self, credDict, full=False):
+        """Get the catalog counters. They are served from the summary table maintained
+        incrementally, unless full is set or the summary table is not initialized, in which
+        case the tables are counted, including the consistency counters (orphan files, etc)
+        """
         counterDict = {}
         res = self._checkAdminPermission(credDict)
         if not res["OK"]:
             return res
         if not res["Value"]:
             return S_ERROR(errno.EACCES, "Permission denied")
+        if not full:
+            res = self.fileManager.getSummaryCounters()
+            if res["OK"] and "Files" in res["Value"]:
+                return res
+            gLogger.warn("Catalog counters not available, counting the tables", res.get("Message", ""))
         # res = self.dtree.getDirectoryCounters()
         # if not res['OK']:
         #  return res
@@ -238,6 +238,20 @@ CREATE TABLE FC_DirectoryUsage(
 
 -- ------------------------------------------------------------------------------
 
+-- Catalog wide counters (Files, Directories and Replicas per SEID), updated in the
+-- same transactions as the catalog tables, so that getCatalogCounters does not count them
+CREATE TABLE FC_CatalogCounters(
+   CounterName VARCHAR(32) NOT NULL,
+   SEID INTEGER NOT NULL DEFAULT 0,
+   CounterValue BIGINT NOT NULL DEFAULT 0,
+   LastUpdate DATETIME NOT NULL,
+   PRIMARY KEY (CounterName,SEID)
+) ENGINE = INNODB;
+
+INSERT INTO FC_CatalogCounters (CounterName, SEID, CounterValue, LastUpdate) VALUES ('Files', 0, 0, UTC_TIMESTAMP()), ('Directories', 0, 0, UTC_TIMESTAMP());
+
+-- ------------------------------------------------------------------------------
+
 CREATE TABLE FC_MetaFields (
   MetaID INT AUTO_INCREMENT PRIMARY KEY,
   MetaName VARCHAR(64) CHARACTER SET latin1 COLLATE latin1_bin NOT NULL,
@@ -220,6 +220,21 @@ CREATE TABLE FC_DirectoryUsage(
 
 -- ------------------------------------------------------------------------------
 
+-- Catalog wide counters (Files, Directories and Replicas per SEID), maintained by the
+-- triggers below, so that getCatalogCounters does not count the tables
+CREATE TABLE FC_CatalogCounters(
+   CounterName VARCHAR(32) NOT NULL,
+   SEID INTEGER NOT NULL DEFAULT 0,
+   CounterValue BIGINT NOT NULL DEFAULT 0,
+   LastUpdate TIMESTAMP,
+
+   PRIMARY KEY (CounterName,SEID)
+) ENGINE = INNODB;
+
+INSERT INTO FC_CatalogCounters (CounterName, SEID, CounterValue) values ('Files', 0, 0), ('Directories', 0, 0);
+
+-- ------------------------------------------------------------------------------
+
 
 CREATE TABLE FC_DirMeta (
     DirID INTEGER NOT NULL,
@@ -622,11 +637,57 @@ BEGIN
 
     -- ... and increase it on the new one
     call update_directory_usage (dir_id, new.SEID, file_size, 1);
+
+    call update_catalog_counter ('Replicas', old.SEID, -1);
+    call update_catalog_counter ('Replicas', new.SEID, 1);
   END IF;
 END //
 DELIMITER ;
 
 
+-- update_catalog_counter : apply a change to one of the catalog wide counters
+-- counter_name : Files, Directories or Replicas
+-- se_id : SEID for the Replicas counters, 0 otherwise
+-- counter_diff : the modification to bring to the counter
+
+DROP PROCEDURE IF EXISTS update_catalog_counter;
+DELIMITER //
+CREATE PROCEDURE update_catalog_counter
+(IN counter_name VARCHAR(32), IN se_id INT, IN counter_diff BIGINT)
+BEGIN
+    INSERT INTO FC_CatalogCounters (CounterName, SEID, CounterValue) VALUES (counter_name, se_id, counter_diff) ON DUPLICATE KEY UPDATE CounterValue = CounterValue + counter_diff;
+END //
+DELIMITER ;
+
+-- The triggers maintaining the catalog counters run in the transaction of the statement
+-- inserting or deleting the rows. Rows are only ever deleted explicitly from these tables,
+-- never through a foreign key cascade (which would not fire the triggers)
+
+DROP TRIGGER IF EXISTS trg_after_insert_file_counter;
+CREATE TRIGGER trg_after_insert_file_counter AFTER INSERT ON FC_Files
+FOR EACH ROW call update_catalog_counter ('Files', 0, 1);
+
+DROP TRIGGER IF EXISTS trg_after_delete_file_counter;
+CREATE TRIGGER trg_after_delete_file_counter AFTER DELETE ON FC_Files
+FOR EACH ROW call update_catalog_counter ('Files', 0, -1);
+
+DROP TRIGGER IF EXISTS trg_after_insert_replica_counter;
+CREATE TRIGGER trg_after_insert_replica_counter AFTER INSERT ON FC_Replicas
+FOR EACH ROW call update_catalog_counter ('Replicas', new.SEID, 1);
+
+DROP TRIGGER IF EXISTS trg_after_delete_replica_counter;
+CREATE TRIGGER trg_after_delete_replica_counter AFTER DELETE ON FC_Replicas
+FOR EACH ROW call update_catalog_counter ('Replicas', old.SEID, -1);
+
+DROP TRIGGER IF EXISTS trg_after_insert_dir_counter;
+CREATE TRIGGER trg_after_insert_dir_counter AFTER INSERT ON FC_DirectoryList
+FOR EACH ROW call update_catalog_counter ('Directories', 0, 1);
+
+DROP TRIGGER IF EXISTS trg_after_delete_dir_counter;
+CREATE TRIGGER trg_after_delete_dir_counter AFTER DELETE ON FC_DirectoryList
+FOR EACH ROW call update_catalog_counter ('Directories', 0, -1);
+
+
 
 -- ps_get_replicas_for_files_in_dir : get replica information for all the files in a given dir
 -- dir_id : directory id
@@ -56,6 +56,7 @@ class FileCatalogHandlerMixin:
             "ValidReplicaStatus": ["AprioriGood", "Trash", "Removing", "Probing"],
             "VisibleFileStatus": ["AprioriGood"],
             "VisibleReplicaStatus": ["AprioriGood"],
+            "InsertChunkSize": 1000,
         }
         for configKey in sorted(defaultConfig.keys()):
             defaultValue = defaultConfig[configKey]
@@ -364,9 +365,9 @@ class FileCatalogHandlerMixin:
 
     types_getCatalogCounters = []
 
-    def export_getCatalogCounters(self):
+    def export_getCatalogCounters(self, full=False):
         """Get the number of registered directories, files and replicas in various tables"""
-        return self.fileCatalogDB.getCatalogCounters(self.getRemoteCredentials())
+        return self.fileCatalogDB.getCatalogCounters(self.getRemoteCredentials(), full=full)
 
     types_rebuildDirectoryUsage = []
 
@@ -374,6 +375,18 @@ class FileCatalogHandlerMixin:
         """Rebuild DirectoryUsage table from scratch"""
         return self.fileCatalogDB.rebuildDirectoryUsage()
 
+    types_rebuildFileAncestors = []
+
+    def export_rebuildFileAncestors(self):
+        """Complete the FileAncestors table with the missing transitive relations"""
+        return self.fileCatalogDB.rebuildFileAncestors(self.getRemoteCredentials())
+
+    types_rebuildCatalogCounters = []
+
+    def export_rebuildCatalogCounters(self):
+        """Recompute the catalog counters summary table from scratch"""
+        return self.fileCatalogDB.rebuildCatalogCounters(self.getRemoteCredentials())
+
     types_repairCatalog = []
 
     def export_repairCatalog(self):
@@ -0,0 +1,126 @@
+"""
+  Client side cache of the replicas returned by the file catalogs
+
+  The cache is bounded in size and its entries expire after a given lifetime. It is shared by all the
+  DataManager instances of a process using the same VO and catalogs, so that the JobWrapper, the optimizers
+  or the agents asking several times for the same LFNs within a short time only query the catalog once.
+"""
+import threading
+
+import cachetools
+
+from DIRAC import S_OK
+
+#: Caches shared between the DataManager instances, indexed by (vo, catalogs)
+gReplicaCaches = {}
+gReplicaCachesLock = threading.Lock()
+
+
+def getReplicaCache(key, maxSize, lifetime):
+    """Get the ReplicaCache shared by the clients using the given key, create it if needed
+
+    :param key: hashable identifying the catalogs the cache is used for
+    :param int maxSize: maximum number of (lfn, allStatus) entries kept in the cache
+    :param int lifetime: lifetime of the entries in seconds
+
+    :return: ReplicaCache instance
+    """
+    with gReplicaCachesLock:
+        cache = gReplicaCaches.get(key)
+        if cache is None or cache.maxSize != maxSize or cache.lifetime != lifetime:
+            cache = ReplicaCache(maxSize, lifetime)
+            gReplicaCaches[key] = cache
+        return cache
+
+
+class ReplicaCache:
+    """Bounded, time limited cache of the catalog replicas of LFNs
+
+    Entries are the ``{se: pfn}`` dictionaries returned by the catalog ``getReplicas`` for an LFN,
+    indexed by (lfn, allStatus). Copies are stored and returned, so the callers can modify the results.
+    """
+
+    def __init__(self, maxSize, lifetime):
+        """c'tor
+
+        :param int maxSize: maximum number of entries kept in the cache
+        :param int lifetime: lifetime of the entries in seconds
+        """
+        self.maxSize = maxSize
+        self.lifetime = lifetime
+        self.__cache = cachetools.TTLCache(maxSize, lifetime)
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, lfns, allStatus):
+        """Get the cached replicas of a list of LFNs
+
+        :param lfns: LFN or iterable of LFNs to look for
+        :param bool allStatus: allStatus flag of the catalog query
+
+        :return: tuple (dictionary {lfn: replicas} of the cached LFNs, list of LFNs not in the cache)
+        """
+        if isinstance(lfns, str):
+            lfns = [lfns]
+        found = {}
+        missing = []
+        with self.__lock:
+            for lfn in lfns:
+                replicas = self.__cache.get((lfn, allStatus))
+                if replicas is None:
+                    missing.append(lfn)
+                else:
+                    found[lfn] = dict(replicas)
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def add(self, replicaDict, allStatus):
+        """Add replicas to the cache
+
+        :param dict replicaDict: {lfn: {se: pfn}} as returned in the Successful dictionary of getReplicas
+        :param bool allStatus: allStatus flag of the catalog query
+        """
+        with self.__lock:
+            for lfn, replicas in replicaDict.items():
+                self.__cache[(lfn, allStatus)] = dict(replicas)
+
+    def invalidate(self, lfns):
+        """Remove LFNs from the cache, e.g. because their replicas have been changed
+
+        :param lfns: LFN or iterable of LFNs
+        """
+        if isinstance(lfns, str):
+            lfns = [lfns]
+        with self.__lock:
+            for lfn in lfns:
+                for allStatus in (True, False):
+                    if self.__cache.pop((lfn, allStatus), None) is not None:
+                        self.invalidations += 1
+
+    def clear(self):
+        """Remove all the entries of the cache"""
+        with self.__lock:
+            self.__cache.clear()
+
+    def getStats(self):
+        """Get the usage statistics of the cache
+
+        :return: S_OK(dict) with the number of hits, misses, invalidations, the hit rate and the current size
+        """
+        with self.__lock:
+            self.__cache.expire()
+            lookups = self.hits + self.misses
+            return S_OK(
+                {
+                    "Hits": self.hits,
+                    "Misses": self.misses,
+                    "Invalidations": self.invalidations,
+                    "HitRate": float(self.hits) / lookups if lookups else 0.0,
+                    "Size": len(self.__cache),
+                    "MaxSize": self.maxSize,
+                    "Lifetime": self.lifetime,
+                }
+            )
@@ -0,0 +1,100 @@
+""" Test the client side replica cache
+"""
+import time
+
+from DIRAC import S_OK
+from DIRAC.DataManagementSystem.Client import DataManager as DataManagerModule
+from DIRAC.DataManagementSystem.Utilities.ReplicaCache import ReplicaCache, getReplicaCache
+
+
+def test_getAndInvalidate():
+    cache = ReplicaCache(10, 60)
+    cache.add({"/a/f1": {"SE1": "pfn1"}, "/a/f2": {"SE1": "pfn2", "SE2": "pfn2b"}}, True)
+
+    found, missing = cache.get(["/a/f1", "/a/f2", "/a/f3"], True)
+    assert found == {"/a/f1": {"SE1": "pfn1"}, "/a/f2": {"SE1": "pfn2", "SE2": "pfn2b"}}
+    assert missing == ["/a/f3"]
+
+    # The allStatus flag is part of the key
+    found, missing = cache.get(["/a/f1"], False)
+    assert not found
+    assert missing == ["/a/f1"]
+
+    # Returned dictionaries are copies
+    found["/a/f1"] = {}
+    found, _missing = cache.get(["/a/f1"], True)
+    found["/a/f1"].pop("SE1")
+    found, _missing = cache.get(["/a/f1"], True)
+    assert found == {"/a/f1": {"SE1": "pfn1"}}
+
+    cache.invalidate("/a/f1")
+    cache.invalidate({"/a/f2": {"SE": "SE3", "PFN": "pfn3"}})
+    found, missing = cache.get(["/a/f1", "/a/f2"], True)
+    assert not found
+    assert missing == ["/a/f1", "/a/f2"]
+
+    stats = cache.getStats()["Value"]
+    assert stats["Hits"] == 4
+    assert stats["Misses"] == 4
+    assert stats["HitRate"] == 0.5
+    assert stats["Invalidations"] == 2
+    assert stats["Size"] == 0
+
+
+def test_singleLFN():
+    cache = ReplicaCache(10, 60)
+    found, missing = cache.get("/a/b", True)
+    assert not found
+    assert missing == ["/a/b"]
+
+    cache.add({"/a/b": {"SE1": "pfn1"}}, True)
+    found, missing = cache.get("/a/b", True)
+    assert found == {"/a/b": {"SE1": "pfn1"}}
+    assert not missing
+
+
+def test_bounded():
+    cache = ReplicaCache(5, 60)
+    cache.add({f"/a/f{i}": {"SE1": f"pfn{i}"} for i in range(20)}, True)
+    assert cache.getStats()["Value"]["Size"] == 5
+
+
+def test_expiration():
+    cache = ReplicaCache(5, 0.1)
+    cache.add({"/a/f1": {"SE1": "pfn1"}}, True)
+    time.sleep(0.2)
+    found, missing = cache.get(["/a/f1"], True)
+    assert not found
+    assert missing == ["/a/f1"]
+
+
+def test_sharedCache():
+    cache = getReplicaCache(("vo", ("FileCatalog",)), 10, 60)
+    assert getReplicaCache(("vo", ("FileCatalog",)), 10, 60) is cache
+    assert getReplicaCache(("otherVO", ("FileCatalog",)), 10, 60) is not cache
+    # A configuration change creates a new cache
+    assert getReplicaCache(("vo", ("FileCatalog",)), 20, 60) is not cache
+
+
+def test_getReplicasSingleLFN(mocker):
+    """A single LFN given as a string is looked up as a whole, in the cache and in the catalog"""
+    config = {"DataManagement/ReplicaCacheLifetime": 60, "DataManagement/ReplicaCacheSize": 10}
+    operations = mocker.patch.object(DataManagerModule, "Operations")
+    operations.return_value.getValue.side_effect = lambda option, default: config.get(option, default)
+    for name in ("FileCatalog", "ResourceStatus", "DMSHelpers", "DataOperationSender"):
+        mocker.patch.object(DataManagerModule, name)
+
+    dm = DataManagerModule.DataManager(vo="singleLFNVO")
+    dm.replicaCache.clear()
+    dm.fileCatalog.getReplicas.return_value = S_OK({"Successful": {"/a/b": {"SE1": "pfn1"}}, "Failed": {}})
+
+    res = dm.getReplicas("/a/b", getUrl=False)
+    assert res["OK"], res
+    assert res["Value"] == {"Successful": {"/a/b": {"SE1": True}}, "Failed": {}}
+    dm.fileCatalog.getReplicas.assert_called_once_with(["/a/b"], allStatus=True)
+
+    # The second call is served by the cache
+    res = dm.getReplicas("/a/b", getUrl=False)
+    assert res["OK"], res
+    assert res["Value"] == {"Successful": {"/a/b": {"SE1": True}}, "Failed": {}}
+    assert dm.fileCatalog.getReplicas.call_count == 1
@@ -0,0 +1,40 @@
+"""
+AgentPhaseMonitoring type used to monitor the phases of the cycles of DIRAC agents.
+"""
+from DIRAC.MonitoringSystem.Client.Types.BaseType import BaseType
+
+
+class AgentPhaseMonitoring(BaseType):
+    """
+    .. class:: AgentPhaseMonitoring
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self.keyFields = [
+            "Host",
+            "AgentName",
+            "Phase",
+        ]
+
+        self.monitoringFields = [
+            "PhaseDuration",
+            "PhaseJobs",
+        ]
+
+        self.index = "agent_phase_monitoring-index"
+
+        self.addMapping(
+            {
+                "Host": {"type": "keyword"},
+                "AgentName": {"type": "keyword"},
+                "Phase": {"type": "keyword"},
+                "PhaseDuration": {"type": "float"},
+                "PhaseJobs": {"type": "long"},
+            }
+        )
+
+        self.period = "month"
+
+        self.checkType()
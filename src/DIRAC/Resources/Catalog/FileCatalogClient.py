@@ -86,6 +86,8 @@ class FileCatalogClient(FileCatalogClientBase):
         "deleteGroup",
         "repairCatalog",
         "rebuildDirectoryUsage",
+        "rebuildFileAncestors",
+        "rebuildCatalogCounters",
     ]
 
     NO_LFN_METHODS = [
@@ -112,6 +114,8 @@ class FileCatalogClient(FileCatalogClientBase):
         "deleteGroup",
         "repairCatalog",
         "rebuildDirectoryUsage",
+        "rebuildFileAncestors",
+        "rebuildCatalogCounters",
     ]
 
     ADMIN_METHODS = [
@@ -124,6 +128,8 @@ class FileCatalogClient(FileCatalogClientBase):
         "getCatalogCounters",
         "repairCatalog",
         "rebuildDirectoryUsage",
+        "rebuildFileAncestors",
+        "rebuildCatalogCounters",
     ]
 
     def __init__(self, url=None, **kwargs):
@@ -521,14 +527,28 @@ class FileCatalogClient(FileCatalogClientBase):
     # Administrative database operations
     #
 
-    def getCatalogCounters(self, timeout=120):
-        """Get the number of registered directories, files and replicas in various tables"""
+    def getCatalogCounters(self, full=False, timeout=120):
+        """Get the number of registered directories, files and replicas in various tables
+
+        :param bool full: count the tables instead of using the summary counters, and get the consistency counters
+        """
+        # Servers of earlier versions do not accept the full argument
+        if full:
+            return self._getRPC(timeout=timeout).getCatalogCounters(full)
         return self._getRPC(timeout=timeout).getCatalogCounters()
 
     def rebuildDirectoryUsage(self, timeout=120):
         """Rebuild DirectoryUsage table from scratch"""
         return self._getRPC(timeout=timeout).rebuildDirectoryUsage()
 
+    def rebuildFileAncestors(self, timeout=120):
+        """Complete the FileAncestors table with the missing transitive relations"""
+        return self._getRPC(timeout=timeout).rebuildFileAncestors()
+
+    def rebuildCatalogCounters(self, timeout=120):
+        """Recompute the catalog counters summary table from scratch"""
+        return self._getRPC(timeout=timeout).rebuildCatalogCounters()
+
     def repairCatalog(self, timeout=120):
         """Repair the catalog inconsistencies"""
         return self._getRPC(timeout=timeout).repairCatalog()
@@ -17,13 +17,27 @@ LocalCEType:
 NumberOfProcessors:
    Maximum number of processors that can be used to compute jobs.
 
+PackingStrategy:
+   If True, jobs are requested by shape so that they fill the node (see getDescription):
+   the largest processor counts of PackingShapes first, the smaller ones being backfilled in the gaps,
+   while processors are reserved for the largest shape when such jobs are waiting.
+
+PackingShapes:
+   Processor counts of the jobs requested by the PackingStrategy (default 16, 8, 4, 2, 1).
+
+MaxRAM:
+   Memory of the node in MB. With the PackingStrategy, the memory left is also requested
+   and the memory of the jobs (MaxRAM JDL parameter) is accounted.
+
 **Code Documentation**
 """
 import functools
 import os
+import threading
+import time
 import concurrent.futures
 
-from DIRAC import S_OK, S_ERROR
+from DIRAC import S_OK, S_ERROR, gConfig
 from DIRAC.ConfigurationSystem.private.ConfigurationData import ConfigurationData
 
 from DIRAC.Resources.Computing.ComputingElement import ComputingElement
@@ -68,6 +82,20 @@ class PoolComputingElement(ComputingElement):
         self.processorsPerTask = {}
         self.userNumberPerTask = {}
 
+        # Job packing
+        self.packing = False
+        self.packingShapes = [16, 8, 4, 2, 1]
+        self.maxRAM = 0
+        self.ramPerTask = {}
+        self.endTimePerTask = {}
+        self.largeJobsWaiting = False
+
+        # Utilisation accounting, in processor x seconds
+        self.startTime = time.time()
+        self.lastUsageTime = self.startTime
+        self.usedProcessorSeconds = 0.0
+        self.usageLock = threading.Lock()
+
         # This CE will effectively submit to another "Inner"CE
         # (by default to the InProcess CE)
         self.innerCESubmissionType = "InProcess"
@@ -84,6 +112,12 @@ class PoolComputingElement(ComputingElement):
         # The result is not immediately available
         self.ceParameters["AsyncSubmission"] = True
         self.innerCESubmissionType = self.ceParameters.get("InnerCESubmissionType", self.innerCESubmissionType)
+        self.packing = str(self.ceParameters.get("PackingStrategy", False)).lower() in ("1", "yes", "true", "y")
+        packingShapes = self.ceParameters.get("PackingShapes", self.packingShapes)
+        if isinstance(packingShapes, str):
+            packingShapes = packingShapes.split(",")
+        self.packingShapes = sorted({int(shape) for shape in packingShapes}, reverse=True)
+        self.maxRAM = int(self.ceParameters.get("MaxRAM", 0))
         return S_OK()
 
     def getProcessorsInUse(self):
@@ -96,6 +130,31 @@ class PoolComputingElement(ComputingElement):
             processorsInUse += self.processorsPerTask[future]
         return processorsInUse
 
+    def getRAMInUse(self):
+        """Get the memory (in MB) allocated to the running jobs
+
+        :return: memory in use
+        """
+        return sum(self.ramPerTask.values())
+
+    def __updateUsage(self):
+        """Accounts the processors used since the last update, to be called before they change"""
+        with self.usageLock:
+            now = time.time()
+            self.usedProcessorSeconds += self.getProcessorsInUse() * (now - self.lastUsageTime)
+            self.lastUsageTime = now
+
+    def getUtilisationEfficiency(self):
+        """Fraction of the processors x time of the node used by jobs since the CE was created
+
+        :return: float between 0 and 1
+        """
+        self.__updateUsage()
+        elapsed = self.lastUsageTime - self.startTime
+        if not elapsed or not self.processors:
+            return 0.0
+        return self.usedProcessorSeconds / (self.processors * elapsed)
+
     #############################################################################
     def submitJob(self, executableFile, proxy=None, inputs=None, **kwargs):
         """Method to submit job.
@@ -118,6 +177,18 @@ class PoolComputingElement(ComputingElement):
             self.taskID += 1
             return S_OK(taskID)
 
+        jobParams = kwargs.get("jobDesc", {}).get("jobParams", {})
+        ramForJob = 0
+        if self.packing:
+            # The MaxRAM JDL parameter is in GB
+            ramForJob = int(jobParams.get("MaxRAM", 0)) * 1024
+            if self.maxRAM and ramForJob > self.maxRAM - self.getRAMInUse():
+                self.taskResults[self.taskID] = S_ERROR("Not enough memory for the job")
+                taskID = self.taskID
+                self.taskID += 1
+                return S_OK(taskID)
+            self.__updateLargeJobsWaiting(processorsForJob)
+
         # Now persisting the job limits for later use in pilot.cfg file (pilot 3 default)
         cd = ConfigurationData(loadDefaultCFG=False)
         res = cd.loadFile("pilot.cfg")
@@ -143,8 +214,12 @@ class PoolComputingElement(ComputingElement):
                 taskKwargs["PayloadUser"] = os.environ["USER"] + f"p{str(nUser).zfill(2)}"
 
         # Submission
+        self.__updateUsage()
         future = self.pPool.submit(executeJob, executableFile, proxy, self.taskID, inputs, **taskKwargs)
         self.processorsPerTask[future] = processorsForJob
+        if self.packing:
+            self.ramPerTask[future] = ramForJob
+            self.endTimePerTask[future] = self.__estimateEndTime(jobParams, processorsForJob)
         future.add_done_callback(functools.partial(self.finalizeJob, self.taskID))
 
         taskID = self.taskID
@@ -196,7 +271,10 @@ class PoolComputingElement(ComputingElement):
 
         :param future: evaluating the future result
         """
+        self.__updateUsage()
         nProc = self.processorsPerTask.pop(future)
+        self.ramPerTask.pop(future, None)
+        self.endTimePerTask.pop(future, None)
 
         result = future.result()  # This would be the result of the e.g. InProcess.submitJob()
         if result["OK"]:
@@ -225,6 +303,7 @@ class PoolComputingElement(ComputingElement):
         processorsInUse = self.getProcessorsInUse()
         result["UsedProcessors"] = processorsInUse
         result["AvailableProcessors"] = self.processors - processorsInUse
+        result["UtilisationEfficiency"] = self.getUtilisationEfficiency()
         return result
 
     def getDescription(self):
@@ -238,7 +317,9 @@ class PoolComputingElement(ComputingElement):
         ceDict = result["Value"]
 
         ceDictList = []
-        if self.ceParameters.get("MultiProcessorStrategy"):
+        if self.packing:
+            ceDictList = self.__getPackingDescriptions(ceDict)
+        elif self.ceParameters.get("MultiProcessorStrategy"):
             strategyRequiredTags = []
             if not ceDict.get("ProcessorsInUse", 0):
                 # We are starting from a clean page, try to get the most demanding
@@ -257,12 +338,83 @@ class PoolComputingElement(ComputingElement):
                 ceDictList.append(newCEDict)
 
         # Do not require anything special if nothing else was lucky
-        ceDictList.append(dict(ceDict))
+        if not self.packing:
+            ceDictList.append(dict(ceDict))
 
         return S_OK(ceDictList)
 
+    def __getPackingDescriptions(self, ceDict):
+        """CE descriptions requesting, in turn, each job shape fitting in the free processors and memory.
+
+        The shapes are requested from the largest to the smallest, so that the small jobs are backfilled
+        in the gaps left by the large ones. When jobs of the largest shape are waiting (i.e. the last request
+        for them matched one) but do not fit, the processors are reserved for them: the smaller jobs only get
+        the CPU time left before enough running jobs end (according to their CPUTime) to start a large one,
+        unless they fit in the processors that would still be free by then.
+        """
+        freeProcessors = ceDict.get("NumberOfProcessors", 0)
+        if self.maxRAM:
+            ceDict["MaxRAM"] = self.maxRAM - self.getRAMInUse()
+
+        largestShape = self.packingShapes[0]
+        backfillCPUTime = None
+        extraProcessors = freeProcessors
+        if self.largeJobsWaiting and freeProcessors < largestShape:
+            now = time.time()
+            cpuPower = gConfig.getValue("/LocalSite/CPUNormalizationFactor", 0.0)
+            processorsAtEnd = freeProcessors
+            for endTime, processors in sorted(
+                (self.endTimePerTask.get(future, float("inf")), processors)
+                for future, processors in self.processorsPerTask.items()
+            ):
+                processorsAtEnd += processors
+                if processorsAtEnd >= largestShape:
+                    if endTime != float("inf") and cpuPower:
+                        backfillCPUTime = int(max(0, endTime - now) * cpuPower)
+                        extraProcessors = processorsAtEnd - largestShape
+                    break
+
+        ceDictList = []
+        for shape in self.packingShapes:
+            if shape > freeProcessors:
+                continue
+            newCEDict = dict(ceDict)
+            newCEDict["NumberOfProcessors"] = shape
+            if shape > 1:
+                newCEDict["RequiredTag"] = list(ceDict.get("RequiredTag", [])) + ["%dProcessors" % shape]
+            if backfillCPUTime is not None and shape > extraProcessors:
+                newCEDict["CPUTime"] = min(backfillCPUTime, ceDict.get("CPUTime", backfillCPUTime))
+            ceDictList.append(newCEDict)
+
+        # Jobs of other shapes, still within the reservation
+        newCEDict = dict(ceDict)
+        if backfillCPUTime is not None and freeProcessors > extraProcessors:
+            newCEDict["CPUTime"] = min(backfillCPUTime, ceDict.get("CPUTime", backfillCPUTime))
+        ceDictList.append(newCEDict)
+        return ceDictList
+
+    def __updateLargeJobsWaiting(self, processorsForJob):
+        """Large jobs are assumed to be waiting when one matched, and not anymore when they could have
+        matched (there were enough free processors to request them first) but a smaller job did.
+        """
+        largestShape = self.packingShapes[0]
+        if processorsForJob >= largestShape:
+            self.largeJobsWaiting = True
+        elif self.processors - self.getProcessorsInUse() >= largestShape:
+            self.largeJobsWaiting = False
+
+    @staticmethod
+    def __estimateEndTime(jobParams, processors):
+        """Expected end time of a job from its CPUTime (normalized CPU time per processor), if known"""
+        cpuPower = gConfig.getValue("/LocalSite/CPUNormalizationFactor", 0.0)
+        cpuTime = int(jobParams.get("CPUTime", 0))
+        if not cpuPower or not cpuTime:
+            return float("inf")
+        return time.time() + cpuTime / cpuPower
+
     def shutdown(self):
         """Wait for all futures (jobs) to complete"""
         if self.pPool:
             self.pPool.shutdown()  # blocking
+        self.log.info("Utilisation efficiency of the processors", f"{100 * self.getUtilisationEfficiency():.1f}%")
         return S_OK(self.taskResults)
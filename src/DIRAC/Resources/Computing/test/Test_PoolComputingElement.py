@@ -396,3 +396,61 @@ def test__getProcessorsForJobs(processorsPerTask, kwargs, expected):
         ce.processorsPerTask = processorsPerTask
     res = ce._getProcessorsForJobs(kwargs)
     assert res == expected
+
+
+def test_getDescription_packing():
+    ce = PoolComputingElement("TestPoolCE")
+    ce.ceParameters.update({"NumberOfProcessors": 16, "MaxRAM": 32768, "PackingStrategy": "True"})
+    ce._reset()
+    ce.processorsPerTask = {1: 8, 2: 4}
+    ce.ramPerTask = {1: 8192, 2: 4096}
+
+    res = ce.getDescription()
+    assert res["OK"], res
+    shapes = [(ceDict["NumberOfProcessors"], ceDict.get("RequiredTag", [])) for ceDict in res["Value"]]
+    assert shapes == [(4, ["4Processors"]), (2, ["2Processors"]), (1, []), (4, [])]
+    assert all(ceDict["MaxRAM"] == 20480 for ceDict in res["Value"])
+
+
+def test_getDescription_packingReservation(mocker):
+    mocker.patch(
+        "DIRAC.Resources.Computing.PoolComputingElement.gConfig.getValue",
+        side_effect=lambda option, default=None: 10.0 if "CPUNormalizationFactor" in option else default,
+    )
+    ce = PoolComputingElement("TestPoolCE")
+    ce.ceParameters.update({"NumberOfProcessors": 16, "PackingStrategy": True, "PackingShapes": "8,4,1"})
+    ce._reset()
+    ce.setCPUTimeLeft(100000)
+    now = time.time()
+    # 6 processors free, 4 more in 1000 seconds, 6 more in 2000 seconds
+    ce.processorsPerTask = {1: 4, 2: 6}
+    ce.endTimePerTask = {1: now + 1000, 2: now + 2000}
+
+    # No large job waiting: no reservation
+    res = ce.getDescription()
+    assert res["OK"], res
+    assert [ceDict["CPUTime"] for ceDict in res["Value"]] == [100000, 100000, 100000]
+
+    # 8 processors jobs are waiting: they can start in 1000 seconds, leaving 2 spare processors,
+    # so the larger jobs must end before
+    ce.largeJobsWaiting = True
+    res = ce.getDescription()
+    assert res["OK"], res
+    assert [ceDict["NumberOfProcessors"] for ceDict in res["Value"]] == [4, 1, 6]
+    assert [ceDict["CPUTime"] for ceDict in res["Value"]] == [
+        pytest.approx(10000, rel=0.01),
+        100000,
+        pytest.approx(10000, rel=0.01),
+    ]
+
+
+def test_utilisationEfficiency(mocker):
+    ce = PoolComputingElement("TestPoolCE")
+    ce.processors = 4
+    ce.startTime = ce.lastUsageTime = 0
+    mocker.patch("DIRAC.Resources.Computing.PoolComputingElement.time.time", side_effect=[10, 20])
+    # 2 processors used for the first 10 seconds, none afterwards
+    ce.processorsPerTask = {1: 2}
+    assert ce.getUtilisationEfficiency() == pytest.approx(0.5)
+    ce.processorsPerTask = {}
+    assert ce.getUtilisationEfficiency() == pytest.approx(0.25)
@@ -8,6 +8,7 @@ import os
 import sys
 import re
 import time
+import concurrent.futures
 
 from diraccfg import CFG
 
@@ -71,10 +72,13 @@ class JobAgent(AgentModule):
         self.stopAfterHostFailures = 3
         self.matchFailedCount = 0
         self.stopAfterFailedMatches = 10
+        self.maxConcurrentMatches = 8
         self.jobCount = 0
         self.extraOptions = ""
         self.logLevel = "INFO"
         self.defaultWrapperLocation = "DIRAC/WorkloadManagementSystem/JobWrapper/JobWrapperTemplate.py"
+        # Directory of the input sandboxes downloaded by the jobs, shared by all the jobs of the pilot
+        self.sandboxCacheDir = ""
 
         # Timeleft
         self.initTimes = os.times()
@@ -124,9 +128,12 @@ class JobAgent(AgentModule):
         self.stopOnApplicationFailure = self.am_getOption("StopOnApplicationFailure", self.stopOnApplicationFailure)
         self.stopAfterHostFailures = self.am_getOption("StopAfterHostFailures", self.stopAfterHostFailures)
         self.stopAfterFailedMatches = self.am_getOption("StopAfterFailedMatches", self.stopAfterFailedMatches)
+        self.maxConcurrentMatches = self.am_getOption("MaxConcurrentMatches", self.maxConcurrentMatches)
         self.extraOptions = gConfig.getValue("/AgentJobRequirements/ExtraOptions", self.extraOptions)
         self.logLevel = self.am_getOption("DefaultLogLevel", self.logLevel)
         self.defaultWrapperLocation = self.am_getOption("JobWrapperTemplate", self.defaultWrapperLocation)
+        sandboxCacheDir = self.am_getOption("SandboxCacheDirectory", "SandboxCache")
+        self.sandboxCacheDir = os.path.abspath(sandboxCacheDir) if sandboxCacheDir else ""
 
         # Utilities
         self.timeLeftUtil = TimeLeft()
@@ -158,50 +165,82 @@ class JobAgent(AgentModule):
             return self._finish("Node is being drained by an operator")
 
         self.log.verbose("Job Agent execution loop")
-        # Check that there is enough slots to match a job
-        result = self._checkCEAvailability(self.computingElement)
-        if not result["OK"]:
-            return self._finish(result["Message"])
-        if result["OK"] and result["Value"]:
-            return result
-
-        # Check that we are allowed to continue and that time left is sufficient
-        if self.jobCount:
-            cpuWorkLeft = self._computeCPUWorkLeft()
-            result = self._checkCPUWorkLeft(cpuWorkLeft)
+        while True:
+            # Check that there is enough slots to match a job
+            result = self._checkCEAvailability(self.computingElement)
             if not result["OK"]:
+                return self._finish(result["Message"])
+            if result["OK"] and result["Value"]:
                 return result
-            result = self._setCPUWorkLeft(cpuWorkLeft)
+
+            # Check that we are allowed to continue and that time left is sufficient
+            if self.jobCount:
+                cpuWorkLeft = self._computeCPUWorkLeft()
+                result = self._checkCPUWorkLeft(cpuWorkLeft)
+                if not result["OK"]:
+                    return result
+                result = self._setCPUWorkLeft(cpuWorkLeft)
+                if not result["OK"]:
+                    return result
+
+            # Get environment details and enhance them
+            result = self._getCEDict(self.computingElement)
             if not result["OK"]:
                 return result
+            ceDictList = result["Value"]
 
-        # Get environment details and enhance them
-        result = self._getCEDict(self.computingElement)
-        if not result["OK"]:
-            return result
-        ceDictList = result["Value"]
+            for ceDict in ceDictList:
+                self._setCEDict(ceDict)
 
-        for ceDict in ceDictList:
-            self._setCEDict(ceDict)
+            # Try to match jobs, for several slots at once if the CE runs them asynchronously
+            jobRequests = self._matchJobs(ceDictList)
+            matchedJobs = [(jobRequest, proxyResult) for jobRequest, proxyResult in jobRequests if jobRequest["OK"]]
 
-        # Try to match a job
-        jobRequest = self._matchAJob(ceDictList)
+            if not matchedJobs:
+                res = self._checkMatchingIssues(jobRequests[0][0])
+                if not res["OK"]:
+                    self._finish(res["Message"])
+                    return res
 
-        if not jobRequest["OK"]:
-            res = self._checkMatchingIssues(jobRequest)
-            if not res["OK"]:
-                self._finish(res["Message"])
+                # if we don't match a job, independently from the reason,
+                # we wait a bit longer before trying again
+                time.sleep(int(self.am_getOption("PollingTime")) * (self.matchFailedCount + 1) * 2)
                 return res
 
-            # if we don't match a job, independently from the reason,
-            # we wait a bit longer before trying again
-            time.sleep(int(self.am_getOption("PollingTime")) * (self.matchFailedCount + 1) * 2)
-            return res
+            # If we are, we matched a job
+            # Reset the Counter
+            self.matchFailedCount = 0
 
-        # If we are, we matched a job
-        # Reset the Counter
-        self.matchFailedCount = 0
+            for index, (jobRequest, proxyResult) in enumerate(matchedJobs):
+                result = self._processMatchedJob(jobRequest, proxyResult)
+                if not result["OK"]:
+                    # The agent stops: give back the other jobs matched for it
+                    for otherJobRequest, _ in matchedJobs[index + 1 :]:
+                        self._rescheduleFailedJob(otherJobRequest["Value"]["JobID"], "Job Agent stopped")
+                    return result
 
+            # Checking errors that could have occurred during the job submission and/or execution
+            result = self._checkSubmittedJobs()
+            if not result["OK"]:
+                return result
+            submissionErrors = result["Value"][0]
+            payloadErrors = result["Value"][1]
+            if submissionErrors:
+                return self._finish("Error during the submission process")
+            if payloadErrors:
+                return self._finish("Error during a payload execution", self.stopOnApplicationFailure)
+
+            # Keep on filling the free slots as long as there are jobs to match
+            if len(jobRequests) == 1 or len(matchedJobs) < len(jobRequests):
+                return S_OK("Job Agent cycle complete")
+
+    def _processMatchedJob(self, jobRequest, proxyResult=None):
+        """Check a matched job and submit it to the CE
+
+        :param dict jobRequest: S_OK with the job returned by the Matcher
+        :param dict proxyResult: result of _setupProxy for the job, if already done
+        :return: S_OK/S_ERROR
+        """
         # Check matcher information returned
         matcherParams = ["JDL", "Owner", "Group"]
         matcherInfo = jobRequest["Value"]
@@ -254,8 +293,10 @@ class JobAgent(AgentModule):
                 )
 
         self.jobReport.setJobStatus(minorStatus="Job Received by Agent", sendFlag=False)
-        ownerDN = getDNForUsername(owner)["Value"]
-        result_setupProxy = self._setupProxy(ownerDN, jobGroup)
+        result_setupProxy = proxyResult
+        if not result_setupProxy:
+            ownerDN = getDNForUsername(owner)["Value"]
+            result_setupProxy = self._setupProxy(ownerDN, jobGroup)
         if not result_setupProxy["OK"]:
             result = self._rescheduleFailedJob(jobID, result_setupProxy["Message"])
             return self._finish(result["Message"], self.stopOnApplicationFailure)
@@ -318,18 +359,7 @@ class JobAgent(AgentModule):
                 # This might fail, but only a message would be printed.
                 self._sendFailoverRequest(request)
 
-        # Checking errors that could have occurred during the job submission and/or execution
-        result = self._checkSubmittedJobs()
-        if not result["OK"]:
-            return result
-        submissionErrors = result["Value"][0]
-        payloadErrors = result["Value"][1]
-        if submissionErrors:
-            return self._finish("Error during the submission process")
-        if payloadErrors:
-            return self._finish("Error during a payload execution", self.stopOnApplicationFailure)
-
-        return S_OK("Job Agent cycle complete")
+        return S_OK()
 
     #############################################################################
     def _saveJobJDLRequest(self, jobID, jobJDL):
@@ -374,6 +404,8 @@ class JobAgent(AgentModule):
             ceDict["PilotReference"] = str(self.pilotReference)
         ceDict["PilotBenchmark"] = self.cpuFactor
         ceDict["PilotInfoReportedFlag"] = self.pilotInfoReportedFlag
+        if self.sandboxCacheDir:
+            ceDict["SandboxCacheDirectory"] = self.sandboxCacheDir
 
         # Add possible job requirements
         result = gConfig.getOptionsDict("/AgentJobRequirements")
@@ -557,6 +589,84 @@ class JobAgent(AgentModule):
                 break
         return jobRequest
 
+    def _matchJobs(self, ceDictList):
+        """Match jobs for the free processors of the CE, and set up their proxies at the same time.
+
+        A first request is made with the full CE descriptions, so that the jobs needing many processors or the
+        whole node can be matched. If it gets a single processor job, the CE runs the jobs asynchronously and the
+        filling mode is enabled, the other free processors are then given single processor jobs matched with
+        concurrent requests. The processors taken by a multi processor job are only known once it is submitted.
+
+        :param list ceDictList: CE descriptions, by order of priority
+        :return: list of (jobRequest, proxy result or None) tuples, one per request
+        """
+        jobRequests = [self._matchAJobAndSetupProxy(ceDictList)]
+        jobRequest = jobRequests[0][0]
+        if not jobRequest["OK"] or not self.fillingMode:
+            return jobRequests
+        if not self.computingElement.ceParameters.get("AsyncSubmission", False):
+            return jobRequests
+        result = self._getJDLParameters(jobRequest["Value"].get("JDL", ""))
+        if not result["OK"] or "MultiProcessor" in result["Value"].get("Tags", []):
+            return jobRequests
+
+        freeProcessors = max(ceDict.get("NumberOfProcessors", 1) for ceDict in ceDictList)
+        nRequests = min(self.maxConcurrentMatches, freeProcessors) - 1
+        singleProcessorCEDictList = self._limitCEDictList(ceDictList, 1, freeProcessors)
+        if nRequests < 1 or not singleProcessorCEDictList:
+            return jobRequests
+        with concurrent.futures.ThreadPoolExecutor(max_workers=nRequests) as executor:
+            jobRequests += executor.map(self._matchAJobAndSetupProxy, [singleProcessorCEDictList] * nRequests)
+        return jobRequests
+
+    @staticmethod
+    def _limitCEDictList(ceDictList, processors, freeProcessors):
+        """CE descriptions restricted to a number of processors
+
+        :param list ceDictList: CE descriptions
+        :param int processors: number of processors the jobs may use
+        :param int freeProcessors: number of free processors of the CE
+        :return: list of CE descriptions
+        """
+        limitedCEDictList = []
+        for ceDict in ceDictList:
+            requiredTags = ceDict.get("RequiredTag", [])
+            if "WholeNode" in requiredTags and processors < freeProcessors:
+                continue
+            if "MultiProcessor" in requiredTags and processors == 1:
+                continue
+            if any(
+                int(match.group(1)) > processors
+                for match in (re.match(r"^(\d+)Processors$", tag) for tag in requiredTags)
+                if match
+            ):
+                continue
+            newCEDict = dict(ceDict)
+            newCEDict["NumberOfProcessors"] = min(ceDict.get("NumberOfProcessors", 1), processors)
+            if ceDict.get("MaxRAM") and freeProcessors:
+                newCEDict["MaxRAM"] = ceDict["MaxRAM"] * processors // freeProcessors
+            limitedCEDictList.append(newCEDict)
+        return limitedCEDictList
+
+    def _matchAJobAndSetupProxy(self, ceDictList):
+        """Match a job and set up the proxy of its owner
+
+        :param list ceDictList: CE descriptions, by order of priority
+        :return: tuple (jobRequest, proxy result or None if not done)
+        """
+        jobRequest = self._matchAJob(ceDictList)
+        if not jobRequest["OK"]:
+            return jobRequest, None
+
+        owner = jobRequest["Value"].get("Owner")
+        jobGroup = jobRequest["Value"].get("Group")
+        if not owner or not jobGroup:
+            return jobRequest, None
+        result = getDNForUsername(owner)
+        if not result["OK"]:
+            return jobRequest, None
+        return jobRequest, self._setupProxy(result["Value"], jobGroup)
+
     def _checkMatchingIssues(self, jobRequest):
         """Check the source of the matching issue
 
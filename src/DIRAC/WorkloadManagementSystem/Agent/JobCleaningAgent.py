@@ -21,6 +21,12 @@ In vanilla DIRAC the HeartBeatLoggingInfo is only used by the StalledJobAgent. F
 this purpose the options MaxHBJobsAtOnce and RemoveStatusDelayHB/[Done|Killed|Failed] should be set to values larger
 than 0.
 
+Deleting many rows is expensive for large tables. If the HeartBeatLoggingInfo table of the JobDB is partitioned by time
+(HeartBeatLoggingInfoPartitionDays option of the JobDB), the HeartBeatLoggingInfoRetention option can be set instead:
+the partitions holding only records older than this number of days are then dropped, for all the jobs.
+Similarly, the LoggingInfoRetention option applies to the LoggingInfo table of the JobLoggingDB, if partitioned
+(LoggingInfoPartitionDays option of the JobLoggingDB).
+
 """
 import datetime
 import os
@@ -36,9 +42,10 @@ from DIRAC.RequestManagementSystem.Client.ReqClient import ReqClient
 from DIRAC.RequestManagementSystem.Client.Request import Request
 from DIRAC.WorkloadManagementSystem.Client import JobStatus
 from DIRAC.WorkloadManagementSystem.Client.JobMonitoringClient import JobMonitoringClient
-from DIRAC.WorkloadManagementSystem.Client.SandboxStoreClient import SandboxStoreClient
 from DIRAC.WorkloadManagementSystem.Client.WMSClient import WMSClient
 from DIRAC.WorkloadManagementSystem.DB.JobDB import JobDB
+from DIRAC.WorkloadManagementSystem.DB.JobLoggingDB import JobLoggingDB
+from DIRAC.WorkloadManagementSystem.Utilities.JobPurger import JobPurger
 
 
 class JobCleaningAgent(AgentModule):
@@ -52,12 +59,18 @@ class JobCleaningAgent(AgentModule):
 
         # clients
         self.jobDB = None
+        self.jobLoggingDB = None
+        self.jobPurger = None
 
         self.maxJobsAtOnce = 500
+        self.purgeBatchSize = 1000
+        self.maxPurgeRate = 0
         self.prodTypes = []
         self.removeStatusDelay = {}
         self.removeStatusDelayHB = {}
         self.maxHBJobsAtOnce = 0
+        self.hbLoggingInfoRetention = -1
+        self.loggingInfoRetention = -1
 
     #############################################################################
     def initialize(self):
@@ -72,6 +85,8 @@ class JobCleaningAgent(AgentModule):
             self.prodTypes = Operations().getValue("Transformations/DataProcessing", ["MCSimulation", "Merge"])
         self.log.info(f"Will exclude the following Production types from cleaning {', '.join(self.prodTypes)}")
         self.maxJobsAtOnce = self.am_getOption("MaxJobsAtOnce", self.maxJobsAtOnce)
+        self.purgeBatchSize = self.am_getOption("PurgeBatchSize", self.purgeBatchSize)
+        self.maxPurgeRate = self.am_getOption("MaxPurgeRate", self.maxPurgeRate)
 
         self.removeStatusDelay[JobStatus.DONE] = self.am_getOption("RemoveStatusDelay/Done", 7)
         self.removeStatusDelay[JobStatus.KILLED] = self.am_getOption("RemoveStatusDelay/Killed", 7)
@@ -82,6 +97,8 @@ class JobCleaningAgent(AgentModule):
         self.removeStatusDelayHB[JobStatus.KILLED] = self.am_getOption("RemoveStatusDelayHB/Killed", -1)
         self.removeStatusDelayHB[JobStatus.FAILED] = self.am_getOption("RemoveStatusDelayHB/Failed", -1)
         self.maxHBJobsAtOnce = self.am_getOption("MaxHBJobsAtOnce", self.maxHBJobsAtOnce)
+        self.hbLoggingInfoRetention = self.am_getOption("HeartBeatLoggingInfoRetention", self.hbLoggingInfoRetention)
+        self.loggingInfoRetention = self.am_getOption("LoggingInfoRetention", self.loggingInfoRetention)
 
         return S_OK()
 
@@ -130,11 +147,16 @@ class JobCleaningAgent(AgentModule):
             if not result["OK"]:
                 self.log.error("Failed to delete jobs", f"with condDict {condDict}")
 
-        if self.maxHBJobsAtOnce > 0:
+        if self.hbLoggingInfoRetention > 0:
+            self.removeHeartBeatLoggingInfo(None, self.hbLoggingInfoRetention)
+        elif self.maxHBJobsAtOnce > 0:
             for status, delay in self.removeStatusDelayHB.items():
                 if delay > 0:
                     self.removeHeartBeatLoggingInfo(status, delay)
 
+        if self.loggingInfoRetention > 0:
+            self.removeLoggingInfo(self.loggingInfoRetention)
+
         return S_OK()
 
     def removeDeletedJobs(self):
@@ -151,12 +173,6 @@ class JobCleaningAgent(AgentModule):
             self.log.info("No jobs to remove")
             return S_OK()
 
-        self.log.info("Unassigning sandboxes from soon to be deleted jobs", f"({len(jobList)})")
-        result = SandboxStoreClient(useCertificates=True).unassignJobs(jobList)
-        if not result["OK"]:
-            self.log.error("Cannot unassign jobs to sandboxes", result["Message"])
-            return result
-
         self.log.info("Attempting to remove deleted jobs", f"({len(jobList)})")
 
         # remove from jobList those that have still Operations to do in RMS
@@ -185,7 +201,28 @@ class JobCleaningAgent(AgentModule):
         if not jobList:
             return S_OK()
 
-        return self._deleteRemoveJobs(jobList, remove=True)
+        return self._purgeJobs(jobList)
+
+    def _purgeJobs(self, jobList):
+        """Remove jobs from all the WMS stores (JobDB, JobLoggingDB, TaskQueueDB, sandboxes, ES parameters)
+        by batches of PurgeBatchSize jobs, at most MaxPurgeRate jobs per second.
+
+        :param list jobList: list of int(JobID)
+        :returns: S_OK/S_ERROR
+        """
+        if not self.jobPurger:
+            self.jobPurger = JobPurger(
+                jobDB=self.jobDB,
+                batchSize=self.purgeBatchSize,
+                maxJobsPerSecond=self.maxPurgeRate,
+                parentLogger=self.log,
+            )
+        result = self.jobPurger.purgeJobs(jobList)
+        if not result["OK"]:
+            return result
+        if result["Value"]["Failed"]:
+            return S_ERROR(f"Failed to remove {len(result['Value']['Failed'])} jobs")
+        return S_OK()
 
     def deleteJobsByStatus(self, condDict, delay=False):
         """Sets the job status to "DELETED" for jobs in condDict.
@@ -215,10 +252,10 @@ class JobCleaningAgent(AgentModule):
         if not jobList:
             return S_OK()
 
-        return self._deleteRemoveJobs(jobList)
+        return self._deleteJobs(jobList)
 
-    def _deleteRemoveJobs(self, jobList, remove=False):
-        """Delete or removes a jobList"""
+    def _deleteJobs(self, jobList):
+        """Set a jobList Deleted, the removal from the DBs is done by the JobPurger"""
         ownerJobsDict = self._getOwnerJobsDict(jobList)
 
         fail = False
@@ -230,13 +267,10 @@ class JobCleaningAgent(AgentModule):
                 self.log.error("No DN found", f"for {user}")
                 return res
             wmsClient = WMSClient(useCertificates=True, delegatedDN=res["Value"][0], delegatedGroup=ownerGroup)
-            if remove:
-                result = wmsClient.removeJob(jobsList)
-            else:
-                result = wmsClient.deleteJob(jobsList)
+            result = wmsClient.deleteJob(jobsList)
             if not result["OK"]:
                 self.log.error(
-                    "Could not {'remove' if remove else 'delete'} jobs",
+                    "Could not delete jobs",
                     f"for {user} : {ownerGroup} (n={len(jobsList)}) : {result['Message']}",
                 )
                 fail = True
@@ -347,15 +381,36 @@ class JobCleaningAgent(AgentModule):
 
     def removeHeartBeatLoggingInfo(self, status, delayDays):
         """Remove HeartBeatLoggingInfo for jobs with given status after given number of days.
+        Without status, the partitions of the table older than the given number of days are dropped.
 
-        :param str status: Job Status
+        :param str status: Job Status, None for all the jobs
         :param int delayDays: number of days after which information is removed
         :returns: None
         """
-        self.log.info(f"Removing HeartBeatLoggingInfo for Jobs with {status} and older than {delayDays} day(s)")
         delTime = str(datetime.datetime.utcnow() - delayDays * TimeUtilities.day)
-        result = self.jobDB.removeInfoFromHeartBeatLogging(status, delTime, self.maxHBJobsAtOnce)
+        if status is None:
+            self.log.info(f"Dropping HeartBeatLoggingInfo partitions older than {delayDays} day(s)")
+            result = self.jobDB.dropHeartBeatLoggingInfoPartitions(delTime)
+        else:
+            self.log.info(f"Removing HeartBeatLoggingInfo for Jobs with {status} and older than {delayDays} day(s)")
+            result = self.jobDB.removeInfoFromHeartBeatLogging(status, delTime, self.maxHBJobsAtOnce)
         if not result["OK"]:
             self.log.error("Failed to delete from HeartBeatLoggingInfo", result["Message"])
         else:
             self.log.info("Deleted HeartBeatLogging info")
+
+    def removeLoggingInfo(self, delayDays):
+        """Remove the LoggingInfo records older than a given number of days, by dropping partitions
+
+        :param int delayDays: number of days after which information is removed
+        :returns: None
+        """
+        if not self.jobLoggingDB:
+            self.jobLoggingDB = JobLoggingDB()
+        self.log.info(f"Dropping LoggingInfo partitions older than {delayDays} day(s)")
+        delTime = str(datetime.datetime.utcnow() - delayDays * TimeUtilities.day)
+        result = self.jobLoggingDB.dropLoggingInfoPartitions(delTime)
+        if not result["OK"]:
+            self.log.error("Failed to drop LoggingInfo partitions", result["Message"])
+        else:
+            self.log.info("Dropped LoggingInfo partitions", f"({len(result['Value'])})")
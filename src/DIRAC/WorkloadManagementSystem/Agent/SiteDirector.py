@@ -12,8 +12,9 @@ import os
 import random
 import socket
 import sys
+import threading
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 
 import DIRAC
 from DIRAC import S_ERROR, S_OK, gConfig
@@ -48,6 +49,18 @@ from DIRAC.WorkloadManagementSystem.Utilities.QueueUtilities import getQueuesRes
 MAX_PILOTS_TO_SUBMIT = 100
 
 
+class SubmissionCycle:
+    """State of a pilot submission cycle, kept by its submissions to the queues even when they go on
+    in the background after the end of the cycle
+    """
+
+    def __init__(self, queueDict):
+        self.queueDict = queueDict
+        # Compressed and encoded pilot files, per bundled proxy
+        self.pilotFilesCache = {}
+        self.totalSubmittedPilots = 0
+
+
 class SiteDirector(AgentModule):
     """SiteDirector class provides an implementation of a DIRAC agent.
 
@@ -65,7 +78,10 @@ class SiteDirector(AgentModule):
             sys.exit(res["Message"])
         self.resourcesModule = res["Value"]
 
-        self.queueDict = {}
+        self.__queueDict = {}
+        # State of the current cycle, and of the cycle of the submission running in a thread
+        self.__cycle = SubmissionCycle(self.__queueDict)
+        self.__threadCycle = threading.local()
         # self.queueCECache aims at saving CEs information over the cycles to avoid to create the exact same CEs each cycle
         self.queueCECache = {}
         self.queueSlots = {}
@@ -84,7 +100,14 @@ class SiteDirector(AgentModule):
         self.pilotGroup = ""
         self.platforms = []
         self.sites = []
-        self.totalSubmittedPilots = 0
+        self.submissionLock = threading.Lock()
+        self.maxSubmissionThreads = 10
+        self.maxSubmissionsPerCE = 2
+        self.submissionTimeout = 600
+        # Semaphores limiting the concurrent submissions to each CE
+        self.ceSemaphores = defaultdict(lambda: threading.BoundedSemaphore(self.maxSubmissionsPerCE))
+        # Queues for which the submission of a previous cycle is still going on
+        self.queuesInSubmission = set()
 
         self.addPilotsToEmptySites = False
         self.checkPlatform = False
@@ -189,6 +212,9 @@ class SiteDirector(AgentModule):
             "AvailableSlotsUpdateCycleFactor", self.availableSlotsUpdateCycleFactor
         )
         self.maxRetryGetPilotOutput = self.am_getOption("MaxRetryGetPilotOutput", self.maxRetryGetPilotOutput)
+        self.maxSubmissionThreads = self.am_getOption("MaxSubmissionThreads", self.maxSubmissionThreads)
+        self.maxSubmissionsPerCE = self.am_getOption("MaxSubmissionsPerCE", self.maxSubmissionsPerCE)
+        self.submissionTimeout = self.am_getOption("SubmissionTimeout", self.submissionTimeout)
 
         # Flags
         self.addPilotsToEmptySites = self.am_getOption("AddPilotsToEmptySites", self.addPilotsToEmptySites)
@@ -359,112 +385,202 @@ class SiteDirector(AgentModule):
 
         self.log.verbose("Queues treated", ",".join(self.queueDict))
 
-        self.totalSubmittedPilots = 0
+        self.__cycle = SubmissionCycle(self.queueDict)
 
         queueDictItems = list(self.queueDict.items())
         random.shuffle(queueDictItems)
 
+        # The queues are treated concurrently, so that a slow CE does not delay the submission to the others
+        executor = ThreadPoolExecutor(max_workers=self.maxSubmissionThreads)
+        futures = {}
         for queueName, queueDictionary in queueDictItems:
-            # now submitting to the single queues
-            self.log.verbose("Evaluating queue", queueName)
+            with self.submissionLock:
+                if queueName in self.queuesInSubmission:
+                    self.log.warn("Submission of the previous cycle still going on, skipping", f"queue {queueName}")
+                    continue
+                self.queuesInSubmission.add(queueName)
+            future = executor.submit(
+                self.__submitPilotsInCycle, self.__cycle, queueName, queueDictionary, anySite, jobSites, testSites
+            )
+            future.add_done_callback(lambda _future, queueName=queueName: self.__endQueueSubmission(queueName, _future))
+            futures[future] = queueName
+
+        done, notDone = wait(futures, timeout=self.submissionTimeout)
+        # The submissions still going on are not interrupted: they go on in the background
+        executor.shutdown(wait=False)
+        for future in notDone:
+            self.log.warn(
+                "Submission not finished in time", f"for queue {futures[future]}, it continues in the background"
+            )
 
-            # are we going to submit pilots to this specific queue?
-            if not self._allowedToSubmit(queueName, anySite, jobSites, testSites):
-                continue
+        result = S_OK()
+        for future in done:
+            # The exceptions are logged by the callback
+            if not future.exception() and not future.result()["OK"]:
+                result = future.result()
 
-            if "CPUTime" in queueDictionary["ParametersDict"]:
-                queueCPUTime = int(queueDictionary["ParametersDict"]["CPUTime"])
-            else:
-                self.log.warn("CPU time limit is not specified, skipping", f"queue {queueName}")
-                continue
-            if queueCPUTime > self.maxQueueLength:
-                queueCPUTime = self.maxQueueLength
+        # Summary after the cycle over queues
+        self.log.info("Total number of pilots submitted in this cycle", f"{self.totalSubmittedPilots}")
 
-            ce, ceDict = self._getCE(queueName)
+        return result
 
-            # additionalInfo is normally taskQueueDict
-            pilotsWeMayWantToSubmit, additionalInfo = self._getPilotsWeMayWantToSubmit(ceDict)
-            self.log.debug(f"{pilotsWeMayWantToSubmit} pilotsWeMayWantToSubmit are eligible for {queueName} queue")
-            if not pilotsWeMayWantToSubmit:
-                self.log.debug(f"...so skipping {queueName}")
-                continue
+    def __submitPilotsInCycle(self, cycle, *args):
+        """Run _submitPilotsPerQueue with the state of its cycle, even if it goes on after the cycle"""
+        self.__threadCycle.cycle = cycle
+        try:
+            return self._submitPilotsPerQueue(*args)
+        finally:
+            del self.__threadCycle.cycle
+
+    def __endQueueSubmission(self, queueName, future):
+        """Callback marking the end of the submission to a queue, and logging its exception if any"""
+        with self.submissionLock:
+            self.queuesInSubmission.discard(queueName)
+        if future.exception():
+            self.log.exception("Pilot submission thread failed", f"queue {queueName}", lException=future.exception())
+
+    def __currentCycle(self):
+        """The cycle of the submission running in this thread, or else the current cycle"""
+        return getattr(self.__threadCycle, "cycle", self.__cycle)
+
+    @property
+    def queueDict(self):
+        """Queues of the agent, or of the cycle of the submission running in this thread"""
+        cycle = getattr(self.__threadCycle, "cycle", None)
+        return cycle.queueDict if cycle else self.__queueDict
+
+    @queueDict.setter
+    def queueDict(self, queueDict):
+        self.__queueDict = queueDict
+
+    @property
+    def pilotFilesCache(self):
+        """Compressed and encoded pilot files of the cycle, per bundled proxy"""
+        return self.__currentCycle().pilotFilesCache
+
+    @pilotFilesCache.setter
+    def pilotFilesCache(self, pilotFilesCache):
+        self.__currentCycle().pilotFilesCache = pilotFilesCache
+
+    @property
+    def totalSubmittedPilots(self):
+        """Number of pilots submitted in the cycle"""
+        return self.__currentCycle().totalSubmittedPilots
+
+    @totalSubmittedPilots.setter
+    def totalSubmittedPilots(self, totalSubmittedPilots):
+        self.__currentCycle().totalSubmittedPilots = totalSubmittedPilots
+
+    def _submitPilotsPerQueue(self, queueName, queueDictionary, anySite, jobSites, testSites):
+        """Evaluate a queue and submit pilots to it if necessary and possible
+
+        :param str queueName: queue name
+        :param dict queueDictionary: queue description
+        :param bool anySite: jobs can run at any site
+        :param set jobSites: sites where jobs are requested
+        :param set testSites: sites where test jobs are requested
 
-            # Get the number of already waiting pilots for the queue
-            totalWaitingPilots = 0
-            manyWaitingPilotsFlag = False
-            if self.pilotWaitingFlag:
-                tqIDList = list(additionalInfo)
-                result = self.pilotAgentsDB.countPilots(
-                    {"TaskQueueID": tqIDList, "Status": PilotStatus.PILOT_WAITING_STATES}, None
-                )
-                if not result["OK"]:
-                    self.log.error("Failed to get Number of Waiting pilots", result["Message"])
-                    totalWaitingPilots = 0
-                else:
-                    totalWaitingPilots = result["Value"]
-                    self.log.debug(f"Waiting Pilots: {totalWaitingPilots}")
-            if totalWaitingPilots >= pilotsWeMayWantToSubmit:
-                self.log.verbose("Possibly enough pilots already waiting", f"({totalWaitingPilots})")
-                manyWaitingPilotsFlag = True
-                if not self.addPilotsToEmptySites:
-                    continue
+        :return: S_OK/S_ERROR
+        """
+        # now submitting to the single queues
+        self.log.verbose("Evaluating queue", queueName)
 
-            self.log.debug(
-                f"{totalWaitingPilots} waiting pilots for the total of {pilotsWeMayWantToSubmit} eligible pilots for {queueName}"
-            )
+        # are we going to submit pilots to this specific queue?
+        if not self._allowedToSubmit(queueName, anySite, jobSites, testSites):
+            return S_OK()
 
-            # Get the number of available slots on the target site/queue
-            totalSlots = self.getQueueSlots(queueName, manyWaitingPilotsFlag)
-            if totalSlots <= 0:
-                self.log.debug(f"{queueName}: No slots available")
-                continue
+        if "CPUTime" in queueDictionary["ParametersDict"]:
+            queueCPUTime = int(queueDictionary["ParametersDict"]["CPUTime"])
+        else:
+            self.log.warn("CPU time limit is not specified, skipping", f"queue {queueName}")
+            return S_OK()
+        if queueCPUTime > self.maxQueueLength:
+            queueCPUTime = self.maxQueueLength
 
-            if manyWaitingPilotsFlag:
-                # Throttle submission of extra pilots to empty sites
-                pilotsToSubmit = int(self.maxPilotsToSubmit / 10) + 1
-            else:
-                pilotsToSubmit = max(0, min(totalSlots, pilotsWeMayWantToSubmit - totalWaitingPilots))
-                self.log.info(
-                    f"{queueName}: Slots={totalSlots}, TQ jobs(pilotsWeMayWantToSubmit)={pilotsWeMayWantToSubmit}, Pilots: waiting {totalWaitingPilots}, to submit={pilotsToSubmit}"
-                )
+        ce, ceDict = self._getCE(queueName)
 
-            # Limit the number of pilots to submit to MAX_PILOTS_TO_SUBMIT
-            pilotsToSubmit = min(self.maxPilotsToSubmit, pilotsToSubmit)
+        # additionalInfo is normally taskQueueDict
+        pilotsWeMayWantToSubmit, additionalInfo = self._getPilotsWeMayWantToSubmit(ceDict)
+        self.log.debug(f"{pilotsWeMayWantToSubmit} pilotsWeMayWantToSubmit are eligible for {queueName} queue")
+        if not pilotsWeMayWantToSubmit:
+            self.log.debug(f"...so skipping {queueName}")
+            return S_OK()
 
-            # Get the working proxy
-            cpuTime = queueCPUTime + 86400
-            self.log.verbose("Getting pilot proxy", f"for {self.pilotDN}/{self.pilotGroup} {cpuTime} long")
-            result = gProxyManager.getPilotProxyFromDIRACGroup(self.pilotDN, self.pilotGroup, cpuTime)
-            if not result["OK"]:
-                return result
-            proxy = result["Value"]
-            # Check returned proxy lifetime
-            result = proxy.getRemainingSecs()  # pylint: disable=no-member
+        # Get the number of already waiting pilots for the queue
+        totalWaitingPilots = 0
+        manyWaitingPilotsFlag = False
+        if self.pilotWaitingFlag:
+            tqIDList = list(additionalInfo)
+            result = self.pilotAgentsDB.countPilots(
+                {"TaskQueueID": tqIDList, "Status": PilotStatus.PILOT_WAITING_STATES}, None
+            )
             if not result["OK"]:
-                return result
-            lifetime_secs = result["Value"]
-            ce.setProxy(proxy, lifetime_secs)
+                self.log.error("Failed to get Number of Waiting pilots", result["Message"])
+                totalWaitingPilots = 0
+            else:
+                totalWaitingPilots = result["Value"]
+                self.log.debug(f"Waiting Pilots: {totalWaitingPilots}")
+        if totalWaitingPilots >= pilotsWeMayWantToSubmit:
+            self.log.verbose("Possibly enough pilots already waiting", f"({totalWaitingPilots})")
+            manyWaitingPilotsFlag = True
+            if not self.addPilotsToEmptySites:
+                return S_OK()
+
+        self.log.debug(
+            f"{totalWaitingPilots} waiting pilots for the total of {pilotsWeMayWantToSubmit} eligible pilots for {queueName}"
+        )
 
-            # Get valid token if needed
-            if "Token" in ce.ceParameters.get("Tag", []):
-                result = self.__getPilotToken(audience=ce.audienceName)
-                if not result["OK"]:
-                    return result
-                ce.setToken(result["Value"], 3500)
+        # Get the number of available slots on the target site/queue
+        totalSlots = self.getQueueSlots(queueName, manyWaitingPilotsFlag)
+        if totalSlots <= 0:
+            self.log.debug(f"{queueName}: No slots available")
+            return S_OK()
 
-            # now really submitting
-            res = self._submitPilotsToQueue(pilotsToSubmit, ce, queueName)
-            if not res["OK"]:
-                self.log.info("Failed pilot submission", f"Queue: {queueName}")
-            else:
-                pilotList, stampDict = res["Value"]
+        if manyWaitingPilotsFlag:
+            # Throttle submission of extra pilots to empty sites
+            pilotsToSubmit = int(self.maxPilotsToSubmit / 10) + 1
+        else:
+            pilotsToSubmit = max(0, min(totalSlots, pilotsWeMayWantToSubmit - totalWaitingPilots))
+            self.log.info(
+                f"{queueName}: Slots={totalSlots}, TQ jobs(pilotsWeMayWantToSubmit)={pilotsWeMayWantToSubmit}, Pilots: waiting {totalWaitingPilots}, to submit={pilotsToSubmit}"
+            )
 
-                # updating the pilotAgentsDB... done by default but maybe not strictly necessary
-                self._addPilotTQReference(queueName, additionalInfo, pilotList, stampDict)
+        # Limit the number of pilots to submit to MAX_PILOTS_TO_SUBMIT
+        pilotsToSubmit = min(self.maxPilotsToSubmit, pilotsToSubmit)
 
-        # Summary after the cycle over queues
-        self.log.info("Total number of pilots submitted in this cycle", f"{self.totalSubmittedPilots}")
+        # Get the working proxy
+        cpuTime = queueCPUTime + 86400
+        self.log.verbose("Getting pilot proxy", f"for {self.pilotDN}/{self.pilotGroup} {cpuTime} long")
+        result = gProxyManager.getPilotProxyFromDIRACGroup(self.pilotDN, self.pilotGroup, cpuTime)
+        if not result["OK"]:
+            return result
+        proxy = result["Value"]
+        # Check returned proxy lifetime
+        result = proxy.getRemainingSecs()  # pylint: disable=no-member
+        if not result["OK"]:
+            return result
+        lifetime_secs = result["Value"]
+        ce.setProxy(proxy, lifetime_secs)
+
+        # Get valid token if needed
+        if "Token" in ce.ceParameters.get("Tag", []):
+            result = self.__getPilotToken(audience=ce.audienceName)
+            if not result["OK"]:
+                return result
+            ce.setToken(result["Value"], 3500)
 
+        # now really submitting, with a limited number of concurrent submissions to the CE
+        with self.submissionLock:
+            ceSemaphore = self.ceSemaphores[queueDictionary["CEName"]]
+        with ceSemaphore:
+            res = self._submitPilotsToQueue(pilotsToSubmit, ce, queueName)
+        if not res["OK"]:
+            self.log.info("Failed pilot submission", f"Queue: {queueName}")
+        else:
+            pilotList, stampDict = res["Value"]
+
+            # updating the pilotAgentsDB... done by default but maybe not strictly necessary
+            self._addPilotTQReference(queueName, additionalInfo, pilotList, stampDict)
         return S_OK()
 
     def __getPilotToken(self, audience: str, scope: list[str] = None):
@@ -776,7 +892,8 @@ class SiteDirector(AgentModule):
         pilotList = submitResult["Value"]
         self.queueSlots[queue]["AvailableSlots"] -= len(pilotList)
 
-        self.totalSubmittedPilots += len(pilotList)
+        with self.submissionLock:
+            self.totalSubmittedPilots += len(pilotList)
         self.log.info(
             f"Submitted {len(pilotList)} pilots to {self.queueDict[queue]['QueueName']}@{self.queueDict[queue]['CEName']}"
         )
@@ -826,42 +943,30 @@ class SiteDirector(AgentModule):
         for tq in taskQueueDict:
             sumPriority += taskQueueDict[tq]["Priority"]
             tqPriorityList.append((tq, sumPriority))
-        tqDict = {}
+        pilotRefTQDict = {}
         for pilotID in pilotList:
             rndm = random.random() * sumPriority
             for tq, prio in tqPriorityList:
                 if rndm < prio:
                     tqID = tq
                     break
-            if tqID not in tqDict:
-                tqDict[tqID] = []
-            tqDict[tqID].append(pilotID)
-
-        for tqID, pilotsList in tqDict.items():
-            result = self.pilotAgentsDB.addPilotTQReference(
-                pilotsList,
-                tqID,
-                self.pilotDN,
-                self.pilotGroup,
-                self.localhost,
-                self.queueDict[queue]["CEType"],
-                stampDict,
-            )
-            if not result["OK"]:
-                self.log.error("Failed add pilots to the PilotAgentsDB", result["Message"])
-                continue
-            for pilot in pilotsList:
-                result = self.pilotAgentsDB.setPilotStatus(
-                    pilot,
-                    PilotStatus.SUBMITTED,
-                    self.queueDict[queue]["CEName"],
-                    "Successfully submitted by the SiteDirector",
-                    self.queueDict[queue]["Site"],
-                    self.queueDict[queue]["QueueName"],
-                )
-                if not result["OK"]:
-                    self.log.error("Failed to set pilot status", result["Message"])
-                    continue
+            pilotRefTQDict[pilotID] = tqID
+
+        # The pilots are registered in bulk, directly with their Submitted status
+        result = self.pilotAgentsDB.addPilotTQReferences(
+            pilotRefTQDict,
+            self.pilotDN,
+            self.pilotGroup,
+            self.localhost,
+            self.queueDict[queue]["CEType"],
+            stampDict,
+            destination=self.queueDict[queue]["CEName"],
+            gridSite=self.queueDict[queue]["Site"],
+            queue=self.queueDict[queue]["QueueName"],
+            statusReason="Successfully submitted by the SiteDirector",
+        )
+        if not result["OK"]:
+            self.log.error("Failed add pilots to the PilotAgentsDB", result["Message"])
 
     def getQueueSlots(self, queue, manyWaitingPilotsFlag):
         """Get the number of available slots in the queue"""
@@ -1071,10 +1176,15 @@ class SiteDirector(AgentModule):
         :rtype: str
         """
 
-        try:
-            pilotFilesCompressedEncodedDict = getPilotFilesCompressedEncodedDict([], proxy)
-        except Exception as be:
-            self.log.exception("Exception during pilot modules files compression", lException=be)
+        # The compression of the files is costly, and they are the same for all the queues within a cycle
+        cacheKey = proxy.dumpAllToString()["Value"] if proxy is not None else None
+        pilotFilesCompressedEncodedDict = self.pilotFilesCache.get(cacheKey)
+        if pilotFilesCompressedEncodedDict is None:
+            try:
+                pilotFilesCompressedEncodedDict = getPilotFilesCompressedEncodedDict([], proxy)
+                self.pilotFilesCache[cacheKey] = pilotFilesCompressedEncodedDict
+            except Exception as be:
+                self.log.exception("Exception during pilot modules files compression", lException=be)
 
         location = Operations().getValue("Pilot/pilotFileServer", "")
         localPilot = pilotWrapperScript(
@@ -1263,6 +1373,8 @@ class SiteDirector(AgentModule):
 
         abortedPilots = 0
         getPilotOutput = []
+        # The pilots are updated by bulks of pilots getting the same status
+        pilotsPerStatus = defaultdict(list)
 
         for pRef in pilotRefs:
             newStatus = ""
@@ -1289,9 +1401,7 @@ class SiteDirector(AgentModule):
 
             if newStatus:
                 self.log.info("Updating status", f"to {newStatus} for pilot {pRef}")
-                result = self.pilotAgentsDB.setPilotStatus(pRef, newStatus, "", "Updated by SiteDirector")
-                if not result["OK"]:
-                    self.log.error(result["Message"])
+                pilotsPerStatus[newStatus].append(pRef)
                 if newStatus == "Aborted":
                     abortedPilots += 1
             # Set the flag to retrieve the pilot output now or not
@@ -1299,6 +1409,11 @@ class SiteDirector(AgentModule):
                 if pilotDict[pRef]["OutputReady"].lower() == "false" and self.getOutput:
                     getPilotOutput.append(pRef)
 
+        for newStatus, pRefs in pilotsPerStatus.items():
+            result = self.pilotAgentsDB.setPilotStatus(pRefs, newStatus, "", "Updated by SiteDirector")
+            if not result["OK"]:
+                self.log.error(result["Message"])
+
         return abortedPilots, getPilotOutput
 
     def _getPilotOutput(self, pRef, pilotDict, ce, ceName):
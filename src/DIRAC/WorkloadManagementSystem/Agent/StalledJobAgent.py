@@ -10,16 +10,21 @@ seconds will be assigned the "Stalled" state.
 """
 import concurrent.futures
 import datetime
+import time
 
 from DIRAC import S_OK, S_ERROR, gConfig
+from DIRAC.AccountingSystem.Client.DataStoreClient import DataStoreClient
 from DIRAC.AccountingSystem.Client.Types.Job import Job
 from DIRAC.Core.Base.AgentModule import AgentModule
-from DIRAC.Core.Utilities import DErrno
-from DIRAC.Core.Utilities.TimeUtilities import fromString, toEpoch, second
+from DIRAC.Core.Utilities import DErrno, Network
+from DIRAC.Core.Utilities.List import breakListIntoChunks
+from DIRAC.Core.Utilities.TimeUtilities import fromString, toEpoch, toEpochMilliSeconds, second
 from DIRAC.Core.Utilities.ClassAd.ClassAdLight import ClassAd
 from DIRAC.ConfigurationSystem.Client.Helpers import cfgPath
+from DIRAC.ConfigurationSystem.Client.Helpers.Operations import Operations
 from DIRAC.ConfigurationSystem.Client.Helpers.Registry import getDNForUsername
 from DIRAC.ConfigurationSystem.Client.PathFinder import getSystemInstance
+from DIRAC.MonitoringSystem.Client.MonitoringReporter import MonitoringReporter
 from DIRAC.WorkloadManagementSystem.Client.JobManagerClient import JobManagerClient
 from DIRAC.WorkloadManagementSystem.Client.WMSClient import WMSClient
 from DIRAC.WorkloadManagementSystem.Client.JobMonitoringClient import JobMonitoringClient
@@ -47,6 +52,7 @@ class StalledJobAgent(AgentModule):
         self.stalledJobsToleranceTime = 0
         self.stalledJobsTolerantSites = []
         self.stalledJobsToRescheduleSites = []
+        self.batchSize = 500
         self.threadPoolExecutor = None
 
     #############################################################################
@@ -73,6 +79,7 @@ class StalledJobAgent(AgentModule):
         self.submittingTime = self.am_getOption("SubmittingTime", self.submittingTime)
         self.matchedTime = self.am_getOption("MatchedTime", self.matchedTime)
         self.rescheduledTime = self.am_getOption("RescheduledTime", self.rescheduledTime)
+        self.batchSize = self.am_getOption("BatchSize", self.batchSize)
 
         wrapperSection = cfgPath("Systems", "WorkloadManagement", wmsInstance, "JobWrapper")
 
@@ -97,15 +104,21 @@ class StalledJobAgent(AgentModule):
         self.log.verbose(f"Multithreaded with {maxNumberOfThreads} threads")
         self.threadPoolExecutor = concurrent.futures.ThreadPoolExecutor(max_workers=maxNumberOfThreads)
 
+        # The duration of the phases of the cycle are sent to their own monitoring type
+        self.phaseMonitoringReporter = None
+        if "Monitoring" in Operations().getMonitoringBackends(monitoringType="AgentPhaseMonitoring"):
+            self.phaseMonitoringReporter = MonitoringReporter(monitoringType="AgentPhaseMonitoring")
+
         return S_OK()
 
     #############################################################################
     def execute(self):
-        """The main agent execution method."""
-        # Now we are getting what's going to be checked
-        futures = []
+        """The main agent execution method.
 
-        # 1) Queueing the jobs that might be marked Stalled
+        Each phase selects its candidate jobs with one query, then processes them by batches,
+        in parallel threads, with a few bulk queries and updates per batch.
+        """
+        # 1) Mark Stalled the jobs that might be stalled
         # This is the minimum time we wait for declaring a job Stalled, therefore it is safe
         checkTime = datetime.datetime.utcnow() - self.stalledTime * second
         checkedStatuses = [JobStatus.RUNNING, JobStatus.COMPLETING]
@@ -113,56 +126,54 @@ class StalledJobAgent(AgentModule):
         result = self.jobDB.selectJobs({"Status": checkedStatuses}, older=checkTime, timeStamp="HeartBeatTime")
         if not result["OK"]:
             self.log.error(f"Issue selecting {' & '.join(checkedStatuses)} jobs", result["Message"])
-        if result["Value"]:
+        elif result["Value"]:
             jobs = sorted(result["Value"])
             self.log.info(
                 f"{' & '.join(checkedStatuses)} jobs will be checked for being stalled",
                 f"(n={len(jobs)}, heartbeat before {str(checkTime)})",
             )
-            for job in jobs:
-                future = self.threadPoolExecutor.submit(self._execute, f"{job}:_markStalledJobs")
-                futures.append(future)
+            self._runPhase("MarkStalled", self._markStalledJobs, jobs)
 
         # 2) fail Stalled Jobs
         result = self.jobDB.selectJobs({"Status": JobStatus.STALLED})
         if not result["OK"]:
             self.log.error("Issue selecting Stalled jobs", result["Message"])
-        if result["Value"]:
+        elif result["Value"]:
             jobs = sorted(result["Value"])
             self.log.info("Jobs Stalled will be checked for failure", f"(n={len(jobs)})")
-            for job in jobs:
-                future = self.threadPoolExecutor.submit(self._execute, f"{job}:_failStalledJobs")
-                futures.append(future)
+            self._runPhase("FailStalled", self._failStalledJobs, jobs)
 
         # 3) Send accounting
-        for minor in self.minorStalledStatuses:
-            result = self.jobDB.selectJobs({"Status": JobStatus.FAILED, "MinorStatus": minor, "AccountedFlag": "False"})
-            if not result["OK"]:
-                self.log.error("Issue selecting jobs for accounting", result["Message"])
-            if result["Value"]:
-                jobs = result["Value"]
-                self.log.info("Stalled jobs will be Accounted", f"(n={len(jobs)})")
-                for job in jobs:
-                    future = self.threadPoolExecutor.submit(self._execute, f"{job}:_sendAccounting")
-                    futures.append(future)
-
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                future.result()
-            except Exception as exc:
-                self.log.error(f"_execute generated an exception: {exc}")
+        result = self.jobDB.selectJobs(
+            {"Status": JobStatus.FAILED, "MinorStatus": list(self.minorStalledStatuses), "AccountedFlag": "False"}
+        )
+        if not result["OK"]:
+            self.log.error("Issue selecting jobs for accounting", result["Message"])
+        elif result["Value"]:
+            jobs = result["Value"]
+            self.log.info("Stalled jobs will be Accounted", f"(n={len(jobs)})")
+            self._runPhase("SendAccounting", self._sendAccounting, jobs)
 
         # From here on we don't use the threads
 
         # 4) Fail submitting jobs
+        phaseStart = time.time()
         result = self._failSubmittingJobs()
         if not result["OK"]:
             self.log.error("Failed to process jobs being submitted", result["Message"])
+        self._reportPhase("FailSubmitting", time.time() - phaseStart)
 
         # 5) Kick stuck jobs
+        phaseStart = time.time()
         result = self._kickStuckJobs()
         if not result["OK"]:
             self.log.error("Failed to kick stuck jobs", result["Message"])
+        self._reportPhase("KickStuck", time.time() - phaseStart)
+
+        if self.phaseMonitoringReporter:
+            result = self.phaseMonitoringReporter.commit()
+            if not result["OK"]:
+                self.log.error("Failed to send the phases monitoring", result["Message"])
 
         return S_OK()
 
@@ -174,327 +185,425 @@ class StalledJobAgent(AgentModule):
         self.log.info("Threads are empty, terminating the agent...")
         return S_OK()
 
-    def _execute(self, job_Op):
-        """Doing the actual job.
+    def _runPhase(self, phase, method, jobIDs):
+        """Process jobs by batches in the threads, and report the time taken
 
-        This is run inside the threads
+        :param str phase: name of the phase, for the logs and the monitoring
+        :param method: method processing a list of job IDs
+        :param list jobIDs: jobs to process
         """
-        jobID, jobOp = job_Op.split(":")
-        jobID = int(jobID)
-        res = getattr(self, f"{jobOp}")(jobID)
-        if not res["OK"]:
-            self.log.error(f"Failure executing {jobOp}", f"on {jobID}: {res['Message']}")
+        phaseStart = time.time()
+        futures = [
+            self.threadPoolExecutor.submit(method, jobBatch) for jobBatch in breakListIntoChunks(jobIDs, self.batchSize)
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                result = future.result()
+                if not result["OK"]:
+                    self.log.error(f"Failure executing {phase}", result["Message"])
+            except Exception as exc:
+                self.log.error(f"{phase} generated an exception: {exc}")
+        self._reportPhase(phase, time.time() - phaseStart, len(jobIDs))
+
+    def _reportPhase(self, phase, duration, nJobs=None):
+        """Log the duration of a phase, and report it to the AgentPhaseMonitoring if enabled
+
+        :param str phase: name of the phase
+        :param float duration: time taken by the phase, in seconds
+        :param int nJobs: number of jobs processed, if known
+        """
+        self.log.info(f"{phase} phase done", f"in {duration:.2f} s" + (f" for {nJobs} jobs" if nJobs else ""))
+        if self.phaseMonitoringReporter:
+            self.phaseMonitoringReporter.addRecord(
+                {
+                    "AgentName": self.agentName,
+                    "timestamp": int(toEpochMilliSeconds()),
+                    "Host": Network.getFQDN(),
+                    "Phase": phase,
+                    "PhaseDuration": duration,
+                    "PhaseJobs": nJobs or 0,
+                }
+            )
 
     #############################################################################
-    def _markStalledJobs(self, jobID):
+    def _markStalledJobs(self, jobIDs):
         """
-        Identifies if JobID is stalled:
+        Identifies the stalled jobs among the given ones:
         running or completing without update longer than stalledTime.
 
         Run inside thread.
         """
-        delayTime = self.stalledTime
-        # Add a tolerance time for some sites if required
-        if self.stalledJobsTolerantSites:
-            result = self.jobDB.getJobAttribute(jobID, "site")
-            if not result["OK"]:
-                return result
-            site = result["Value"]
-            if site in self.stalledJobsTolerantSites:
-                delayTime += self.stalledJobsToleranceTime
-        # Check if the job is really stalled
-        result = self._checkJobStalled(jobID, delayTime)
+        result = self.jobDB.getJobsAttributes(jobIDs, ["Site", "MinorStatus", "HeartBeatTime", "LastUpdateTime"])
         if not result["OK"]:
             return result
-        self.log.verbose("Updating status to Stalled", f"for job {jobID}")
-        return self._updateJobStatus(jobID, JobStatus.STALLED)
+        jobsAttrs = result["Value"]
+
+        now = toEpoch()
+        stalledJobs = []
+        for jobID, jobAttrs in jobsAttrs.items():
+            delayTime = self.stalledTime
+            # Add a tolerance time for some sites if required
+            if jobAttrs["Site"] in self.stalledJobsTolerantSites:
+                delayTime += self.stalledJobsToleranceTime
+            # Check if the job is really stalled
+            result = self._getLatestUpdateTime(jobID, jobAttrs)
+            if not result["OK"]:
+                continue
+            elapsedTime = now - result["Value"]
+            self.log.debug(f"(CurrentTime-LastUpdate) = {elapsedTime} secs")
+            if elapsedTime > delayTime:
+                self.log.info(
+                    "Job is identified as stalled", ": jobID %d with last update > %s secs ago" % (jobID, elapsedTime)
+                )
+                stalledJobs.append(jobID)
+            else:
+                self.log.verbose(f"Job {jobID} is running and will be ignored")
+
+        if not stalledJobs:
+            return S_OK()
+        self.log.verbose("Updating status to Stalled", f"for {len(stalledJobs)} jobs")
+        jobsMinorStatus = {jobID: jobsAttrs[jobID]["MinorStatus"] for jobID in stalledJobs}
+        return self._updateJobsStatus(stalledJobs, JobStatus.STALLED, jobsMinorStatus=jobsMinorStatus)
 
     #############################################################################
-    def _failStalledJobs(self, jobID):
+    def _failStalledJobs(self, jobIDs):
         """Changes the Stalled status to Failed for jobs long in the Stalled
         status.
 
         Run inside thread.
         """
+        # Check if the job pilots are lost
+        result = self._getJobsPilotStatus(jobIDs)
+        if not result["OK"]:
+            self.log.error("Failed to get pilot status", result["Message"])
+            return result
+        pilotStatuses = result["Value"]
 
-        setFailed = False
-        # Check if the job pilot is lost
-        result = self._getJobPilotStatus(jobID)
+        result = self.jobDB.getJobsAttributes(
+            jobIDs, ["Site", "Owner", "OwnerGroup", "HeartBeatTime", "LastUpdateTime"]
+        )
         if not result["OK"]:
-            self.log.error("Failed to get pilot status", f"for job {jobID}: {result['Message']}")
             return result
-        pilotStatus = result["Value"]
-        if pilotStatus != "Running":
-            setFailed = self.minorStalledStatuses[0]
-        else:
-            # Verify that there was no sign of life for long enough
-            result = self._getLatestUpdateTime(jobID)
-            if not result["OK"]:
-                self.log.error("Failed to get job update time", f"for job {jobID}: {result['Message']}")
-                return result
-            elapsedTime = toEpoch() - result["Value"]
-            if elapsedTime > self.failedTime:
-                setFailed = self.minorStalledStatuses[1]
+        jobsAttrs = result["Value"]
 
-        # Set the jobs Failed, send them a kill signal in case they are not really dead
-        # and send accounting info
-        if setFailed:
-            res = self._sendKillCommand(jobID)
-            if not res["OK"]:
-                self.log.error("Failed to kill job", jobID)
-
-            # For some sites we might want to reschedule rather than fail the jobs
-            if self.stalledJobsToRescheduleSites:
-                result = self.jobDB.getJobAttribute(jobID, "site")
+        now = toEpoch()
+        failedJobs = {}
+        for jobID, jobAttrs in jobsAttrs.items():
+            if pilotStatuses.get(jobID) != "Running":
+                failedJobs[jobID] = self.minorStalledStatuses[0]
+            else:
+                # Verify that there was no sign of life for long enough
+                result = self._getLatestUpdateTime(jobID, jobAttrs)
                 if not result["OK"]:
-                    return result
-                site = result["Value"]
-                if site in self.stalledJobsToRescheduleSites:
-                    return self._updateJobStatus(jobID, JobStatus.RESCHEDULED, minorStatus=setFailed, force=True)
+                    continue
+                if now - result["Value"] > self.failedTime:
+                    failedJobs[jobID] = self.minorStalledStatuses[1]
 
-            return self._updateJobStatus(jobID, JobStatus.FAILED, minorStatus=setFailed, force=True)
+        if not failedJobs:
+            return S_OK()
 
-        return S_OK()
+        # Set the jobs Failed, send them a kill signal in case they are not really dead
+        # and send accounting info
+        res = self._sendKillCommand(list(failedJobs), jobsAttrs)
+        if not res["OK"]:
+            self.log.error("Failed to kill jobs", res["Message"])
 
-    def _getJobPilotStatus(self, jobID):
-        """Get the job pilot status."""
-        result = JobMonitoringClient().getJobParameter(jobID, "Pilot_Reference")
-        if not result["OK"]:
-            return result
-        pilotReference = result["Value"].get("Pilot_Reference", "Unknown")
-        if pilotReference == "Unknown":
-            # There is no pilot reference, hence its status is unknown
-            return S_OK("NoPilot")
+        # For some sites we might want to reschedule rather than fail the jobs
+        updates = {}
+        for jobID, minorStatus in failedJobs.items():
+            status = JobStatus.FAILED
+            if jobsAttrs[jobID]["Site"] in self.stalledJobsToRescheduleSites:
+                status = JobStatus.RESCHEDULED
+            updates.setdefault((status, minorStatus), []).append(jobID)
 
-        result = PilotManagerClient().getPilotInfo(pilotReference)
-        if not result["OK"]:
-            if DErrno.cmpError(result, DErrno.EWMSNOPILOT):
-                self.log.warn("No pilot found", f"for job {jobID}: {result['Message']}")
-                return S_OK("NoPilot")
-            self.log.error("Failed to get pilot information", f"for job {jobID}: {result['Message']}")
-            return result
-        pilotStatus = result["Value"][pilotReference]["Status"]
+        toRet = S_OK()
+        for (status, minorStatus), jobs in updates.items():
+            result = self._updateJobsStatus(jobs, status, minorStatus=minorStatus, force=True)
+            if not result["OK"]:
+                toRet = result
+        return toRet
 
-        return S_OK(pilotStatus)
+    def _getJobsPilotStatus(self, jobIDs):
+        """Get the status of the pilots of the jobs
 
-    #############################################################################
-    def _checkJobStalled(self, job, stalledTime):
-        """Compares the most recent of LastUpdateTime and HeartBeatTime against
-        the stalledTime limit."""
-        result = self._getLatestUpdateTime(job)
+        :param list jobIDs: job IDs
+        :return: S_OK({jobID: pilotStatus}), the status is NoPilot for the jobs without a known pilot
+        """
+        result = JobMonitoringClient().getJobParameters(jobIDs, "Pilot_Reference")
         if not result["OK"]:
             return result
+        pilotReferences = {
+            int(jobID): parameters.get("Pilot_Reference", "Unknown") for jobID, parameters in result["Value"].items()
+        }
+        # There is no pilot reference for some jobs, hence their pilot status is unknown
+        references = list({ref for ref in pilotReferences.values() if ref != "Unknown"})
 
-        elapsedTime = toEpoch() - result["Value"]
-        self.log.debug(f"(CurrentTime-LastUpdate) = {elapsedTime} secs")
-        if elapsedTime > stalledTime:
-            self.log.info(
-                "Job is identified as stalled", ": jobID %d with last update > %s secs ago" % (job, elapsedTime)
-            )
-            return S_OK()
+        pilotsInfo = {}
+        if references:
+            result = PilotManagerClient().getPilotInfo(references)
+            if not result["OK"]:
+                if not DErrno.cmpError(result, DErrno.EWMSNOPILOT):
+                    self.log.error("Failed to get pilot information", result["Message"])
+                    return result
+                self.log.warn("No pilot found", result["Message"])
+            else:
+                pilotsInfo = result["Value"]
 
-        return S_ERROR(f"Job {job} is running and will be ignored")
+        pilotStatuses = {}
+        for jobID in jobIDs:
+            pilotReference = pilotReferences.get(int(jobID), "Unknown")
+            if pilotReference in pilotsInfo:
+                pilotStatuses[int(jobID)] = pilotsInfo[pilotReference]["Status"]
+            else:
+                pilotStatuses[int(jobID)] = "NoPilot"
+        return S_OK(pilotStatuses)
 
     #############################################################################
-    def _getLatestUpdateTime(self, job):
-        """Returns the most recent of HeartBeatTime and LastUpdateTime."""
-        result = self.jobDB.getJobAttributes(job, ["HeartBeatTime", "LastUpdateTime"])
-        if not result["OK"] or not result["Value"]:
-            self.log.error(
-                "Failed to get job attributes",
-                "for job %d: %s" % (job, result["Message"] if "Message" in result else "empty"),
-            )
-            return S_ERROR("Could not get attributes for job")
+    def _getLatestUpdateTime(self, job, jobAttrs):
+        """Returns the most recent of HeartBeatTime and LastUpdateTime.
 
+        :param int job: job ID
+        :param dict jobAttrs: job attributes, including the HeartBeatTime and LastUpdateTime
+        """
         latestUpdate = 0
-        if not result["Value"]["HeartBeatTime"] or result["Value"]["HeartBeatTime"] == "None":
+        if not jobAttrs["HeartBeatTime"] or jobAttrs["HeartBeatTime"] == "None":
             self.log.verbose("HeartBeatTime is null", f"for job {job}")
         else:
-            latestUpdate = toEpoch(fromString(result["Value"]["HeartBeatTime"]))
+            latestUpdate = toEpoch(fromString(jobAttrs["HeartBeatTime"]))
 
-        if not result["Value"]["LastUpdateTime"] or result["Value"]["LastUpdateTime"] == "None":
+        if not jobAttrs["LastUpdateTime"] or jobAttrs["LastUpdateTime"] == "None":
             self.log.verbose("LastUpdateTime is null", f"for job {job}")
         else:
-            latestUpdate = max(latestUpdate, toEpoch(fromString(result["Value"]["LastUpdateTime"])))
+            latestUpdate = max(latestUpdate, toEpoch(fromString(jobAttrs["LastUpdateTime"])))
 
         if not latestUpdate:
+            self.log.error(
+                "Failed to get the job update time", f"LastUpdate and HeartBeat times are null for job {job}"
+            )
             return S_ERROR(f"LastUpdate and HeartBeat times are null for job {job}")
         else:
             self.log.verbose("", f"Latest update time from epoch for job {job} is {latestUpdate}")
             return S_OK(latestUpdate)
 
     #############################################################################
-    def _updateJobStatus(self, job, status, minorStatus=None, force=False):
-        """This method updates the job status in the JobDB."""
+    def _updateJobsStatus(self, jobIDs, status, minorStatus=None, force=False, jobsMinorStatus=None):
+        """This method updates the status of jobs in the JobDB, and adds the logging records.
+
+        :param list jobIDs: job IDs
+        :param str status: new major status
+        :param str minorStatus: new minor status, if not given the current one is kept
+        :param bool force: force the status update (don't evaluate the state machine)
+        :param dict jobsMinorStatus: {jobID: minorStatus} current minor statuses, if already known
+        """
 
         if not self.am_getOption("Enable", True):
             return S_OK("Disabled")
 
         toRet = S_OK()
 
-        self.log.debug(f"self.jobDB.setJobAttribute({job},'Status','{status}',update=True)")
-        result = self.jobDB.setJobAttribute(job, "Status", status, update=True, force=force)
+        attrNames = ["Status"]
+        attrValues = [status]
+        if minorStatus:
+            attrNames.append("MinorStatus")
+            attrValues.append(minorStatus)
+        self.log.debug(f"self.jobDB.setJobAttributes({jobIDs},{attrNames},{attrValues},update=True)")
+        result = self.jobDB.setJobAttributes(jobIDs, attrNames, attrValues, update=True, force=force)
         if not result["OK"]:
-            self.log.error("Failed setting Status", f"{status} for job {job}: {result['Message']}")
+            self.log.error("Failed setting Status", f"{status} for {len(jobIDs)} jobs: {result['Message']}")
             toRet = result
-        if minorStatus:
-            self.log.debug(f"self.jobDB.setJobAttribute({job},'MinorStatus','{minorStatus}',update=True)")
-            result = self.jobDB.setJobAttribute(job, "MinorStatus", minorStatus, update=True)
-            if not result["OK"]:
-                self.log.error("Failed setting MinorStatus", f"{minorStatus} for job {job}: {result['Message']}")
-                toRet = result
 
-        if not minorStatus:  # Retain last minor status for stalled jobs
-            result = self.jobDB.getJobAttributes(job, ["MinorStatus"])
-            if result["OK"] and "MinorStatus" in result["Value"]:
-                minorStatus = result["Value"]["MinorStatus"]
+        if not minorStatus and jobsMinorStatus is None:  # Retain last minor status for stalled jobs
+            result = self.jobDB.getJobsAttributes(jobIDs, ["MinorStatus"])
+            if result["OK"]:
+                jobsMinorStatus = {jobID: attrs["MinorStatus"] for jobID, attrs in result["Value"].items()}
             else:
-                self.log.error("Failed getting MinorStatus", f"for job {job}: {result['Message']}")
-                minorStatus = "idem"
+                self.log.error("Failed getting MinorStatus", f"for {len(jobIDs)} jobs: {result['Message']}")
+                jobsMinorStatus = {}
                 toRet = result
 
-        result = self.logDB.addLoggingRecord(job, status=status, minorStatus=minorStatus, source="StalledJobAgent")
+        records = [
+            {
+                "JobID": jobID,
+                "Status": status,
+                "MinorStatus": minorStatus or jobsMinorStatus.get(jobID, "idem"),
+                "Source": "StalledJobAgent",
+            }
+            for jobID in jobIDs
+        ]
+        result = self.logDB.addLoggingRecords(records)
         if not result["OK"]:
-            self.log.warn("Failed adding logging record", result["Message"])
+            self.log.warn("Failed adding logging records", result["Message"])
             toRet = result
 
         return toRet
 
-    def _getProcessingType(self, jobID):
+    @staticmethod
+    def _getProcessingType(jdl):
         """Get the Processing Type from the JDL, until it is promoted to a real
         Attribute."""
         processingType = "unknown"
-        result = self.jobDB.getJobJDL(jobID, original=True)
-        if not result["OK"]:
+        if not jdl:
             return processingType
-        classAdJob = ClassAd(result["Value"])
+        classAdJob = ClassAd(jdl)
         if classAdJob.lookupAttribute("ProcessingType"):
             processingType = classAdJob.getAttributeString("ProcessingType")
         return processingType
 
-    def _sendAccounting(self, jobID):
-        """Send WMS accounting data for the given job.
+    def _sendAccounting(self, jobIDs):
+        """Send WMS accounting data for the given jobs, in a single bundle.
 
         Run inside thread.
         """
-        try:
-            accountingReport = Job()
-            endTime = "Unknown"
-            lastHeartBeatTime = "Unknown"
+        result = self.jobDB.getJobsAttributes(jobIDs)
+        if not result["OK"]:
+            return result
+        jobsDict = result["Value"]
+        jobIDs = list(jobsDict)
 
-            result = self.jobDB.getJobAttributes(jobID)
-            if not result["OK"]:
-                return result
-            jobDict = result["Value"]
-
-            startTime, endTime = self._checkLoggingInfo(jobID, jobDict)
-            lastCPUTime, lastWallTime, lastHeartBeatTime = self._checkHeartBeat(jobID, jobDict)
-            lastHeartBeatTime = fromString(lastHeartBeatTime)
-            if lastHeartBeatTime is not None and lastHeartBeatTime > endTime:
-                endTime = lastHeartBeatTime
-
-            result = JobMonitoringClient().getJobParameter(jobID, "CPUNormalizationFactor")
-            if not result["OK"] or not result["Value"]:
-                self.log.error(
-                    "Error getting Job Parameter CPUNormalizationFactor, setting 0",
-                    result.get("Message", "No such value"),
-                )
-                cpuNormalization = 0.0
-            else:
-                cpuNormalization = float(result["Value"].get("CPUNormalizationFactor"))
+        result = self.logDB.getJobsLoggingInfo(jobIDs)
+        if not result["OK"]:
+            return result
+        jobsLogging = result["Value"]
 
-        except Exception as e:
-            self.log.exception(
-                "Exception in _sendAccounting",
-                f"for job={str(jobID)}: endTime={str(endTime)}, lastHBTime={str(lastHeartBeatTime)}",
-                lException=e,
-            )
-            return S_ERROR("Exception")
-        processingType = self._getProcessingType(jobID)
-
-        accountingReport.setStartTime(startTime)
-        accountingReport.setEndTime(endTime)
-        # execTime = toEpoch( endTime ) - toEpoch( startTime )
-        # Fill the accounting data
-        acData = {
-            "Site": jobDict["Site"],
-            "User": jobDict["Owner"],
-            "UserGroup": jobDict["OwnerGroup"],
-            "JobGroup": jobDict["JobGroup"],
-            "JobType": jobDict["JobType"],
-            "JobClass": jobDict["JobSplitType"],
-            "ProcessingType": processingType,
-            "FinalMajorStatus": JobStatus.FAILED,
-            "FinalMinorStatus": JobMinorStatus.STALLED_PILOT_NOT_RUNNING,
-            "CPUTime": lastCPUTime,
-            "NormCPUTime": lastCPUTime * cpuNormalization,
-            "ExecTime": lastWallTime,
-            "InputDataSize": 0.0,
-            "OutputDataSize": 0.0,
-            "InputDataFiles": 0,
-            "OutputDataFiles": 0,
-            "DiskSpace": 0.0,
-            "InputSandBoxSize": 0.0,
-            "OutputSandBoxSize": 0.0,
-            "ProcessedEvents": 0,
-        }
+        result = self.jobDB.getJobsHeartBeatData(jobIDs)
+        if not result["OK"]:
+            return result
+        jobsHeartBeatData = result["Value"]
 
-        # For accidentally stopped jobs ExecTime can be not set
-        if not acData["ExecTime"]:
-            acData["ExecTime"] = acData["CPUTime"]
-        elif acData["ExecTime"] < acData["CPUTime"]:
-            acData["ExecTime"] = acData["CPUTime"]
+        result = JobMonitoringClient().getJobParameters(jobIDs, "CPUNormalizationFactor")
+        if not result["OK"]:
+            self.log.error("Error getting Job Parameter CPUNormalizationFactor, setting 0", result["Message"])
+            jobsParameters = {}
+        else:
+            jobsParameters = {int(jobID): parameters for jobID, parameters in result["Value"].items()}
 
-        self.log.verbose("Accounting Report is:")
-        self.log.verbose(acData)
-        accountingReport.setValuesFromDict(acData)
+        result = self.jobDB.getJobsJDL(jobIDs, original=True)
+        jobsJDL = result["Value"] if result["OK"] else {}
 
-        result = accountingReport.commit()
-        if result["OK"]:
-            self.jobDB.setJobAttribute(jobID, "AccountedFlag", "True")
-        else:
-            self.log.error("Failed to send accounting report", f"for job {jobID}: {result['Message']}")
-        return result
+        dataStoreClient = DataStoreClient()
+        accountedJobs = []
+        for jobID, jobDict in jobsDict.items():
+            try:
+                endTime = "Unknown"
+                lastHeartBeatTime = "Unknown"
+
+                startTime, endTime = self._checkLoggingInfo(jobDict, jobsLogging.get(jobID, []))
+                lastCPUTime, lastWallTime, lastHeartBeatTime = self._checkHeartBeat(
+                    jobDict, jobsHeartBeatData.get(jobID, [])
+                )
+                lastHeartBeatTime = fromString(lastHeartBeatTime)
+                if lastHeartBeatTime is not None and lastHeartBeatTime > endTime:
+                    endTime = lastHeartBeatTime
+
+                cpuNormalization = jobsParameters.get(jobID, {}).get("CPUNormalizationFactor")
+                if not cpuNormalization:
+                    self.log.error(
+                        "Error getting Job Parameter CPUNormalizationFactor, setting 0", f"No such value for {jobID}"
+                    )
+                    cpuNormalization = 0.0
+                cpuNormalization = float(cpuNormalization)
+
+            except Exception as e:
+                self.log.exception(
+                    "Exception in _sendAccounting",
+                    f"for job={str(jobID)}: endTime={str(endTime)}, lastHBTime={str(lastHeartBeatTime)}",
+                    lException=e,
+                )
+                continue
 
-    def _checkHeartBeat(self, jobID, jobDict):
-        """Get info from HeartBeat."""
-        result = self.jobDB.getHeartBeatData(jobID)
+            accountingReport = Job()
+            accountingReport.setStartTime(startTime)
+            accountingReport.setEndTime(endTime)
+            # execTime = toEpoch( endTime ) - toEpoch( startTime )
+            # Fill the accounting data
+            acData = {
+                "Site": jobDict["Site"],
+                "User": jobDict["Owner"],
+                "UserGroup": jobDict["OwnerGroup"],
+                "JobGroup": jobDict["JobGroup"],
+                "JobType": jobDict["JobType"],
+                "JobClass": jobDict["JobSplitType"],
+                "ProcessingType": self._getProcessingType(jobsJDL.get(jobID)),
+                "FinalMajorStatus": JobStatus.FAILED,
+                "FinalMinorStatus": JobMinorStatus.STALLED_PILOT_NOT_RUNNING,
+                "CPUTime": lastCPUTime,
+                "NormCPUTime": lastCPUTime * cpuNormalization,
+                "ExecTime": lastWallTime,
+                "InputDataSize": 0.0,
+                "OutputDataSize": 0.0,
+                "InputDataFiles": 0,
+                "OutputDataFiles": 0,
+                "DiskSpace": 0.0,
+                "InputSandBoxSize": 0.0,
+                "OutputSandBoxSize": 0.0,
+                "ProcessedEvents": 0,
+            }
+
+            # For accidentally stopped jobs ExecTime can be not set
+            if not acData["ExecTime"]:
+                acData["ExecTime"] = acData["CPUTime"]
+            elif acData["ExecTime"] < acData["CPUTime"]:
+                acData["ExecTime"] = acData["CPUTime"]
+
+            self.log.verbose("Accounting Report is:")
+            self.log.verbose(acData)
+            accountingReport.setValuesFromDict(acData)
+            result = dataStoreClient.addRegister(accountingReport)
+            if not result["OK"]:
+                self.log.error("Failed to add accounting report", f"for job {jobID}: {result['Message']}")
+                continue
+            accountedJobs.append(jobID)
+
+        if not accountedJobs:
+            return S_OK()
+        result = dataStoreClient.commit()
+        if not result["OK"]:
+            self.log.error("Failed to send accounting reports", f"for {len(accountedJobs)} jobs: {result['Message']}")
+            return result
+        return self.jobDB.setJobAttributes(accountedJobs, ["AccountedFlag"], ["True"])
+
+    def _checkHeartBeat(self, jobDict, heartBeatData):
+        """Get info from HeartBeat.
+
+        :param dict jobDict: job attributes
+        :param list heartBeatData: heart beat data of the job, as returned by JobDB.getHeartBeatData
+        """
         lastCPUTime = 0
         lastWallTime = 0
-        lastHeartBeatTime = jobDict["StartExecTime"]
-        if lastHeartBeatTime == "None":
-            lastHeartBeatTime = 0
-
-        if result["OK"]:
-            for name, value, heartBeatTime in result["Value"]:
-                if name == "CPUConsumed":
-                    try:
-                        value = int(float(value))
-                        if value > lastCPUTime:
-                            lastCPUTime = value
-                    except ValueError:
-                        pass
-                if name == "WallClockTime":
-                    try:
-                        value = int(float(value))
-                        if value > lastWallTime:
-                            lastWallTime = value
-                    except ValueError:
-                        pass
-                if isinstance(heartBeatTime, str):
-                    heartBeatTime = datetime.datetime.strptime(heartBeatTime, "%Y-%m-%d %H:%M:%S")
-                if heartBeatTime > lastHeartBeatTime:
-                    lastHeartBeatTime = heartBeatTime
-
+        lastHeartBeatTime = fromString(jobDict["StartExecTime"])
+        if not isinstance(lastHeartBeatTime, datetime.datetime):
+            lastHeartBeatTime = datetime.datetime.min
+
+        for name, value, heartBeatTime in heartBeatData:
+            if name == "CPUConsumed":
+                try:
+                    value = int(float(value))
+                    if value > lastCPUTime:
+                        lastCPUTime = value
+                except ValueError:
+                    pass
+            if name == "WallClockTime":
+                try:
+                    value = int(float(value))
+                    if value > lastWallTime:
+                        lastWallTime = value
+                except ValueError:
+                    pass
+            if isinstance(heartBeatTime, str):
+                heartBeatTime = datetime.datetime.strptime(heartBeatTime, "%Y-%m-%d %H:%M:%S")
+            if heartBeatTime > lastHeartBeatTime:
+                lastHeartBeatTime = heartBeatTime
+
+        if lastHeartBeatTime == datetime.datetime.min:
+            lastHeartBeatTime = None
         return lastCPUTime, lastWallTime, lastHeartBeatTime
 
-    def _checkLoggingInfo(self, jobID, jobDict):
-        """Get info from JobLogging."""
-        logList = []
-        result = self.logDB.getJobLoggingInfo(jobID)
-        if result["OK"]:
-            logList = result["Value"]
+    def _checkLoggingInfo(self, jobDict, logList):
+        """Get info from JobLogging.
 
+        :param dict jobDict: job attributes
+        :param list logList: logging records of the job, as returned by JobLoggingDB.getJobLoggingInfo
+        """
         startTime = jobDict["StartExecTime"]
         if not startTime or startTime == "None":
             # status, minor, app, stime, source
@@ -582,33 +691,33 @@ class StalledJobAgent(AgentModule):
             self.log.error("Failed to select jobs", result["Message"])
             return result
 
-        for jobID in result["Value"]:
-            result = self._updateJobStatus(jobID, JobStatus.FAILED, force=True)
+        if result["Value"]:
+            result = self._updateJobsStatus(result["Value"], JobStatus.FAILED, force=True)
             if not result["OK"]:
                 self.log.error("Failed to update job status", result["Message"])
-                continue
 
         return S_OK()
 
-    def _sendKillCommand(self, job):
-        """Send a kill signal to the job such that it cannot continue running.
+    def _sendKillCommand(self, jobIDs, jobsAttrs):
+        """Send a kill signal to the jobs such that they cannot continue running.
+        The jobs are killed with one call per owner and group.
 
-        :param int job: ID of job to send kill command
+        :param list jobIDs: IDs of jobs to send kill command
+        :param dict jobsAttrs: {jobID: attributes} with the Owner and OwnerGroup of the jobs
         """
+        jobsPerOwner = {}
+        for jobID in jobIDs:
+            jobsPerOwner.setdefault((jobsAttrs[jobID]["Owner"], jobsAttrs[jobID]["OwnerGroup"]), []).append(jobID)
 
-        res = self.jobDB.getJobAttribute(job, "Owner")
-        if not res["OK"]:
-            return res
-        owner = res["Value"]
-
-        res = self.jobDB.getJobAttribute(job, "OwnerGroup")
-        if not res["OK"]:
-            return res
-        ownerGroup = res["Value"]
-
-        wmsClient = WMSClient(
-            useCertificates=True,
-            delegatedDN=getDNForUsername(owner)["Value"][0] if owner else None,
-            delegatedGroup=ownerGroup,
-        )
-        return wmsClient.killJob(job)
+        toRet = S_OK()
+        for (owner, ownerGroup), jobs in jobsPerOwner.items():
+            wmsClient = WMSClient(
+                useCertificates=True,
+                delegatedDN=getDNForUsername(owner)["Value"][0] if owner else None,
+                delegatedGroup=ownerGroup,
+            )
+            result = wmsClient.killJob(jobs)
+            if not result["OK"]:
+                self.log.error("Failed to kill jobs", f"of {owner}@{ownerGroup}: {result['Message']}")
+                toRet = result
+        return toRet
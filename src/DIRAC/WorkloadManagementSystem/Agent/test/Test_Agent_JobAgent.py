@@ -222,6 +222,83 @@ def test__checkMatchingIssues(mocker, issueMessage, stopAfterFailedMatches, matc
     assert result["OK"] == expectedResult
 
 
+@pytest.mark.parametrize(
+    "processors, expected",
+    [
+        (16, [(16, ["WholeNode"]), (16, ["16Processors"]), (16, ["MultiProcessor"]), (16, [])]),
+        (13, [(13, ["MultiProcessor"]), (13, [])]),
+        (1, [(1, [])]),
+    ],
+)
+def test__limitCEDictList(processors, expected):
+    """Test JobAgent()._limitCEDictList()"""
+    ceDictList = [
+        {"NumberOfProcessors": 16, "MaxRAM": 16000, "RequiredTag": requiredTag}
+        for requiredTag in (["WholeNode"], ["16Processors"], ["MultiProcessor"])
+    ]
+    ceDictList.append({"NumberOfProcessors": 16, "MaxRAM": 16000})
+
+    result = JobAgent._limitCEDictList(ceDictList, processors, 16)
+    assert [(ceDict["NumberOfProcessors"], ceDict.get("RequiredTag", [])) for ceDict in result] == expected
+    assert all(ceDict["MaxRAM"] == processors * 1000 for ceDict in result)
+    # The original descriptions are left untouched
+    assert all(ceDict["NumberOfProcessors"] == 16 for ceDict in ceDictList)
+
+
+def _requestJob(ceDict):
+    """Matcher returning a job using the processors of the CE description, if it has any"""
+    if not ceDict.get("NumberOfProcessors"):
+        return S_ERROR("No match found")
+    tags = ceDict.get("RequiredTag", []) + (["MultiProcessor"] if ceDict["NumberOfProcessors"] > 1 else [])
+    jdl = "[Tags = {" + ", ".join(f'"{tag}"' for tag in tags) + "};]" if tags else "[]"
+    return S_OK({"JobID": ceDict["NumberOfProcessors"], "Owner": "user", "Group": "group", "JDL": jdl})
+
+
+@pytest.mark.parametrize(
+    "asyncSubmission, fillingMode, maxConcurrentMatches, ceDictList, expectedProcessors",
+    [
+        (False, True, 8, [{"NumberOfProcessors": 1}], [1]),
+        (True, True, 1, [{"NumberOfProcessors": 1}], [1]),
+        (True, True, 4, [{"NumberOfProcessors": 1}, {"NumberOfProcessors": 16}], [1, 1, 1, 1]),
+        (True, True, 8, [{"NumberOfProcessors": 1}, {"NumberOfProcessors": 2}], [1, 1]),
+        (True, False, 8, [{"NumberOfProcessors": 1}, {"NumberOfProcessors": 16}], [1]),
+        # A multi processor job is matched alone, its processors are only known once submitted
+        (True, True, 8, [{"NumberOfProcessors": 16}], [16]),
+        # An empty node with only whole node or 16 processors jobs waiting
+        (
+            True,
+            True,
+            8,
+            [
+                {"NumberOfProcessors": 16, "RequiredTag": ["WholeNode"]},
+                {"NumberOfProcessors": 16, "RequiredTag": ["16Processors"]},
+            ],
+            [16],
+        ),
+    ],
+)
+def test__matchJobs(mocker, asyncSubmission, fillingMode, maxConcurrentMatches, ceDictList, expectedProcessors):
+    """Test JobAgent()._matchJobs()"""
+    mocker.patch("DIRAC.WorkloadManagementSystem.Agent.JobAgent.AgentModule.__init__")
+    mocker.patch("DIRAC.WorkloadManagementSystem.Agent.JobAgent.getDNForUsername", return_value=S_OK("/DN/of/user"))
+    mocker.patch("DIRAC.WorkloadManagementSystem.Agent.JobAgent.JobAgent._setupProxy", return_value=S_OK("proxy"))
+    matcherMock = mocker.patch("DIRAC.WorkloadManagementSystem.Agent.JobAgent.MatcherClient")
+    matcherMock.return_value.requestJob.side_effect = _requestJob
+
+    jobAgent = JobAgent("Test", "Test1")
+    jobAgent.log = gLogger
+    jobAgent.fillingMode = fillingMode
+    jobAgent.maxConcurrentMatches = maxConcurrentMatches
+    jobAgent.computingElement = ComputingElementFactory().getCE("InProcess")["Value"]
+    jobAgent.computingElement.ceParameters["AsyncSubmission"] = asyncSubmission
+
+    result = jobAgent._matchJobs(ceDictList)
+    assert [jobRequest["Value"]["JobID"] for jobRequest, _ in result] == expectedProcessors
+    assert all(proxyResult["Value"] == "proxy" for _, proxyResult in result)
+    # The first request is made with the full CE descriptions
+    assert matcherMock.return_value.requestJob.call_args_list[0][0][0] == ceDictList[0]
+
+
 @pytest.mark.parametrize(
     "matcherInfo, matcherParams, expectedResult",
     [
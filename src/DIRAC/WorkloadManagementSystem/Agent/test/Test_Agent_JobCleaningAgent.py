@@ -143,3 +143,21 @@ def test_deleteJobOversizedSandbox(mocker, inputs, params, expected):
     result = jobCleaningAgent.deleteJobOversizedSandbox(inputs)
 
     assert result == expected
+
+
+@pytest.mark.parametrize(
+    "status, dropped, removed",
+    [
+        (None, 1, 0),
+        ("Done", 0, 1),
+    ],
+)
+def test_removeHeartBeatLoggingInfo(jca, status, dropped, removed):
+    """Testing JobCleaningAgent().removeHeartBeatLoggingInfo()"""
+
+    jca.jobDB = MagicMock()
+    jca.jobDB.dropHeartBeatLoggingInfoPartitions.return_value = S_OK(["p20240101"])
+    jca.jobDB.removeInfoFromHeartBeatLogging.return_value = S_OK(10)
+    jca.removeHeartBeatLoggingInfo(status, 7)
+    assert jca.jobDB.dropHeartBeatLoggingInfoPartitions.call_count == dropped
+    assert jca.jobDB.removeInfoFromHeartBeatLogging.call_count == removed
@@ -4,12 +4,15 @@
 
 # imports
 import datetime
+import threading
+import time
 import pytest
 from unittest.mock import MagicMock
 
 from DIRAC import gLogger
 
 # sut
+from DIRAC.WorkloadManagementSystem.Agent import SiteDirector as SiteDirectorModule
 from DIRAC.WorkloadManagementSystem.Agent.SiteDirector import SiteDirector
 
 mockAM = MagicMock()
@@ -185,6 +188,80 @@ def test__submitPilotsToQueue(sd):
     assert sd._submitPilotsToQueue(1, MagicMock(), "aQueue")["OK"]
 
 
+def test_submitPilots(sd, mocker):
+    """Testing SiteDirector().submitPilots(): the queues are treated concurrently, and a slow submission
+    goes on in the background with the state of its cycle
+    """
+    sd.queueDict = {f"queue{i}": {"CEName": f"ce{i}"} for i in range(4)}
+    sd.queueDict["slowQueue"] = {"CEName": "slowCE"}
+    mocker.patch.object(sd, "_ifAndWhereToSubmit", return_value=(True, True, set(), set()))
+    mocker.patch.object(sd, "log")
+    releaseSlowQueue = threading.Event()
+    treatedQueues = []
+
+    def submitPilotsPerQueue(queueName, queueDictionary, *args):
+        if queueName == "slowQueue":
+            releaseSlowQueue.wait()
+        elif queueName == "queue3" and "slowQueue" not in sd.queueDict:
+            raise RuntimeError("Submission failure")
+        # The queue is still found in the queues of the cycle
+        assert sd.queueDict[queueName] is queueDictionary
+        with sd.submissionLock:
+            sd.totalSubmittedPilots += 1
+        treatedQueues.append(queueName)
+        return {"OK": True}
+
+    mocker.patch.object(sd, "_submitPilotsPerQueue", side_effect=submitPilotsPerQueue)
+    realWait = SiteDirectorModule.wait
+
+    def waitForFastQueues(futures, timeout):
+        """The submission timeout expires once all the queues but the slow one are done"""
+        realWait([future for future, queueName in futures.items() if queueName != "slowQueue"])
+        return realWait(futures, timeout=0)
+
+    mocker.patch("DIRAC.WorkloadManagementSystem.Agent.SiteDirector.wait", side_effect=waitForFastQueues)
+
+    assert sd.submitPilots()["OK"]
+    assert sorted(treatedQueues) == [f"queue{i}" for i in range(4)]
+    assert sd.totalSubmittedPilots == 4
+
+    # The submission to the slow queue goes on in the background, the next cycle skips it
+    assert sd.queuesInSubmission == {"slowQueue"}
+    treatedQueues.clear()
+    sd.queueDict = {f"queue{i}": {"CEName": f"ce{i}"} for i in range(4)}
+    assert sd.submitPilots()["OK"]
+    assert sorted(treatedQueues) == [f"queue{i}" for i in range(3)]
+    assert sd.totalSubmittedPilots == 3
+    # The exception of a submission is logged
+    assert sd.log.exception.call_args.args[:2] == ("Pilot submission thread failed", "queue queue3")
+
+    releaseSlowQueue.set()
+    for _ in range(1000):
+        if not sd.queuesInSubmission:
+            break
+        time.sleep(0.01)
+    assert "slowQueue" in treatedQueues
+    assert not sd.queuesInSubmission
+    # The late submission is counted in its own cycle
+    assert sd.totalSubmittedPilots == 3
+
+
+def test__writePilotScript(sd, mocker):
+    """Testing SiteDirector()._writePilotScript(): the pilot files are compressed once per cycle"""
+    getPilotFilesMock = mocker.patch(
+        "DIRAC.WorkloadManagementSystem.Agent.SiteDirector.getPilotFilesCompressedEncodedDict", return_value={}
+    )
+    mocker.patch("DIRAC.WorkloadManagementSystem.Agent.SiteDirector.pilotWrapperScript", return_value="")
+    mocker.patch("DIRAC.WorkloadManagementSystem.Agent.SiteDirector._writePilotWrapperFile", return_value="file")
+    proxy = MagicMock()
+    proxy.dumpAllToString.return_value = {"OK": True, "Value": "proxyString"}
+
+    for _ in range(3):
+        assert sd._writePilotScript("", "", proxy=proxy) == "file"
+        assert sd._writePilotScript("", "") == "file"
+    assert getPilotFilesMock.call_count == 2
+
+
 @pytest.mark.parametrize(
     "pilotRefs, pilotDict, pilotCEDict, expected",
     [
@@ -213,3 +290,29 @@ def test__updatePilotStatus(sd, pilotRefs, pilotDict, pilotCEDict, expected):
     """Testing SiteDirector()._updatePilotStatus()"""
     res = sd._updatePilotStatus(pilotRefs, pilotDict, pilotCEDict)
     assert res == expected
+
+
+def test__updatePilotStatus_bulk(sd):
+    """Testing SiteDirector()._updatePilotStatus(): the pilots are updated by status"""
+    pilotInfo = {"Status": "Submitted", "LastUpdateTime": datetime.datetime.utcnow(), "OutputReady": "False"}
+    pilotDict = {f"pilot{i}": dict(pilotInfo) for i in range(5)}
+    pilotCEDict = {"pilot0": "Running", "pilot1": "Running", "pilot2": "Aborted", "pilot3": "Running"}
+
+    res = sd._updatePilotStatus(list(pilotDict), pilotDict, pilotCEDict)
+    assert res == (1, [])
+    calls = {call.args[1]: call.args[0] for call in sd.pilotAgentsDB.setPilotStatus.call_args_list}
+    assert calls == {"Running": ["pilot0", "pilot1", "pilot3"], "Aborted": ["pilot2"]}
+
+
+def test__addPilotTQReference(sd):
+    """Testing SiteDirector()._addPilotTQReference(): the pilots are registered in one go"""
+    sd.queueDict["aQueue"]["CEType"] = "SSH"
+    taskQueueDict = {1: {"Priority": 1}, 2: {"Priority": 3}}
+
+    sd._addPilotTQReference("aQueue", taskQueueDict, [f"pilot{i}" for i in range(10)], {})
+    sd.pilotAgentsDB.addPilotTQReferences.assert_called_once()
+    pilotRefTQDict = sd.pilotAgentsDB.addPilotTQReferences.call_args.args[0]
+    assert sorted(pilotRefTQDict) == sorted(f"pilot{i}" for i in range(10))
+    assert set(pilotRefTQDict.values()) <= {1, 2}
+    assert sd.pilotAgentsDB.addPilotTQReferences.call_args.kwargs["destination"] == "aCE"
+    sd.pilotAgentsDB.setPilotStatus.assert_not_called()
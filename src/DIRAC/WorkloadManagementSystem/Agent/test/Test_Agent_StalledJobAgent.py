@@ -1,11 +1,13 @@
 """ Test class for Stalled Job Agent
 """
+import datetime
 import pytest
 from unittest.mock import MagicMock
 
 # DIRAC Components
 from DIRAC.WorkloadManagementSystem.Agent.StalledJobAgent import StalledJobAgent
-from DIRAC import gLogger
+from DIRAC import gLogger, S_OK
+from DIRAC.WorkloadManagementSystem.Client import JobStatus
 
 # Mock Objects
 mockAM = MagicMock()
@@ -49,5 +51,58 @@ def test__sjaFunctions(sja):
 
     assert sja._failSubmittingJobs()["OK"]
     assert sja._kickStuckJobs()["OK"]
-    assert sja._failStalledJobs(0)["OK"]
-    assert not sja._markStalledJobs(0)["OK"]
+    assert sja._failStalledJobs([0])["OK"]
+    assert sja._markStalledJobs([0])["OK"]
+
+
+def test__markStalledJobs(sja):
+    """Only the jobs without update for longer than the stalled time are set Stalled, in bulk"""
+    now = datetime.datetime.utcnow()
+    sja.jobDB.getJobsAttributes.return_value = S_OK(
+        {
+            1: {"Site": "Site1", "MinorStatus": "m1", "HeartBeatTime": now, "LastUpdateTime": now},
+            2: {
+                "Site": "Site1",
+                "MinorStatus": "m2",
+                "HeartBeatTime": now - datetime.timedelta(hours=1),
+                "LastUpdateTime": None,
+            },
+            3: {"Site": "Site1", "MinorStatus": "m3", "HeartBeatTime": None, "LastUpdateTime": None},
+        }
+    )
+    sja.jobDB.setJobAttributes.return_value = S_OK()
+    sja.logDB.addLoggingRecords.return_value = S_OK()
+
+    assert sja._markStalledJobs([1, 2, 3])["OK"]
+
+    sja.jobDB.setJobAttributes.assert_called_once_with([2], ["Status"], [JobStatus.STALLED], update=True, force=False)
+    records = sja.logDB.addLoggingRecords.call_args[0][0]
+    assert records == [{"JobID": 2, "Status": JobStatus.STALLED, "MinorStatus": "m2", "Source": "StalledJobAgent"}]
+
+
+def test__failStalledJobs(sja, mocker):
+    """Jobs with lost pilots are set Failed, in bulk, and killed with one call per owner"""
+    now = datetime.datetime.utcnow()
+    mocker.patch.object(sja, "_getJobsPilotStatus", return_value=S_OK({1: "Running", 2: "NoPilot", 3: "Done"}))
+    sja.jobDB.getJobsAttributes.return_value = S_OK(
+        {
+            jobID: {
+                "Site": "Site1",
+                "Owner": "owner",
+                "OwnerGroup": "group",
+                "HeartBeatTime": now,
+                "LastUpdateTime": now,
+            }
+            for jobID in (1, 2, 3)
+        }
+    )
+    sja.jobDB.setJobAttributes.return_value = S_OK()
+    sja.logDB.addLoggingRecords.return_value = S_OK()
+    mockKill = mocker.patch.object(sja, "_sendKillCommand", return_value=S_OK())
+
+    assert sja._failStalledJobs([1, 2, 3])["OK"]
+
+    assert mockKill.call_args[0][0] == [2, 3]
+    sja.jobDB.setJobAttributes.assert_called_once_with(
+        [2, 3], ["Status", "MinorStatus"], [JobStatus.FAILED, sja.minorStalledStatuses[0]], update=True, force=True
+    )
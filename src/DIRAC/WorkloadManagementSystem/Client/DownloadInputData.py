@@ -7,9 +7,12 @@
     components to provide access to datasets by available site protocols as
     defined in the CS for the VO.
 """
+import concurrent.futures
+import json
 import os
-import tempfile
 import random
+import tempfile
+import threading
 
 from DIRAC import S_OK, S_ERROR, gLogger
 from DIRAC.WorkloadManagementSystem.Client.JobStateUpdateClient import JobStateUpdateClient
@@ -48,6 +51,22 @@ class DownloadInputData:
         self.jobID = None
         self.counter = 1
         self.availableSEs = DMSHelpers().getStorageElements()
+        # The files are downloaded concurrently, with a limited number of downloads per SE
+        self.maxParallelDownloads = int(self.configuration.get("MaxParallelDownloads", 4))
+        self.maxDownloadsPerSE = int(self.configuration.get("MaxDownloadsPerSE", 2))
+        self.__seSlots = {}
+        self.__lock = threading.Lock()
+        # If set, the payload is started as soon as this number of files is downloaded,
+        # and it can follow the other downloads in the manifest
+        jobArgs = argumentsDict.get("Job", {})
+        self.minInputDataFiles = int(jobArgs.get("MinInputDataFiles", 0))
+        self.manifest = jobArgs.get("InputDataManifest", "")
+        if self.minInputDataFiles and not self.manifest:
+            self.manifest = "InputDataManifest.json"
+        self.resolvedData = {}
+        self.failedReplicas = set()
+        self.pending = set()
+        self.localSECount = 0
 
     #############################################################################
     def execute(self, dataToResolve=None):
@@ -148,63 +167,57 @@ class DownloadInputData:
             )
             return S_OK({"Failed": self.inputData, "Successful": {}})
 
-        resolvedData = {}
-        localSECount = 0
-        for lfn, info in downloadReplicas.items():
-            seName = info["SE"]
-            guid = info["GUID"]
-            reps = replicas.get(lfn, {})
-            if seName:
-                result = returnSingleResult(StorageElement(seName).getFileMetadata(lfn))
-                if not result["OK"]:
-                    self.log.error("Error getting metadata", result["Message"])
-                    error = result["Message"]
-                else:
-                    metadata = result["Value"]
-                    if metadata.get("Lost", False):
-                        error = "PFN has been Lost by the StorageElement"
-                    elif metadata.get("Unavailable", False):
-                        error = "PFN is declared Unavailable by the StorageElement"
-                    elif not metadata.get("Cached", metadata["Accessible"]):
-                        error = "PFN is no longer in StorageElement Cache"
-                    else:
-                        error = ""
-                if error:
-                    self.log.error(error, lfn)
-                    result = {"OK": False}
-                else:
-                    self.log.info("Preliminary checks OK", f"download {lfn} from {seName}:")
-                    result = self._downloadFromSE(lfn, seName, reps, guid)
-                    if not result["OK"]:
-                        self.log.error("Download failed", f"Tried downloading from SE {seName}: {result['Message']}")
-            else:
-                result = {"OK": False}
-
-            if not result["OK"]:
-                reps.pop(seName, None)
-                # Check the other SEs
-                if reps:
-                    self.log.info("Trying to download from any SE")
-                    result = self._downloadFromBestSE(lfn, reps, guid)
-                    if not result["OK"]:
-                        self.log.error("Download from best SE failed", f"Tried downloading {lfn}: {result['Message']}")
-                        failedReplicas.add(lfn)
-                else:
-                    failedReplicas.add(lfn)
-            else:
-                localSECount += 1
-            if result["OK"]:
-                # Rename file if downloaded FileName does not match the LFN... How can this happen?
-                lfnName = os.path.basename(lfn)
-                oldPath = result["Value"]["path"]
-                fileName = os.path.basename(oldPath)
-                if lfnName != fileName:
-                    newPath = os.path.join(os.path.dirname(oldPath), lfnName)
-                    os.rename(oldPath, newPath)
-                    result["Value"]["path"] = newPath
-                resolvedData[lfn] = result["Value"]
-
-        # Report datasets that could not be downloaded
+        # Largest files first, so that the smaller ones fill the download slots at the end
+        lfns = sorted(downloadReplicas, key=lambda lfn: int(downloadReplicas[lfn].get("Size", 0)), reverse=True)
+        self.resolvedData = {}
+        self.failedReplicas = failedReplicas
+        self.pending = set(lfns)
+        self.localSECount = 0
+        self.__writeManifest()
+
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, self.maxParallelDownloads))
+        futures = {
+            pool.submit(self._downloadFile, lfn, downloadReplicas[lfn], replicas.get(lfn, {})): lfn for lfn in lfns
+        }
+        completed = concurrent.futures.as_completed(futures)
+        for future in completed:
+            self.__collectDownload(futures[future], *future.result())
+            if self.minInputDataFiles and self.pending and len(self.resolvedData) >= self.minInputDataFiles:
+                break
+        else:
+            pool.shutdown()
+            return self.__reportDownloads()
+
+        # Let the payload start, the remaining files keep being downloaded and are added to the manifest
+        self.log.info(
+            "Enough input data downloaded to start the payload",
+            f"{len(self.resolvedData)} file(s) local, {len(self.pending)} still downloading",
+        )
+        threading.Thread(target=self.__finishDownloads, args=(completed, futures, pool)).start()
+        return S_OK({"Successful": dict(self.resolvedData), "Failed": sorted(self.failedReplicas)})
+
+    def __collectDownload(self, lfn, result, fromLocalSE):
+        """Records the result of the download of a file and updates the manifest"""
+        self.pending.discard(lfn)
+        if result["OK"]:
+            self.resolvedData[lfn] = result["Value"]
+            if fromLocalSE:
+                self.localSECount += 1
+        else:
+            self.failedReplicas.add(lfn)
+        self.__writeManifest()
+
+    def __finishDownloads(self, completed, futures, pool):
+        """Collects the downloads still running once the payload was started"""
+        for future in completed:
+            self.__collectDownload(futures[future], *future.result())
+        pool.shutdown()
+        self.__reportDownloads()
+
+    def __reportDownloads(self):
+        """Reports the datasets that were downloaded and those that could not be"""
+        resolvedData = self.resolvedData
+        localSECount = self.localSECount
         report = ""
         if resolvedData:
             report += f"Successfully downloaded {len(resolvedData)} LFN(s)"
@@ -213,7 +226,7 @@ class DownloadInputData:
             else:
                 report += " from local SEs:\n"
             report += "\n".join(sorted(resolvedData))
-        failedReplicas = sorted(failedReplicas.difference(resolvedData))
+        failedReplicas = sorted(self.failedReplicas.difference(resolvedData))
         if failedReplicas:
             self.log.warn(f"The following LFN(s) could not be downloaded to the WN:\n{'n'.join(failedReplicas)}")
             report += f"\nFailed to download {len(failedReplicas)} LFN(s):\n"
@@ -224,6 +237,78 @@ class DownloadInputData:
 
         return S_OK({"Successful": resolvedData, "Failed": failedReplicas})
 
+    def __writeManifest(self):
+        """Writes the manifest of the input data, that the payload can poll to know which files are local.
+        It is replaced atomically, and the downloads are over when its Pending list is empty.
+        """
+        if not self.manifest:
+            return
+        manifest = {
+            "Successful": {lfn: info["path"] for lfn, info in self.resolvedData.items()},
+            "Failed": sorted(self.failedReplicas.difference(self.resolvedData)),
+            "Pending": sorted(self.pending),
+        }
+        try:
+            with open(f"{self.manifest}.tmp", "w") as fd:
+                json.dump(manifest, fd)
+            os.replace(f"{self.manifest}.tmp", self.manifest)
+        except OSError as e:
+            self.log.warn("Failed to write the input data manifest", repr(e))
+
+    def _downloadFile(self, lfn, info, reps):
+        """Downloads a file, from its selected SE or else from any SE, as done by the download threads
+
+        :return: the download result, and whether the file came from the selected local SE
+        """
+        seName = info["SE"]
+        guid = info["GUID"]
+        result = S_ERROR("No replica at the local SEs")
+        if seName:
+            result = returnSingleResult(StorageElement(seName).getFileMetadata(lfn))
+            if not result["OK"]:
+                self.log.error("Error getting metadata", result["Message"])
+                error = result["Message"]
+            else:
+                metadata = result["Value"]
+                if metadata.get("Lost", False):
+                    error = "PFN has been Lost by the StorageElement"
+                elif metadata.get("Unavailable", False):
+                    error = "PFN is declared Unavailable by the StorageElement"
+                elif not metadata.get("Cached", metadata["Accessible"]):
+                    error = "PFN is no longer in StorageElement Cache"
+                else:
+                    error = ""
+            if error:
+                self.log.error(error, lfn)
+                result = S_ERROR(error)
+            else:
+                self.log.info("Preliminary checks OK", f"download {lfn} from {seName}:")
+                result = self._downloadFromSE(lfn, seName, reps, guid)
+                if not result["OK"]:
+                    self.log.error("Download failed", f"Tried downloading from SE {seName}: {result['Message']}")
+
+        fromLocalSE = result["OK"]
+        if not result["OK"]:
+            reps.pop(seName, None)
+            # Check the other SEs
+            if not reps:
+                return result, False
+            self.log.info("Trying to download from any SE")
+            result = self._downloadFromBestSE(lfn, reps, guid)
+            if not result["OK"]:
+                self.log.error("Download from best SE failed", f"Tried downloading {lfn}: {result['Message']}")
+                return result, False
+
+        # Rename file if downloaded FileName does not match the LFN... How can this happen?
+        lfnName = os.path.basename(lfn)
+        oldPath = result["Value"]["path"]
+        fileName = os.path.basename(oldPath)
+        if lfnName != fileName:
+            newPath = os.path.join(os.path.dirname(oldPath), lfnName)
+            os.rename(oldPath, newPath)
+            result["Value"]["path"] = newPath
+        return result, fromLocalSE
+
     #############################################################################
     def __checkDiskSpace(self, totalSize):
         """Compare available disk space to the file size reported from the catalog
@@ -250,9 +335,11 @@ class DownloadInputData:
 
     def __getDownloadDir(self, incrementCounter=True):
         if self.inputDataDirectory == "PerFile":
-            if incrementCounter:
-                self.counter += 1
-            return tempfile.mkdtemp(prefix=f"InputData_{self.counter}", dir=os.getcwd())
+            with self.__lock:
+                if incrementCounter:
+                    self.counter += 1
+                counter = self.counter
+            return tempfile.mkdtemp(prefix=f"InputData_{counter}", dir=os.getcwd())
         elif self.inputDataDirectory == "CWD":
             return os.getcwd()
         else:
@@ -310,7 +397,8 @@ class DownloadInputData:
                 return S_OK(fileDict)
 
         localFile = os.path.join(downloadDir, fileName)
-        result = returnSingleResult(StorageElement(seName).getFile(lfn, localPath=downloadDir))
+        with self.__getSESlots(seName):
+            result = returnSingleResult(StorageElement(seName).getFile(lfn, localPath=downloadDir))
         if not result["OK"]:
             self.log.warn("Problem getting lfn", f"{lfn} from {seName}:\n{result['Message']}")
             self.__cleanFailedFile(lfn, downloadDir)
@@ -331,6 +419,11 @@ class DownloadInputData:
             self.log.warn("File does not exist in local directory after download")
             return S_ERROR("OK download result but file missing in current directory")
 
+    def __getSESlots(self, seName):
+        """Semaphore limiting the number of concurrent downloads from an SE"""
+        with self.__lock:
+            return self.__seSlots.setdefault(seName, threading.BoundedSemaphore(max(1, self.maxDownloadsPerSE)))
+
     #############################################################################
     def __setJobParam(self, name, value):
         """Wraps around setJobParameter of state update client"""
@@ -32,6 +32,12 @@ class InputDataResolution:
         self.arguments["Configuration"].setdefault(
             "RemoteProtocol", op.getValue("InputDataPolicy/Protocols/Remote", [])
         )
+        self.arguments["Configuration"].setdefault(
+            "MaxParallelDownloads", op.getValue("InputDataPolicy/MaxParallelDownloads", 4)
+        )
+        self.arguments["Configuration"].setdefault(
+            "MaxDownloadsPerSE", op.getValue("InputDataPolicy/MaxDownloadsPerSE", 2)
+        )
 
         # By default put input data into the current directory
         self.arguments.setdefault("InputDataDirectory", gConfig.getValue("/LocalSite/InputDataDirectory", "CWD"))
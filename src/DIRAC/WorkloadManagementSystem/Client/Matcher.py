@@ -307,17 +307,11 @@ class Matcher:
         """Update pilot to job mapping information"""
         pilotReference = resourceDict.get("PilotReference", "")
         if pilotReference and pilotReference != "Unknown":
-            result = self.pilotAgentsDB.setCurrentJobID(pilotReference, jobID)
+            result = self.pilotAgentsDB.setJobsForPilots([(jobID, pilotReference)])
             if not result["OK"]:
                 self.log.error(
                     "Problem updating pilot information",
-                    f";setCurrentJobID. pilotReference: {pilotReference}; {result['Message']}",
-                )
-            result = self.pilotAgentsDB.setJobForPilot(jobID, pilotReference, updateStatus=False)
-            if not result["OK"]:
-                self.log.error(
-                    "Problem updating pilot information",
-                    f"; setJobForPilot. pilotReference: {pilotReference}; {result['Message']}",
+                    f"; setJobsForPilots. pilotReference: {pilotReference}; {result['Message']}",
                 )
 
     def _checkCredentials(self, resourceDict, credDict):
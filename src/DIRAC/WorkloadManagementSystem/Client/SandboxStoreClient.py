@@ -4,9 +4,9 @@
 
 import os
 import tarfile
-import hashlib
 import tempfile
 import re
+import shutil
 from io import BytesIO, StringIO
 
 from DIRAC import gLogger, S_OK, S_ERROR
@@ -16,12 +16,14 @@ from DIRAC.Core.Base.Client import Client
 from DIRAC.Core.Utilities.File import mkDir
 from DIRAC.Resources.Storage.StorageElement import StorageElement
 from DIRAC.Core.Utilities.ReturnValues import returnSingleResult
-from DIRAC.Core.Utilities.File import getGlobbedTotalSize
+from DIRAC.Core.Utilities.File import getGlobbedTotalSize, getMD5ForFiles
 from DIRAC.ConfigurationSystem.Client.Helpers.Registry import getVOForGroup
 
 
 class SandboxStoreClient:
     __validSandboxTypes = ("Input", "Output")
+    # Sandbox file names made of their md5 checksum
+    __checksumName = re.compile(r"^[0-9a-f]{32}\.tar")
     __smdb = None
 
     def __init__(self, rpcClient=None, transferClient=None, smdb=False, **kwargs):
@@ -145,15 +147,17 @@ class SandboxStoreClient:
                 result["SandboxFileName"] = tmpFilePath
                 return result
 
-        oMD5 = hashlib.md5()
-        with open(tmpFilePath, "rb") as fd:
-            bData = fd.read(10240)
-            while bData:
-                oMD5.update(bData)
-                bData = fd.read(10240)
+        fileId = f"{getMD5ForFiles([tmpFilePath])}.tar.bz2"
 
-        transferClient = self.__getTransferClient()
-        result = transferClient.sendFile(tmpFilePath, [f"{oMD5.hexdigest()}.tar.bz2", assignTo])
+        # Identical sandboxes (e.g. the ones of many jobs of a user) are only uploaded once
+        result = self.__getRPCClient().assignExistingSandbox(fileId, assignTo)
+        if result["OK"] and result["Value"]:
+            gLogger.verbose("Sandbox already in the store, not uploading it", result["Value"])
+        else:
+            if not result["OK"]:
+                gLogger.verbose("Cannot check if the sandbox is already in the store", result["Message"])
+            transferClient = self.__getTransferClient()
+            result = transferClient.sendFile(tmpFilePath, [fileId, assignTo])
         result["SandboxFileName"] = tmpFilePath
         try:
             if result["OK"]:
@@ -165,9 +169,12 @@ class SandboxStoreClient:
     ##############
     # Download sandbox
 
-    def downloadSandbox(self, sbLocation, destinationDir="", inMemory=False, unpack=True):
+    def downloadSandbox(self, sbLocation, destinationDir="", inMemory=False, unpack=True, cacheDir=""):
         """
         Download a sandbox file and keep it in bundled form
+
+        :param str cacheDir: directory of the sandboxes already downloaded, shared by the jobs running on the node.
+                             The sandboxes are unpacked from there, after being downloaded if needed.
         """
         if sbLocation.find("SB:") != 0:
             return S_ERROR("Invalid sandbox URL")
@@ -177,18 +184,26 @@ class SandboxStoreClient:
             return S_ERROR("Invalid sandbox URL")
         seName = sbSplit[0]
         sePFN = "|".join(sbSplit[1:])
+        sbFileName = os.path.basename(sePFN)
+
+        se = StorageElement(seName, vo=self.__vo)
+
+        # The sandboxes are named after their checksum: they can be cached regardless of their owner
+        if cacheDir and unpack and not inMemory and self.__checksumName.match(sbFileName):
+            result = self.__getCachedSandbox(se, sePFN, cacheDir)
+            if not result["OK"]:
+                return result
+            return self.__unpackSandbox(result["Value"], destinationDir)
 
         try:
             tmpSBDir = tempfile.mkdtemp(prefix="TMSB.")
         except OSError as e:
             return S_ERROR(f"Cannot create temporary file: {repr(e)}")
 
-        se = StorageElement(seName, vo=self.__vo)
         result = returnSingleResult(se.getFile(sePFN, localPath=tmpSBDir))
 
         if not result["OK"]:
             return result
-        sbFileName = os.path.basename(sePFN)
 
         result = S_OK()
         tarFileName = os.path.join(tmpSBDir, sbFileName)
@@ -204,6 +219,30 @@ class SandboxStoreClient:
                 os.rmdir(tmpSBDir)
             return S_OK(data)
 
+        if not unpack:
+            # If destination dir is not specified use current working dir
+            # If its defined ensure the dir structure is there
+            if destinationDir:
+                mkDir(destinationDir)
+            result["Value"] = tarFileName
+            return result
+
+        result = self.__unpackSandbox(tarFileName, destinationDir)
+
+        try:
+            os.unlink(tarFileName)
+            os.rmdir(tmpSBDir)
+        except OSError as e:
+            gLogger.warn(f"Could not remove temporary dir {tmpSBDir}: {repr(e)}")
+
+        return result
+
+    @staticmethod
+    def __unpackSandbox(tarFileName, destinationDir=""):
+        """Unpack a sandbox archive
+
+        :return: S_OK(size of the unpacked files)
+        """
         # If destination dir is not specified use current working dir
         # If its defined ensure the dir structure is there
         if not destinationDir:
@@ -211,10 +250,6 @@ class SandboxStoreClient:
         else:
             mkDir(destinationDir)
 
-        if not unpack:
-            result["Value"] = tarFileName
-            return result
-
         try:
             sandboxSize = 0
             with tarfile.open(name=tarFileName, mode="r") as tf:
@@ -223,17 +258,48 @@ class SandboxStoreClient:
                     sandboxSize += tarinfo.size
             # FIXME: here we return the size, but otherwise we always return the location: inconsistent
             # FIXME: looks like this size is used by the JobWrapper
-            result["Value"] = sandboxSize
+            return S_OK(sandboxSize)
         except OSError as e:
-            result = S_ERROR(f"Could not open bundle: {repr(e)}")
+            return S_ERROR(f"Could not open bundle: {repr(e)}")
+
+    @staticmethod
+    def __getCachedSandbox(se, sePFN, cacheDir):
+        """Get a sandbox archive from the cache directory, downloading it there if it is not cached yet.
+        The checksum of the archives is verified before they are added to the cache and before they are used.
+
+        Jobs downloading the same sandbox at the same time may both download it, the archive is moved
+        atomically to the cache so that they never see a partial file.
+
+        :return: S_OK(path of the archive in the cache)
+        """
+        sbFileName = os.path.basename(sePFN)
+        checksum = sbFileName.split(".")[0]
+        cachedFileName = os.path.join(cacheDir, sbFileName)
+        if os.path.isfile(cachedFileName):
+            if getMD5ForFiles([cachedFileName]) == checksum:
+                gLogger.verbose("Sandbox found in the local cache", cachedFileName)
+                return S_OK(cachedFileName)
+            gLogger.warn("Corrupted sandbox in the local cache, downloading it again", cachedFileName)
 
         try:
-            os.unlink(tarFileName)
-            os.rmdir(tmpSBDir)
+            mkDir(cacheDir)
+            tmpSBDir = tempfile.mkdtemp(prefix="TMSB.", dir=cacheDir)
         except OSError as e:
-            gLogger.warn(f"Could not remove temporary dir {tmpSBDir}: {repr(e)}")
-
-        return result
+            return S_ERROR(f"Cannot create temporary file: {repr(e)}")
+        try:
+            result = returnSingleResult(se.getFile(sePFN, localPath=tmpSBDir))
+            if not result["OK"]:
+                return result
+            tarFileName = os.path.join(tmpSBDir, sbFileName)
+            if getMD5ForFiles([tarFileName]) != checksum:
+                return S_ERROR(f"Checksum mismatch of the downloaded sandbox {sbFileName}")
+            os.replace(tarFileName, cachedFileName)
+        except OSError as e:
+            return S_ERROR(f"Cannot add the sandbox to the cache: {repr(e)}")
+        finally:
+            shutil.rmtree(tmpSBDir, ignore_errors=True)
+        gLogger.verbose("Sandbox added to the local cache", cachedFileName)
+        return S_OK(cachedFileName)
 
     ##############
     # Jobs
@@ -1,6 +1,11 @@
 """Test for WMS clients."""
 # pylint: disable=protected-access, missing-docstring, invalid-name
 
+import json
+import os
+import threading
+import time
+
 import pytest
 
 from unittest.mock import MagicMock
@@ -272,3 +277,71 @@ def test_DLI_execute_NoLocal(dli, mockSE):
     assert res["Value"]["Failed"]
     assert "/a/lfn/1.txt" in res["Value"]["Failed"], res
     assert res["Value"]["Failed"][0] == "/a/lfn/1.txt", res
+
+
+def _multiFileDLI(jobArgs, maxParallelDownloads=1):
+    fileCatalog = {f"/a/lfn/{size}.txt": {"Size": size, "GUID": f"GUID{size}", "SE_Local": ""} for size in (10, 30, 20)}
+    theDLI = DownloadInputData(
+        {
+            "InputData": [],
+            "Configuration": {"LocalSEList": ["SE_Local"], "MaxParallelDownloads": maxParallelDownloads},
+            "InputDataDirectory": "CWD",
+            "FileCatalog": S_OK({"Successful": fileCatalog}),
+            "Job": jobArgs,
+        }
+    )
+    theDLI.availableSEs = ["SE_Local"]
+    return theDLI
+
+
+def test_DLI_execute_largestFirst(mockSE, tmp_path, monkeypatch):
+    """The files are downloaded largest first, and the manifest lists them."""
+    monkeypatch.chdir(tmp_path)
+    dli = _multiFileDLI({"InputDataManifest": "manifest.json"})
+    downloaded = []
+
+    def downloadFromSE(lfn, seName, reps, guid):
+        downloaded.append(lfn)
+        return S_OK({"path": os.path.join(str(tmp_path), os.path.basename(lfn))})
+
+    dli._downloadFromSE = MagicMock(side_effect=downloadFromSE)
+    res = dli.execute(dataToResolve=["/a/lfn/10.txt", "/a/lfn/20.txt", "/a/lfn/30.txt"])
+    assert res["OK"], res
+    assert not res["Value"]["Failed"]
+    assert downloaded == ["/a/lfn/30.txt", "/a/lfn/20.txt", "/a/lfn/10.txt"]
+
+    with open(tmp_path / "manifest.json") as fd:
+        manifest = json.load(fd)
+    assert sorted(manifest["Successful"]) == sorted(downloaded)
+    assert manifest["Failed"] == manifest["Pending"] == []
+
+
+def test_DLI_execute_minInputDataFiles(mockSE, tmp_path, monkeypatch):
+    """The payload can start once the first file is local, the others are added to the manifest."""
+    monkeypatch.chdir(tmp_path)
+    dli = _multiFileDLI({"MinInputDataFiles": 1}, maxParallelDownloads=2)
+    release = threading.Event()
+
+    def downloadFromSE(lfn, seName, reps, guid):
+        if lfn != "/a/lfn/30.txt":
+            release.wait(10)
+        return S_OK({"path": os.path.join(str(tmp_path), os.path.basename(lfn))})
+
+    dli._downloadFromSE = MagicMock(side_effect=downloadFromSE)
+    res = dli.execute(dataToResolve=["/a/lfn/10.txt", "/a/lfn/20.txt", "/a/lfn/30.txt"])
+    assert res["OK"], res
+    assert list(res["Value"]["Successful"]) == ["/a/lfn/30.txt"]
+    assert not res["Value"]["Failed"]
+    with open(tmp_path / "InputDataManifest.json") as fd:
+        assert json.load(fd)["Pending"] == ["/a/lfn/10.txt", "/a/lfn/20.txt"]
+
+    # Poll the manifest as a payload would do
+    release.set()
+    for _ in range(100):
+        with open(tmp_path / "InputDataManifest.json") as fd:
+            manifest = json.load(fd)
+        if not manifest["Pending"]:
+            break
+        time.sleep(0.1)
+    assert sorted(manifest["Successful"]) == ["/a/lfn/10.txt", "/a/lfn/20.txt", "/a/lfn/30.txt"]
+    assert manifest["Pending"] == []
@@ -3,12 +3,15 @@
 # pylint: disable=protected-access, missing-docstring, invalid-name, line-too-long
 
 import os
+import shutil
+import tarfile
 from io import BytesIO
 
 import pytest
 from unittest.mock import MagicMock
 
-from DIRAC import gLogger
+from DIRAC import gLogger, S_OK
+from DIRAC.Core.Utilities.File import getMD5ForFiles
 
 gLogger.setLevel("DEBUG")
 
@@ -85,3 +88,62 @@ def test_uploadFilesAsSandbox(mocker, setUp):
     fileList = [BytesIO(b"try")]
     res = ssc.uploadFilesAsSandbox(fileList)
     print(res)
+
+
+@pytest.mark.parametrize("existingSandbox", ["SB:SandboxSE|/SandBox/u/user.group/abc/def/abcdef.tar.bz2", None])
+def test_uploadFilesAsSandbox_existing(tmp_path, existingSandbox):
+    inputFile = tmp_path / "input.txt"
+    inputFile.write_text("input")
+    rpcClient = MagicMock()
+    rpcClient.assignExistingSandbox.return_value = S_OK(existingSandbox)
+    transferClient = MagicMock()
+    transferClient.sendFile.return_value = S_OK("SB:SandboxSE|/SandBox/new.tar.bz2")
+    ssc = SandboxStoreClient(rpcClient=rpcClient, transferClient=transferClient)
+
+    res = ssc.uploadFilesAsSandbox([str(inputFile)], assignTo={"Job:1": "Input"})
+
+    assert res["OK"], res["Message"]
+    fileId = rpcClient.assignExistingSandbox.call_args[0][0]
+    assert fileId.endswith(".tar.bz2")
+    if existingSandbox:
+        assert res["Value"] == existingSandbox
+        transferClient.sendFile.assert_not_called()
+    else:
+        assert res["Value"] == "SB:SandboxSE|/SandBox/new.tar.bz2"
+        transferClient.sendFile.assert_called_once_with(res["SandboxFileName"], [fileId, {"Job:1": "Input"}])
+
+
+def test_downloadSandbox_cache(mocker, tmp_path):
+    sandboxFile = tmp_path / "input.txt"
+    sandboxFile.write_text("input")
+    tarFileName = tmp_path / "sandbox.tar.bz2"
+    with tarfile.open(tarFileName, "w:bz2") as tf:
+        tf.add(sandboxFile, "input.txt")
+    checksum = getMD5ForFiles([str(tarFileName)])
+    sePFN = f"/SandBox/u/user.group/{checksum[:3]}/{checksum[3:6]}/{checksum}.tar.bz2"
+
+    def getFile(pfn, localPath):
+        shutil.copy(tarFileName, os.path.join(localPath, os.path.basename(pfn)))
+        return S_OK({"Successful": {pfn: 1}, "Failed": {}})
+
+    storageElement = MagicMock()
+    storageElement.getFile.side_effect = getFile
+    mocker.patch("DIRAC.WorkloadManagementSystem.Client.SandboxStoreClient.StorageElement", return_value=storageElement)
+    ssc = SandboxStoreClient()
+    cacheDir = tmp_path / "cache"
+
+    for jobID in (1, 2):
+        res = ssc.downloadSandbox(f"SB:SandboxSE|{sePFN}", str(tmp_path / str(jobID)), cacheDir=str(cacheDir))
+        assert res["OK"], res["Message"]
+        assert (tmp_path / str(jobID) / "input.txt").read_text() == "input"
+
+    # The sandbox was only downloaded once, and kept in the cache
+    storageElement.getFile.assert_called_once()
+    assert os.listdir(cacheDir) == [f"{checksum}.tar.bz2"]
+
+    # A corrupted sandbox is downloaded again
+    (cacheDir / f"{checksum}.tar.bz2").write_text("corrupted")
+    res = ssc.downloadSandbox(f"SB:SandboxSE|{sePFN}", str(tmp_path / "3"), cacheDir=str(cacheDir))
+    assert res["OK"], res["Message"]
+    assert storageElement.getFile.call_count == 2
+    assert (tmp_path / "3" / "input.txt").read_text() == "input"
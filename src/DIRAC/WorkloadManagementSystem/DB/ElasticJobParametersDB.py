@@ -24,8 +24,14 @@
 
     The following class methods are provided for public usage
       - getJobParameters()
+      - getJobsParameters()
       - setJobParameter()
+      - setJobParameters()
+      - setJobsParameters()
       - deleteJobParameters()
+      - deleteJobsParameters()
+      - getIndexJobRange()
+      - deleteJobsIndex()
 """
 from DIRAC import S_OK, S_ERROR, gConfig
 from DIRAC.Core.Utilities import TimeUtilities
@@ -68,13 +74,20 @@ class ElasticJobParametersDB(ElasticDB):
 
         self.indexName_base = f"{self.getIndexPrefix()}_elasticjobparameters_index"
 
+    @staticmethod
+    def _indexSplit(jobID: int) -> float:
+        """Get the number of the index of a job, the jobs being stored by ranges of one million
+
+        :param jobID: Job ID
+        """
+        return int(jobID) // 1e6
+
     def _indexName(self, jobID: int) -> str:
         """construct the index name
 
         :param jobID: Job ID
         """
-        indexSplit = int(jobID) // 1e6
-        return f"{self.indexName_base}_{indexSplit}m"
+        return f"{self.indexName_base}_{self._indexSplit(jobID)}m"
 
     def _createIndex(self, indexName: str) -> None:
         """Create a new index if needed
@@ -115,6 +128,36 @@ class ElasticJobParametersDB(ElasticDB):
 
         return S_OK({jobID: resultDict})
 
+    def getJobsParameters(self, jobIDs: list, paramList=None) -> dict:
+        """Get the Job Parameters of many jobs, with one multi-get request per index.
+          If paramList is empty - all the parameters are returned.
+
+        :param self: self reference
+        :param jobIDs: list of Job IDs
+        :param paramList: list of parameters to be returned (also a string is treated)
+        :return: S_OK(dict) {jobID: {parameter name: value}}, empty for the jobs without parameters
+        """
+        if isinstance(paramList, str):
+            paramList = paramList.replace(" ", "").split(",")
+
+        jobsPerIndex = {}
+        for jobID in jobIDs:
+            jobsPerIndex.setdefault(self._indexName(jobID), []).append(int(jobID))
+
+        resultDict = {}
+        for indexName, indexJobIDs in jobsPerIndex.items():
+            self.log.debug("Getting parameters", f"of {len(indexJobIDs)} jobs from {indexName}")
+            res = self.getDocs(indexName, indexJobIDs)
+            if not res["OK"]:
+                return res
+            for jobID in indexJobIDs:
+                jobParameters = res["Value"].get(str(jobID), {})
+                if paramList:
+                    jobParameters = {key: value for key, value in jobParameters.items() if key in paramList}
+                resultDict[jobID] = jobParameters
+
+        return S_OK(resultDict)
+
     def setJobParameter(self, jobID: int, key: str, value: str) -> dict:
         """
         Inserts data into ElasticJobParametersDB index
@@ -169,6 +212,37 @@ class ElasticJobParametersDB(ElasticDB):
             self.log.error("Couldn't insert or update data", result["Message"])
         return result
 
+    def setJobsParameters(self, jobsParameters: dict) -> dict:
+        """
+        Inserts the parameters of many jobs, with a single bulk request creating or updating their documents
+
+        :param self: self reference
+        :param jobsParameters: {jobID: list of tuples (name, value) pairs}
+        :returns: S_OK/S_ERROR as result of indexing
+        """
+        if not jobsParameters:
+            return S_OK()
+        timestamp = int(TimeUtilities.toEpochMilliSeconds())
+
+        docs = []
+        for jobID, parameters in jobsParameters.items():
+            parametersDict = dict(parameters)
+            parametersDict["JobID"] = int(jobID)
+            parametersDict["timestamp"] = timestamp
+            docs.append((self._indexName(jobID), int(jobID), parametersDict))
+
+        try:
+            for indexName in {doc[0] for doc in docs}:
+                self._createIndex(indexName)
+        except RuntimeError as excp:
+            return S_ERROR(str(excp))
+
+        self.log.debug("Inserting parameters", f"of {len(docs)} jobs")
+        result = self.upsertDocs(docs)
+        if not result["OK"]:
+            self.log.error("Couldn't insert or update data", result["Message"])
+        return result
+
     def deleteJobParameters(self, jobID: int, paramList=None) -> dict:
         """Deletes Job Parameters defined for jobID.
           Returns a dictionary with the Job Parameters.
@@ -202,4 +276,45 @@ class ElasticJobParametersDB(ElasticDB):
         self.log.debug("Parameters successfully deleted.")
         return S_OK()
 
+    def deleteJobsParameters(self, jobIDs: list) -> dict:
+        """Deletes all the parameters of many jobs, with one delete by query per index
+
+        :param self: self reference
+        :param jobIDs: list of job IDs
+        :return: S_OK()/S_ERROR()
+        """
+        jobsPerIndex = {}
+        for jobID in jobIDs:
+            jobsPerIndex.setdefault(self._indexName(jobID), []).append(int(jobID))
+
+        for indexName, indexJobIDs in jobsPerIndex.items():
+            result = self.existingIndex(indexName)
+            if not result["OK"]:
+                return result
+            if not result["Value"]:
+                continue
+            self.log.debug("Deleting records", f"of {len(indexJobIDs)} jobs from {indexName}")
+            result = self.deleteByQuery(indexName, {"query": {"terms": {"JobID": indexJobIDs}}})
+            if not result["OK"]:
+                return result
+        return S_OK()
+
+    def getIndexJobRange(self, jobID: int) -> tuple:
+        """Get the range of job IDs stored in the same index as a job
+
+        :param jobID: Job ID
+        :return: tuple (first job ID, last job ID)
+        """
+        firstJobID = int(self._indexSplit(jobID) * 1e6)
+        return firstJobID, int(firstJobID + 1e6 - 1)
+
+    def deleteJobsIndex(self, jobID: int) -> dict:
+        """Deletes the whole index holding the parameters of a job, hence of all the jobs of its range
+
+        :param self: self reference
+        :param jobID: Job ID
+        :return: S_OK()/S_ERROR()
+        """
+        return self.deleteIndex(self._indexName(jobID))
+
     # TODO: Add query by value (e.g. query which values are in a certain pattern)
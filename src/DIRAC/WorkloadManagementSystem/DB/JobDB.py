@@ -9,6 +9,9 @@ The following options can be set in ``Systems/WorkloadManagement/<Setup>/Databas
 
 * *MaxRescheduling*:     Set the maximum number of times a job can be rescheduled, default *3*.
 * *CompressJDLs*:        Enable compression of JDLs when they are stored in the database, default *False*.
+* *HeartBeatLoggingInfoPartitionDays*: If positive, partition the HeartBeatLoggingInfo table by HeartBeatTime,
+                         with one partition per this number of days, default *0*. The old records can then be
+                         removed by dropping partitions, see :meth:`dropHeartBeatLoggingInfoPartitions`.
 
 """
 import base64
@@ -16,6 +19,7 @@ import zlib
 import datetime
 
 import operator
+import uuid
 
 from DIRAC.ConfigurationSystem.Client.Helpers.Registry import getVOForGroup
 from DIRAC.ConfigurationSystem.Client.Helpers.Operations import Operations
@@ -25,6 +29,7 @@ from DIRAC.Core.Utilities import DErrno
 from DIRAC.Core.Utilities.ClassAd.ClassAdLight import ClassAd
 from DIRAC.Core.Utilities.ReturnValues import S_OK, S_ERROR, convertToReturnValue
 from DIRAC.Core.Utilities.DErrno import EWMSSUBM, EWMSJMAN, cmpError
+from DIRAC.Core.Utilities.List import breakListIntoChunks
 from DIRAC.Core.Utilities.ObjectLoader import ObjectLoader
 from DIRAC.ResourceStatusSystem.Client.SiteStatus import SiteStatus
 from DIRAC.WorkloadManagementSystem.Client.JobState.JobManifest import JobManifest
@@ -44,6 +49,9 @@ from DIRAC.WorkloadManagementSystem.DB.JobDBUtils import (
 class JobDB(DB):
     """Interface to MySQL-based JobDB"""
 
+    #: Job attributes for which the JobsSummary table holds the number of jobs
+    jobsSummaryFields = ["Status", "Site", "Owner", "OwnerGroup", "JobGroup", "JobType"]
+
     def __init__(self, parentLogger=None):
         """Standard Constructor"""
 
@@ -67,6 +75,22 @@ class JobDB(DB):
 
         self.jdl2DBParameters = ["JobName", "JobType", "JobGroup"]
 
+        self.hbPartitionDays = self.getCSOption("HeartBeatLoggingInfoPartitionDays", 0)
+        if self.hbPartitionDays > 0:
+            result = self.__partitionHeartBeatLoggingInfo()
+            if not result["OK"]:
+                self.log.warn("Failed to partition the HeartBeatLoggingInfo table", result["Message"])
+
+        self.useJobsSummary = False
+        result = self._query(
+            "SELECT COUNT(*) FROM INFORMATION_SCHEMA.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE() "
+            "AND EVENT_OBJECT_TABLE = 'Jobs' AND TRIGGER_NAME LIKE 'JobsSummary%'"
+        )
+        if result["OK"] and result["Value"][0][0] == 4:
+            self.useJobsSummary = True
+        else:
+            self.log.warn("The JobsSummary table is not maintained, the job counters are computed from the Jobs table")
+
         self.log.info("MaxReschedule", self.maxRescheduling)
         self.log.info("==================================================")
         self.__initialized = True
@@ -632,6 +656,84 @@ class JobDB(DB):
 
         return S_OK()
 
+    #############################################################################
+    def setJobsStatusAttributes(self, jobsUpdates, chunkSize=1000):
+        """Set the status attributes and the execution time stamps of many jobs with multi-row
+        UPDATE statements executed in a single transaction. The Status is set as given,
+        the state machine is supposed to have been evaluated by the caller.
+
+        :param dict jobsUpdates: {jobID: dict} where the dict can have the keys
+
+                                 - Status, MinorStatus, ApplicationStatus: set along with the LastUpdateTime
+                                 - StartExecTime, EndExecTime: only set if not already set, StartExecTime
+                                   also sets the HeartBeatTime if not already set
+                                 - HeartBeatTime: set unconditionally
+
+        :param int chunkSize: maximum number of jobs updated by a single statement
+        :return: S_OK/S_ERROR
+        """
+        jobsUpdates = {int(jobID): update for jobID, update in jobsUpdates.items() if update}
+        if not jobsUpdates:
+            return S_OK()
+
+        # Escape all the values at once
+        values = []
+        for update in jobsUpdates.values():
+            for key, value in update.items():
+                if key == "ApplicationStatus":
+                    value = value[:255]
+                values.append(str(value))
+        result = self._escapeValues(values)
+        if not result["OK"]:
+            return result
+        escapedValues = iter(result["Value"])
+        escapedUpdates = {jobID: {key: next(escapedValues) for key in update} for jobID, update in jobsUpdates.items()}
+
+        def caseOf(column, jobIDs):
+            """CASE expression giving the new value of a column for the jobs updating it, NULL for the others"""
+            cases = " ".join(
+                f"WHEN {jobID} THEN {escapedUpdates[jobID][column]}"
+                for jobID in jobIDs
+                if column in escapedUpdates[jobID]
+            )
+            return f"CASE JobID {cases} END" if cases else None
+
+        cmdList = ["START TRANSACTION"]
+        for jobIDs in breakListIntoChunks(list(escapedUpdates), chunkSize):
+            assignments = []
+            for column in ("Status", "MinorStatus", "ApplicationStatus"):
+                case = caseOf(column, jobIDs)
+                if case:
+                    assignments.append(f"{column}=IFNULL({case}, {column})")
+            statusJobs = [
+                str(jobID)
+                for jobID in jobIDs
+                if {"Status", "MinorStatus", "ApplicationStatus"} & set(escapedUpdates[jobID])
+            ]
+            if statusJobs:
+                assignments.append(
+                    f"LastUpdateTime=IF(JobID IN ({','.join(statusJobs)}), UTC_TIMESTAMP(), LastUpdateTime)"
+                )
+            # The time stamps are only set if not already there, the HeartBeatTime given explicitly prevails
+            heartBeatTimes = [caseOf("HeartBeatTime", jobIDs), "HeartBeatTime"]
+            for column in ("StartExecTime", "EndExecTime"):
+                case = caseOf(column, jobIDs)
+                if case:
+                    assignments.append(f"{column}=IFNULL({column}, {case})")
+                    if column == "StartExecTime":
+                        heartBeatTimes.append(case)
+            heartBeatTimes = [expr for expr in heartBeatTimes if expr]
+            if len(heartBeatTimes) > 1:
+                assignments.append(f"HeartBeatTime=COALESCE({', '.join(heartBeatTimes)})")
+            if not assignments:
+                continue
+            cmdList.append(
+                f"UPDATE Jobs SET {', '.join(assignments)} WHERE JobID IN ({','.join(str(j) for j in jobIDs)})"
+            )
+
+        self.log.verbose("Setting the status of jobs", f"{len(jobsUpdates)} jobs in {len(cmdList) - 1} statements")
+        return self._transaction(cmdList)
+
     #############################################################################
     def setEndExecTime(self, jobID, endDate=None):
         """Set EndExecTime time stamp"""
@@ -883,6 +985,25 @@ class JobDB(DB):
             return S_OK(extractJDL(jdl[0][0]))
         return result
 
+    #############################################################################
+    def getJobsJDL(self, jobIDs, original=False):
+        """Get the JDLs of many jobs with a single query
+
+        :param list jobIDs: job IDs
+        :param bool original: get the original JDLs rather than the current ones
+        :return: S_OK({jobID: jdl})
+        """
+        if not jobIDs:
+            return S_OK({})
+
+        column = "OriginalJDL" if original else "JDL"
+        jobIDString = ",".join(str(int(jobID)) for jobID in jobIDs)
+        result = self._query(f"SELECT JobID,{column} FROM JobJDLs WHERE JobID IN ({jobIDString})")
+        if not result["OK"]:
+            return result
+
+        return S_OK({int(jobID): extractJDL(jdl) for jobID, jdl in result["Value"]})
+
     #############################################################################
     def insertNewJobIntoDB(
         self,
@@ -1008,6 +1129,174 @@ class JobDB(DB):
 
         return retVal
 
+    def insertNewJobsIntoDB(
+        self,
+        jdls,
+        owner,
+        ownerGroup,
+        initialStatus=JobStatus.RECEIVED,
+        initialMinorStatus="Job accepted",
+        chunkSize=1000,
+    ):
+        """Insert many jobs at once, e.g. the jobs generated from a parametric job.
+        Each job is checked and prepared as in insertNewJobIntoDB, but the rows of all the jobs are written
+        with multi-row statements: one insert per chunk of jobs to get the job IDs, then a single transaction
+        for the JobJDLs, Jobs, JobParameters and InputData rows.
+
+        :param list jdls: job description JDLs
+        :param str owner: job owner user name
+        :param str ownerGroup: job owner group
+        :param str initialStatus: optional initial job status (Received by default)
+        :param str initialMinorStatus: optional initial minor job status
+        :param int chunkSize: maximum number of rows inserted by a single statement
+        :return: S_OK(list) of dictionaries with the JobID, Status, MinorStatus and TimeStamp of each job,
+                 in the order of the JDLs
+        """
+        jobManifests = []
+        originalJDLs = []
+        for jdl in jdls:
+            result = checkAndAddOwner(jdl, owner, ownerGroup)
+            if not result["OK"]:
+                return result
+            jobManifests.append(result["Value"])
+            originalJDLs.append(compressJDL(fixJDL(jdl)))
+        if not jobManifests:
+            return S_OK([])
+
+        # 1.- Get the new job IDs: the rows of a chunk are marked, and their IDs read back, as they are
+        # not consecutive with auto_increment_increment > 1 or with concurrent inserts
+        result = self._escapeValues(originalJDLs)
+        if not result["OK"]:
+            return result
+        jobIDs = []
+        for jdlChunk in breakListIntoChunks(result["Value"], chunkSize):
+            marker = f"BulkInsert-{uuid.uuid4()}"
+            cmd = "INSERT INTO JobJDLs (JDL, JobRequirements, OriginalJDL) VALUES "
+            cmd += ",".join(f"('', '{marker}', {e_originalJDL})" for e_originalJDL in jdlChunk)
+            result = self._update(cmd)
+            if not result["OK"] or "lastRowId" not in result:
+                self.log.error("Can not insert new JDLs", result.get("Message", "no new job ID"))
+                self.__removeNewJDLs(jobIDs)
+                return S_ERROR(EWMSSUBM, "Failed to insert JDL in to DB")
+            # The IDs of the rows of a statement are increasing from the first one, in the order of the rows
+            chunkCondition = f"JobID >= {int(result['lastRowId'])} AND JobRequirements = '{marker}'"
+            result = self._query(
+                f"SELECT JobID FROM JobJDLs WHERE {chunkCondition} ORDER BY JobID LIMIT {len(jdlChunk)}"
+            )
+            if not result["OK"] or len(result["Value"]) != len(jdlChunk):
+                self.log.error("Can not get the new job IDs", result.get("Message", "missing job IDs"))
+                self._update(f"DELETE FROM JobJDLs WHERE {chunkCondition}")
+                self.__removeNewJDLs(jobIDs)
+                return S_ERROR(EWMSSUBM, "Failed to insert JDL in to DB")
+            jobIDs.extend(int(row[0]) for row in result["Value"])
+        self.log.info("JobDB: New JobIDs served", f"{jobIDs[0]}-{jobIDs[-1]}")
+
+        # 2.- Check and prepare the jobs
+        vo = getVOForGroup(ownerGroup)
+        jdlRows = []
+        jobsRows = {}
+        parameterRows = []
+        inputDataRows = []
+        retList = []
+        for jobID, jobManifest in zip(jobIDs, jobManifests):
+            jobAttrs = {
+                "JobID": jobID,
+                "LastUpdateTime": str(datetime.datetime.utcnow()),
+                "SubmissionTime": str(datetime.datetime.utcnow()),
+                "Owner": owner,
+                "OwnerGroup": ownerGroup,
+            }
+            jobManifest.setOption("JobID", jobID)
+            jobJDL = jobManifest.dumpAsJDL()
+            # Replace the JobID placeholder if any
+            if jobJDL.find("%j") != -1:
+                jobJDL = jobJDL.replace("%j", str(jobID))
+
+            classAdJob = ClassAd(jobJDL)
+            classAdReq = ClassAd("[]")
+            if not classAdJob.isOK():
+                jobAttrs["Status"] = JobStatus.FAILED
+                jobAttrs["MinorStatus"] = "Error in JDL syntax"
+                jobsRows.setdefault(tuple(jobAttrs), []).append(tuple(jobAttrs.values()))
+                retList.append({"JobID": jobID, "Status": JobStatus.FAILED, "MinorStatus": "Error in JDL syntax"})
+                continue
+
+            classAdJob.insertAttributeInt("JobID", jobID)
+            result = checkAndPrepareJob(jobID, classAdJob, classAdReq, owner, ownerGroup, jobAttrs, vo)
+            if not result["OK"]:
+                self.__removeNewJDLs(jobIDs)
+                return result
+
+            jobJDL = createJDLWithInitialStatus(
+                classAdJob, classAdReq, self.jdl2DBParameters, jobAttrs, initialStatus, initialMinorStatus
+            )
+            jdlRows.append((jobID, compressJDL(jobJDL)))
+            # The jobs with the same attributes are inserted together
+            jobsRows.setdefault(tuple(jobAttrs), []).append(tuple(jobAttrs.values()))
+
+            if classAdJob.lookupAttribute("Parameters"):
+                for name, value in classAdJob.getDictionaryFromSubJDL("Parameters").items():
+                    parameterRows.append((jobID, name, value))
+
+            if classAdJob.lookupAttribute("InputData"):
+                for lfn in classAdJob.getListFromExpression("InputData"):
+                    # some jobs are setting empty string as InputData
+                    if lfn:
+                        inputDataRows.append((jobID, lfn.strip()))
+
+            retList.append({"JobID": jobID, "Status": initialStatus, "MinorStatus": initialMinorStatus})
+
+        # 3.- Write everything in a single transaction
+        cmdList = ["START TRANSACTION"]
+        # The JDLs are set in the rows inserted above, and their marker removed (the jobs with a wrong JDL
+        # syntax keep an empty JDL): each update must change as many rows as it has jobs
+        result = self._escapeValues([jdl for _jobID, jdl in jdlRows])
+        if not result["OK"]:
+            self.__removeNewJDLs(jobIDs)
+            return result
+        e_jdls = dict(zip((jobID for jobID, _jdl in jdlRows), result["Value"]))
+        jdlUpdates = {}
+        for jobIDChunk in breakListIntoChunks(jobIDs, chunkSize):
+            cmd = "UPDATE JobJDLs SET JobRequirements = '', JDL = CASE JobID "
+            cmd += " ".join(f"WHEN {jobID} THEN {e_jdls[jobID]}" for jobID in jobIDChunk if jobID in e_jdls)
+            cmd += f" ELSE JDL END WHERE JobID IN ({','.join(str(jobID) for jobID in jobIDChunk)})"
+            jdlUpdates[len(cmdList)] = len(jobIDChunk)
+            cmdList.append(cmd)
+        for table, columns, rows in [
+            *[("Jobs", columns, rows) for columns, rows in jobsRows.items()],
+            ("JobParameters", ("JobID", "Name", "Value"), parameterRows),
+            ("InputData", ("JobID", "LFN"), inputDataRows),
+        ]:
+            result = self._escapeValues(rows)
+            if not result["OK"]:
+                self.__removeNewJDLs(jobIDs)
+                return result
+            for rowChunk in breakListIntoChunks(result["Value"], chunkSize):
+                cmdList.append(f"INSERT INTO {table} ({','.join(columns)}) VALUES {','.join(rowChunk)}")
+        result = self._transaction(cmdList)
+        if not result["OK"]:
+            self.log.error("Failed to insert the new jobs", result["Message"])
+            self.__removeNewJDLs(jobIDs)
+            return result
+        if any(result["Value"][index][1] != nJobs for index, nJobs in jdlUpdates.items()):
+            self.log.error("Failed to set the JDL of the new jobs", f"{jobIDs[0]}-{jobIDs[-1]}")
+            self.removeJobFromDB(jobIDs)
+            return S_ERROR(EWMSSUBM, "Failed to insert JDL in to DB")
+
+        timeStamp = str(datetime.datetime.utcnow())
+        for retDict in retList:
+            retDict["TimeStamp"] = timeStamp
+        return S_OK(retList)
+
+    def __removeNewJDLs(self, jobIDs):
+        """Remove the JDLs of the jobs which could not be inserted"""
+        for jobIDChunk in breakListIntoChunks(jobIDs, 1000):
+            result = self._update(
+                f"DELETE FROM JobJDLs WHERE JobID IN ({','.join(str(jobID) for jobID in jobIDChunk)})"
+            )
+            if not result["OK"]:
+                self.log.error("Failed to remove the JDLs of jobs not inserted", result["Message"])
+
     def __checkAndPrepareJob(self, jobID, classAdJob, classAdReq, owner, ownerGroup, jobAttrs, vo):
         """
         Check Consistency of Submitted JDL and set some defaults
@@ -1028,9 +1317,12 @@ class JobDB(DB):
         return S_OK()
 
     #############################################################################
-    def removeJobFromDB(self, jobIDs):
+    def removeJobFromDB(self, jobIDs, chunkSize=1000):
         """
         Remove jobs from the Job DB and clean up all the job related data in various tables
+
+        :param jobIDs: job ID or list of job IDs
+        :param int chunkSize: maximum number of jobs removed by a single statement
         """
 
         # ret = self._escapeString(jobID)
@@ -1047,20 +1339,24 @@ class JobDB(DB):
             jobIDList = jobIDs
 
         failedTablesList = []
-        for table in [
-            "InputData",
-            "JobParameters",
-            "AtticJobParameters",
-            "HeartBeatLoggingInfo",
-            "OptimizerParameters",
-            "JobCommands",
-            "Jobs",
-            "JobJDLs",
-        ]:
-            cmd = f"DELETE FROM {table} WHERE JobID in ({','.join(str(j) for j in jobIDList)})"
-            result = self._update(cmd)
-            if not result["OK"]:
-                failedTablesList.append(table)
+        for jobIDChunk in breakListIntoChunks(jobIDList, chunkSize):
+            jobIDString = ",".join(str(j) for j in jobIDChunk)
+            for table in [
+                "InputData",
+                "JobParameters",
+                "AtticJobParameters",
+                "HeartBeatLoggingInfo",
+                "OptimizerParameters",
+                "JobCommands",
+                "Jobs",
+                "JobJDLs",
+            ]:
+                if table in failedTablesList:
+                    continue
+                cmd = f"DELETE FROM {table} WHERE JobID in ({jobIDString})"
+                result = self._update(cmd)
+                if not result["OK"]:
+                    failedTablesList.append(table)
 
         result = S_OK()
         if failedTablesList:
@@ -1068,6 +1364,22 @@ class JobDB(DB):
 
         return result
 
+    #############################################################################
+    def hasJobsInRange(self, minJobID, maxJobID=None):
+        """Check if there are jobs with IDs in a given range
+
+        :param int minJobID: minimum job ID
+        :param int maxJobID: maximum job ID, None for no upper limit
+        :return: S_OK(bool)
+        """
+        cmd = f"SELECT JobID FROM Jobs WHERE JobID >= {int(minJobID)}"
+        if maxJobID is not None:
+            cmd += f" AND JobID <= {int(maxJobID)}"
+        result = self._query(cmd + " LIMIT 1")
+        if not result["OK"]:
+            return result
+        return S_OK(bool(result["Value"]))
+
     #############################################################################
     def rescheduleJob(self, jobID):
         """Reschedule the given job to run again from scratch. Retain the already
@@ -1476,60 +1788,84 @@ class JobDB(DB):
 
         return S_OK(resultDict)
 
+    #############################################################################
+    def getJobsCounters(self, attrList, condDict=None, newer=None, older=None, timeStamp="LastUpdateTime"):
+        """Count the jobs for each distinct combination of the attributes in attrList, like getCounters
+        on the Jobs table. The counts are taken from the JobsSummary table when the attributes and the
+        conditions allow it, without time conditions.
+
+        :param list attrList: job attributes
+        :param dict condDict: conditions on the job attributes
+        :param str newer: only count the jobs with timeStamp newer than this date
+        :param str older: only count the jobs with timeStamp older than this date
+        :param str timeStamp: time stamp attribute of the newer and older conditions
+        :return: S_OK(list of (attrDict, count))/S_ERROR
+        """
+        condDict = condDict or {}
+        condAttributes = []
+        for key in condDict:
+            condAttributes.extend(key if isinstance(key, tuple) else [key])
+        if (
+            not self.useJobsSummary
+            or newer
+            or older
+            or not set(attrList + condAttributes).issubset(self.jobsSummaryFields)
+        ):
+            return self.getCounters("Jobs", attrList, condDict, newer=newer, older=older, timeStamp=timeStamp)
+
+        try:
+            cond = self.buildCondition(condDict)
+        except Exception as excp:
+            return S_ERROR(DErrno.EMYSQL, excp)
+        attrNames = ", ".join(f"`{attr}`" for attr in attrList)
+        result = self._query(
+            f"SELECT {attrNames}, SUM(JobCount) FROM JobsSummary {cond} "
+            f"GROUP BY {attrNames} HAVING SUM(JobCount) > 0 ORDER BY {attrNames}"
+        )
+        if not result["OK"]:
+            return result
+        return S_OK([(dict(zip(attrList, row[:-1])), int(row[-1])) for row in result["Value"]])
+
+    def rebuildJobsSummary(self):
+        """Recompute the JobsSummary table from the Jobs table, e.g. after its creation on an existing DB
+
+        :return: S_OK/S_ERROR
+        """
+        fields = ", ".join(self.jobsSummaryFields)
+        return self._transaction(
+            [
+                "START TRANSACTION",
+                "DELETE FROM JobsSummary",
+                f"INSERT INTO JobsSummary ({fields}, JobCount, RescheduleSum) "
+                f"SELECT {fields}, COUNT(JobID), SUM(RescheduleCounter) FROM Jobs GROUP BY {fields}",
+            ]
+        )
+
     #############################################################################
     def getSiteSummary(self):
         """Get the summary of jobs in a given status on all the sites"""
 
-        waitingList = ['"Submitted"', '"Assigned"', '"Waiting"', '"Matched"']
-        waitingString = ",".join(waitingList)
+        waitingList = ["Submitted", "Assigned", JobStatus.WAITING, JobStatus.MATCHED]
+        statusList = [JobStatus.RUNNING, JobStatus.STALLED, JobStatus.DONE, JobStatus.FAILED]
 
-        result = self.getDistinctJobAttributes("Site")
+        result = self.getJobsCounters(["Site", "Status"])
         if not result["OK"]:
-            return result
+            return S_ERROR("Failed to get Site data from the JobDB")
 
-        siteList = result["Value"]
         siteDict = {}
-        totalDict = {
-            JobStatus.WAITING: 0,
-            JobStatus.RUNNING: 0,
-            JobStatus.STALLED: 0,
-            JobStatus.DONE: 0,
-            JobStatus.FAILED: 0,
-        }
-
-        for site in siteList:
+        totalDict = dict.fromkeys([JobStatus.WAITING] + statusList, 0)
+        for attrDict, count in result["Value"]:
+            site = attrDict["Site"]
             if site == "ANY":
                 continue
-            # Waiting
-            siteDict[site] = {}
-            ret = self._escapeString(site)
-            if not ret["OK"]:
-                return ret
-            e_site = ret["Value"]
-
-            req = f"SELECT COUNT(JobID) FROM Jobs WHERE Status IN ({waitingString}) AND Site={e_site}"
-            result = self._query(req)
-            if result["OK"]:
-                count = result["Value"][0][0]
-            else:
-                return S_ERROR("Failed to get Site data from the JobDB")
-            siteDict[site][JobStatus.WAITING] = count
-            totalDict[JobStatus.WAITING] += count
-            # Running,Stalled,Done,Failed
-            for status in [
-                f'"{JobStatus.RUNNING}"',
-                f'"{JobStatus.STALLED}"',
-                f'"{JobStatus.DONE}"',
-                f'"{JobStatus.FAILED}"',
-            ]:
-                req = f"SELECT COUNT(JobID) FROM Jobs WHERE Status={status} AND Site={e_site}"
-                result = self._query(req)
-                if result["OK"]:
-                    count = result["Value"][0][0]
-                else:
-                    return S_ERROR("Failed to get Site data from the JobDB")
-                siteDict[site][status.replace('"', "")] = count
-                totalDict[status.replace('"', "")] += count
+            siteCounters = siteDict.setdefault(site, dict.fromkeys(totalDict, 0))
+            status = attrDict["Status"]
+            if status in waitingList:
+                status = JobStatus.WAITING
+            elif status not in statusList:
+                continue
+            siteCounters[status] += count
+            totalDict[status] += count
 
         siteDict["Total"] = totalDict
         return S_OK(siteDict)
@@ -1734,6 +2070,76 @@ class JobDB(DB):
 
         return S_OK() if ok else S_ERROR("Failed to store some or all the parameters")
 
+    #####################################################################################
+    def setHeartBeatDataBulk(self, heartBeats):
+        """Add the heart beat data of several jobs to the database with a few bulk statements.
+        The jobs found Stalled or Matched are put back to Running
+
+        :param dict heartBeats: {jobID: [(receptionTime, dynamicDataDict)]}, the HeartBeatTime can be
+                                given in the dynamicDataDict, otherwise the reception time is used
+        """
+        if not heartBeats:
+            return S_OK()
+
+        heartBeatTimes = {}
+        logValues = []
+        for jobID, jobHeartBeats in heartBeats.items():
+            for receptionTime, dynamicDataDict in jobHeartBeats:
+                # The heart beats of a job are in reception order, the last one wins
+                heartBeatTimes[jobID] = str(dynamicDataDict.pop("HeartBeatTime", None) or receptionTime)
+                for key, value in dynamicDataDict.items():
+                    logValues.append((int(jobID), str(key), str(value), str(receptionTime)))
+
+        # Escape all the values at once
+        result = self._escapeValues(list(heartBeatTimes.values()))
+        if not result["OK"]:
+            return result
+        escapedTimes = dict(zip(heartBeatTimes, result["Value"]))
+        result = self._escapeValues([value for logValue in logValues for value in logValue[1:]])
+        if not result["OK"]:
+            return result
+        escapedLogValues = result["Value"]
+
+        jobIDString = ",".join(str(int(jobID)) for jobID in heartBeatTimes)
+        req = f"UPDATE Jobs SET Status='{JobStatus.RUNNING}', LastUpdateTime=UTC_TIMESTAMP() WHERE JobID IN ({jobIDString})"
+        req += f" AND Status IN ('{JobStatus.STALLED}','{JobStatus.MATCHED}')"
+        result = self._update(req)
+        if not result["OK"]:
+            return S_ERROR(f"Failed to restore the Running status: {result['Message']}")
+
+        cases = " ".join(f"WHEN {int(jobID)} THEN {hbTime}" for jobID, hbTime in escapedTimes.items())
+        result = self._update(f"UPDATE Jobs SET HeartBeatTime=CASE JobID {cases} END WHERE JobID IN ({jobIDString})")
+        if not result["OK"]:
+            return S_ERROR(f"Failed to set the heart beat time: {result['Message']}")
+
+        rows = []
+        for i, logValue in enumerate(logValues):
+            name, value, hbTime = escapedLogValues[3 * i : 3 * i + 3]
+            rows.append(f"({logValue[0]}, {name}, {value}, {hbTime})")
+        for rowChunk in breakListIntoChunks(rows, 1000):
+            req = "INSERT INTO HeartBeatLoggingInfo (JobID,Name,Value,HeartBeatTime) VALUES "
+            req += ",".join(rowChunk)
+            result = self._update(req)
+            if not result["OK"]:
+                self.log.warn("Error storing heart beat data", result["Message"])
+                return S_ERROR("Failed to store some or all the parameters")
+
+        return S_OK()
+
+    #####################################################################################
+    def getJobsWithCommands(self, status=JobStatus.RECEIVED):
+        """Get the IDs of the jobs having commands in the given status"""
+        ret = self._escapeString(status)
+        if not ret["OK"]:
+            return ret
+        status = ret["Value"]
+
+        result = self._query(f"SELECT DISTINCT JobID FROM JobCommands WHERE Status={status}")
+        if not result["OK"]:
+            return result
+
+        return S_OK([row[0] for row in result["Value"]])
+
     #####################################################################################
     def getHeartBeatData(self, jobID):
         """Retrieve the job's heart beat data"""
@@ -1752,10 +2158,38 @@ class JobDB(DB):
         result = []
         values = res["Value"]
         for row in values:
-            name, value, heartbeattime = row
-            if isinstance(value, bytes):
-                value = value.decode()
-            result.append((str(name), "%.01f" % (float(value.replace('"', ""))), str(heartbeattime)))
+            result.append(self.__formatHeartBeatRow(row))
+
+        return S_OK(result)
+
+    @staticmethod
+    def __formatHeartBeatRow(row):
+        """Format a (Name, Value, HeartBeatTime) row of the HeartBeatLoggingInfo table"""
+        name, value, heartbeattime = row
+        if isinstance(value, bytes):
+            value = value.decode()
+        return (str(name), "%.01f" % (float(value.replace('"', ""))), str(heartbeattime))
+
+    #####################################################################################
+    def getJobsHeartBeatData(self, jobIDs):
+        """Retrieve the heart beat data of many jobs with a single query
+
+        :param list jobIDs: job IDs
+        :return: S_OK({jobID: list}) with the data as returned by getHeartBeatData
+        """
+        if not jobIDs:
+            return S_OK({})
+
+        jobIDString = ",".join(str(int(jobID)) for jobID in jobIDs)
+        res = self._query(
+            f"SELECT JobID,Name,Value,HeartBeatTime from HeartBeatLoggingInfo WHERE JobID IN ({jobIDString})"
+        )
+        if not res["OK"]:
+            return res
+
+        result = {}
+        for row in res["Value"]:
+            result.setdefault(int(row[0]), []).append(self.__formatHeartBeatRow(row[1:]))
 
         return S_OK(result)
 
@@ -1831,12 +2265,54 @@ class JobDB(DB):
             requestedFields = ["Status", "MinorStatus", "Site", "Owner", "OwnerGroup", "JobGroup", "JobSplitType"]
         valueFields = ["COUNT(JobID)", "SUM(RescheduleCounter)"]
         defString = ", ".join(requestedFields)
-        valueString = ", ".join(valueFields)
-        result = self._query(f"SELECT {defString}, {valueString} FROM Jobs GROUP BY {defString}")
+        if self.useJobsSummary and set(requestedFields).issubset(self.jobsSummaryFields):
+            result = self._query(
+                f"SELECT {defString}, SUM(JobCount), SUM(RescheduleSum) FROM JobsSummary "
+                f"GROUP BY {defString} HAVING SUM(JobCount) > 0"
+            )
+        else:
+            valueString = ", ".join(valueFields)
+            result = self._query(f"SELECT {defString}, {valueString} FROM Jobs GROUP BY {defString}")
         if not result["OK"]:
             return result
         return S_OK(((requestedFields + valueFields), result["Value"]))
 
+    def __partitionHeartBeatLoggingInfo(self):
+        """Partition the HeartBeatLoggingInfo table by HeartBeatTime, or add the partitions of the next days.
+        Partitioned tables can't have foreign keys, so the one on the Jobs table is dropped first.
+        """
+        result = self._getTimePartitions("HeartBeatLoggingInfo")
+        if not result["OK"]:
+            return result
+        if result["Value"] is None:
+            result = self._query(
+                "SELECT CONSTRAINT_NAME FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'HeartBeatLoggingInfo' "
+                "AND CONSTRAINT_TYPE = 'FOREIGN KEY'"
+            )
+            if not result["OK"]:
+                return result
+            for (constraint,) in result["Value"]:
+                result = self._update(f"ALTER TABLE HeartBeatLoggingInfo DROP FOREIGN KEY `{constraint}`")
+                if not result["OK"]:
+                    return result
+        return self._partitionTableByTime("HeartBeatLoggingInfo", "HeartBeatTime", self.hbPartitionDays)
+
+    def dropHeartBeatLoggingInfoPartitions(self, delTime):
+        """Remove the HeartBeatLoggingInfo records older than a given time, for all the jobs, by dropping
+        the partitions of the table. Only for the table partitioned with HeartBeatLoggingInfoPartitionDays.
+
+        :param str delTime: time stamp, the partitions only holding older records are dropped
+        :returns: S_OK(list of dropped partitions)/S_ERROR
+        """
+        if self.hbPartitionDays <= 0:
+            return S_ERROR("HeartBeatLoggingInfo is not partitioned, see HeartBeatLoggingInfoPartitionDays")
+        # Create the partitions of the next days before dropping the old ones
+        result = self.__partitionHeartBeatLoggingInfo()
+        if not result["OK"]:
+            return result
+        return self._dropTimePartitions("HeartBeatLoggingInfo", delTime)
+
     def removeInfoFromHeartBeatLogging(self, status, delTime, maxLines):
         """Remove HeartBeatLoggingInfo from DB.
 
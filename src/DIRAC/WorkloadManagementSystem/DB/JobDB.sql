@@ -78,6 +78,49 @@ CREATE TABLE `Jobs` (
   KEY `LastUpdateTime` (`LastUpdateTime`)
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
 
+-- ------------------------------------------------------------------------------
+-- Number of jobs for each combination of the main job attributes, maintained by the
+-- triggers on the Jobs table below, so that the monitoring summaries don't scan the Jobs table.
+-- The triggers are single statements: the updates not changing these attributes are no-ops.
+DROP TABLE IF EXISTS `JobsSummary`;
+CREATE TABLE `JobsSummary` (
+  `Status` VARCHAR(32) NOT NULL,
+  `Site` VARCHAR(100) NOT NULL,
+  `Owner` VARCHAR(64) NOT NULL,
+  `OwnerGroup` VARCHAR(128) NOT NULL,
+  `JobGroup` VARCHAR(32) NOT NULL,
+  `JobType` VARCHAR(32) NOT NULL,
+  `JobCount` INT(11) NOT NULL DEFAULT 0,
+  `RescheduleSum` INT(11) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`Status`,`Site`,`Owner`,`OwnerGroup`,`JobGroup`,`JobType`)
+) ENGINE=InnoDB DEFAULT CHARSET=latin1;
+
+CREATE TRIGGER `JobsSummaryInsert` AFTER INSERT ON `Jobs` FOR EACH ROW
+  INSERT INTO `JobsSummary` (`Status`,`Site`,`Owner`,`OwnerGroup`,`JobGroup`,`JobType`,`JobCount`,`RescheduleSum`)
+  VALUES (NEW.`Status`,NEW.`Site`,NEW.`Owner`,NEW.`OwnerGroup`,NEW.`JobGroup`,NEW.`JobType`,1,NEW.`RescheduleCounter`)
+  ON DUPLICATE KEY UPDATE `JobCount`=`JobCount`+1, `RescheduleSum`=`RescheduleSum`+NEW.`RescheduleCounter`;
+
+CREATE TRIGGER `JobsSummaryDelete` AFTER DELETE ON `Jobs` FOR EACH ROW
+  UPDATE `JobsSummary` SET `JobCount`=`JobCount`-1, `RescheduleSum`=`RescheduleSum`-OLD.`RescheduleCounter`
+  WHERE `Status`=OLD.`Status` AND `Site`=OLD.`Site` AND `Owner`=OLD.`Owner` AND `OwnerGroup`=OLD.`OwnerGroup`
+    AND `JobGroup`=OLD.`JobGroup` AND `JobType`=OLD.`JobType`;
+
+CREATE TRIGGER `JobsSummaryUpdateOld` AFTER UPDATE ON `Jobs` FOR EACH ROW
+  UPDATE `JobsSummary` SET `JobCount`=`JobCount`-1, `RescheduleSum`=`RescheduleSum`-OLD.`RescheduleCounter`
+  WHERE `Status`=OLD.`Status` AND `Site`=OLD.`Site` AND `Owner`=OLD.`Owner` AND `OwnerGroup`=OLD.`OwnerGroup`
+    AND `JobGroup`=OLD.`JobGroup` AND `JobType`=OLD.`JobType`
+    AND (NOT OLD.`Status` <=> NEW.`Status` OR NOT OLD.`Site` <=> NEW.`Site` OR NOT OLD.`Owner` <=> NEW.`Owner`
+      OR NOT OLD.`OwnerGroup` <=> NEW.`OwnerGroup` OR NOT OLD.`JobGroup` <=> NEW.`JobGroup`
+      OR NOT OLD.`JobType` <=> NEW.`JobType` OR OLD.`RescheduleCounter` <> NEW.`RescheduleCounter`);
+
+CREATE TRIGGER `JobsSummaryUpdateNew` AFTER UPDATE ON `Jobs` FOR EACH ROW
+  INSERT INTO `JobsSummary` (`Status`,`Site`,`Owner`,`OwnerGroup`,`JobGroup`,`JobType`,`JobCount`,`RescheduleSum`)
+  SELECT NEW.`Status`,NEW.`Site`,NEW.`Owner`,NEW.`OwnerGroup`,NEW.`JobGroup`,NEW.`JobType`,1,NEW.`RescheduleCounter`
+  FROM DUAL WHERE (NOT OLD.`Status` <=> NEW.`Status` OR NOT OLD.`Site` <=> NEW.`Site` OR NOT OLD.`Owner` <=> NEW.`Owner`
+      OR NOT OLD.`OwnerGroup` <=> NEW.`OwnerGroup` OR NOT OLD.`JobGroup` <=> NEW.`JobGroup`
+      OR NOT OLD.`JobType` <=> NEW.`JobType` OR OLD.`RescheduleCounter` <> NEW.`RescheduleCounter`)
+  ON DUPLICATE KEY UPDATE `JobCount`=`JobCount`+1, `RescheduleSum`=`RescheduleSum`+NEW.`RescheduleCounter`;
+
 -- ------------------------------------------------------------------------------
 DROP TABLE IF EXISTS `InputData`;
 CREATE TABLE `InputData` (
@@ -2,15 +2,24 @@
     The following methods are provided
 
     addLoggingRecord()
+    addLoggingRecords()
     getJobLoggingInfo()
+    getJobsLoggingInfo()
     deleteJob()
     getWMSTimeStamps()
+    getWMSTimeStampsBulk()
+    dropLoggingInfoPartitions()
+
+    If the LoggingInfoPartitionDays option of the database is positive, the LoggingInfo table is partitioned
+    by StatusTime, with one partition per this number of days, so that the old records can be removed by
+    dropping partitions.
 """
 import datetime
 import time
 
 from DIRAC import S_OK, S_ERROR
 from DIRAC.Core.Utilities import TimeUtilities
+from DIRAC.Core.Utilities.List import breakListIntoChunks
 from DIRAC.Core.Base.DB import DB
 
 MAGIC_EPOC_NUMBER = 1270000000
@@ -26,6 +35,42 @@ class JobLoggingDB(DB):
 
         DB.__init__(self, "JobLoggingDB", "WorkloadManagement/JobLoggingDB", parentLogger=parentLogger)
 
+        self.partitionDays = self.getCSOption("LoggingInfoPartitionDays", 0)
+        if self.partitionDays > 0:
+            result = self.__partitionLoggingInfo()
+            if not result["OK"]:
+                self.log.warn("Failed to partition the LoggingInfo table", result["Message"])
+
+    def __partitionLoggingInfo(self):
+        """Partition the LoggingInfo table by StatusTime, or add the partitions of the next days.
+        The partitioning column has to be part of the primary key, which is extended first.
+        """
+        result = self._getTimePartitions("LoggingInfo")
+        if not result["OK"]:
+            return result
+        if result["Value"] is None:
+            result = self._update(
+                "ALTER TABLE LoggingInfo DROP PRIMARY KEY, ADD PRIMARY KEY (JobID, SeqNum, StatusTime)"
+            )
+            if not result["OK"]:
+                return result
+        return self._partitionTableByTime("LoggingInfo", "StatusTime", self.partitionDays)
+
+    def dropLoggingInfoPartitions(self, delTime):
+        """Remove the LoggingInfo records older than a given time, for all the jobs, by dropping
+        the partitions of the table. Only for the table partitioned with LoggingInfoPartitionDays.
+
+        :param str delTime: time stamp, the partitions only holding older records are dropped
+        :returns: S_OK(list of dropped partitions)/S_ERROR
+        """
+        if self.partitionDays <= 0:
+            return S_ERROR("LoggingInfo is not partitioned, see LoggingInfoPartitionDays")
+        # Create the partitions of the next days before dropping the old ones
+        result = self.__partitionLoggingInfo()
+        if not result["OK"]:
+            return result
+        return self._dropTimePartitions("LoggingInfo", delTime)
+
     #############################################################################
     def addLoggingRecord(
         self,
@@ -47,6 +92,22 @@ class JobLoggingDB(DB):
         event = f"status/minor/app={status}/{minorStatus}/{applicationStatus}"
         self.log.info("Adding record for job ", str(jobID) + ": '" + event + "' from " + source)
 
+        _date, epoc = self.__getDateAndEpoc(date)
+
+        cmd = (
+            "INSERT INTO LoggingInfo (JobId, Status, MinorStatus, ApplicationStatus, "
+            + "StatusTime, StatusTimeOrder, StatusSource) VALUES (%d,'%s','%s','%s','%s',%f,'%s')"
+            % (int(jobID), status, minorStatus, applicationStatus[:255], str(_date), epoc, source[:32])
+        )
+
+        return self._update(cmd)
+
+    def __getDateAndEpoc(self, date):
+        """Get the datetime of a logging record and its StatusTimeOrder value
+
+        :param date: None (current UTC time), string in UTC or datetime.datetime object
+        :return: tuple (datetime.datetime, float)
+        """
         try:
             if not date:
                 # Make the UTC datetime string and float
@@ -63,14 +124,48 @@ class JobLoggingDB(DB):
             self.log.exception("Exception while date evaluation")
             _date = datetime.datetime.utcnow()
         epoc = time.mktime(_date.timetuple()) + _date.microsecond / 1000000.0 - MAGIC_EPOC_NUMBER
+        return _date, epoc
 
-        cmd = (
-            "INSERT INTO LoggingInfo (JobId, Status, MinorStatus, ApplicationStatus, "
-            + "StatusTime, StatusTimeOrder, StatusSource) VALUES (%d,'%s','%s','%s','%s',%f,'%s')"
-            % (int(jobID), status, minorStatus, applicationStatus[:255], str(_date), epoc, source[:32])
-        )
+    #############################################################################
+    def addLoggingRecords(self, records, chunkSize=1000):
+        """Add many entries to the LoggingInfo table with multi-row inserts executed in a single transaction
 
-        return self._update(cmd)
+        :param list records: list of dictionaries with the JobID and optionally the Status, MinorStatus,
+                             ApplicationStatus, Date and Source keys, with the same meaning as the
+                             arguments of addLoggingRecord
+        :param int chunkSize: maximum number of rows inserted by a single statement
+        :return: S_OK/S_ERROR
+        """
+        if not records:
+            return S_OK()
+
+        rows = []
+        for record in records:
+            _date, epoc = self.__getDateAndEpoc(record.get("Date"))
+            rows.append(
+                (
+                    int(record["JobID"]),
+                    record.get("Status", "idem"),
+                    record.get("MinorStatus", "idem"),
+                    record.get("ApplicationStatus", "idem")[:255],
+                    str(_date),
+                    "%f" % epoc,
+                    record.get("Source", "Unknown")[:32],
+                )
+            )
+        result = self._escapeValues(rows)
+        if not result["OK"]:
+            return result
+        escapedRows = result["Value"]
+
+        cmdList = ["START TRANSACTION"]
+        for chunk in breakListIntoChunks(escapedRows, chunkSize):
+            cmdList.append(
+                "INSERT INTO LoggingInfo (JobId, Status, MinorStatus, ApplicationStatus, "
+                "StatusTime, StatusTimeOrder, StatusSource) VALUES %s" % ",".join(chunk)
+            )
+        self.log.verbose("Adding logging records", f"{len(rows)} records in {len(cmdList) - 1} statements")
+        return self._transaction(cmdList)
 
     #############################################################################
     def getJobLoggingInfo(self, jobID):
@@ -89,11 +184,20 @@ class JobLoggingDB(DB):
         if result["OK"] and not result["Value"]:
             return S_ERROR("No Logging information for job %d" % int(jobID))
 
+        return S_OK(self.__resolveIdem(result["Value"]))
+
+    @staticmethod
+    def __resolveIdem(rows):
+        """Replace the 'idem' statuses of the logging records of a job by the previous values
+
+        :param rows: Status,MinorStatus,ApplicationStatus,StatusTime,StatusSource rows in historical order
+        :return: list of tuples
+        """
         return_value = []
-        status, minor, app = result["Value"][0][:3]
+        status, minor, app = rows[0][:3]
         if app == "idem":
             app = "Unknown"
-        for row in result["Value"]:
+        for row in rows:
             if row[0] != "idem":
                 status = row[0]
             if row[1] != "idem":
@@ -101,8 +205,32 @@ class JobLoggingDB(DB):
             if row[2] != "idem":
                 app = row[2]
             return_value.append((status, minor, app, str(row[3]), row[4]))
+        return return_value
+
+    #############################################################################
+    def getJobsLoggingInfo(self, jobIDs):
+        """Get the logging records of many jobs with a single query
 
-        return S_OK(return_value)
+        :param list jobIDs: job IDs
+        :return: S_OK({jobID: list}) with the records as returned by getJobLoggingInfo.
+                 Jobs without logging information are not in the result
+        """
+        if not jobIDs:
+            return S_OK({})
+
+        cmd = (
+            "SELECT JobID,Status,MinorStatus,ApplicationStatus,StatusTime,StatusSource FROM LoggingInfo"
+            " WHERE JobID IN (%s) ORDER BY JobID,StatusTimeOrder,StatusTime"
+            % ",".join(str(int(jobID)) for jobID in jobIDs)
+        )
+        result = self._query(cmd)
+        if not result["OK"]:
+            return result
+
+        rowsPerJob = {}
+        for row in result["Value"]:
+            rowsPerJob.setdefault(int(row[0]), []).append(row[1:])
+        return S_OK({jobID: self.__resolveIdem(rows) for jobID, rows in rowsPerJob.items()})
 
     #############################################################################
     def deleteJob(self, jobID):
@@ -150,3 +278,36 @@ class JobLoggingDB(DB):
             result["LastTime"] = "Unknown"
 
         return S_OK(result)
+
+    #############################################################################
+    def getWMSTimeStampsBulk(self, jobIDs):
+        """Get TimeStamps for the MajorState transitions of many jobs with two queries
+
+        :param list jobIDs: job IDs
+        :return: S_OK({jobID: {State: timestamp, "LastTime": time}}), like getWMSTimeStamps for each job.
+                 Jobs without logging information are not in the result
+        """
+        result = {}
+        if not jobIDs:
+            return S_OK(result)
+        jobList = ",".join(str(int(jobID)) for jobID in jobIDs)
+
+        cmd = f"SELECT JobID,Status,StatusTimeOrder FROM LoggingInfo WHERE JobID IN ({jobList})"
+        resCmd = self._query(cmd)
+        if not resCmd["OK"]:
+            return resCmd
+        for jobID, event, etime in resCmd["Value"]:
+            result.setdefault(int(jobID), {})[event] = str(etime + MAGIC_EPOC_NUMBER)
+
+        # Get last date and time
+        cmd = f"SELECT JobID,MAX(StatusTime) FROM LoggingInfo WHERE JobID IN ({jobList}) GROUP BY JobID"
+        resCmd = self._query(cmd)
+        if not resCmd["OK"]:
+            return resCmd
+        for jobID, lastTime in resCmd["Value"]:
+            if int(jobID) in result:
+                result[int(jobID)]["LastTime"] = str(lastTime)
+        for timeStamps in result.values():
+            timeStamps.setdefault("LastTime", "Unknown")
+
+        return S_OK(result)
@@ -6,6 +6,7 @@
     Available methods are:
 
     addPilotTQReference()
+    addPilotTQReferences()
     setPilotStatus()
     deletePilot()
     clearPilots()
@@ -13,6 +14,7 @@
     storePilotOutput()
     getPilotOutput()
     setJobForPilot()
+    setJobsForPilots()
     getPilotsSummary()
     getGroupedPilotSummary()
 
@@ -31,6 +33,9 @@ from DIRAC.Core.Utilities.MySQL import _quotedList
 from DIRAC.ResourceStatusSystem.Client.SiteStatus import SiteStatus
 from DIRAC.WorkloadManagementSystem.Client import PilotStatus
 
+# Maximum number of rows inserted by a single statement
+BULK_SIZE = 1000
+
 
 class PilotAgentsDB(DB):
     def __init__(self, parentLogger=None):
@@ -42,24 +47,74 @@ class PilotAgentsDB(DB):
         self, pilotRef, taskQueueID, ownerDN, ownerGroup, broker="Unknown", gridType="DIRAC", pilotStampDict={}
     ):
         """Add a new pilot job reference"""
+        return self.addPilotTQReferences(
+            {ref: taskQueueID for ref in pilotRef}, ownerDN, ownerGroup, broker, gridType, pilotStampDict
+        )
 
-        err = "PilotAgentsDB.addPilotTQReference: Failed to retrieve a new Id."
+    def addPilotTQReferences(
+        self,
+        pilotRefTQDict,
+        ownerDN,
+        ownerGroup,
+        broker="Unknown",
+        gridType="DIRAC",
+        pilotStampDict={},
+        destination=None,
+        gridSite=None,
+        queue=None,
+        statusReason=None,
+    ):
+        """Add new pilot job references, each with its TaskQueue, inserting them by bulks
+
+        :param dict pilotRefTQDict: TaskQueueID per pilot reference
+        :param str ownerDN: DN of the owner of the pilots
+        :param str ownerGroup: group of the owner of the pilots
+        :param str broker: broker (host) which submitted the pilots
+        :param str gridType: type of the CE the pilots were submitted to
+        :param dict pilotStampDict: stamp per pilot reference
+        :param str destination: CE the pilots were submitted to
+        :param str gridSite: site of the CE
+        :param str queue: queue the pilots were submitted to
+        :param str statusReason: reason of the Submitted status
+
+        :return: S_OK/S_ERROR
+        """
 
-        for ref in pilotRef:
-            stamp = ""
-            if ref in pilotStampDict:
-                stamp = pilotStampDict[ref]
+        err = "PilotAgentsDB.addPilotTQReferences: Failed to retrieve a new Id."
 
-            res = self._escapeString(ownerDN)
-            if not res["OK"]:
-                return res
-            escapedOwnerDN = res["Value"]
+        res = self._escapeString(ownerDN)
+        if not res["OK"]:
+            return res
+        escapedOwnerDN = res["Value"]
+
+        columns = ["DestinationSite", "GridSite", "Queue", "StatusReason"]
+        values = [destination, gridSite, queue, statusReason]
+        optionalColumns = "".join(f", {column}" for column, value in zip(columns, values) if value)
+        optionalValues = "".join(f",'{value}'" for value in values if value)
+
+        pilotRefs = list(pilotRefTQDict)
+        for i in range(0, len(pilotRefs), BULK_SIZE):
+            rows = []
+            for ref in pilotRefs[i : i + BULK_SIZE]:
+                stamp = pilotStampDict.get(ref, "")
+                rows.append(
+                    "('%s',%d,%s,'%s','%s','%s',UTC_TIMESTAMP(),UTC_TIMESTAMP(),'Submitted','%s'%s)"
+                    % (
+                        ref,
+                        int(pilotRefTQDict[ref]),
+                        escapedOwnerDN,
+                        ownerGroup,
+                        broker,
+                        gridType,
+                        stamp,
+                        optionalValues,
+                    )
+                )
 
             req = (
                 "INSERT INTO PilotAgents( PilotJobReference, TaskQueueID, OwnerDN, "
-                + "OwnerGroup, Broker, GridType, SubmissionTime, LastUpdateTime, Status, PilotStamp ) "
-                + "VALUES ('%s',%d,%s,'%s','%s','%s',UTC_TIMESTAMP(),UTC_TIMESTAMP(),'Submitted','%s')"
-                % (ref, int(taskQueueID), escapedOwnerDN, ownerGroup, broker, gridType, stamp)
+                + "OwnerGroup, Broker, GridType, SubmissionTime, LastUpdateTime, Status, PilotStamp"
+                + f"{optionalColumns} ) VALUES {','.join(rows)}"
             )
 
             result = self._update(req)
@@ -85,7 +140,13 @@ class PilotAgentsDB(DB):
         updateTime=None,
         conn=False,
     ):
-        """Set pilot job status"""
+        """Set pilot job status
+
+        :param pilotRef: pilot reference, or list of pilot references which get the same status
+        :type pilotRef: str or list
+        """
+        if not isinstance(pilotRef, str) and not pilotRef:
+            return S_OK()
 
         setList = []
         setList.append(f"Status='{status}'")
@@ -112,27 +173,13 @@ class PilotAgentsDB(DB):
                     setList.append(f"GridSite='{res['Value'][destination]}'")
 
         set_string = ",".join(setList)
-        req = f"UPDATE PilotAgents SET {set_string} WHERE PilotJobReference='{pilotRef}'"
+        if isinstance(pilotRef, str):
+            req = f"UPDATE PilotAgents SET {set_string} WHERE PilotJobReference='{pilotRef}'"
+        else:
+            refString = ",".join(["'" + ref + "'" for ref in pilotRef])
+            req = f"UPDATE PilotAgents SET {set_string} WHERE PilotJobReference in ( {refString} )"
         return self._update(req, conn=conn)
 
-    # ###########################################################################################
-    # FIXME: this can't work ATM because of how the DB table is made. Maybe it would be useful later.
-    #   def setPilotStatusBulk(self, pilotRefsStatusDict=None, statusReason=None,
-    #                          conn=False):
-    #     """ Set pilot job status in a bulk
-    #     """
-    #     if not pilotRefsStatusDict:
-    #       return S_OK()
-
-    #     # Building the request with "ON DUPLICATE KEY UPDATE"
-    #     reqBase = "INSERT INTO PilotAgents (PilotJobReference, Status, StatusReason) VALUES "
-
-    #     for pilotJobReference, status in pilotRefsStatusDict.items():
-    #       req = reqBase + ','.join("('%s', '%s', '%s')" % (pilotJobReference, status, statusReason))
-    #       req += " ON DUPLICATE KEY UPDATE Status=VALUES(Status),StatusReason=VALUES(StatusReason)"
-
-    #     return self._update(req, conn=conn)
-
     ##########################################################################################
     def selectPilots(
         self, condDict, older=None, newer=None, timeStamp="SubmissionTime", orderAttribute=None, limit=None
@@ -452,6 +499,56 @@ AND SubmissionTime < DATE_SUB(UTC_TIMESTAMP(),INTERVAL %d DAY)"
             return self._update(req)
         return S_ERROR(f"PilotJobReference {pilotRef} not found")
 
+    ##########################################################################################
+    def setJobsForPilots(self, jobPilotList, updateCurrentJob=True):
+        """Store the jobIDs of the jobs executed by pilots, with bulk statements
+
+        :param list jobPilotList: list of (jobID, pilotRef) tuples
+        :param bool updateCurrentJob: also set the jobs as the current ones of the pilots
+        :return: S_OK/S_ERROR
+        """
+        if not jobPilotList:
+            return S_OK()
+
+        # The jobs are inserted in rounds with at most one job per pilot each, the pilot IDs being looked up
+        # within the statement: the n-th round inserts the n-th job of each pilot
+        jobsPerPilot = {}
+        for jobID, pilotRef in jobPilotList:
+            jobsPerPilot.setdefault(pilotRef, []).append(int(jobID))
+        for jobRound in range(max(len(jobIDs) for jobIDs in jobsPerPilot.values())):
+            roundJobs = {ref: jobIDs[jobRound] for ref, jobIDs in jobsPerPilot.items() if len(jobIDs) > jobRound}
+            for i in range(0, len(roundJobs), BULK_SIZE):
+                refs = list(roundJobs)[i : i + BULK_SIZE]
+                refString = ",".join(["'" + ref + "'" for ref in refs])
+                jobCase = " ".join("WHEN '%s' THEN %d" % (ref, roundJobs[ref]) for ref in refs)
+                req = (
+                    "INSERT INTO JobToPilotMapping (PilotID,JobID,StartTime) "
+                    f"SELECT PilotID, CASE PilotJobReference {jobCase} END, UTC_TIMESTAMP() FROM PilotAgents "
+                    f"WHERE PilotJobReference in ( {refString} )"
+                )
+                result = self._update(req)
+                if not result["OK"]:
+                    return result
+                if result["Value"] < len(refs):
+                    self.log.warn("Some pilots were not found", f"among {refString}")
+
+        if updateCurrentJob:
+            refs = list(jobsPerPilot)
+            for i in range(0, len(refs), BULK_SIZE):
+                refString = ",".join(["'" + ref + "'" for ref in refs[i : i + BULK_SIZE]])
+                jobCase = " ".join(
+                    "WHEN '%s' THEN %d" % (ref, jobsPerPilot[ref][-1]) for ref in refs[i : i + BULK_SIZE]
+                )
+                req = (
+                    f"UPDATE PilotAgents SET CurrentJobID = CASE PilotJobReference {jobCase} END "
+                    f"WHERE PilotJobReference in ( {refString} )"
+                )
+                result = self._update(req)
+                if not result["OK"]:
+                    return result
+
+        return S_OK()
+
     ##########################################################################################
     def setCurrentJobID(self, pilotRef, jobID):
         """Set the pilot agent current DIRAC job ID"""
@@ -902,6 +902,39 @@ WHERE j.JobId = %s AND t.TQId = j.TQId"
         self.__deleteTQWithDelay.add(tqId, 300, (tqId, tqOwner, tqOwnerGroup))
         return S_OK(True)
 
+    def deleteJobs(self, jobIds, connObj=False):
+        """
+        Delete many jobs from the task queues with a single statement
+        Return S_OK( number of deleted jobs ) / S_ERROR
+        """
+        if not jobIds:
+            return S_OK(0)
+        if not connObj:
+            retVal = self._getConnection()
+            if not retVal["OK"]:
+                return S_ERROR(f"Can't delete jobs: {retVal['Message']}")
+            connObj = retVal["Value"]
+        jobIdString = ",".join(str(int(jobId)) for jobId in jobIds)
+        retVal = self._query(
+            "SELECT DISTINCT t.TQId, t.Owner, t.OwnerGroup \
+FROM `tq_TaskQueues` t, `tq_Jobs` j \
+WHERE j.JobId IN (%s) AND t.TQId = j.TQId"
+            % jobIdString,
+            conn=connObj,
+        )
+        if not retVal["OK"]:
+            return S_ERROR(f"Could not get jobs from task queues: {retVal['Message']}")
+        taskQueues = retVal["Value"]
+        if not taskQueues:
+            return S_OK(0)
+        self.log.verbose("Deleting jobs", f"(n={len(jobIds)})")
+        retVal = self._update(f"DELETE FROM `tq_Jobs` WHERE JobId IN ({jobIdString})", conn=connObj)
+        if not retVal["OK"]:
+            return S_ERROR(f"Could not delete jobs from task queues: {retVal['Message']}")
+        for tqId, tqOwner, tqOwnerGroup in taskQueues:
+            self.__deleteTQWithDelay.add(tqId, 300, (tqId, tqOwner, tqOwnerGroup))
+        return S_OK(retVal["Value"])
+
     def getTaskQueueForJob(self, jobId, connObj=False):
         """
         Return TaskQueue for a given Job
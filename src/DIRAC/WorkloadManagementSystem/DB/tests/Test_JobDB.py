@@ -36,3 +36,35 @@ def test_getInputData(jobDB: JobDB):
     # Assert
     assert res["OK"], res["Message"]
     assert res["Value"] == ["/vo/user/lfn1", "/vo/user/lfn2"]
+
+
+@pytest.mark.parametrize("jdlRowsUpdated, expectedOK", [(2, True), (1, False)])
+def test_insertNewJobsIntoDB(jobDB: JobDB, jdlRowsUpdated, expectedOK):
+    """The IDs of the new jobs are read back, and their JDL set by an update of the rows inserted"""
+    # Arrange
+    jobManifest = MagicMock()
+    jobManifest.dumpAsJDL.return_value = '[Executable = "/bin/echo"; JobName = "test";]'
+    jobDB._escapeValues = lambda values: S_OK([f"'{value}'" for value in values])
+    jobDB._update = MagicMock(return_value={"OK": True, "Value": 2, "lastRowId": 10})
+    # IDs allocated with auto_increment_increment = 2
+    jobDB._query = MagicMock(return_value=S_OK(((10,), (12,))))
+    jobDB._transaction = MagicMock(side_effect=lambda cmdList: S_OK([(cmd, jdlRowsUpdated) for cmd in cmdList]))
+    jobDB.removeJobFromDB = MagicMock(return_value=S_OK())
+    jobDB.jdl2DBParameters = []
+
+    # Act
+    with patch("DIRAC.WorkloadManagementSystem.DB.JobDB.checkAndAddOwner", return_value=S_OK(jobManifest)), patch(
+        "DIRAC.WorkloadManagementSystem.DB.JobDB.checkAndPrepareJob", return_value=S_OK()
+    ), patch("DIRAC.WorkloadManagementSystem.DB.JobDB.createJDLWithInitialStatus", return_value="JDL"):
+        res = jobDB.insertNewJobsIntoDB(["[]", "[]"], "owner", "ownerGroup")
+
+    # Assert
+    updateCmd = jobDB._transaction.call_args[0][0][1]
+    assert updateCmd.startswith("UPDATE JobJDLs")
+    assert "WHEN 10 THEN" in updateCmd and "WHEN 12 THEN" in updateCmd
+    assert res["OK"] is expectedOK
+    if expectedOK:
+        assert [retDict["JobID"] for retDict in res["Value"]] == [10, 12]
+        jobDB.removeJobFromDB.assert_not_called()
+    else:
+        jobDB.removeJobFromDB.assert_called_once_with([10, 12])
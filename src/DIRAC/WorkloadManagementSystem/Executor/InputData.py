@@ -1,11 +1,16 @@
 """
   The InputData Optimizer Executor queries the file catalog for specified job input data and adds the
   relevant information to the job optimizer parameters to be used during the scheduling decision.
+
+  When the executor processes several jobs in parallel (MaxTasks > 1) and BatchWindow is set, the catalog
+  lookups of the jobs processed at the same time are merged into single bulk queries, and the
+  SE to site and SE status mappings are cached for all the jobs.
 """
 import pprint
 import time
 
 from DIRAC import S_OK, S_ERROR
+from DIRAC.Core.Utilities.DictCache import DictCache
 from DIRAC.Core.Utilities.Proxy import executeWithUserProxy
 from DIRAC.ConfigurationSystem.Client.Helpers.Operations import Operations
 from DIRAC.Resources.Storage.StorageElement import StorageElement
@@ -14,6 +19,7 @@ from DIRAC.DataManagementSystem.Utilities.DMSHelpers import DMSHelpers
 from DIRAC.DataManagementSystem.Client.DataManager import DataManager
 from DIRAC.WorkloadManagementSystem.Executor.Base.OptimizerExecutor import OptimizerExecutor
 from DIRAC.WorkloadManagementSystem.Client import JobMinorStatus
+from DIRAC.WorkloadManagementSystem.Utilities.LookupBatcher import LookupBatcher
 
 
 class InputData(OptimizerExecutor):
@@ -23,10 +29,13 @@ class InputData(OptimizerExecutor):
       - optimizeJob() - the main method called for each job
     """
 
-    def __init__(self) -> None:
-        self.__lastCacheUpdate = 0
-        self.__cacheLifeTime = 600
-        super().__init__()
+    # SE to sites and SE status mappings, shared by all the jobs
+    __cacheLifeTime = 600
+    __SEToSiteCache = DictCache()
+    __SEStatusCache = DictCache()
+    # No batching of the catalog lookups unless configured
+    __replicasBatcher = LookupBatcher(0)
+    __metadataBatcher = LookupBatcher(0)
 
     @classmethod
     def initializeOptimizer(cls):
@@ -39,9 +48,13 @@ class InputData(OptimizerExecutor):
 
         cls.__dataManDict = {}
         cls.__fcDict = {}
-        cls.__SEToSiteMap = {}
-        cls.__lastCacheUpdate = 0
-        cls.__cacheLifeTime = 600
+        cls.__cacheLifeTime = cls.ex_getOption("SECacheLifeTime", 600)
+        # Merge the catalog lookups of the jobs processed concurrently. Not possible with the user proxies,
+        # which are applied one job at a time
+        batchWindow = 0 if cls.checkWithUserProxy else cls.ex_getOption("BatchWindow", 0.0)
+        batchMaxLFNs = cls.ex_getOption("BatchMaxLFNs", 10000)
+        cls.__replicasBatcher = LookupBatcher(batchWindow, batchMaxLFNs, parentLogger=cls.log)
+        cls.__metadataBatcher = LookupBatcher(batchWindow, batchMaxLFNs, parentLogger=cls.log)
 
         # Note: this is a default, that right now is generically the default for user jobs, at least for main DIRAC users
         # (since this now doesn't run for production jobs)
@@ -206,7 +219,7 @@ class InputData(OptimizerExecutor):
         else:
             # This will return already active replicas, excluding banned SEs, and
             # removing tape replicas if there are disk replicas
-            result = dm.getReplicasForJobs(lfns)
+            result = self.__replicasBatcher.lookup(vo, lfns, dm.getReplicasForJobs)
         self.jobLog.verbose("Catalog replicas lookup time", f"{time.time() - startTime:.2f} seconds ")
         if not result["OK"]:
             self.log.warn(result["Message"])
@@ -239,7 +252,7 @@ class InputData(OptimizerExecutor):
             if fc is None:
                 return S_ERROR(f"Failed to instantiate FileCatalog for vo {vo}")
             else:
-                guidDict = fc.getFileMetadata(lfns)
+                guidDict = self.__metadataBatcher.lookup(vo, lfns, fc.getFileMetadata)
             self.jobLog.info("Catalog Metadata Lookup Time", f"{time.time() - startTime:.2f} seconds ")
 
             if not guidDict["OK"]:
@@ -301,21 +314,26 @@ class InputData(OptimizerExecutor):
         """Returns a list of sites having the given SE as a local one.
         Uses the local cache of the site-se information
         """
-
-        # Empty the cache if too old
-        now = time.time()
-        if (now - self.__lastCacheUpdate) > self.__cacheLifeTime:
-            self.log.verbose("Resetting the SE to site mapping cache")
-            self.__SEToSiteMap = {}
-            self.__lastCacheUpdate = now
-
-        if seName not in self.__SEToSiteMap:
+        siteList = self.__SEToSiteCache.get(seName)
+        if siteList is None:
             result = DMSHelpers().getSitesForSE(seName)
             if not result["OK"]:
                 self.jobLog.error("Failed to get site for SE", result["Message"])
                 return result
-            self.__SEToSiteMap[seName] = list(result["Value"])
-        return S_OK(self.__SEToSiteMap[seName])
+            siteList = list(result["Value"])
+            self.__SEToSiteCache.add(seName, self.__cacheLifeTime, siteList)
+        return S_OK(siteList)
+
+    def __getSEStatus(self, seName, vo):
+        """Returns the status of an SE, from the local cache if possible"""
+        seStatus = self.__SEStatusCache.get((seName, vo))
+        if seStatus is None:
+            result = StorageElement(seName, vo=vo).getStatus()
+            if not result["OK"]:
+                return result
+            seStatus = result["Value"]
+            self.__SEStatusCache.add((seName, vo), self.__cacheLifeTime, seStatus)
+        return S_OK(seStatus)
 
     #############################################################################
     def _getSiteCandidates(self, okReplicas, vo):
@@ -364,8 +382,7 @@ class InputData(OptimizerExecutor):
                         self.jobLog.warn("Could not get sites for SE", f"{seName}: {result['Message']}")
                         continue
                     siteList = result["Value"]
-                    seObj = StorageElement(seName, vo=vo)
-                    result = seObj.getStatus()
+                    result = self.__getSEStatus(seName, vo)
                     if not result["OK"]:
                         self.jobLog.error("Failed to get SE status", result["Message"])
                         return result
@@ -416,7 +433,7 @@ class InputData(OptimizerExecutor):
         # This will return already active replicas, excluding banned SEs, and
         # removing tape replicas if there are disk replicas
 
-        result = dm.getReplicasForJobs(inputSandbox)
+        result = self.__replicasBatcher.lookup(vo, inputSandbox, dm.getReplicasForJobs)
         self.jobLog.verbose("Catalog replicas lookup time", f"{time.time() - startTime:.2f} seconds ")
         if not result["OK"]:
             self.log.warn(result["Message"])
@@ -185,6 +185,9 @@ def test__getSiteCandidates(mocker, okReplicas, getSitesForSE_RV, storageGetStat
 
     inputData = InputData()
     inputData.log = gLogger
+    # The SE information is cached across the jobs
+    inputData._InputData__SEToSiteCache.purgeAll()
+    inputData._InputData__SEStatusCache.purgeAll()
     # inputData.jobLog = gLogger
     res = inputData._getSiteCandidates(okReplicas, "vo")
     assert res["OK"] is expectedRes
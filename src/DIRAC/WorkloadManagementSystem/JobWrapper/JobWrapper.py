@@ -31,7 +31,6 @@ from DIRAC.ConfigurationSystem.Client.Helpers.Operations import Operations
 from DIRAC.ConfigurationSystem.Client.Helpers.Registry import getVOForGroup
 from DIRAC.ConfigurationSystem.Client.PathFinder import getSystemSection
 from DIRAC.Core.Utilities import DEncode, DErrno, List
-from DIRAC.Core.Utilities.Adler import fileAdler
 from DIRAC.Core.Utilities.File import getGlobbedFiles, getGlobbedTotalSize
 from DIRAC.Core.Utilities.ObjectLoader import ObjectLoader
 from DIRAC.Core.Utilities.SiteSEMapping import getSEsForSite
@@ -118,6 +117,7 @@ class JobWrapper:
         )
         self.defaultOutputPath = ""
         self.retryUpload = gConfig.getValue(self.section + "/RetryUpload", False)
+        self.maxUploadThreads = gConfig.getValue(self.section + "/MaxUploadThreads", 4)
         self.dm = DataManager()
         self.fc = FileCatalog()
         self.log.verbose("===========================================================================")
@@ -924,6 +924,7 @@ class JobWrapper:
         else:
             pfnGUID = result["Value"]
 
+        fileList = []
         for oData in outputData:
             (lfn, localfile) = self.__getLFNfromOutputFile(oData, outputPath)
             if not os.path.exists(localfile):
@@ -933,7 +934,7 @@ class JobWrapper:
             # # file size
             localfileSize = getGlobbedTotalSize(localfile)
 
-            self.outputDataSize += getGlobbedTotalSize(localfile)
+            self.outputDataSize += localfileSize
 
             outputFilePath = os.path.join(os.getcwd(), localfile)
 
@@ -942,41 +943,48 @@ class JobWrapper:
             if fileGUID:
                 self.log.verbose(f"Found GUID for file from POOL XML catalogue {localfile}")
 
-            # #  file checksum
-            cksm = fileAdler(outputFilePath)
-
+            # # file checksum, computed by the upload threads concurrently with the other transfers
             fileMetaDict = {
                 "Size": localfileSize,
                 "LFN": lfn,
                 "ChecksumType": "Adler32",
-                "Checksum": cksm,
                 "GUID": fileGUID,
             }
-
-            outputSEList = self.__getSortedSEList(outputSE)
-            upload = self.failoverTransfer.transferAndRegisterFile(
-                fileName=localfile,
-                localPath=outputFilePath,
-                lfn=lfn,
-                destinationSEList=outputSEList,
-                fileMetaDict=fileMetaDict,
-                fileCatalog=self.defaultCatalog,
-                masterCatalogOnly=self.masterCatalogOnlyFlag,
-                retryUpload=self.retryUpload,
+            fileList.append(
+                {
+                    "oData": oData,
+                    "fileName": localfile,
+                    "localPath": outputFilePath,
+                    "lfn": lfn,
+                    "destinationSEList": self.__getSortedSEList(outputSE),
+                    "fileMetaDict": fileMetaDict,
+                }
             )
-            if upload["OK"]:
-                self.log.info(
-                    '"{}" successfully uploaded to "{}" as "LFN:{}"'.format(
-                        localfile, upload["Value"]["uploadedSE"], lfn
-                    )
-                )
+
+        upload = self.failoverTransfer.transferAndRegisterFiles(
+            fileList,
+            fileCatalog=self.defaultCatalog,
+            masterCatalogOnly=self.masterCatalogOnlyFlag,
+            retryUpload=self.retryUpload,
+            maxThreads=self.maxUploadThreads,
+        )
+        successful = upload["Value"]["Successful"] if upload["OK"] else {}
+
+        # The failover is done sequentially, as it adds operations to the failover request
+        for fileDict in fileList:
+            oData = fileDict["oData"]
+            localfile = fileDict["fileName"]
+            lfn = fileDict["lfn"]
+            outputSEList = fileDict["destinationSEList"]
+            if lfn in successful:
+                self.log.info(f'"{localfile}" successfully uploaded to "{successful[lfn]}" as "LFN:{lfn}"')
                 uploaded.append(lfn)
                 continue
 
             self.log.error(
                 "Could not putAndRegister file",
                 "%s with LFN %s to %s with GUID %s trying failover storage"
-                % (localfile, lfn, ", ".join(outputSEList), fileGUID),
+                % (localfile, lfn, ", ".join(outputSEList), fileDict["fileMetaDict"]["GUID"]),
             )
             if not self.defaultFailoverSE:
                 self.log.info(
@@ -990,11 +998,11 @@ class JobWrapper:
             targetSE = outputSEList[0]
             result = self.failoverTransfer.transferAndRegisterFileFailover(
                 fileName=localfile,
-                localPath=outputFilePath,
+                localPath=fileDict["localPath"],
                 lfn=lfn,
                 targetSE=targetSE,
                 failoverSEList=failoverSEs,
-                fileMetaDict=fileMetaDict,
+                fileMetaDict=fileDict["fileMetaDict"],
                 fileCatalog=self.defaultCatalog,
                 masterCatalogOnly=self.masterCatalogOnlyFlag,
             )
@@ -1111,7 +1119,9 @@ class JobWrapper:
             if registeredISB:
                 for isb in registeredISB:
                     self.log.info(f"Downloading Input SandBox {isb}")
-                    result = SandboxStoreClient().downloadSandbox(isb)
+                    result = SandboxStoreClient().downloadSandbox(
+                        isb, cacheDir=self.ceArgs.get("SandboxCacheDirectory", "")
+                    )
                     if not result["OK"]:
                         self.__report(minorStatus=JobMinorStatus.FAILED_DOWNLOADING_INPUT_SANDBOX)
                         return S_ERROR(f"Cannot download Input sandbox {isb}: {result['Message']}")
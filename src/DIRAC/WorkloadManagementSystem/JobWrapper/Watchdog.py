@@ -296,21 +296,18 @@ class Watchdog:
             self.parameters["MemoryUsed"] = []
         self.parameters["MemoryUsed"].append(memoryUsed)
 
-        result = self.profiler.vSizeUsage(withChildren=True)
+        # A single scan of the process tree, also used by the CPU checks below
+        result = self.profiler.treeUsage()
         if not result["OK"]:
-            self.log.warn("Could not get vSize info from profiler", result["Message"])
+            self.log.warn("Could not get vSize and rss info from profiler", result["Message"])
         else:
-            vsize = result["Value"] * 1024.0
+            vsize = result["Value"]["vSizeUsage"] * 1024.0
             heartBeatDict["Vsize"] = vsize
             self.parameters.setdefault("Vsize", [])
             self.parameters["Vsize"].append(vsize)
             msg += f"Job Vsize: {vsize:.1f} kb "
 
-        result = self.profiler.memoryUsage(withChildren=True)
-        if not result["OK"]:
-            self.log.warn("Could not get rss info from profiler", result["Message"])
-        else:
-            rss = result["Value"] * 1024.0
+            rss = result["Value"]["memoryUsage"] * 1024.0
             heartBeatDict["RSS"] = rss
             self.parameters.setdefault("RSS", [])
             self.parameters["RSS"].append(rss)
@@ -415,23 +412,14 @@ class Watchdog:
         """Uses the profiler to get CPU time for current process, its child, and the terminated child,
         and returns HH:MM:SS after conversion.
         """
-        result = self.profiler.cpuUsageUser(withChildren=True, withTerminatedChildren=True)
-        if not result["OK"]:
-            self.log.warn("Issue while checking consumed CPU for user", result["Message"])
-            if result["Errno"] == errno.ESRCH:
-                self.log.warn("The main process does not exist (anymore). This might be correct.")
-            return result
-        cpuUsageUser = result["Value"]
-
-        result = self.profiler.cpuUsageSystem(withChildren=True, withTerminatedChildren=True)
+        result = self.profiler.treeUsage(withTerminatedChildren=True)
         if not result["OK"]:
-            self.log.warn("Issue while checking consumed CPU for system", result["Message"])
+            self.log.warn("Issue while checking consumed CPU", result["Message"])
             if result["Errno"] == errno.ESRCH:
                 self.log.warn("The main process does not exist (anymore). This might be correct.")
             return result
-        cpuUsageSystem = result["Value"]
 
-        cpuTimeTotal = cpuUsageUser + cpuUsageSystem
+        cpuTimeTotal = result["Value"]["cpuUsageUser"] + result["Value"]["cpuUsageSystem"]
         if cpuTimeTotal:
             self.log.verbose("Raw CPU time consumed (s) =", cpuTimeTotal)
             return self.__getCPUHMS(cpuTimeTotal)
@@ -751,22 +739,17 @@ class Watchdog:
         self.initialValues["MemoryUsed"] = memUsed
         self.parameters["MemoryUsed"] = []
 
-        result = self.profiler.vSizeUsage(withChildren=True)
+        result = self.profiler.treeUsage()
         if not result["OK"]:
-            self.log.warn("Could not get vSize info from profiler", result["Message"])
+            self.log.warn("Could not get vSize and rss info from profiler", result["Message"])
         else:
-            vsize = result["Value"] * 1024.0
+            vsize = result["Value"]["vSizeUsage"] * 1024.0
             self.initialValues["Vsize"] = vsize
             self.log.verbose("Vsize(kb)", f"{vsize:.1f}")
-        self.parameters["Vsize"] = []
-
-        result = self.profiler.memoryUsage(withChildren=True)
-        if not result["OK"]:
-            self.log.warn("Could not get rss info from profiler", result["Message"])
-        else:
-            rss = result["Value"] * 1024.0
+            rss = result["Value"]["memoryUsage"] * 1024.0
             self.initialValues["RSS"] = rss
             self.log.verbose("RSS(kb)", f"{rss:.1f}")
+        self.parameters["Vsize"] = []
         self.parameters["RSS"] = []
 
         # We exclude fuse so that mountpoints can be cleaned up by automount after a period unused
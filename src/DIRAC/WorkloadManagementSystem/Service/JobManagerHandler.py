@@ -196,9 +196,10 @@ class JobManagerHandlerMixin:
             except ValidationError as e:
                 return S_ERROR(str(e))
 
-        for jobDescription in jobDescList:  # jobDescList because there might be a list generated by a parametric job
-            result = self.jobDB.insertNewJobIntoDB(
-                jobDescription,
+        if parametricJob:
+            # All the jobs generated by a parametric job are inserted at once
+            result = self.jobDB.insertNewJobsIntoDB(
+                jobDescList,
                 self.owner,
                 self.ownerGroup,
                 initialStatus=initialStatus,
@@ -206,15 +207,43 @@ class JobManagerHandlerMixin:
             )
             if not result["OK"]:
                 return result
+            jobIDList = [retDict["JobID"] for retDict in result["Value"]]
+            self.log.info("Jobs added to the JobDB", f"{len(jobIDList)} jobs for {self.owner}/{self.ownerGroup}")
+
+            result = self.jobLoggingDB.addLoggingRecords(
+                [
+                    {
+                        "JobID": retDict["JobID"],
+                        "Status": retDict["Status"],
+                        "MinorStatus": retDict["MinorStatus"],
+                        "Date": retDict["TimeStamp"],
+                        "Source": "JobManager",
+                    }
+                    for retDict in result["Value"]
+                ]
+            )
+            if not result["OK"]:
+                self.log.error("Failed to add the logging records of the new jobs", result["Message"])
+        else:
+            for jobDescription in jobDescList:
+                result = self.jobDB.insertNewJobIntoDB(
+                    jobDescription,
+                    self.owner,
+                    self.ownerGroup,
+                    initialStatus=initialStatus,
+                    initialMinorStatus=initialMinorStatus,
+                )
+                if not result["OK"]:
+                    return result
 
-            jobID = result["JobID"]
-            self.log.info(f'Job added to the JobDB", "{jobID} for {self.owner}/{self.ownerGroup}')
+                jobID = result["JobID"]
+                self.log.info(f'Job added to the JobDB", "{jobID} for {self.owner}/{self.ownerGroup}')
 
-            self.jobLoggingDB.addLoggingRecord(
-                jobID, result["Status"], result["MinorStatus"], date=result["TimeStamp"], source="JobManager"
-            )
+                self.jobLoggingDB.addLoggingRecord(
+                    jobID, result["Status"], result["MinorStatus"], date=result["TimeStamp"], source="JobManager"
+                )
 
-            jobIDList.append(jobID)
+                jobIDList.append(jobID)
 
         # Set persistency flag
         retVal = gProxyManager.getUserPersistence(ownerDN, self.ownerGroup)
@@ -8,6 +8,7 @@ from DIRAC import S_OK, S_ERROR
 from DIRAC.Core.DISET.RequestHandler import RequestHandler
 import DIRAC.Core.Utilities.TimeUtilities as TimeUtilities
 from DIRAC.Core.Utilities.DEncode import ignoreEncodeWarning
+from DIRAC.Core.Utilities.DictCache import DictCache
 from DIRAC.Core.Utilities.JEncode import strToIntDict
 from DIRAC.Core.Utilities.ObjectLoader import ObjectLoader
 from DIRAC.ConfigurationSystem.Client.Helpers.Operations import Operations
@@ -17,6 +18,15 @@ from DIRAC.WorkloadManagementSystem.Client.PilotManagerClient import PilotManage
 from DIRAC.WorkloadManagementSystem.Service.JobPolicy import JobPolicy, RIGHT_GET_INFO
 
 
+def _cacheKey(obj):
+    """Make a hashable cache key out of a selection (dictionaries, lists...)"""
+    if isinstance(obj, dict):
+        return tuple(sorted(((_cacheKey(key), _cacheKey(value)) for key, value in obj.items()), key=repr))
+    if isinstance(obj, (list, tuple, set)):
+        return tuple(_cacheKey(item) for item in obj)
+    return obj
+
+
 class JobMonitoringHandlerMixin:
     @classmethod
     def initializeHandler(cls, svcInfoDict):
@@ -49,8 +59,32 @@ class JobMonitoringHandlerMixin:
                 return S_ERROR(f"Can't connect to DB: {excp}")
 
         cls.pilotManager = PilotManagerClient()
+
+        # The job counters requested by the monitoring pages are cached for a short time
+        cls.summaryCache = DictCache()
+        cls.summaryCacheLifetime = cls.srv_getCSOption("SummaryCacheLifetime", 30)
         return S_OK()
 
+    @classmethod
+    def getJobsCounters(cls, attrList, selectDict, startDate=None, endDate=None):
+        """Get the job counters from the JobDB, through the summary cache
+
+        :param list attrList: job attributes
+        :param dict selectDict: conditions on the job attributes
+        :param str startDate: only count the jobs updated after this date
+        :param str endDate: only count the jobs updated before this date
+        :return: S_OK(list of (attrDict, count))/S_ERROR
+        """
+        key = ("Counters", _cacheKey(attrList), _cacheKey(selectDict), startDate, endDate)
+        result = cls.summaryCache.get(key)
+        if result is None:
+            result = cls.jobDB.getJobsCounters(
+                attrList, selectDict, newer=startDate, older=endDate, timeStamp="LastUpdateTime"
+            )
+            if result["OK"]:
+                cls.summaryCache.add(key, cls.summaryCacheLifetime, result)
+        return result
+
     @classmethod
     def parseSelectors(cls, selectDict=None):
         """Parse selectors before DB query
@@ -207,7 +241,7 @@ class JobMonitoringHandlerMixin:
         """
 
         _, _, attrDict = cls.parseSelectors(attrDict)
-        return cls.jobDB.getCounters("Jobs", attrList, attrDict, newer=str(cutDate), timeStamp="LastUpdateTime")
+        return cls.getJobsCounters(attrList, attrDict, startDate=str(cutDate))
 
     ##############################################################################
     types_getJobOwner = [int]
@@ -333,9 +367,7 @@ class JobMonitoringHandlerMixin:
         else:
             orderAttribute = None
 
-        result = self.jobDB.getCounters(
-            "Jobs", ["Status"], selectDict, newer=startDate, older=endDate, timeStamp="LastUpdateTime"
-        )
+        result = self.getJobsCounters(["Status"], selectDict, startDate, endDate)
         if not result["OK"]:
             return result
 
@@ -425,9 +457,7 @@ class JobMonitoringHandlerMixin:
     def export_getJobStats(cls, attribute, selectDict):
         """Get job statistics distribution per attribute value with a given selection"""
         startDate, endDate, selectDict = cls.parseSelectors(selectDict)
-        result = cls.jobDB.getCounters(
-            "Jobs", [attribute], selectDict, newer=startDate, older=endDate, timeStamp="LastUpdateTime"
-        )
+        result = cls.getJobsCounters([attribute], selectDict, startDate, endDate)
         if not result["OK"]:
             return result
         resultDict = {}
@@ -478,12 +508,10 @@ class JobMonitoringHandlerMixin:
         if cls.elasticJobParametersDB:
             if not isinstance(jobIDs, list):
                 jobIDs = [jobIDs]
-            parameters = {}
-            for jobID in jobIDs:
-                res = cls.elasticJobParametersDB.getJobParameters(jobID, parName)
-                if not res["OK"]:
-                    return res
-                parameters.update(res["Value"])
+            res = cls.elasticJobParametersDB.getJobsParameters(jobIDs, parName)
+            if not res["OK"]:
+                return res
+            parameters = res["Value"]
 
             # Need anyway to get also from JobDB, for those jobs with parameters registered in MySQL or in both backends
             res = cls.jobDB.getJobParameters(jobIDs, parName)
@@ -542,7 +570,12 @@ class JobMonitoringHandlerMixin:
 
     @classmethod
     def export_getSiteSummary(cls):
-        return cls.jobDB.getSiteSummary()
+        result = cls.summaryCache.get("SiteSummary")
+        if result is None:
+            result = cls.jobDB.getSiteSummary()
+            if result["OK"]:
+                cls.summaryCache.add("SiteSummary", cls.summaryCacheLifetime, result)
+        return result
 
     ##############################################################################
     types_getJobHeartBeatData = [int]
@@ -14,6 +14,7 @@ from DIRAC.Core.Utilities.DEncode import ignoreEncodeWarning
 from DIRAC.Core.Utilities.ObjectLoader import ObjectLoader
 from DIRAC.ConfigurationSystem.Client.Helpers.Operations import Operations
 from DIRAC.WorkloadManagementSystem.Client import JobStatus
+from DIRAC.WorkloadManagementSystem.Utilities.HeartBeatBuffer import HeartBeatBuffer
 from DIRAC.WorkloadManagementSystem.Utilities.JobStatusUtility import JobStatusUtility
 
 
@@ -51,6 +52,19 @@ class JobStateUpdateHandlerMixin:
 
         cls.jsu = JobStatusUtility(cls.jobDB, cls.jobLoggingDB, cls.elasticJobParametersDB)
 
+        # Heart beats are buffered and written in bulk, unless the flush period is 0
+        cls.heartBeatBuffer = None
+        flushPeriod = cls.srv_getCSOption("HeartBeatFlushPeriod", 500)
+        if flushPeriod > 0:
+            cls.heartBeatBuffer = HeartBeatBuffer(
+                cls.jobDB,
+                cls.elasticJobParametersDB,
+                flushPeriod=flushPeriod / 1000.0,
+                maxSize=cls.srv_getCSOption("HeartBeatBufferSize", 10000),
+                parentLogger=cls.log,
+            )
+            cls.heartBeatBuffer.start()
+
         return S_OK()
 
     ###########################################################################
@@ -114,6 +128,19 @@ class JobStateUpdateHandlerMixin:
         """Set various job status fields with a time stamp and a source"""
         return cls.jsu.setJobStatusBulk(int(jobID), statusDict, force=force)
 
+    ###########################################################################
+    types_setJobsStatusBulk = [dict]
+
+    @classmethod
+    @ignoreEncodeWarning
+    def export_setJobsStatusBulk(cls, jobsStatusDict, force=False):
+        """Set various status fields of many jobs with a time stamp and a source
+
+        :param dict jobsStatusDict: {jobID: {dateTime: statusDict}}
+        :return: S_OK({"Successful": {jobID: (attrNames, attrValues)}, "Failed": {jobID: errorMessage}})
+        """
+        return cls.jsu.setJobsStatusBulk(jobsStatusDict, force=force)
+
     ###########################################################################
     types_setJobAttribute = [[str, int], str, str]
 
@@ -179,26 +206,23 @@ class JobStateUpdateHandlerMixin:
         """Set arbitrary parameter specified by name/value pair
         for job specified by its JobId
         """
+        if cls.elasticJobParametersDB:
+            res = cls.elasticJobParametersDB.setJobsParameters(
+                {int(jobID): [(str(parameter[0]), str(parameter[1]))] for jobID, parameter in jobsParameterDict.items()}
+            )
+            if not res["OK"]:
+                cls.log.error("Failed to add Job Parameter to elasticJobParametersDB", res["Message"])
+                return S_ERROR(res["Message"])
+            return S_OK()
+
         failed = False
 
         for jobID in jobsParameterDict:
-            if cls.elasticJobParametersDB:
-                res = cls.elasticJobParametersDB.setJobParameter(
-                    int(jobID), str(jobsParameterDict[jobID][0]), str(jobsParameterDict[jobID][1])
-                )
-                if not res["OK"]:
-                    cls.log.error("Failed to add Job Parameter to elasticJobParametersDB", res["Message"])
-                    failed = True
-                    message = res["Message"]
-
-            else:
-                res = cls.jobDB.setJobParameter(
-                    jobID, str(jobsParameterDict[jobID][0]), str(jobsParameterDict[jobID][1])
-                )
-                if not res["OK"]:
-                    cls.log.error("Failed to add Job Parameter to MySQL", res["Message"])
-                    failed = True
-                    message = res["Message"]
+            res = cls.jobDB.setJobParameter(jobID, str(jobsParameterDict[jobID][0]), str(jobsParameterDict[jobID][1]))
+            if not res["OK"]:
+                cls.log.error("Failed to add Job Parameter to MySQL", res["Message"])
+                failed = True
+                message = res["Message"]
 
         if failed:
             return S_ERROR(message)
@@ -231,13 +255,22 @@ class JobStateUpdateHandlerMixin:
     def export_sendHeartBeat(cls, jobID, dynamicData, staticData):
         """Send a heart beat sign of life for a job jobID"""
 
+        if cls.heartBeatBuffer:
+            # The data is written asynchronously, only the pending commands are needed now
+            cls.heartBeatBuffer.addHeartBeat(int(jobID), dynamicData, staticData)
+            result = cls.heartBeatBuffer.getJobCommands(int(jobID))
+            if not result["OK"]:
+                cls.log.warn("Failed to get the job commands", f"for job {jobID}: {result['Message']}")
+                return S_OK({})
+            return result
+
         result = cls.jobDB.setHeartBeatData(int(jobID), dynamicData)
         if not result["OK"]:
             cls.log.warn("Failed to set the heart beat data", f"for job {jobID} ")
 
         if cls.elasticJobParametersDB:
-            for key, value in staticData.items():
-                result = cls.elasticJobParametersDB.setJobParameter(int(jobID), key, value)
+            if staticData:
+                result = cls.elasticJobParametersDB.setJobParameters(int(jobID), list(staticData.items()))
                 if not result["OK"]:
                     cls.log.error("Failed to add Job Parameters to ElasticSearch", result["Message"])
         else:
@@ -1,3 +1,6 @@
+import threading
+import time
+
 from DIRAC import S_OK, S_ERROR, gLogger
 from DIRAC.Core.Utilities import ThreadScheduler
 from DIRAC.Core.Base.ExecutorMindHandler import ExecutorMindHandler
@@ -39,6 +42,8 @@ def cleanTaskQueues():
 class OptimizationMindHandler(ExecutorMindHandler):
     __optimizationStates = [JobStatus.RECEIVED, JobStatus.CHECKING]
     __loadTaskId = False
+    __throughputLock = threading.Lock()
+    __throughput = {"start": time.time(), "optimized": 0, "failed": 0}
 
     MSG_DEFINITIONS = {"OptimizeJobs": {"jids": (list, tuple)}}
 
@@ -94,7 +99,7 @@ class OptimizationMindHandler(ExecutorMindHandler):
             if not result["OK"]:
                 return result
             jidList = result["Value"]
-            knownJids = cls.getTaskIds()
+            knownJids = set(cls.getTaskIds())
             added = 0
             for jid in jidList:
                 jid = int(jid)
@@ -123,8 +128,38 @@ class OptimizationMindHandler(ExecutorMindHandler):
         if not result["OK"]:
             return result
         cls.__loadTaskId = result["Value"]
+        result = ThreadScheduler.gThreadScheduler.addPeriodicTask(
+            cls.srv_getCSOption("ThroughputReportPeriod", 300), cls.__reportThroughput
+        )
+        if not result["OK"]:
+            return result
         return cls.__loadJobs()
 
+    @classmethod
+    def __countJob(cls, key):
+        """Count a job leaving the optimization"""
+        with cls.__throughputLock:
+            cls.__throughput[key] += 1
+
+    @classmethod
+    def __reportThroughput(cls):
+        """Log the number of jobs per second going out of the optimization since the last report"""
+        with cls.__throughputLock:
+            throughput = cls.__throughput
+            cls.__throughput = {"start": time.time(), "optimized": 0, "failed": 0}
+        elapsed = max(time.time() - throughput["start"], 1)
+        cls.log.info(
+            "Optimization throughput",
+            "%d jobs optimized, %d failed in %d s: %.2f jobs/s"
+            % (
+                throughput["optimized"],
+                throughput["failed"],
+                elapsed,
+                (throughput["optimized"] + throughput["failed"]) / elapsed,
+            ),
+        )
+        return S_OK()
+
     @classmethod
     def exec_executorConnected(cls, trid, eTypes):
         return cls.__loadJobs(eTypes)
@@ -155,6 +190,7 @@ class OptimizationMindHandler(ExecutorMindHandler):
         # If not in proper state then end chain
         if status not in cls.__optimizationStates:
             cls.log.info(f"Dispatching job {jid} out of optimization")
+            cls.__countJob("failed" if status == JobStatus.FAILED else "optimized")
             return S_OK()
         # If received send to JobPath
         if status == JobStatus.RECEIVED:
@@ -192,6 +228,7 @@ class OptimizationMindHandler(ExecutorMindHandler):
         result = cachedJobState.commitChanges()
         if not result["OK"]:
             cls.log.error(f"Cannot write changes to job {jid}: {result['Message']}")
+        cls.__countJob("failed")
         jobState = JobState(jid)
         result = jobState.getStatus()
         if result["OK"]:
@@ -79,6 +79,37 @@ class PilotManagerHandler(RequestHandler):
             pilotRef, taskQueueID, ownerDN, ownerGroup, broker, gridType, pilotStampDict
         )
 
+    ##########################################################################################
+    types_addPilotTQReferences = [dict, str, str]
+
+    @classmethod
+    def export_addPilotTQReferences(
+        cls,
+        pilotRefTQDict,
+        ownerDN,
+        ownerGroup,
+        broker="Unknown",
+        gridType="DIRAC",
+        pilotStampDict={},
+        destination=None,
+        gridSite=None,
+        queue=None,
+        statusReason=None,
+    ):
+        """Add new pilot job references, each with its TaskQueue"""
+        return cls.pilotAgentsDB.addPilotTQReferences(
+            pilotRefTQDict,
+            ownerDN,
+            ownerGroup,
+            broker,
+            gridType,
+            pilotStampDict,
+            destination=destination,
+            gridSite=gridSite,
+            queue=queue,
+            statusReason=statusReason,
+        )
+
     ##############################################################################
     types_getPilotOutput = [str]
 
@@ -381,11 +412,11 @@ class PilotManagerHandler(RequestHandler):
         return cls.pilotAgentsDB.setAccountingFlag(pilotRef, mark)
 
     ##########################################################################################
-    types_setPilotStatus = [str, str]
+    types_setPilotStatus = [[str, list], str]
 
     @classmethod
     def export_setPilotStatus(cls, pilotRef, status, destination=None, reason=None, gridSite=None, queue=None):
-        """Set the pilot agent status"""
+        """Set the status of a pilot agent, or of a list of pilot agents"""
 
         return cls.pilotAgentsDB.setPilotStatus(
             pilotRef, status, destination=destination, statusReason=reason, gridSite=gridSite, queue=queue
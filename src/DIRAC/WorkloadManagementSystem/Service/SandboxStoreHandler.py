@@ -96,13 +96,7 @@ class SandboxStoreHandlerMixin:
         else:
             assignTo = {}
 
-        extPos = fileId.find(".tar")
-        if extPos > -1:
-            extension = fileId[extPos + 1 :]
-            aHash = fileId[:extPos]
-        else:
-            extension = ""
-            aHash = fileId
+        aHash, extension = self.__splitFileId(fileId)
         gLogger.info("Upload requested", f"for {aHash} [{extension}]")
 
         credDict = self.getRemoteCredentials()
@@ -191,6 +185,41 @@ class SandboxStoreHandlerMixin:
             return result
         return S_OK(sbURL)
 
+    @staticmethod
+    def __splitFileId(fileId):
+        """Split a sandbox file name into its hash and its extension"""
+        extPos = fileId.find(".tar")
+        if extPos > -1:
+            return fileId[:extPos], fileId[extPos + 1 :]
+        return fileId, ""
+
+    types_assignExistingSandbox = [str, dict]
+
+    def export_assignExistingSandbox(self, fileId, assignTo):
+        """Check if a sandbox is already stored, before uploading it. If it is, it is assigned to the entities
+        as if it had been uploaded again.
+
+        :param str fileId: sandbox file name, made of its md5 checksum and extension (e.g. <md5>.tar.bz2)
+        :param dict assignTo: {entityId: sandbox type}
+        :return: S_OK(sandbox URL), or S_OK(None) if the sandbox has to be uploaded
+        """
+        aHash, extension = self.__splitFileId(fileId)
+        credDict = self.getRemoteCredentials()
+        result = self.__generateLocation(self.__getSandboxPath(f"{aHash}.{extension}"))
+        if not result["OK"]:
+            return result
+        seName, sePFN = result["Value"]
+
+        result = self.sandboxDB.getSandboxId(seName, sePFN, credDict["username"], credDict["group"])
+        if not result["OK"]:
+            return S_OK(None)
+        gLogger.info("Sandbox already exists, no upload needed", aHash)
+        sbURL = f"SB:{seName}|{sePFN}"
+        result = self.export_assignSandboxesToEntities({key: [(sbURL, assignTo[key])] for key in assignTo})
+        if not result["OK"]:
+            return result
+        return S_OK(sbURL)
+
     def transfer_fromClient(self, fileId, token, fileSize, fileHelper):
         """
         Receive a file as a sandbox
@@ -0,0 +1,144 @@
+"""Buffered ingestion of the job heart beats
+
+The heart beats received by the JobStateUpdate service are acknowledged immediately and kept in memory.
+A background thread periodically writes all of them to the databases with a few bulk statements:
+the HeartBeatTime updates and HeartBeatLoggingInfo inserts of all the jobs, and the static job parameters
+(a single bulk request if they are stored in ElasticSearch).
+
+The pending job commands (e.g. Kill) are served from an in memory set of the jobs having outstanding
+commands, refreshed at each flush, so that the JobCommands table is only queried for these jobs.
+"""
+import datetime
+import threading
+
+from DIRAC import gLogger, S_OK
+
+
+class HeartBeatBuffer:
+    """Buffer of the job heart beats, flushed in bulk to the databases by a background thread"""
+
+    def __init__(self, jobDB, elasticJobParametersDB=None, flushPeriod=0.5, maxSize=10000, parentLogger=None):
+        """c'tor
+
+        :param jobDB: JobDB instance
+        :param elasticJobParametersDB: ElasticJobParametersDB instance, if the job parameters are stored in ES
+        :param float flushPeriod: time in seconds between two flushes
+        :param int maxSize: number of buffered jobs triggering an early flush
+        """
+        if not parentLogger:
+            parentLogger = gLogger
+        self.log = parentLogger.getSubLogger(self.__class__.__name__)
+        self.jobDB = jobDB
+        self.elasticJobParametersDB = elasticJobParametersDB
+        self.flushPeriod = flushPeriod
+        self.maxSize = maxSize
+
+        self.__lock = threading.Lock()
+        self.__flushLock = threading.Lock()
+        self.__commandsLock = threading.Lock()
+        self.__flushEvent = threading.Event()
+        # {jobID: [(receptionTime, dynamicDataDict)]}
+        self.__heartBeats = {}
+        # {jobID: {parName: parValue}}
+        self.__staticData = {}
+        # Jobs with outstanding commands, None until loaded
+        self.__jobsWithCommands = None
+        self.__thread = None
+
+    def start(self):
+        """Start the background thread flushing the buffer"""
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__flushLoop, name="HeartBeatBuffer", daemon=True)
+            self.__thread.start()
+        return S_OK()
+
+    def __flushLoop(self):
+        """Flush the buffer periodically, or as soon as it is full"""
+        while True:
+            self.__flushEvent.wait(self.flushPeriod)
+            self.__flushEvent.clear()
+            try:
+                self.flush()
+            except Exception as excp:  # pylint: disable=broad-except
+                self.log.exception("Failed to flush the heart beats", lException=excp)
+
+    def addHeartBeat(self, jobID, dynamicData, staticData):
+        """Buffer a heart beat of a job
+
+        :param int jobID: job ID
+        :param dict dynamicData: heart beat values, logged in HeartBeatLoggingInfo
+        :param dict staticData: job parameters
+        """
+        receptionTime = datetime.datetime.utcnow().replace(microsecond=0)
+        with self.__lock:
+            self.__heartBeats.setdefault(jobID, []).append((receptionTime, dict(dynamicData)))
+            if staticData:
+                self.__staticData.setdefault(jobID, {}).update(staticData)
+            full = len(self.__heartBeats) >= self.maxSize
+        if full:
+            self.__flushEvent.set()
+        return S_OK()
+
+    def getJobCommands(self, jobID):
+        """Get the pending commands of a job and mark them as sent
+
+        :param int jobID: job ID
+        :return: S_OK(dict) {command: arguments}
+        """
+        if self.__jobsWithCommands is None:
+            result = self.__loadJobsWithCommands()
+            if not result["OK"]:
+                return result
+        with self.__commandsLock:
+            if jobID not in self.__jobsWithCommands:
+                return S_OK({})
+            result = self.jobDB.getJobCommand(jobID)
+            if not result["OK"]:
+                return result
+            jobCommands = result["Value"]
+            for command in jobCommands:
+                self.jobDB.setJobCommandStatus(jobID, command, "Sent")
+            self.__jobsWithCommands.discard(jobID)
+        return S_OK(jobCommands)
+
+    def __loadJobsWithCommands(self):
+        """Load the set of jobs with outstanding commands"""
+        result = self.jobDB.getJobsWithCommands()
+        if not result["OK"]:
+            self.log.error("Failed to get the jobs with pending commands", result["Message"])
+            return result
+        with self.__commandsLock:
+            self.__jobsWithCommands = set(result["Value"])
+        return S_OK()
+
+    def flush(self):
+        """Write the buffered heart beats to the databases"""
+        with self.__lock:
+            heartBeats = self.__heartBeats
+            staticData = self.__staticData
+            self.__heartBeats = {}
+            self.__staticData = {}
+
+        with self.__flushLock:
+            if heartBeats:
+                result = self.jobDB.setHeartBeatDataBulk(heartBeats)
+                if not result["OK"]:
+                    self.log.warn("Failed to set the heart beat data", f"of {len(heartBeats)} jobs")
+
+            if staticData and self.elasticJobParametersDB:
+                result = self.elasticJobParametersDB.setJobsParameters(
+                    {jobID: list(parameters.items()) for jobID, parameters in staticData.items()}
+                )
+                if not result["OK"]:
+                    self.log.error("Failed to add Job Parameters to ElasticSearch", result["Message"])
+            else:
+                for jobID, parameters in staticData.items():
+                    result = self.jobDB.setJobParameters(jobID, list(parameters.items()))
+                    if not result["OK"]:
+                        self.log.error("Failed to add Job Parameters to MySQL", result["Message"])
+
+            self.__loadJobsWithCommands()
+
+        if heartBeats:
+            self.log.verbose("Heart beats flushed", f"for {len(heartBeats)} jobs")
+        return S_OK()
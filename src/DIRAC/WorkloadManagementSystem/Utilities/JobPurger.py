@@ -0,0 +1,154 @@
+"""Set based removal of jobs from all the WMS stores
+
+The jobs are removed by batches: for each batch the sandboxes are unassigned, then the jobs are removed from the
+TaskQueueDB, the JobLoggingDB, the ElasticJobParametersDB (if used) and finally from the JobDB, each of them with
+a few statements using lists of job IDs. The JobDB is cleaned last, so that the jobs of a batch which failed
+to be removed from one of the stores are still there to be removed at a later attempt.
+
+The number of jobs removed per second can be limited, to keep the load on the databases under control.
+When all the jobs of an ElasticJobParametersDB index are gone, the whole index is deleted.
+"""
+import time
+
+from DIRAC import gLogger, S_OK
+from DIRAC.ConfigurationSystem.Client.Helpers.Operations import Operations
+from DIRAC.Core.Utilities.List import breakListIntoChunks
+from DIRAC.Core.Utilities.ObjectLoader import ObjectLoader
+from DIRAC.WorkloadManagementSystem.Client.SandboxStoreClient import SandboxStoreClient
+
+
+class JobPurger:
+    """Remove jobs from the JobDB, JobLoggingDB, TaskQueueDB, sandbox store and ElasticJobParametersDB"""
+
+    def __init__(
+        self,
+        jobDB=None,
+        jobLoggingDB=None,
+        taskQueueDB=None,
+        elasticJobParametersDB=None,
+        batchSize=1000,
+        maxJobsPerSecond=0,
+        parentLogger=None,
+    ):
+        """c'tor
+
+        :param jobDB: JobDB instance, created if not given
+        :param jobLoggingDB: JobLoggingDB instance, created if not given
+        :param taskQueueDB: TaskQueueDB instance, created if not given
+        :param elasticJobParametersDB: ElasticJobParametersDB instance, created if not given and the job
+                                       parameters are stored in ElasticSearch
+        :param int batchSize: number of jobs removed together
+        :param float maxJobsPerSecond: maximum removal rate, 0 for no limit
+        :raises: RuntimeError, AttributeError
+        """
+        if not parentLogger:
+            parentLogger = gLogger
+        self.log = parentLogger.getSubLogger(self.__class__.__name__)
+        self.batchSize = batchSize
+        self.maxJobsPerSecond = maxJobsPerSecond
+
+        self.jobDB = jobDB or self.__loadDB("JobDB")
+        self.jobLoggingDB = jobLoggingDB or self.__loadDB("JobLoggingDB")
+        self.taskQueueDB = taskQueueDB or self.__loadDB("TaskQueueDB")
+        self.elasticJobParametersDB = elasticJobParametersDB
+        if not self.elasticJobParametersDB:
+            if Operations().getValue("/Services/JobMonitoring/useESForJobParametersFlag", False):
+                self.elasticJobParametersDB = self.__loadDB("ElasticJobParametersDB")
+
+    def __loadDB(self, dbName):
+        """Instantiate one of the WMS databases"""
+        result = ObjectLoader().loadObject(f"WorkloadManagementSystem.DB.{dbName}", dbName)
+        if not result["OK"]:
+            raise AttributeError(result["Message"])
+        try:
+            return result["Value"](parentLogger=self.log)
+        except RuntimeError:
+            self.log.error(f"Can't connect to the {dbName}")
+            raise
+
+    def purgeJobs(self, jobIDs):
+        """Remove jobs from all the WMS stores, by batches
+
+        :param list jobIDs: IDs of the jobs to remove
+        :return: S_OK({"Successful": list of removed job IDs, "Failed": {jobID: error message}})
+        """
+        successful = []
+        failed = {}
+        jobIDs = sorted(int(jobID) for jobID in jobIDs)
+        if not jobIDs:
+            return S_OK({"Successful": successful, "Failed": failed})
+
+        start = time.time()
+        esIndexRanges = set()
+        for batch in breakListIntoChunks(jobIDs, self.batchSize):
+            result = self._purgeBatch(batch)
+            if not result["OK"]:
+                self.log.error("Failed to remove jobs", f"(n={len(batch)}): {result['Message']}")
+                failed.update(dict.fromkeys(batch, result["Message"]))
+            else:
+                successful.extend(batch)
+                if self.elasticJobParametersDB:
+                    esIndexRanges.update(self.elasticJobParametersDB.getIndexJobRange(jobID) for jobID in batch)
+            self.__throttle(start, len(successful) + len(failed))
+
+        # Drop the ES indices not holding any job anymore
+        for jobRange in sorted(esIndexRanges):
+            result = self._deleteEmptyESIndex(*jobRange)
+            if not result["OK"]:
+                self.log.error("Failed to delete ElasticJobParametersDB index", result["Message"])
+
+        self.log.info(
+            "Jobs removed", f"{len(successful)} jobs removed, {len(failed)} failed, in {time.time() - start:.1f} s"
+        )
+        return S_OK({"Successful": successful, "Failed": failed})
+
+    def __throttle(self, start, nJobs):
+        """Sleep as needed to keep the removal rate under maxJobsPerSecond"""
+        if self.maxJobsPerSecond <= 0:
+            return
+        delay = nJobs / self.maxJobsPerSecond - (time.time() - start)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _purgeBatch(self, jobIDs):
+        """Remove a batch of jobs from all the stores
+
+        :param list jobIDs: job IDs
+        :return: S_OK/S_ERROR
+        """
+        result = SandboxStoreClient(useCertificates=True).unassignJobs(jobIDs)
+        if not result["OK"]:
+            return result
+
+        result = self.taskQueueDB.deleteJobs(jobIDs)
+        if not result["OK"]:
+            return result
+
+        result = self.jobLoggingDB.deleteJob(jobIDs)
+        if not result["OK"]:
+            return result
+
+        if self.elasticJobParametersDB:
+            result = self.elasticJobParametersDB.deleteJobsParameters(jobIDs)
+            if not result["OK"]:
+                return result
+
+        return self.jobDB.removeJobFromDB(jobIDs)
+
+    def _deleteEmptyESIndex(self, firstJobID, lastJobID):
+        """Delete the ElasticJobParametersDB index holding the parameters of a range of jobs if it has no job left.
+        The index of the range of the most recent jobs is kept, as new jobs can still be added to it.
+
+        :param int firstJobID: first job ID of the range of the index
+        :param int lastJobID: last job ID of the range of the index
+        :return: S_OK/S_ERROR
+        """
+        for minJobID, maxJobID, expected in ((firstJobID, lastJobID, False), (lastJobID + 1, None, True)):
+            result = self.jobDB.hasJobsInRange(minJobID, maxJobID)
+            if not result["OK"]:
+                return result
+            if result["Value"] is not expected:
+                return S_OK()
+
+        self.log.info("Deleting ElasticJobParametersDB index without jobs", f"(jobs {firstJobID}-{lastJobID})")
+        return self.elasticJobParametersDB.deleteJobsIndex(firstJobID)
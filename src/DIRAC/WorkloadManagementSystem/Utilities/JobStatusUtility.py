@@ -92,7 +92,6 @@ class JobStatusUtility:
         as a key and status information dictionary as values
         """
         jobID = int(jobID)
-        log = self.log.getLocalSubLogger("JobStatusBulk/Job-%d" % jobID)
 
         result = self.jobDB.getJobAttributes(jobID, ["Status", "StartExecTime", "EndExecTime"])
         if not result["OK"]:
@@ -100,18 +99,156 @@ class JobStatusUtility:
         if not result["Value"]:
             # if there is no matching Job it returns an empty dictionary
             return S_ERROR("No Matching Job")
+        jobAttrs = result["Value"]
+
+        # Get the latest time stamps of major status updates
+        result = self.jobLoggingDB.getWMSTimeStamps(int(jobID))
+        if not result["OK"]:
+            return result
+
+        result = self.__getStatusUpdate(jobID, jobAttrs, result["Value"], statusDict, force=force)
+        if not result["OK"]:
+            return result
+        update = result["Value"]
+        attrNames = update["AttrNames"]
+        attrValues = update["AttrValues"]
+
+        if attrNames:
+            # Here we are forcing the update as it's always updating to the last status
+            result = self.jobDB.setJobAttributes(jobID, attrNames, attrValues, update=True, force=True)
+            if not result["OK"]:
+                return result
+            if self.elasticJobParametersDB:
+                result = self.elasticJobParametersDB.setJobParameter(int(jobID), "Status", update["Status"])
+                if not result["OK"]:
+                    return result
+        # Update start and end time if needed
+        if update["EndExecTime"]:
+            result = self.jobDB.setEndExecTime(jobID, update["EndExecTime"])
+            if not result["OK"]:
+                return result
+        if update["StartExecTime"]:
+            result = self.jobDB.setStartExecTime(jobID, update["StartExecTime"])
+            if not result["OK"]:
+                return result
+
+        # Update the JobLoggingDB records
+        for record in update["Records"]:
+            result = self.jobLoggingDB.addLoggingRecord(
+                jobID,
+                status=record["Status"],
+                minorStatus=record["MinorStatus"],
+                applicationStatus=record["ApplicationStatus"],
+                date=record["Date"],
+                source=record["Source"],
+            )
+            if not result["OK"]:
+                return result
+        if update["HeartBeatTime"] is not None:
+            result = self.jobDB.setHeartBeatData(jobID, {"HeartBeatTime": update["HeartBeatTime"]})
+            if not result["OK"]:
+                return result
+
+        return S_OK((attrNames, attrValues))
+
+    def setJobsStatusBulk(self, jobsStatusDict: dict, force: bool = False):
+        """Set the status fields of many jobs, as setJobStatusBulk does for a single job.
+
+        The current attributes and time stamps of all the jobs are read with two queries, the transitions
+        are evaluated in memory, then the JobDB and the JobLoggingDB are each updated with multi-row
+        statements executed in a single transaction.
+
+        :param dict jobsStatusDict: {jobID: {dateTime: statusDict}}, statusDict as for setJobStatusBulk
+        :param bool force: force the status update (don't evaluate the state machine)
+        :return: S_OK({"Successful": {jobID: (attrNames, attrValues)}, "Failed": {jobID: errorMessage}})
+        """
+        jobsStatusDict = {int(jobID): statusDict for jobID, statusDict in jobsStatusDict.items()}
+        successful = {}
+        failed = {}
+        if not jobsStatusDict:
+            return S_OK({"Successful": successful, "Failed": failed})
+        jobIDs = list(jobsStatusDict)
+
+        result = self.jobDB.getJobsAttributes(jobIDs, ["Status", "StartExecTime", "EndExecTime"])
+        if not result["OK"]:
+            return result
+        jobsAttrs = result["Value"]
+
+        result = self.jobLoggingDB.getWMSTimeStampsBulk(jobIDs)
+        if not result["OK"]:
+            return result
+        jobsTimeStamps = result["Value"]
+
+        jobsUpdates = {}
+        records = []
+        for jobID, statusDict in jobsStatusDict.items():
+            if not jobsAttrs.get(jobID):
+                failed[jobID] = "No Matching Job"
+                continue
+            result = self.__getStatusUpdate(
+                jobID, jobsAttrs[jobID], jobsTimeStamps.get(jobID, {}), statusDict, force=force
+            )
+            if not result["OK"]:
+                failed[jobID] = result["Message"]
+                continue
+            update = result["Value"]
+            jobUpdate = dict(zip(update["AttrNames"], update["AttrValues"]))
+            for key in ("StartExecTime", "EndExecTime", "HeartBeatTime"):
+                if update[key]:
+                    jobUpdate[key] = update[key]
+            jobsUpdates[jobID] = jobUpdate
+            records.extend(dict(record, JobID=jobID) for record in update["Records"])
+            successful[jobID] = (update["AttrNames"], update["AttrValues"])
+
+        result = self.jobDB.setJobsStatusAttributes(jobsUpdates)
+        if not result["OK"]:
+            return result
+        result = self.jobLoggingDB.addLoggingRecords(records)
+        if not result["OK"]:
+            return result
+
+        if self.elasticJobParametersDB:
+            jobsStatus = {
+                jobID: [("Status", jobUpdate["Status"])]
+                for jobID, jobUpdate in jobsUpdates.items()
+                if "Status" in jobUpdate
+            }
+            result = self.elasticJobParametersDB.setJobsParameters(jobsStatus)
+            if not result["OK"]:
+                for jobID in jobsStatus:
+                    failed[jobID] = result["Message"]
+                    successful.pop(jobID, None)
+
+        self.log.verbose("Job statuses set", f"successful: {len(successful)}, failed: {len(failed)}")
+        return S_OK({"Successful": successful, "Failed": failed})
+
+    def __getStatusUpdate(self, jobID: int, jobAttrs: dict, wmsTimeStamps: dict, statusDict: dict, force=False):
+        """Evaluate in memory the changes of a job resulting from a set of status updates
+
+        :param int jobID: job ID
+        :param dict jobAttrs: Status, StartExecTime and EndExecTime attributes of the job
+        :param dict wmsTimeStamps: time stamps of the major statuses, as returned by JobLoggingDB.getWMSTimeStamps
+        :param dict statusDict: {dateTime: statusDict}, modified to reflect the state machine decisions
+        :param bool force: force the status update (don't evaluate the state machine)
+        :return: S_OK(dict) with the AttrNames, AttrValues, Status, StartExecTime, EndExecTime and HeartBeatTime
+                 to set in the JobDB and the Records to add to the JobLoggingDB
+        """
+        log = self.log.getLocalSubLogger("JobStatusBulk/Job-%d" % jobID)
 
         # If the current status is Stalled and we get an update, it should probably be "Running"
-        currentStatus = result["Value"]["Status"]
+        currentStatus = jobAttrs["Status"]
         if currentStatus == JobStatus.STALLED:
             currentStatus = JobStatus.RUNNING
-        startTime = result["Value"].get("StartExecTime")
-        endTime = result["Value"].get("EndExecTime")
+        startTime = jobAttrs.get("StartExecTime")
+        endTime = jobAttrs.get("EndExecTime")
         # getJobAttributes only returns strings :(
         if startTime == "None":
             startTime = None
         if endTime == "None":
             endTime = None
+        # Only the times not already set in the DB have to be updated
+        newStartTime = None
+        newEndTime = None
 
         # Remove useless items in order to make it simpler later, although there should not be any
         for sDict in statusDict.values():
@@ -119,14 +256,12 @@ class JobStatusUtility:
                 if not sDict[item]:
                     sDict.pop(item, None)
 
-        # Get the latest time stamps of major status updates
-        result = self.jobLoggingDB.getWMSTimeStamps(int(jobID))
-        if not result["OK"]:
-            return result
-        if not result["Value"]:
+        if not wmsTimeStamps:
             return S_ERROR("No registered WMS timeStamps")
+        if not statusDict:
+            return S_ERROR("No status to set")
         # This is more precise than "LastTime". timeStamps is a sorted list of tuples...
-        timeStamps = sorted((float(t), s) for s, t in result["Value"].items() if s != "LastTime")
+        timeStamps = sorted((float(t), s) for s, t in wmsTimeStamps.items() if s != "LastTime")
         lastTime = TimeUtilities.toString(TimeUtilities.fromEpoch(timeStamps[-1][0]))
 
         # Get chronological order of new updates
@@ -145,16 +280,17 @@ class JobStatusUtility:
 
             if not startTime and newStat == JobStatus.RUNNING:
                 # Pick up the start date when the job starts running if not existing
-                startTime = updTime
+                startTime = newStartTime = updTime
                 log.debug("Set job start time", startTime)
             elif not endTime and newStat in JobStatus.JOB_FINAL_STATES:
                 # Pick up the end time when the job is in a final status
-                endTime = updTime
+                endTime = newEndTime = updTime
                 log.debug("Set job end time", endTime)
 
         # We should only update the status to the last one if its time stamp is more recent than the last update
         attrNames = []
         attrValues = []
+        status = None
         if updateTimes[-1] >= lastTime:
             minor = ""
             application = ""
@@ -197,43 +333,34 @@ class JobStatusUtility:
             if application:
                 attrNames.append("ApplicationStatus")
                 attrValues.append(application)
-            # Here we are forcing the update as it's always updating to the last status
-            result = self.jobDB.setJobAttributes(jobID, attrNames, attrValues, update=True, force=True)
-            if not result["OK"]:
-                return result
-            if self.elasticJobParametersDB:
-                result = self.elasticJobParametersDB.setJobParameter(int(jobID), "Status", status)
-                if not result["OK"]:
-                    return result
-        # Update start and end time if needed
-        if endTime:
-            result = self.jobDB.setEndExecTime(jobID, endTime)
-            if not result["OK"]:
-                return result
-        if startTime:
-            result = self.jobDB.setStartExecTime(jobID, startTime)
-            if not result["OK"]:
-                return result
 
-        # Update the JobLoggingDB records
+        # The JobLoggingDB records
+        records = []
         heartBeatTime = None
         for updTime in updateTimes:
             sDict = statusDict[updTime]
-            status = sDict.get("Status", "idem")
-            minor = sDict.get("MinorStatus", "idem")
-            application = sDict.get("ApplicationStatus", "idem")
             source = sDict.get("Source", "Unknown")
-            result = self.jobLoggingDB.addLoggingRecord(
-                jobID, status=status, minorStatus=minor, applicationStatus=application, date=updTime, source=source
+            records.append(
+                {
+                    "Status": sDict.get("Status", "idem"),
+                    "MinorStatus": sDict.get("MinorStatus", "idem"),
+                    "ApplicationStatus": sDict.get("ApplicationStatus", "idem"),
+                    "Date": updTime,
+                    "Source": source,
+                }
             )
-            if not result["OK"]:
-                return result
             # If the update comes from a job, update the heart beat time stamp with this item's stamp
             if source.startswith("Job"):
                 heartBeatTime = updTime
-        if heartBeatTime is not None:
-            result = self.jobDB.setHeartBeatData(jobID, {"HeartBeatTime": heartBeatTime})
-            if not result["OK"]:
-                return result
 
-        return S_OK((attrNames, attrValues))
+        return S_OK(
+            {
+                "AttrNames": attrNames,
+                "AttrValues": attrValues,
+                "Status": status,
+                "StartExecTime": newStartTime,
+                "EndExecTime": newEndTime,
+                "HeartBeatTime": heartBeatTime,
+                "Records": records,
+            }
+        )
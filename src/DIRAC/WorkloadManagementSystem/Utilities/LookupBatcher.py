@@ -0,0 +1,88 @@
+"""Merge the bulk lookups of concurrent threads into a single call
+
+Executors process several jobs in parallel threads, and the jobs of a same production often need the
+same information about the same items (e.g. the replicas of the same LFNs). The first thread asking for
+a lookup waits for a short time window for the other threads to add their items, then performs one
+bulk call for all of them. The result is then split back to each thread.
+
+The lookup functions must take a list of items and return a bulk structure
+S_OK({"Successful": {item: value}, "Failed": {item: error}}).
+"""
+import threading
+
+from DIRAC import S_OK, S_ERROR, gLogger
+
+
+class LookupBatcher:
+    """Batch the bulk lookups issued concurrently with the same key"""
+
+    def __init__(self, window=0.5, maxItems=10000, parentLogger=None):
+        """c'tor
+
+        :param float window: time in seconds to wait for other lookups. 0 disables the batching
+        :param int maxItems: number of items triggering the lookup before the end of the window
+        """
+        if not parentLogger:
+            parentLogger = gLogger
+        self.log = parentLogger.getSubLogger(self.__class__.__name__)
+        self.window = window
+        self.maxItems = maxItems
+        self.__lock = threading.Lock()
+        # {key: batch}
+        self.__pending = {}
+
+    def lookup(self, key, items, lookupFunc):
+        """Look up items, together with the ones of the other threads using the same key
+
+        :param key: hashable, only lookups with the same key are batched (e.g. the VO)
+        :param list items: items to look up
+        :param callable lookupFunc: bulk lookup function
+        :return: S_OK({"Successful": {item: value}, "Failed": {item: error}}) for the given items only
+        """
+        if self.window <= 0:
+            return lookupFunc(list(items))
+
+        with self.__lock:
+            batch = self.__pending.get(key)
+            leader = batch is None
+            if leader:
+                batch = {"items": set(), "full": threading.Event(), "done": threading.Event(), "result": None}
+                self.__pending[key] = batch
+            batch["items"].update(items)
+            if len(batch["items"]) >= self.maxItems:
+                # No more items in this batch
+                self.__pending.pop(key, None)
+                batch["full"].set()
+
+        if leader:
+            batch["full"].wait(self.window)
+            with self.__lock:
+                if self.__pending.get(key) is batch:
+                    del self.__pending[key]
+            self.log.verbose("Bulk lookup", f"of {len(batch['items'])} items for {key}")
+            try:
+                batch["result"] = lookupFunc(sorted(batch["items"]))
+            except Exception as excp:  # pylint: disable=broad-except
+                self.log.exception("Bulk lookup failed", lException=excp)
+                batch["result"] = S_ERROR(f"Bulk lookup failed: {excp}")
+            finally:
+                batch["done"].set()
+        else:
+            batch["done"].wait()
+
+        return self.__split(batch["result"], items)
+
+    @staticmethod
+    def __split(result, items):
+        """Extract the values of some items from a bulk result. The values are copied, so that they can be
+        modified independently by each thread.
+        """
+        if not result["OK"]:
+            return result
+        splitResult = {"Successful": {}, "Failed": {}}
+        for item in items:
+            for status in ("Successful", "Failed"):
+                if item in result["Value"].get(status, {}):
+                    value = result["Value"][status][item]
+                    splitResult[status][item] = dict(value) if isinstance(value, dict) else value
+        return S_OK(splitResult)
@@ -0,0 +1,99 @@
+# pylint: disable=missing-docstring, invalid-name
+
+from unittest.mock import MagicMock
+
+from DIRAC import gLogger
+
+# sut
+from DIRAC.WorkloadManagementSystem.Utilities.HeartBeatBuffer import HeartBeatBuffer
+
+gLogger.setLevel("DEBUG")
+
+
+def _jobDBMock(jobsWithCommands=None):
+    jobDB = MagicMock()
+    jobDB.setHeartBeatDataBulk.return_value = {"OK": True, "Value": None}
+    jobDB.setJobParameters.return_value = {"OK": True, "Value": None}
+    jobDB.getJobsWithCommands.return_value = {"OK": True, "Value": jobsWithCommands or []}
+    jobDB.getJobCommand.return_value = {"OK": True, "Value": {"Kill": ""}}
+    return jobDB
+
+
+def test_flush():
+    jobDB = _jobDBMock()
+    hbb = HeartBeatBuffer(jobDB)
+
+    hbb.addHeartBeat(1, {"CPUConsumed": 1.0}, {"Memory": "1"})
+    hbb.addHeartBeat(2, {"CPUConsumed": 2.0}, {})
+    hbb.addHeartBeat(1, {"CPUConsumed": 3.0}, {"Memory": "2"})
+    # Nothing is written before the flush
+    jobDB.setHeartBeatDataBulk.assert_not_called()
+
+    res = hbb.flush()
+    assert res["OK"]
+    # All the jobs are written with a single call
+    jobDB.setHeartBeatDataBulk.assert_called_once()
+    heartBeats = jobDB.setHeartBeatDataBulk.call_args[0][0]
+    assert sorted(heartBeats) == [1, 2]
+    assert [dynamicData for _receptionTime, dynamicData in heartBeats[1]] == [
+        {"CPUConsumed": 1.0},
+        {"CPUConsumed": 3.0},
+    ]
+    # The static data of a job is merged, the latest value wins
+    jobDB.setJobParameters.assert_called_once_with(1, [("Memory", "2")])
+
+    # The buffer is empty after a flush
+    jobDB.setHeartBeatDataBulk.reset_mock()
+    hbb.flush()
+    jobDB.setHeartBeatDataBulk.assert_not_called()
+
+
+def test_flush_ES():
+    jobDB = _jobDBMock()
+    esDB = MagicMock()
+    esDB.setJobsParameters.return_value = {"OK": True, "Value": 2}
+    hbb = HeartBeatBuffer(jobDB, esDB)
+
+    hbb.addHeartBeat(1, {}, {"Memory": "1", "CPUNormalizationFactor": "10"})
+    hbb.addHeartBeat(2, {}, {"Memory": "2"})
+    hbb.flush()
+    esDB.setJobsParameters.assert_called_once_with(
+        {1: [("Memory", "1"), ("CPUNormalizationFactor", "10")], 2: [("Memory", "2")]}
+    )
+    jobDB.setJobParameters.assert_not_called()
+
+
+def test_getJobCommands():
+    jobDB = _jobDBMock(jobsWithCommands=[2])
+    hbb = HeartBeatBuffer(jobDB)
+
+    # Jobs without pending commands do not query the JobCommands table
+    res = hbb.getJobCommands(1)
+    assert res["OK"]
+    assert res["Value"] == {}
+    jobDB.getJobCommand.assert_not_called()
+
+    res = hbb.getJobCommands(2)
+    assert res["OK"]
+    assert res["Value"] == {"Kill": ""}
+    jobDB.setJobCommandStatus.assert_called_once_with(2, "Kill", "Sent")
+
+    # The command is only sent once
+    res = hbb.getJobCommands(2)
+    assert res["Value"] == {}
+    assert jobDB.getJobCommand.call_count == 1
+    assert jobDB.getJobsWithCommands.call_count == 1
+
+    # New commands are seen after the next flush
+    hbb.flush()
+    assert jobDB.getJobsWithCommands.call_count == 2
+    res = hbb.getJobCommands(2)
+    assert jobDB.getJobCommand.call_count == 2
+
+
+def test_earlyFlush():
+    hbb = HeartBeatBuffer(_jobDBMock(), maxSize=2)
+    hbb.addHeartBeat(1, {}, {})
+    assert not hbb._HeartBeatBuffer__flushEvent.is_set()
+    hbb.addHeartBeat(2, {}, {})
+    assert hbb._HeartBeatBuffer__flushEvent.is_set()
@@ -0,0 +1,61 @@
+""" unit test (pytest) of JobPurger module
+"""
+from unittest.mock import MagicMock
+
+import pytest
+
+from DIRAC import S_OK, S_ERROR
+from DIRAC.WorkloadManagementSystem.Utilities.JobPurger import JobPurger
+
+
+@pytest.fixture
+def purger(mocker):
+    mocker.patch("DIRAC.WorkloadManagementSystem.Utilities.JobPurger.SandboxStoreClient", return_value=MagicMock())
+    jobDB = MagicMock()
+    jobDB.removeJobFromDB.return_value = S_OK()
+    jobLoggingDB = MagicMock()
+    jobLoggingDB.deleteJob.return_value = S_OK()
+    taskQueueDB = MagicMock()
+    taskQueueDB.deleteJobs.return_value = S_OK(0)
+    esDB = MagicMock()
+    esDB.deleteJobsParameters.return_value = S_OK()
+    esDB.deleteJobsIndex.return_value = S_OK()
+    esDB.getIndexJobRange.side_effect = lambda jobID: (jobID // 1000000 * 1000000, jobID // 1000000 * 1000000 + 999999)
+    return JobPurger(jobDB, jobLoggingDB, taskQueueDB, esDB, batchSize=2)
+
+
+def test_purgeJobs(purger):
+    # No job left in the first million, but newer jobs exist
+    purger.jobDB.hasJobsInRange.side_effect = lambda minJobID, maxJobID: S_OK(maxJobID is None)
+
+    result = purger.purgeJobs([5, "3", 1, 1000001])
+
+    assert result["OK"]
+    assert result["Value"] == {"Successful": [1, 3, 5, 1000001], "Failed": {}}
+    assert [call.args[0] for call in purger.jobDB.removeJobFromDB.call_args_list] == [[1, 3], [5, 1000001]]
+    assert purger.taskQueueDB.deleteJobs.call_count == 2
+    assert purger.elasticJobParametersDB.deleteJobsParameters.call_count == 2
+    assert [call.args[0] for call in purger.elasticJobParametersDB.deleteJobsIndex.call_args_list] == [0, 1000000]
+
+
+def test_purgeJobs_failedBatch(purger):
+    # Jobs are left in the index range: it is kept
+    purger.jobDB.hasJobsInRange.return_value = S_OK(True)
+    purger.jobLoggingDB.deleteJob.side_effect = [S_OK(), S_ERROR("Boom")]
+
+    result = purger.purgeJobs([1, 2, 3])
+
+    assert result["OK"]
+    assert result["Value"]["Successful"] == [1, 2]
+    assert result["Value"]["Failed"] == {3: "Boom"}
+    # The failed batch is not removed from the JobDB, to be retried later
+    purger.jobDB.removeJobFromDB.assert_called_once_with([1, 2])
+    purger.elasticJobParametersDB.deleteJobsIndex.assert_not_called()
+
+
+def test_purgeJobs_empty(purger):
+    result = purger.purgeJobs([])
+
+    assert result["OK"]
+    assert result["Value"] == {"Successful": [], "Failed": {}}
+    purger.jobDB.removeJobFromDB.assert_not_called()
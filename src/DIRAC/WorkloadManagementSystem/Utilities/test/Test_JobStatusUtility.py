@@ -229,3 +229,69 @@ def test__setJobStatusBulk(
     assert res["OK"] is resExpected
     if res["OK"]:
         assert res["Value"] == resExpected_value
+
+
+def test__setJobsStatusBulk():
+    # Arrange
+    timeStamps = {
+        JobStatus.RECEIVED: "1000000001.001",
+        JobStatus.CHECKING: "1000000002.002",
+        JobStatus.WAITING: "1000000003.003",
+        "LastTime": "2001-09-09 03:46:43",
+    }
+    jobDB_mock = MagicMock()
+    jobDB_mock.getJobsAttributes.return_value = {
+        "OK": True,
+        "Value": {
+            1: {"Status": JobStatus.WAITING, "StartExecTime": None, "EndExecTime": None},
+            2: {"Status": JobStatus.WAITING, "StartExecTime": None, "EndExecTime": None},
+            3: {"Status": JobStatus.WAITING, "StartExecTime": None, "EndExecTime": None},
+        },
+    }
+    jobDB_mock.setJobsStatusAttributes.return_value = {"OK": True, "Value": []}
+
+    jobLoggingDB_mock = MagicMock()
+    jobLoggingDB_mock.getWMSTimeStampsBulk.return_value = {"OK": True, "Value": {1: timeStamps, 2: timeStamps}}
+    jobLoggingDB_mock.addLoggingRecords.return_value = {"OK": True, "Value": []}
+
+    esJobParameters_mock = MagicMock()
+    esJobParameters_mock.setJobsParameters.return_value = {"OK": True, "Value": 2}
+
+    jsu = JobStatusUtility(jobDB_mock, jobLoggingDB_mock, esJobParameters_mock)
+
+    # Act
+    res = jsu.setJobsStatusBulk(
+        {
+            "1": {"2002-01-01 00:00:00": {"Status": JobStatus.MATCHED, "Source": "Matcher"}},
+            "2": {
+                "2002-01-01 00:00:00": {"Status": JobStatus.RUNNING, "Source": "JobWrapper"},
+                "2003-01-01 00:00:00": {"Status": JobStatus.DONE, "Source": "JobWrapper"},
+            },
+            "3": {"2002-01-01 00:00:00": {"Status": JobStatus.MATCHED}},
+            "4": {"2002-01-01 00:00:00": {"Status": JobStatus.MATCHED}},
+        }
+    )
+
+    # Assert
+    assert res["OK"], res["Message"]
+    assert res["Value"]["Successful"] == {1: (["Status"], [JobStatus.MATCHED]), 2: (["Status"], [JobStatus.WAITING])}
+    assert res["Value"]["Failed"] == {3: "No registered WMS timeStamps", 4: "No Matching Job"}
+
+    jobDB_mock.getJobsAttributes.assert_called_once()
+    jobLoggingDB_mock.getWMSTimeStampsBulk.assert_called_once()
+    jobsUpdates = jobDB_mock.setJobsStatusAttributes.call_args[0][0]
+    assert jobsUpdates[1] == {"Status": JobStatus.MATCHED}
+    # The state machine refuses the transitions, but the start and end times are picked up
+    assert jobsUpdates[2] == {
+        "Status": JobStatus.WAITING,
+        "StartExecTime": "2002-01-01 00:00:00",
+        "EndExecTime": "2003-01-01 00:00:00",
+        "HeartBeatTime": "2003-01-01 00:00:00",
+    }
+    records = jobLoggingDB_mock.addLoggingRecords.call_args[0][0]
+    assert len(records) == 3
+    assert {record["JobID"] for record in records} == {1, 2}
+    assert records[1]["Source"] == "JobWrapper(SM)"
+    esJobParameters_mock.setJobsParameters.assert_called_once_with(
+        {1: [("Status", JobStatus.MATCHED)], 2: [("Status", JobStatus.WAITING)]}
+    )
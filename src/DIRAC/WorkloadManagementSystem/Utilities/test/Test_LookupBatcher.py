@@ -0,0 +1,72 @@
+""" unit test (pytest) of LookupBatcher module
+"""
+import threading
+
+from DIRAC import S_OK, S_ERROR
+from DIRAC.WorkloadManagementSystem.Utilities.LookupBatcher import LookupBatcher
+
+
+class BulkLookup:
+    def __init__(self, result=None):
+        self.calls = []
+        self.result = result
+
+    def __call__(self, items):
+        self.calls.append(items)
+        if self.result:
+            return self.result
+        return S_OK(
+            {
+                "Successful": {item: {"SE": item} for item in items if not item.startswith("bad")},
+                "Failed": {item: "No such file" for item in items if item.startswith("bad")},
+            }
+        )
+
+
+def test_lookup_noBatch():
+    bulkLookup = BulkLookup()
+    result = LookupBatcher(0).lookup("vo", ["/a", "bad"], bulkLookup)
+
+    assert result["OK"]
+    assert result["Value"] == {"Successful": {"/a": {"SE": "/a"}}, "Failed": {"bad": "No such file"}}
+    assert bulkLookup.calls == [["/a", "bad"]]
+
+
+def test_lookup_batch():
+    bulkLookup = BulkLookup()
+    batcher = LookupBatcher(1)
+    lfnLists = [["/a", "/b"], ["/b", "/c"], ["/a", "bad"]]
+    results = [None] * len(lfnLists)
+
+    def lookup(i):
+        results[i] = batcher.lookup("vo", lfnLists[i], bulkLookup)
+
+    threads = [threading.Thread(target=lookup, args=(i,)) for i in range(len(lfnLists))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # A single bulk call for the 3 lookups
+    assert bulkLookup.calls == [["/a", "/b", "/c", "bad"]]
+    assert results[0]["Value"] == {"Successful": {"/a": {"SE": "/a"}, "/b": {"SE": "/b"}}, "Failed": {}}
+    assert results[1]["Value"] == {"Successful": {"/b": {"SE": "/b"}, "/c": {"SE": "/c"}}, "Failed": {}}
+    assert results[2]["Value"] == {"Successful": {"/a": {"SE": "/a"}}, "Failed": {"bad": "No such file"}}
+    # Each lookup gets its own copy of the values
+    assert results[0]["Value"]["Successful"]["/a"] is not results[2]["Value"]["Successful"]["/a"]
+
+
+def test_lookup_full():
+    bulkLookup = BulkLookup()
+    # The batch is full at once: no wait for the end of the window
+    result = LookupBatcher(60, maxItems=2).lookup("vo", ["/a", "/b"], bulkLookup)
+
+    assert result["OK"]
+    assert bulkLookup.calls == [["/a", "/b"]]
+
+
+def test_lookup_error():
+    result = LookupBatcher(0.01).lookup("vo", ["/a"], BulkLookup(S_ERROR("Catalog down")))
+
+    assert not result["OK"]
+    assert result["Message"] == "Catalog down"
@@ -1,6 +1,7 @@
 """
 This is used to test the MySQLDB module.
 """
+import datetime
 import time
 import pytest
 
@@ -294,3 +295,46 @@ def test_deleteEntries(name, fields, requiredFields, values, table, cond, expect
     result = mysqlDB.getCounters(name, fields, {})
     assert result["OK"], result["Message"]
     assert result["Value"] == []
+
+
+def test_timePartitions():
+    """Partition a table by time, insert records in the past and drop the old partitions"""
+    mysqlDB = setupDB()
+    partTable = {
+        "TestPartTable": {
+            "Fields": {"ID": "INTEGER NOT NULL", "Time": "DATETIME NOT NULL"},
+            "PrimaryKey": ["ID", "Time"],
+        }
+    }
+    result = mysqlDB._createTables(partTable, force=True)
+    assert result["OK"], result["Message"]
+
+    result = mysqlDB._getTimePartitions("TestPartTable")
+    assert result["OK"], result["Message"]
+    assert result["Value"] is None
+
+    # The partitions of today and of the next 4 periods of 2 days
+    result = mysqlDB._partitionTableByTime("TestPartTable", "Time", 2)
+    assert result["OK"], result["Message"]
+    assert result["Value"] == 5
+    result = mysqlDB._partitionTableByTime("TestPartTable", "Time", 2)
+    assert result["OK"], result["Message"]
+    assert result["Value"] == 0
+
+    now = datetime.datetime.utcnow()
+    for i, delay in enumerate((30, 0, -3)):
+        result = mysqlDB.insertFields("TestPartTable", ["ID", "Time"], [i, str(now - datetime.timedelta(days=delay))])
+        assert result["OK"], result["Message"]
+
+    # Only the partition of the records before today can be dropped
+    result = mysqlDB._dropTimePartitions("TestPartTable", now)
+    assert result["OK"], result["Message"]
+    assert result["Value"] == [f"p{now:%Y%m%d}"]
+
+    result = mysqlDB.getFields("TestPartTable", ["ID"])
+    assert result["OK"], result["Message"]
+    assert sorted(result["Value"]) == [(1,), (2,)]
+
+    result = mysqlDB._dropTimePartitions("TestPartTable", now)
+    assert result["OK"], result["Message"]
+    assert result["Value"] == []
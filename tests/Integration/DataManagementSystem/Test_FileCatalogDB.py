@@ -921,6 +921,32 @@ class DirectoryCase(FileCatalogDBTestCase):
             result = self.db.removeDirectory(toRemove, credDict)
             self.assertTrue(result["OK"], f"removeDirectory failed: {result}")
 
+    def test_directoryCounters(self):
+        """Removing the same directory twice only decrements the Directories counter once"""
+        counterDir = parentDir + "/counterTestDir"
+        result = self.db.createDirectory(counterDir, credDict)
+        self.assertTrue(result["OK"], f"createDirectory failed: {result}")
+        result = self.db.dtree.findDir(counterDir)
+        self.assertTrue(result["OK"], f"findDir failed: {result}")
+        dirID = result["Value"]
+
+        result = self.db.fileManager.getSummaryCounters()
+        self.assertTrue(result["OK"], f"getSummaryCounters failed: {result}")
+        nDirectories = result["Value"].get("Directories", 0)
+
+        for _ in range(2):
+            result = self.db.removeDirectory(counterDir, credDict)
+            self.assertTrue(result["OK"], f"removeDirectory failed: {result}")
+        # The DELETE of a concurrent removal of the same directory, once it is already gone
+        req = f"DELETE FROM {self.db.dtree.getDirectoryListTable()} WHERE DirID={dirID}"
+        result = self.db.dtree._updateWithDirectoryCounter(req, -1)
+        self.assertTrue(result["OK"], f"_updateWithDirectoryCounter failed: {result}")
+        self.assertEqual(result["Value"], 0)
+
+        result = self.db.fileManager.getSummaryCounters()
+        self.assertTrue(result["OK"], f"getSummaryCounters failed: {result}")
+        self.assertEqual(result["Value"].get("Directories", 0), nDirectories - 1)
+
 
 class DirectoryUsageCase(FileCatalogDBTestCase):
     def getPhysicalSize(self, sizeDict, dirName, seName):
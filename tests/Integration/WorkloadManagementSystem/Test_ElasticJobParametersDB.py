@@ -157,3 +157,39 @@ def test_setAndGetJobFromDB():
     assert res["OK"]
     res = elasticJobParametersDB.deleteIndex(elasticJobParametersDB._indexName(1010000))
     assert res["OK"]
+
+
+def test_setAndGetJobsFromDB():
+    # jobs spread over two indices, in one call
+    res = elasticJobParametersDB.setJobsParameters(
+        {200: [("DIRAC", "dirac@cern"), ("k", "v")], 201: [("k", "v201")], 1010200: [("k", "v1010200")]}
+    )
+    assert res["OK"]
+    assert res["Value"] == 3
+    time.sleep(SLEEP_DELAY)
+
+    res = elasticJobParametersDB.getJobsParameters([200, 201, 1010200, 202])
+    assert res["OK"]
+    assert res["Value"][200]["DIRAC"] == "dirac@cern"
+    assert res["Value"][200]["k"] == "v"
+    assert res["Value"][201]["k"] == "v201"
+    assert res["Value"][1010200]["k"] == "v1010200"
+    assert res["Value"][202] == {}
+
+    # update one job and add a parameter to another one
+    res = elasticJobParametersDB.setJobsParameters({200: [("k", "newV")], 201: [("k1", "v1")]})
+    assert res["OK"]
+    time.sleep(SLEEP_DELAY)
+    res = elasticJobParametersDB.getJobsParameters([200, 201], "k, k1")
+    assert res["OK"]
+    assert res["Value"] == {200: {"k": "newV"}, 201: {"k": "v201", "k1": "v1"}}
+
+    # same content as with the single job method
+    res = elasticJobParametersDB.getJobParameters(200)
+    assert res["OK"]
+    assert res["Value"][200] == elasticJobParametersDB.getJobsParameters([200])["Value"][200]
+
+    res = elasticJobParametersDB.deleteIndex(elasticJobParametersDB._indexName(200))
+    assert res["OK"]
+    res = elasticJobParametersDB.deleteIndex(elasticJobParametersDB._indexName(1010200))
+    assert res["OK"]
@@ -15,6 +15,7 @@ import DIRAC
 DIRAC.initialize()  # Initialize configuration
 
 from DIRAC import S_OK, gLogger
+from DIRAC.Core.Utilities.ClassAd.ClassAdLight import ClassAd
 from DIRAC.WorkloadManagementSystem.Client import JobStatus
 from DIRAC.WorkloadManagementSystem.Client import JobMinorStatus
 
@@ -105,6 +106,46 @@ def test_insertNewJobIntoDB(jobDB):
     assert res["Value"] == {}
 
 
+def test_insertNewJobsIntoDB(jobDB):
+    """Test the insertNewJobsIntoDB method: same jobs as inserted one by one"""
+
+    jdls = [jdl.replace('"helloWorld"', f'"helloWorld_{i}"') for i in range(3)]
+    jdls[1] = jdls[1].replace('InputData = "";', 'InputData = {"/vo/data/file1", "/vo/data/file2"};')
+
+    res = jobDB.insertNewJobsIntoDB(jdls, "owner", "ownerGroup", initialStatus=JobStatus.SUBMITTING)
+    assert res["OK"], res["Message"]
+    assert len(res["Value"]) == 3
+    jobIDs = [retDict["JobID"] for retDict in res["Value"]]
+    assert jobIDs == sorted(set(jobIDs))
+    assert all(retDict["Status"] == JobStatus.SUBMITTING for retDict in res["Value"])
+
+    res = jobDB.insertNewJobIntoDB(jdls[1], "owner", "ownerGroup", initialStatus=JobStatus.SUBMITTING)
+    assert res["OK"], res["Message"]
+    singleJobID = res["JobID"]
+
+    res = jobDB.getJobsAttributes([jobIDs[1], singleJobID])
+    assert res["OK"], res["Message"]
+    bulkAttributes, singleAttributes = res["Value"][jobIDs[1]], res["Value"][singleJobID]
+    for attribute in ["JobID", "SubmissionTime", "LastUpdateTime", "HeartBeatTime"]:
+        bulkAttributes.pop(attribute, None)
+        singleAttributes.pop(attribute, None)
+    assert bulkAttributes == singleAttributes
+    assert bulkAttributes["JobName"] == "helloWorld_1"
+
+    res = jobDB.getJobsJDL([jobIDs[1], singleJobID])
+    assert res["OK"], res["Message"]
+    bulkJDL, singleJDL = ClassAd(res["Value"][jobIDs[1]]), ClassAd(res["Value"][singleJobID])
+    assert bulkJDL.getAttributeInt("JobID") == jobIDs[1]
+    assert bulkJDL.getAttributeString("JobRequirements") == singleJDL.getAttributeString("JobRequirements")
+    res = jobDB.getInputData(jobIDs[1])
+    assert res["OK"], res["Message"]
+    assert sorted(res["Value"]) == ["/vo/data/file1", "/vo/data/file2"]
+
+    res = jobDB.insertNewJobsIntoDB([], "owner", "ownerGroup")
+    assert res["OK"], res["Message"]
+    assert res["Value"] == []
+
+
 def test_removeJobFromDB(jobDB):
     # Arrange
     res = jobDB.insertNewJobIntoDB(jdl, "owner", "ownerGroup")
@@ -259,6 +300,42 @@ def test_getCounters(jobDB):
     assert res["OK"], res["Message"]
 
 
+def test_jobsSummary(jobDB):
+    assert jobDB.useJobsSummary
+
+    res = jobDB.insertNewJobIntoDB(jdl, "owner", "ownerGroup")
+    assert res["OK"], res["Message"]
+    jobID = res["JobID"]
+    res = jobDB.setJobStatus(jobID, status=JobStatus.CHECKING)
+    assert res["OK"], res["Message"]
+    res = jobDB.setJobAttribute(jobID, "Site", "Site1")
+    assert res["OK"], res["Message"]
+
+    # The counters from the JobsSummary table are the same as the ones from the Jobs table
+    res = jobDB.getJobsCounters(["Status", "Site"], {"Owner": "owner"})
+    assert res["OK"], res["Message"]
+    summaryCounters = res["Value"]
+    assert ({"Status": JobStatus.CHECKING, "Site": "Site1"}, 1) in summaryCounters
+    res = jobDB.getCounters("Jobs", ["Status", "Site"], {"Owner": "owner"})
+    assert res["OK"], res["Message"]
+    assert summaryCounters == res["Value"]
+
+    res = jobDB.rebuildJobsSummary()
+    assert res["OK"], res["Message"]
+    res = jobDB.getJobsCounters(["Status", "Site"], {"Owner": "owner"})
+    assert res["OK"], res["Message"]
+    assert res["Value"] == summaryCounters
+
+    res = jobDB.getSiteSummary()
+    assert res["OK"], res["Message"]
+
+    res = jobDB.removeJobFromDB(jobID)
+    assert res["OK"], res["Message"]
+    res = jobDB.getJobsCounters(["Status", "Site"], {"Owner": "owner", "Site": "Site1"})
+    assert res["OK"], res["Message"]
+    assert ({"Status": JobStatus.CHECKING, "Site": "Site1"}, 1) not in res["Value"]
+
+
 def test_heartBeatLogging(jobDB):
     res = jobDB.insertNewJobIntoDB(jdl, "owner", "ownerGroup")
     assert res["OK"], res["Message"]
@@ -365,6 +442,40 @@ def test_setJobsMajorStatus(jobDB):
     assert res["Value"] == {jobID_1: {"Status": JobStatus.KILLED}, jobID_2: {"Status": JobStatus.CHECKING}}
 
 
+def test_setJobsStatusAttributes(jobDB):
+    res = jobDB.insertNewJobIntoDB(jdl, "owner", "ownerGroup")
+    assert res["OK"], res["Message"]
+    jobID_1 = res["JobID"]
+    res = jobDB.insertNewJobIntoDB(jdl, "owner", "ownerGroup")
+    assert res["OK"], res["Message"]
+    jobID_2 = res["JobID"]
+
+    res = jobDB.setJobsStatusAttributes(
+        {
+            jobID_1: {"Status": JobStatus.RUNNING, "StartExecTime": "2023-01-01 00:00:00"},
+            jobID_2: {"MinorStatus": "some_minor_status", "HeartBeatTime": "2023-01-02 00:00:00"},
+        }
+    )
+    assert res["OK"], res["Message"]
+    res = jobDB.getJobsAttributes([jobID_1, jobID_2], ["Status", "MinorStatus", "StartExecTime", "HeartBeatTime"])
+    assert res["OK"], res["Message"]
+    assert res["Value"][jobID_1]["Status"] == JobStatus.RUNNING
+    assert res["Value"][jobID_1]["MinorStatus"] == "Job accepted"
+    assert str(res["Value"][jobID_1]["StartExecTime"]) == "2023-01-01 00:00:00"
+    assert str(res["Value"][jobID_1]["HeartBeatTime"]) == "2023-01-01 00:00:00"
+    assert res["Value"][jobID_2]["Status"] == JobStatus.RECEIVED
+    assert res["Value"][jobID_2]["MinorStatus"] == "some_minor_status"
+    assert res["Value"][jobID_2]["StartExecTime"] is None
+    assert str(res["Value"][jobID_2]["HeartBeatTime"]) == "2023-01-02 00:00:00"
+
+    # The start time is not overwritten
+    res = jobDB.setJobsStatusAttributes({jobID_1: {"StartExecTime": "2023-02-01 00:00:00"}})
+    assert res["OK"], res["Message"]
+    res = jobDB.getJobAttributes(jobID_1, ["StartExecTime"])
+    assert res["OK"], res["Message"]
+    assert res["Value"]["StartExecTime"] == "2023-01-01 00:00:00"
+
+
 def test_attributes(jobDB):
     res = jobDB.insertNewJobIntoDB(jdl, "owner", "ownerGroup")
     assert res["OK"], res["Message"]
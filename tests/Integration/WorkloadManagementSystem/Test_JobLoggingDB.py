@@ -47,3 +47,23 @@ def test_JobStatus(jobLoggingDB: JobLoggingDB):
     assert result["OK"] is True, result["Message"]
 
     jobLoggingDB.deleteJob(1)
+
+
+def test_bulkRecords(jobLoggingDB: JobLoggingDB):
+    result = jobLoggingDB.addLoggingRecords(
+        [
+            {"JobID": 1, "Status": "Received", "Date": "2006-04-25 14:20:17", "Source": "Unittest"},
+            {"JobID": 1, "Status": "Checking", "Date": "2006-04-25 14:20:18", "Source": "Unittest"},
+            {"JobID": 2, "Status": "Received", "MinorStatus": "bulk", "Source": "Unittest"},
+        ]
+    )
+    assert result["OK"] is True, result["Message"]
+
+    result = jobLoggingDB.getWMSTimeStampsBulk([1, 2, 3])
+    assert result["OK"] is True, result["Message"]
+    assert set(result["Value"]) == {1, 2}
+    assert set(result["Value"][1]) == {"Received", "Checking", "LastTime"}
+    assert result["Value"][1]["LastTime"] == "2006-04-25 14:20:18"
+    assert set(result["Value"][2]) == {"Received", "LastTime"}
+
+    jobLoggingDB.deleteJob([1, 2])
@@ -94,6 +94,45 @@ def test_basic():
     # FIXME: to expand...
 
 
+def test_bulk():
+    """bulk insert, status update and job mapping"""
+    pilotRefs = [f"bulkPilotRef_{i}" for i in range(4)]
+    res = paDB.addPilotTQReferences(
+        {ref: 100 + i % 2 for i, ref in enumerate(pilotRefs)},
+        "ownerDN",
+        "ownerGroup",
+        pilotStampDict={pilotRefs[0]: "aStamp"},
+        destination="aCE",
+        gridSite="aSite",
+        queue="aQueue",
+        statusReason="Bulk submission",
+    )
+    assert res["OK"] is True, res["Message"]
+
+    res = paDB.setPilotStatus(pilotRefs[:3], "Running", statusReason="Bulk update")
+    assert res["OK"] is True, res["Message"]
+
+    res = paDB.setJobsForPilots([(1, pilotRefs[0]), (2, pilotRefs[1]), (3, pilotRefs[0])])
+    assert res["OK"] is True, res["Message"]
+
+    res = paDB.getPilotInfo(pilotRefs)
+    assert res["OK"] is True, res["Message"]
+    pilotInfo = res["Value"]
+    assert [pilotInfo[ref]["Status"] for ref in pilotRefs] == ["Running", "Running", "Running", "Submitted"]
+    assert [pilotInfo[ref]["TaskQueueID"] for ref in pilotRefs] == [100, 101, 100, 101]
+    assert all(pilotInfo[ref]["DestinationSite"] == "aCE" for ref in pilotRefs)
+    assert pilotInfo[pilotRefs[0]]["PilotStamp"] == "aStamp"
+    assert sorted(pilotInfo[pilotRefs[0]]["Jobs"]) == [1, 3]
+    assert pilotInfo[pilotRefs[1]]["Jobs"] == [2]
+    assert "Jobs" not in pilotInfo[pilotRefs[2]]
+
+    res = paDB.getPilotCurrentJob(pilotRefs[0])
+    assert res["OK"] is True, res["Message"]
+    assert res["Value"] == 3
+
+    cleanUpPilots(pilotRefs)
+
+
 @patch("DIRAC.WorkloadManagementSystem.DB.PilotAgentsDB.getVOForGroup")
 def test_getGroupedPilotSummary(mocked_fcn):
     """
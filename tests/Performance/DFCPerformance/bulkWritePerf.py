@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+""" This script instantiate a DFC client against a given service,
+    and registers job outputs in large batches (addFile with several replicas)
+    for a given time, in order to measure the registration throughput.
+    It produces time.txt, like the other perf scripts, and prints the
+    average number of registered files per second at the end.
+
+    To compare the bulk insertion path with another version of the FileManager,
+    run the script against a service running each version (or with different
+    InsertChunkSize values) on the same DB content, and compare the throughputs.
+
+    Tunable parameters:
+      * maxDuration : time it will run. Cannot be too long, otherwise job
+                      is killed because staled
+      * port: list of ports on which we can find a service (assumes all the service running on one machine)
+      * hostname: name of the host hosting the service
+      * storageElements: list of storage element names
+      * bulkSize: number of files registered by a single addFile call
+      * nbReplicas: number of replicas registered for each file
+      * nbDirectories: number of directories the files of a batch are spread in
+"""
+import DIRAC
+
+DIRAC.initialize()  # Initialize configuration
+
+import random
+import time
+import uuid
+
+from DIRAC.Resources.Catalog.FileCatalogClient import FileCatalogClient
+
+port = random.choice([9196, 9197, 9198, 9199])
+hostname = "yourmachine.somewhere.something"
+servAddress = f"dips://{hostname}:{port}/DataManagement/FileCatalog"
+
+maxDuration = 1800  # 30mn
+bulkSize = 1000
+nbReplicas = 2
+nbDirectories = 10
+fc = FileCatalogClient(servAddress)
+
+storageElements = ["se0", "se1", "se2", "se3", "se4", "se5", "se6", "se7", "se8", "se9"]
+
+fl = open("time.txt", "w")
+fl.write(f"QueryStart\tQueryEnd\tQueryTime\textra(port {port})\n")
+
+start = time.time()
+registered = 0
+registrationTime = 0.0
+
+done = False
+
+while not done:
+    batch = uuid.uuid4().hex
+    lfnDict = {}
+    for f in range(bulkSize):
+        dirPath = f"/bulkPerf/{batch[:2]}/{batch}/{f % nbDirectories:04d}"
+        filename = f"{batch}_{f}.out"
+        lfn = f"{dirPath}/{filename}"
+        lfnDict[lfn] = {
+            "PFN": lfn,
+            "SE": random.sample(storageElements, nbReplicas),
+            "Size": random.randint(1, 1000000),
+            "GUID": str(uuid.uuid4()),
+            "Checksum": f"{random.getrandbits(32):08x}",
+        }
+
+    beforeI = time.time()
+    res = fc.addFile(lfnDict)
+    afterI = time.time()
+    queryInsertTime = afterI - beforeI
+    extra = "bulkInsert "
+    if not res["OK"]:
+        extra += res["Message"]
+    else:
+        nbSuccessful = len(res["Value"].get("Successful", []))
+        registered += nbSuccessful
+        registrationTime += queryInsertTime
+        extra += "{} {} {}".format(len(lfnDict), nbSuccessful, len(res["Value"].get("Failed", [])))
+
+    fl.write(f"{beforeI}\t{afterI}\t{queryInsertTime}\t{extra}\n")
+    fl.flush()
+
+    beforeR = time.time()
+    res = fc.removeFile(list(lfnDict))
+    afterR = time.time()
+    extra = "remove "
+    if not res["OK"]:
+        extra += res["Message"]
+    else:
+        extra += "{} {} {}".format(
+            len(lfnDict), len(res["Value"].get("Successful", [])), len(res["Value"].get("Failed", []))
+        )
+    fl.write(f"{beforeR}\t{afterR}\t{afterR - beforeR}\t{extra}\n")
+    fl.flush()
+
+    if time.time() - start > maxDuration:
+        done = True
+
+fl.close()
+
+if registrationTime:
+    print(f"Registered {registered} files in {registrationTime:.1f}s: {registered / registrationTime:.1f} files/s")
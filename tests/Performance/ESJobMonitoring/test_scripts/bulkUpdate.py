@@ -0,0 +1,39 @@
+"""
+Performance test created using multi-mechnize to analyze time
+for bulk update processing with ElasticSearch.
+"""
+
+import random
+import string
+import time
+
+from DIRAC.WorkloadManagementSystem.DB.ElasticJobParametersDB import ElasticJobParametersDB
+
+
+def random_generator(size=6, chars=string.ascii_letters):
+    return "".join(random.choice(chars) for x in range(size))
+
+
+class Transaction:
+    def __init__(self):
+        self.elasticJobParametersDB = ElasticJobParametersDB()
+        self.custom_timers = {}
+
+    def run(self):
+        start_time = time.time()
+
+        for i in range(0, random.randint(10, 30)):
+            jobsParameters = {
+                random.randint(1, 1000): [(random_generator(), random_generator(size=12))] for _ in range(100)
+            }
+            self.elasticJobParametersDB.setJobsParameters(jobsParameters)
+
+        end_time = time.time()
+
+        self.custom_timers["Execution_Time"] = end_time - start_time
+
+
+if __name__ == "__main__":
+    trans = Transaction()
+    trans.run()
+    print(trans.custom_timers)
@@ -0,0 +1,78 @@
+"""
+Stress test of the ExecutorDispatcher, without any network.
+
+A large number of tasks go through a chain of executor types, served by many executors.
+Some of the tasks are frozen on the way, and some are removed while waiting in the queues.
+
+Usage: python stressDispatcher.py [nTasks] [nExecutors]
+"""
+import collections
+import sys
+import time
+
+from DIRAC import S_OK
+from DIRAC.Core.Utilities.ExecutorDispatcher import ExecutorDispatcher, ExecutorDispatcherCallbacks
+
+CHAIN = ["Test/Path", "Test/Sanity", "Test/InputData", "Test/Scheduling"]
+
+
+class Callbacks(ExecutorDispatcherCallbacks):
+    def __init__(self):
+        # Tasks sent to the executors, processed in the main loop
+        self.sent = collections.deque()
+
+    def cbDispatch(self, taskId, taskObj, pathExecuted):
+        if len(pathExecuted) < len(CHAIN):
+            return S_OK(CHAIN[len(pathExecuted)])
+        return S_OK()
+
+    def cbSendTask(self, taskId, taskObj, eId, eType):
+        self.sent.append((eId, taskId))
+        return S_OK()
+
+
+def main(nTasks=500000, nExecutors=50):
+    callbacks = Callbacks()
+    dispatcher = ExecutorDispatcher()
+    dispatcher.setFreezeOnUnknownExecutor(False)
+    dispatcher.setCallbacks(callbacks)
+
+    start = time.time()
+    for eId in range(nExecutors):
+        dispatcher.addExecutor(f"exec{eId}", CHAIN, maxTasks=10)
+    for taskId in range(nTasks):
+        dispatcher.addTask(taskId, taskId)
+    loaded = time.time()
+    print(f"{nTasks} tasks loaded in {loaded - start:.1f} s")
+
+    # Remove some of the waiting tasks
+    for taskId in range(nTasks - 1, 0, -100):
+        dispatcher.removeTask(taskId)
+
+    processed = 0
+    while True:
+        if not callbacks.sent:
+            taskIds = dispatcher.getTaskIds()
+            if not taskIds:
+                break
+            # Adding a known task unfreezes the frozen tasks
+            dispatcher.addTask(taskIds[0], taskIds[0])
+            continue
+        eId, taskId = callbacks.sent.popleft()
+        if dispatcher.getTask(taskId) is None:
+            # Removed while in the executor
+            continue
+        if taskId % 50 == 0 and processed % 7 == 0:
+            dispatcher.freezeTask(eId, taskId, 0)
+        else:
+            dispatcher.taskProcessed(eId, taskId)
+        processed += 1
+    end = time.time()
+
+    print(f"{processed} executor steps in {end - loaded:.1f} s: {processed / (end - loaded):.0f} steps/s")
+    print(f"{len(dispatcher.getTaskIds())} tasks left")
+    return S_OK()
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
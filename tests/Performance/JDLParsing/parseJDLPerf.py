@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+""" This script measures the time needed to parse the JDLs of the jobs of a parametric job, as done by the
+    JobManager, the optimizers, the JobAgent and the JobWrapper, with the ClassAd class and with loadJDLAsCFG
+    (used by the JobManifest). Each JDL is parsed a first time, then again to measure the parse caches.
+
+    The number of jobs must not exceed the size of the caches (1000).
+
+    Usage: parseJDLPerf.py [nJobs] [nLFNs]
+"""
+import sys
+import time
+
+from DIRAC.Core.Utilities.ClassAd.ClassAdLight import ClassAd
+from DIRAC.Core.Utilities.JDL import loadJDLAsCFG
+from DIRAC.WorkloadManagementSystem.Utilities.ParametricJob import generateParametricJobs
+
+nJobs = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+nLFNs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+inputData = ", ".join(f'"/vo/data/run_%s/file_{i}.raw"' for i in range(nLFNs))
+jdl = f"""[
+    Executable = "dirac-jobexec";
+    Arguments = "jobDescription.xml -o LogLevel=info -p Run=%s";
+    JobName = "parseJDLPerf_%n";
+    JobGroup = "parseJDLPerf";
+    JobType = "User";
+    CPUTime = 86400;
+    Priority = 1;
+    Site = {{"LCG.CERN.cern", "LCG.IN2P3.fr", "LCG.CNAF.it"}};
+    InputData = {{{inputData}}};
+    InputSandbox = {{"jobDescription.xml", "LFN:/vo/user/u/user/sandbox.tar.bz2"}};
+    OutputSandbox = {{"std.err", "std.out", "*.log"}};
+    OutputData = {{"output_%s.root"}};
+    StdError = "std.err";
+    StdOutput = "std.out";
+    Tags = {{"MultiProcessor", "8GB"}};
+    Parameters = {nJobs};
+    ParameterStart = 1;
+    ParameterStep = 1;
+]"""
+
+result = generateParametricJobs(ClassAd(jdl))
+if not result["OK"]:
+    print(f"Failed to generate the jobs: {result['Message']}")
+    sys.exit(1)
+jdls = result["Value"]
+print(f"{len(jdls)} JDLs of {sum(len(jobJDL) for jobJDL in jdls) // len(jdls)} characters")
+
+for name, parse in (("ClassAd", ClassAd), ("loadJDLAsCFG", loadJDLAsCFG)):
+    for attempt in ("first parse", "cached"):
+        start = time.perf_counter()
+        for jobJDL in jdls:
+            parse(jobJDL)
+        elapsed = time.perf_counter() - start
+        print(f"{name} {attempt}: {elapsed / len(jdls) * 1e6:.1f} us per JDL")
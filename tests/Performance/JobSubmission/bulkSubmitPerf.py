@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+
+""" This script measures the insertion throughput of the jobs of a parametric job in the JobDB,
+    inserting them one by one with insertNewJobIntoDB as it used to be done by the JobManager,
+    then all at once with insertNewJobsIntoDB. It prints the number of jobs inserted per second
+    for both methods, and removes the jobs at the end.
+
+    It needs a configuration giving access to a JobDB which can be filled with test jobs.
+
+    Usage: bulkSubmitPerf.py [nJobs]
+"""
+import DIRAC
+
+DIRAC.initialize()  # Initialize configuration
+
+import sys
+import time
+
+from DIRAC.Core.Utilities.ClassAd.ClassAdLight import ClassAd
+from DIRAC.WorkloadManagementSystem.Client import JobStatus
+from DIRAC.WorkloadManagementSystem.DB.JobDB import JobDB
+from DIRAC.WorkloadManagementSystem.Utilities.ParametricJob import generateParametricJobs
+
+owner = "owner"
+ownerGroup = "ownerGroup"
+nJobs = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+jdl = f"""[
+    Executable = "dirac-jobexec";
+    Arguments = "jobDescription.xml -o LogLevel=info -p Event=%s";
+    JobName = "bulkSubmitPerf_%n";
+    JobGroup = "bulkSubmitPerf";
+    JobType = "User";
+    CPUTime = 86400;
+    Priority = 1;
+    OutputSandbox = {{"std.err", "std.out"}};
+    StdError = "std.err";
+    StdOutput = "std.out";
+    Parameters = {nJobs};
+    ParameterStart = 1;
+    ParameterStep = 1;
+]"""
+
+jobDB = JobDB()
+result = generateParametricJobs(ClassAd(jdl))
+if not result["OK"]:
+    print(f"Failed to generate the jobs: {result['Message']}")
+    DIRAC.exit(1)
+jobDescList = result["Value"]
+
+jobIDs = []
+start = time.time()
+for jobDescription in jobDescList:
+    result = jobDB.insertNewJobIntoDB(jobDescription, owner, ownerGroup, initialStatus=JobStatus.SUBMITTING)
+    if not result["OK"]:
+        print(f"Failed to insert a job: {result['Message']}")
+        DIRAC.exit(1)
+    jobIDs.append(result["JobID"])
+oneByOne = time.time() - start
+print(f"insertNewJobIntoDB: {nJobs} jobs in {oneByOne:.1f} s, {nJobs / oneByOne:.0f} jobs/s")
+
+start = time.time()
+result = jobDB.insertNewJobsIntoDB(jobDescList, owner, ownerGroup, initialStatus=JobStatus.SUBMITTING)
+if not result["OK"]:
+    print(f"Failed to insert the jobs: {result['Message']}")
+    DIRAC.exit(1)
+bulk = time.time() - start
+jobIDs.extend(retDict["JobID"] for retDict in result["Value"])
+print(f"insertNewJobsIntoDB: {nJobs} jobs in {bulk:.1f} s, {nJobs / bulk:.0f} jobs/s")
+
+result = jobDB.removeJobFromDB(jobIDs)
+if not result["OK"]:
+    print(f"Failed to remove the jobs: {result['Message']}")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+
+""" This script measures the time taken by a SiteDirector cycle to submit pilots to queues whose CEs
+    simulate the latency of remote CEs (a few of them being slow), with the queues treated one after
+    the other (MaxSubmissionThreads = 1) and concurrently. It also measures the writing of the pilot scripts
+    of the queues (with a bundled proxy), with and without the cache of the compressed pilot files.
+
+    Usage: submissionPerf.py [nQueues] [latency] [slowLatency] [nSlowQueues] [maxSubmissionThreads]
+"""
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import MagicMock, patch
+
+from DIRAC import S_OK, gLogger
+from DIRAC.WorkloadManagementSystem.Agent import SiteDirector as SiteDirectorModule
+from DIRAC.WorkloadManagementSystem.Agent.SiteDirector import SiteDirector
+
+nQueues = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+slowLatency = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+nSlowQueues = int(sys.argv[4]) if len(sys.argv) > 4 else 2
+maxSubmissionThreads = int(sys.argv[5]) if len(sys.argv) > 5 else 10
+
+
+class FakeCE:
+    """CE whose submission takes some time, like a remote CE"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.ceParameters = {}
+        self.workingDirectory = tempfile.gettempdir()
+
+    def setProxy(self, proxy, lifetime):
+        self.proxy = proxy
+
+    def submitJob(self, executable, proxy, numberOfJobs):
+        time.sleep(self.latency)
+        return S_OK([f"pilot_{i}" for i in range(numberOfJobs)])
+
+
+class FakeProxy:
+    """Proxy of a realistic size"""
+
+    def dumpAllToString(self):
+        return S_OK(os.urandom(6000).hex())
+
+    def getRemainingSecs(self):
+        return S_OK(86400)
+
+
+def getSiteDirector():
+    with patch.object(SiteDirectorModule.AgentModule, "__init__", return_value=None):
+        sd = SiteDirector()
+    sd.log = gLogger
+    sd.workingDirectory = tempfile.gettempdir()
+    sd.pilotAgentsDB = MagicMock()
+    sd.pilotAgentsDB.countPilots.return_value = S_OK(0)
+    sd.matcherClient = MagicMock()
+    sd.matcherClient.getMatchingTaskQueues.return_value = S_OK({1: {"Jobs": 100, "Priority": 1}})
+    sd.sendSubmissionAccounting = False
+    sd.siteMaskList = ["Site"]
+    sd.queueDict = {}
+    for i in range(nQueues):
+        ce = FakeCE(slowLatency if i < nSlowQueues else latency)
+        sd.queueDict[f"queue{i}"] = {
+            "CE": ce,
+            "CEName": f"ce{i}",
+            "CEType": "Fake",
+            "QueueName": f"queue{i}",
+            "Site": "Site",
+            "BundleProxy": True,
+            "ParametersDict": {"CPUTime": 86400},
+        }
+        sd.queueCECache[f"queue{i}"] = {"CE": ce}
+        sd.queueSlots[f"queue{i}"] = {"AvailableSlots": 10}
+    sd._ifAndWhereToSubmit = lambda: (True, True, set(), set())
+    sd._allowedToSubmit = lambda *args: True
+    sd._getPilotOptions = lambda *args, **kwargs: ["-S Setup"]
+    sd.getQueueSlots = lambda *args: 10
+    sd.submissionTimeout = 3600
+    return sd
+
+
+def measure(sd):
+    start = time.time()
+    result = sd.submitPilots()
+    assert result["OK"], result
+    assert sd.totalSubmittedPilots == 10 * nQueues
+    return time.time() - start
+
+
+def measurePilotScripts(sd, cache):
+    proxy = FakeProxy()
+    start = time.time()
+    sd.pilotFilesCache = {}
+    for _ in range(nQueues):
+        if not cache:
+            sd.pilotFilesCache = {}
+        os.unlink(sd._writePilotScript(tempfile.gettempdir(), "-S Setup", proxy=proxy))
+    return time.time() - start
+
+
+if __name__ == "__main__":
+    gLogger.setLevel("ERROR")
+    with patch.object(SiteDirectorModule, "Operations"), patch.object(
+        SiteDirectorModule.gProxyManager, "getPilotProxyFromDIRACGroup", return_value=S_OK(FakeProxy())
+    ):
+        sd = getSiteDirector()
+        sd.maxSubmissionThreads = 1
+        serial = measure(sd)
+        sd = getSiteDirector()
+        sd.maxSubmissionThreads = maxSubmissionThreads
+        concurrent = measure(sd)
+
+        noCache = measurePilotScripts(sd, False)
+        cache = measurePilotScripts(sd, True)
+
+    print(f"{nQueues} queues, latency {latency} s, {nSlowQueues} slow queues with latency {slowLatency} s")
+    print(f"Serial submission: {serial:.2f} s")
+    print(f"Concurrent submission ({maxSubmissionThreads} threads): {concurrent:.2f} s")
+    print(f"Pilot scripts without / with the pilot files cache: {1000 * noCache:.1f} ms / {1000 * cache:.1f} ms")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+""" This script measures the CPU consumed by the Watchdog to sample the resources used by a job: the process tree
+    of the job is scanned as in a Watchdog check, once per metric with the former per-metric Profiler calls,
+    and once in total with Profiler.treeUsage, whose samples are then shared by all the profilers of the process.
+
+    Usage: samplingPerf.py [nProcesses] [nChecks] [nWatchdogs]
+"""
+import sys
+import time
+from multiprocessing import Process
+
+from DIRAC.Core.Utilities import Profiler as ProfilerModule
+from DIRAC.Core.Utilities.Profiler import Profiler
+
+nProcesses = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+nChecks = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+nWatchdogs = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+
+
+def perMetricCheck(profiler):
+    profiler.vSizeUsage(withChildren=True)
+    profiler.memoryUsage(withChildren=True)
+    profiler.cpuUsageUser(withChildren=True, withTerminatedChildren=True)
+    profiler.cpuUsageSystem(withChildren=True, withTerminatedChildren=True)
+
+
+def treeUsageCheck(profiler):
+    # The two calls made by a Watchdog check, the second one being served by the shared sample
+    profiler.treeUsage()
+    profiler.treeUsage(withTerminatedChildren=True)
+
+
+def measure(check, pid):
+    profiler = Profiler(pid)
+    start = time.process_time()
+    for _ in range(nChecks):
+        ProfilerModule._treeSamples.clear()
+        for _ in range(nWatchdogs):
+            check(profiler)
+    return time.process_time() - start
+
+
+def job():
+    children = [Process(target=time.sleep, args=(600,)) for _ in range(nProcesses - 1)]
+    for child in children:
+        child.start()
+    time.sleep(600)
+
+
+if __name__ == "__main__":
+    jobProcess = Process(target=job)
+    jobProcess.start()
+    time.sleep(2)
+    try:
+        perMetric = measure(perMetricCheck, jobProcess.pid)
+        treeUsage = measure(treeUsageCheck, jobProcess.pid)
+    finally:
+        for child in Profiler(jobProcess.pid).process.children(recursive=True):
+            child.kill()
+        jobProcess.kill()
+
+    print(f"{nChecks} checks of a job of {nProcesses} processes by {nWatchdogs} watchdog(s)")
+    print(f"per metric calls: {perMetric:.2f} s CPU, {1000 * perMetric / nChecks:.1f} ms per check")
+    print(f"treeUsage:        {treeUsage:.2f} s CPU, {1000 * treeUsage / nChecks:.1f} ms per check")